@@ -0,0 +1,33 @@
+"""add HTTP validators to archived urls
+
+Revision ID: 0006_add_url_validators
+Revises: 0005_add_multi_provider_tracking
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_add_url_validators'
+down_revision = '0005_add_multi_provider_tracking'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Validators of the last archived fetch, used for conditional re-archiving
+    op.add_column('archived_urls', sa.Column('etag', sa.Text(), nullable=True))
+    op.add_column('archived_urls', sa.Column('last_modified', sa.String(), nullable=True))
+    op.add_column('archived_urls', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('archived_urls', sa.Column('validated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('archived_urls', 'validated_at')
+    op.drop_column('archived_urls', 'content_hash')
+    op.drop_column('archived_urls', 'last_modified')
+    op.drop_column('archived_urls', 'etag')
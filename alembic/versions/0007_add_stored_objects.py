@@ -0,0 +1,47 @@
+"""add content-addressed stored object index
+
+Revision ID: 0007_add_stored_objects
+Revises: 0006_add_url_validators
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_add_stored_objects'
+down_revision = '0006_add_url_validators'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per (content, provider, codec): where those bytes are already stored
+    op.create_table(
+        'stored_objects',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('content_sha256', sa.String(length=64), nullable=False),
+        sa.Column('provider', sa.String(), nullable=False),
+        sa.Column('codec', sa.String(), nullable=False),
+        sa.Column('storage_path', sa.Text(), nullable=False),
+        sa.Column('storage_uri', sa.Text(), nullable=True),
+        sa.Column('stored_size', sa.BigInteger(), nullable=True),
+        sa.Column('original_size', sa.BigInteger(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('content_sha256', 'provider', 'codec', name='uq_stored_object_content')
+    )
+
+    # Content hash of each artifact's main output
+    op.add_column('archive_artifact', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index('idx_artifact_content_sha256', 'archive_artifact', ['content_sha256'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_artifact_content_sha256', table_name='archive_artifact')
+    op.drop_column('archive_artifact', 'content_sha256')
+    op.drop_table('stored_objects')
@@ -0,0 +1,31 @@
+"""add encoded size and codec to archive_artifact
+
+Revision ID: 0008_add_artifact_encoding
+Revises: 0007_add_stored_objects
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_add_artifact_encoding'
+down_revision = '0007_add_stored_objects'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Recorded by the single-pass finalization alongside content_sha256
+    op.add_column('archive_artifact', sa.Column('original_size', sa.BigInteger(), nullable=True))
+    op.add_column('archive_artifact', sa.Column('stored_size', sa.BigInteger(), nullable=True))
+    op.add_column('archive_artifact', sa.Column('codec', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('archive_artifact', 'codec')
+    op.drop_column('archive_artifact', 'stored_size')
+    op.drop_column('archive_artifact', 'original_size')
@@ -0,0 +1,30 @@
+"""add asset_dedup flag to archive_artifact
+
+Revision ID: 0009_add_artifact_asset_dedup
+Revises: 0008_add_artifact_encoding
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_add_artifact_asset_dedup'
+down_revision = '0008_add_artifact_encoding'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Set when inlined assets were moved to the asset store; retrieval only rehydrates these
+    op.add_column(
+        'archive_artifact',
+        sa.Column('asset_dedup', sa.Boolean(), server_default=sa.text('false'), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('archive_artifact', 'asset_dedup')
@@ -8,9 +8,11 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from core.config import AppSettings, get_settings
 
 logger = logging.getLogger(__name__)
+from archivers.screenshot_derivatives import thumbnail_name
 from db import ArchiveArtifactRepository
 from models import DeleteResponse, SummarizeRequest, SummarizeResponse
 from core.utils import sanitize_filename
+from storage.artifact_manifest import get_artifact_manifest
 from pydantic import BaseModel, Field
 from task_manager.archiver import (
     DEFAULT_REQUEUE_CHUNK_SIZE,
@@ -57,6 +59,9 @@ def list_saves_endpoint(
     from pathlib import Path
 
     data_root = Path(settings.data_dir).resolve()
+    manifest = get_artifact_manifest()
+    if manifest is not None and not manifest.ready:
+        manifest = None
     for art, au in rows:
         created_val = getattr(art, "created_at", None)
         created_at = created_val.isoformat() if hasattr(created_val, "isoformat") else created_val
@@ -66,13 +71,18 @@ def list_saves_endpoint(
         archiver = getattr(art, "archiver", None)
         if saved_path:
             p = Path(saved_path)
-            file_exists = p.exists()
-            try:
-                rp = p.resolve()
-                if data_root in rp.parents:
-                    rel_path = str(rp.relative_to(data_root))
-            except Exception:
-                rel_path = None
+            if manifest is not None and manifest.relative_path(saved_path) is not None:
+                # Answered from the artifact manifest without per-row syscalls
+                rel_path = manifest.relative_path(saved_path)
+                file_exists = manifest.contains(saved_path)
+            else:
+                file_exists = p.exists()
+                try:
+                    rp = p.resolve()
+                    if data_root in rp.parents:
+                        rel_path = str(rp.relative_to(data_root))
+                except Exception:
+                    rel_path = None
             # Infer archiver from path if not recorded in DB
             if not archiver:
                 parts = p.parts
@@ -91,6 +101,7 @@ def list_saves_endpoint(
                 "saved_path": art.saved_path,
                 "file_exists": file_exists,
                 "relative_path": rel_path,
+                "thumbnail_path": _thumbnail_path(saved_path, rel_path, archiver, settings, manifest),
                 "archiver": archiver,
                 "created_at": created_at,
             }
@@ -98,6 +109,19 @@ def list_saves_endpoint(
     return out
 
 
+def _thumbnail_path(saved_path, rel_path, archiver, settings: AppSettings, manifest) -> Optional[str]:
+    """Relative path of a screenshot's dashboard thumbnail, when it exists."""
+    sizes = settings.screenshot_thumbnail_sizes
+    if archiver != "screenshot" or not rel_path or not sizes:
+        return None
+    from pathlib import Path
+
+    name = thumbnail_name(*sizes[0])
+    thumb = Path(saved_path).with_name(name)
+    exists = manifest.contains(str(thumb)) if manifest is not None else thumb.exists()
+    return str(Path(rel_path).with_name(name)) if exists else None
+
+
 @router.get("/archivers", response_model=List[str])
 def list_archivers(request: Request):
     registry: Dict[str, object] = getattr(request.app.state, "archivers", {})
@@ -262,6 +286,9 @@ def delete_save(
                 if data_root in rp.parents:
                     p.unlink()
                     removed_files.append(str(p))
+                    manifest = get_artifact_manifest()
+                    if manifest is not None:
+                        manifest.remove_path(p)
                     # Prune empty parents up to data root
                     parent = p.parent
                     while parent != data_root and parent.is_dir():
@@ -303,6 +330,7 @@ def delete_saves_by_item(
         from pathlib import Path
 
         data_root = Path(settings.data_dir).resolve()
+        manifest = get_artifact_manifest()
         for sp in saved_paths:
             try:
                 p = Path(sp)
@@ -312,6 +340,8 @@ def delete_saves_by_item(
                 if data_root in rp.parents:
                     p.unlink()
                     removed_files.append(str(p))
+                    if manifest is not None:
+                        manifest.remove_path(p)
                     parent = p.parent
                     while parent != data_root and parent.is_dir():
                         try:
@@ -351,6 +381,7 @@ def delete_saves_by_url_endpoint(
         from pathlib import Path
 
         data_root = Path(settings.data_dir).resolve()
+        manifest = get_artifact_manifest()
         for sp in saved_paths:
             try:
                 p = Path(sp)
@@ -360,6 +391,8 @@ def delete_saves_by_url_endpoint(
                 if data_root in rp.parents:
                     p.unlink()
                     removed_files.append(str(p))
+                    if manifest is not None:
+                        manifest.remove_path(p)
                     parent = p.parent
                     while parent != data_root and parent.is_dir():
                         try:
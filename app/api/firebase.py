@@ -188,6 +188,43 @@ async def add_pocket_article(
         )
 
 
+def _artifact_gcs_path(db_storage, item_id: str, archiver: str) -> str:
+    """Stored object path of an article's artifact (raises 404 when unknown)."""
+    # Get artifact for specified archiver
+    artifact = db_storage.get_artifact(item_id, archiver)
+
+    if not artifact:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Artifact not found for archiver: {archiver}"
+        )
+
+    # Get storage path from artifact
+    storage_uploads = artifact.get('storage_uploads', [])
+    gcs_path = None
+
+    # Find GCS upload in storage_uploads list
+    for upload in storage_uploads:
+        if upload.get('success') and upload.get('storage_uri'):
+            # Extract GCS path from storage URI
+            uri = upload.get('storage_uri', '')
+            if uri.startswith('gs://'):
+                # Prefer the recorded key; older uploads only carry the URI
+                gcs_path = upload.get('storage_path') or uri.replace('gs://', '').split('/', 1)[1]
+                break
+
+    if not gcs_path:
+        # Fallback to old gcs_path field
+        gcs_path = artifact.get('gcs_path')
+
+    if not gcs_path:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No GCS path found for archiver: {archiver}"
+        )
+    return gcs_path
+
+
 @router.get("/download/{item_id}/{archiver}", response_model=DownloadURLResponse)
 async def generate_download_url(
     request: Request,
@@ -238,37 +275,7 @@ async def generate_download_url(
                 detail=f"Article not found: {item_id}"
             )
 
-        # Get artifact for specified archiver
-        artifact = db_storage.get_artifact(item_id, archiver)
-
-        if not artifact:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Artifact not found for archiver: {archiver}"
-            )
-
-        # Get storage path from artifact
-        storage_uploads = artifact.get('storage_uploads', [])
-        gcs_path = None
-
-        # Find GCS upload in storage_uploads list
-        for upload in storage_uploads:
-            if upload.get('success') and upload.get('storage_uri'):
-                # Extract GCS path from storage URI
-                uri = upload.get('storage_uri', '')
-                if uri.startswith('gs://'):
-                    gcs_path = uri.replace('gs://', '').split('/', 1)[1]  # Remove bucket, keep path
-                    break
-
-        if not gcs_path:
-            # Fallback to old gcs_path field
-            gcs_path = artifact.get('gcs_path')
-
-        if not gcs_path:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No GCS path found for archiver: {archiver}"
-            )
+        gcs_path = _artifact_gcs_path(db_storage, item_id, archiver)
 
         # Generate signed URL from any GCS provider
         signed_url = None
@@ -307,6 +314,73 @@ async def generate_download_url(
         )
 
 
+@router.get("/download/{item_id}/{archiver}/file")
+def download_artifact_file(
+    request: Request,
+    item_id: str,
+    archiver: str
+):
+    """
+    Stream an archived article's artifact through the service.
+
+    Unlike the signed URL endpoint this proxies the bytes, so it works for
+    clients that cannot reach the bucket. Remote providers are fronted by the
+    local artifact cache, so repeated downloads are served from disk; Range
+    and If-None-Match are honoured.
+
+    Args:
+        request: FastAPI request object
+        item_id: Article identifier
+        archiver: Archiver type (monolith, singlefile, pdf, etc.)
+
+    Raises:
+        HTTPException: If the article, artifact or stored file is not found
+    """
+    import mimetypes
+    from pathlib import Path
+
+    from storage.codecs import strip_codec_suffix
+
+    file_storage_providers = getattr(request.app.state, 'file_storage_providers', None)
+    if not file_storage_providers:
+        raise HTTPException(
+            status_code=503,
+            detail="File storage providers not initialized"
+        )
+
+    db_storage = request.app.state.db_storage
+    if not db_storage.get_article(item_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Article not found: {item_id}"
+        )
+    storage_path = _artifact_gcs_path(db_storage, item_id, archiver)
+
+    plain_name = Path(strip_codec_suffix(storage_path)).name
+    media_type = mimetypes.guess_type(plain_name)[0] or "application/octet-stream"
+    filename = f"{item_id}-{archiver}{Path(plain_name).suffix}"
+
+    for provider in file_storage_providers:
+        try:
+            if provider.exists(storage_path):
+                return provider.serve_file(
+                    storage_path=storage_path,
+                    filename=filename,
+                    media_type=media_type,
+                    request_headers=request.headers
+                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to serve from {provider.provider_name}: {e}")
+            continue
+
+    raise HTTPException(
+        status_code=404,
+        detail=f"Stored file not found: {storage_path}"
+    )
+
+
 @router.post("/save", response_model=AddPocketArticleResponse)
 async def save_article(
     request: Request,
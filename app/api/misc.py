@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import get_metrics
 
 router = APIRouter()
 
@@ -7,3 +10,10 @@ router = APIRouter()
 def healthz():
     return {"status": "ok"}
 
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        get_metrics().render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -2,13 +2,13 @@ from __future__ import annotations
 
 import logging
 import mimetypes
-import tarfile
+from datetime import timedelta
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 
 from core.config import AppSettings, get_settings
 from db import (
@@ -27,6 +27,11 @@ from models import (
     TaskAccepted,
 )
 from core.utils import sanitize_filename, check_url_archivability, rewrite_paywalled_url
+from core.tar_stream import TarMember, stream_tar_gz
+from storage.asset_store import AssetStore, fetch_remote_asset, rehydrate_file
+from storage.codecs import COMPRESSED_SUFFIXES, strip_codec_suffix
+from storage.file_storage import FileStorageProvider
+from storage.serving import file_response
 
 logger = logging.getLogger(__name__)
 
@@ -201,8 +206,7 @@ def _archive_with(
 
             if existing is not None:
                 # Verify the file actually exists before reusing
-                saved_path_obj = Path(existing.saved_path) if existing.saved_path else None
-                if saved_path_obj and saved_path_obj.exists():
+                if existing.saved_path and archiver_obj.output_exists(existing.saved_path):
                     logger.info(f"Reusing existing artifact | archiver={name} item_id={safe_id} saved_path={existing.saved_path}")
                     last_result = ArchiveResult(
                         success=True, exit_code=0, saved_path=existing.saved_path
@@ -262,6 +266,8 @@ def _archive_with(
                 exit_code=result.exit_code,
                 saved_path=result.saved_path,
                 archiver_name=name,
+                storage_uploads=(result.metadata or {}).get("storage_uploads"),
+                asset_dedup=bool((result.metadata or {}).get("asset_dedup")),
             )
             logger.info(f"Persisted save result | archiver={name} item_id={safe_id} rowid={last_row_id}")
             if (
@@ -310,19 +316,6 @@ def _archive_with(
     )
 
 
-@router.post("/archive/{archiver}", response_model=SaveResponse)
-def archive_with(
-    archiver: str,
-    payload: SaveRequest,
-    request: Request,
-    settings: AppSettings = Depends(get_settings),
-):
-    logger.info(f"/archive/{archiver} invoked")
-    response = _archive_with(archiver, payload, request, settings)
-    logger.info(f"/archive/{archiver} response | ok={response.ok} exit_code={response.exit_code} rowid={response.db_rowid}")
-    return response
-
-
 @router.post("/archive/retrieve")
 def retrieve_archive(
     payload: ArchiveRetrieveRequest,
@@ -405,26 +398,42 @@ def retrieve_archive(
         extension = Path(saved_path).suffix or infer_extension_from_archiver(archiver_label)
         filename = f"{base_label}-{archiver_label}{extension}"
 
-        # Check if we have storage providers available
-        if hasattr(request.app.state, 'file_storage_providers') and request.app.state.file_storage_providers:
-            # Try to retrieve from any storage provider
-            for provider in request.app.state.file_storage_providers:
-                try:
-                    # Check if file exists in this provider
-                    storage_path = saved_path.replace(str(settings.data_dir), "archives")
-                    if provider.exists(storage_path):
-                        logger.info(
-                            f"Serving archived artifact via {provider.provider_name}",
-                            extra={"archiver": archiver_label, "item_id": safe_id, "storage_path": storage_path},
-                        )
-                        return provider.serve_file(
-                            storage_path=storage_path,
-                            filename=filename,
-                            media_type=media_type
+        # Only outputs recorded as deduplicated reference the asset store
+        rehydrate = media_type == "text/html" and bool(getattr(artifact, "asset_dedup", False))
+        providers = getattr(request.app.state, "file_storage_providers", None) or []
+        for provider, storage_path, upload in _artifact_locations(artifact, providers, settings):
+            try:
+                logger.info(
+                    f"Serving archived artifact via {provider.provider_name}",
+                    extra={"archiver": archiver_label, "item_id": safe_id, "storage_path": storage_path},
+                )
+                if _can_redirect(provider, upload, media_type, settings):
+                    return RedirectResponse(
+                        provider.generate_access_url(
+                            storage_path, timedelta(minutes=settings.signed_redirect_minutes)
+                        ),
+                        status_code=307,
+                    )
+                if rehydrate:
+                    with provider.get_file_stream(storage_path) as stream:
+                        content = AssetStore(settings.resolved_asset_store_dir).rehydrate(
+                            stream.read(),
+                            fetch=lambda digest: fetch_remote_asset(providers, digest),
                         )
-                except Exception as e:
-                    logger.warning(f"Failed to serve from {provider.provider_name}: {e}")
-                    continue
+                    return Response(
+                        content,
+                        media_type=media_type,
+                        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+                    )
+                return provider.serve_file(
+                    storage_path=storage_path,
+                    filename=filename,
+                    media_type=media_type,
+                    request_headers=request.headers
+                )
+            except Exception as e:
+                logger.warning(f"Failed to serve from {provider.provider_name}: {e}")
+                continue
 
         # Fallback to local file serving if exists
         file_path = Path(saved_path)
@@ -433,71 +442,201 @@ def retrieve_archive(
                 "Serving archived artifact via local filesystem",
                 extra={"archiver": archiver_label, "item_id": safe_id, "path": str(file_path)},
             )
-            return FileResponse(
-                path=str(file_path),
-                media_type=media_type,
-                filename=filename,
-            )
+            # Rebuild self-contained HTML whose assets were moved to the asset store
+            content = rehydrate_file(file_path, settings, providers) if rehydrate else None
+            if content is not None:
+                return Response(
+                    content,
+                    media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+                )
+            return file_response(file_path, request.headers, media_type, filename)
 
-    files: list[tuple[str, Path]] = []
-    temp_files: list[Path] = []  # Track temporary files for cleanup
+    # Locate every artifact up front so an empty bundle is still a 404
+    providers = getattr(request.app.state, "file_storage_providers", None) or []
+    sources: list[tuple[str, Optional[FileStorageProvider], str, bool]] = []
 
     for artifact in artifacts:
         saved_path = getattr(artifact, "saved_path", None)
         archiver_label = getattr(artifact, "archiver", "artifact")
         if not saved_path:
             continue
+        deduplicated = bool(getattr(artifact, "asset_dedup", False))
 
-        # Check if we have storage providers available
-        if hasattr(request.app.state, 'file_storage_providers') and request.app.state.file_storage_providers:
-            # Try to download from any storage provider
-            downloaded = False
-            for provider in request.app.state.file_storage_providers:
-                try:
-                    storage_path = saved_path.replace(str(settings.data_dir), "archives")
-                    if provider.exists(storage_path):
-                        temp_file = provider.download_to_temp(storage_path)
-                        files.append((archiver_label, temp_file))
-                        temp_files.append(temp_file)
-                        downloaded = True
-                        break
-                except Exception as e:
-                    logger.warning(f"Failed to download from {provider.provider_name}: {e}")
-                    continue
+        # Stream from the first provider holding a copy
+        for provider, storage_path, _ in _artifact_locations(artifact, providers, settings):
+            sources.append((archiver_label, provider, storage_path, deduplicated))
+            break
+        else:
+            # Fallback to local file serving
+            if Path(saved_path).exists():
+                sources.append((archiver_label, None, saved_path, deduplicated))
 
-            if downloaded:
-                continue
+    if not sources:
+        raise HTTPException(status_code=404, detail="url not archived")
 
-        # Fallback to local file serving
-        file_path = Path(saved_path)
-        if file_path.exists():
-                files.append((archiver_label, file_path))
+    bundle_label = safe_id or sanitize_filename(url_str or "archive")
+    filename = f"{bundle_label}-artifacts.tar.gz"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    logger.info(
+        "Returning archived bundle",
+        extra={"item_id": safe_id, "file_count": len(sources), "filename": filename},
+    )
+    # Members are read from their provider streams while the archive is sent
+    return StreamingResponse(
+        stream_tar_gz(_bundle_members(sources, settings, providers)),
+        media_type="application/gzip",
+        headers=headers,
+    )
 
-    if not files:
-        raise HTTPException(status_code=404, detail="url not archived")
 
-    try:
-        bundle_label = safe_id or sanitize_filename(url_str or "archive")
-        filename = f"{bundle_label}-artifacts.tar.gz"
-        buffer = BytesIO()
-        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
-            for archiver_label, file_path in files:
-                arcname = f"{archiver_label}/{file_path.name}"
-                tar.add(str(file_path), arcname=arcname)
-        buffer.seek(0)
-        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-        logger.info(
-            "Returning archived bundle",
-            extra={"item_id": safe_id, "file_count": len(files), "filename": filename},
-        )
-        return StreamingResponse(buffer, media_type="application/gzip", headers=headers)
-    finally:
-        # Clean up temporary files
-        for temp_file in temp_files:
+@router.post("/archive/{archiver}", response_model=SaveResponse)
+def archive_with(
+    archiver: str,
+    payload: SaveRequest,
+    request: Request,
+    settings: AppSettings = Depends(get_settings),
+):
+    logger.info(f"/archive/{archiver} invoked")
+    response = _archive_with(archiver, payload, request, settings)
+    logger.info(f"/archive/{archiver} response | ok={response.ok} exit_code={response.exit_code} rowid={response.db_rowid}")
+    return response
+
+
+def _artifact_locations(
+    artifact: object,
+    providers: list[FileStorageProvider],
+    settings: AppSettings,
+) -> Iterator[tuple[FileStorageProvider, str, Optional[dict]]]:
+    """Yield ``(provider, storage_path, upload)`` for each stored copy of an artifact.
+
+    Uploads recorded on the artifact name the provider position and the exact
+    stored key, so they are used without asking the provider first. Several
+    providers may share a name (two local roots), so a recorded upload is
+    routed by ``provider_index``, and only while that position still holds a
+    provider of the recorded name. Artifacts saved before uploads were
+    recorded fall back to probing each provider for the key derived from
+    ``saved_path`` (with and without a codec suffix).
+    """
+    recorded = []
+    for upload in getattr(artifact, "storage_uploads", None) or []:
+        index = _recorded_provider_index(upload, providers)
+        if upload.get("success") and upload.get("storage_path") and index is not None:
+            recorded.append((providers[index], upload))
+    if recorded:
+        for provider, upload in recorded:
+            yield provider, upload["storage_path"], upload
+        return
+
+    saved_path = getattr(artifact, "saved_path", None)
+    if not saved_path:
+        return
+    guess = saved_path.replace(str(settings.data_dir), "archives")
+    for provider in providers:
+        for storage_path in [guess + suffix for suffix in COMPRESSED_SUFFIXES] + [guess]:
             try:
-                temp_file.unlink(missing_ok=True)
+                if provider.exists(storage_path):
+                    yield provider, storage_path, None
+                    break
             except Exception as e:
-                logger.warning(f"Failed to cleanup temp file {temp_file}: {e}")
+                logger.warning(f"Failed to locate artifact in {provider.provider_name}: {e}")
+                break
+
+
+def _recorded_provider_index(upload: dict, providers: list[FileStorageProvider]) -> Optional[int]:
+    """Position of the provider an upload was recorded on, if it is still configured there."""
+    index = upload.get("provider_index")
+    if not isinstance(index, int) or not 0 <= index < len(providers):
+        return None
+    if providers[index].provider_name != upload.get("provider_name"):
+        return None
+    return index
+
+
+def _can_redirect(
+    provider: FileStorageProvider,
+    upload: Optional[dict],
+    media_type: str,
+    settings: AppSettings,
+) -> bool:
+    """Whether a signed URL serves the artifact correctly on its own.
+
+    A signed URL returns the object as stored, without ``Content-Encoding``
+    or asset rehydration, so only uncompressed, non-HTML objects qualify.
+    """
+    return (
+        settings.retrieve_signed_redirects
+        and upload is not None
+        and not upload.get("codec")
+        and media_type != "text/html"
+        and provider.supports_signed_urls
+    )
+
+
+def _bundle_members(
+    sources: list[tuple[str, Optional[FileStorageProvider], str, bool]],
+    settings: AppSettings,
+    providers: list[FileStorageProvider],
+) -> Iterator[TarMember]:
+    for archiver_label, provider, path, deduplicated in sources:
+        try:
+            member = _bundle_member(archiver_label, provider, path, deduplicated, settings, providers)
+        except Exception as e:
+            logger.warning(f"Skipping {path} in bundle: {e}", extra={"archiver": archiver_label})
+            continue
+        yield member
+
+
+def _bundle_member(
+    archiver_label: str,
+    provider: Optional[FileStorageProvider],
+    path: str,
+    deduplicated: bool,
+    settings: AppSettings,
+    providers: list[FileStorageProvider],
+) -> TarMember:
+    """Describe one bundle entry; its content is read when the entry is written.
+
+    ``deduplicated`` outputs reference the asset store and are rebuilt in
+    memory; everything else streams as stored.
+    """
+    arcname = f"{archiver_label}/{Path(strip_codec_suffix(path)).name}"
+
+    if provider is None:
+        file_path = Path(path)
+        stat_result = file_path.stat()
+        size: Optional[int] = stat_result.st_size
+        mtime = stat_result.st_mtime
+
+        def open_stream() -> BinaryIO:
+            return open(file_path, "rb")
+    else:
+        metadata = provider.get_metadata(path)
+        if metadata is None:
+            raise FileNotFoundError(path)
+        size = metadata.original_size if metadata.compressed else metadata.size
+        mtime = metadata.created_at.timestamp()
+
+        def open_stream() -> BinaryIO:
+            return provider.get_file_stream(path)
+
+    # Bundle self-contained HTML even when assets live in the asset store
+    if deduplicated and arcname.lower().endswith((".html", ".htm")):
+        with open_stream() as stream:
+            content = AssetStore(settings.resolved_asset_store_dir).rehydrate(
+                stream.read(),
+                fetch=lambda digest: fetch_remote_asset(providers, digest),
+            )
+        return TarMember(arcname, len(content), lambda: BytesIO(content), mtime)
+
+    if size is None:
+        # Stored encoded without a recorded size: count the decoded bytes first
+        size = 0
+        with open_stream() as stream:
+            while chunk := stream.read(1024 * 1024):
+                size += len(chunk)
+
+    return TarMember(arcname, size, open_stream, mtime)
 
 
 @router.post("/save", response_model=TaskAccepted, status_code=202)
@@ -1,19 +1,67 @@
 from __future__ import annotations
 
 import abc
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from core.config import AppSettings
-from core.utils import sanitize_filename
+from core.metrics import get_metrics
+from core.utils import file_sha256, get_output_size, sanitize_filename
 from models import ArchiveResult
-from storage.file_storage import FileStorageProvider
+from storage.asset_store import build_asset_store, remote_asset_path
+from storage.codecs import (
+    COMPRESSED_SUFFIXES,
+    Codec,
+    EncodedFile,
+    build_codec,
+    encode_file,
+    get_dictionary_store,
+    remote_dictionary_path,
+)
+from storage.file_storage import FileStorageProvider, UploadResult
 from storage.database_storage import DatabaseStorageProvider
 
+if TYPE_CHECKING:
+    from db import StoredObjectRepository
+    from storage.artifact_manifest import ArtifactManifest
+
+
+@lru_cache
+def get_upload_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all archivers for storage provider uploads."""
+    from core.config import get_settings
+
+    return ThreadPoolExecutor(max_workers=get_settings().upload_workers, thread_name_prefix="upload")
+
+
+def _unlink_when_done(futures: list[Future], path: Path) -> None:
+    """Delete ``path`` once every future has finished."""
+    pending = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_future: Future) -> None:
+        with lock:
+            pending[0] -= 1
+            last = pending[0] == 0
+        if last:
+            path.unlink(missing_ok=True)
+
+    for future in futures:
+        future.add_done_callback(done)
+
 
 class BaseArchiver(abc.ABC):
     name: str = "base"
     output_extension: str = "html"  # Subclasses can override (e.g., "pdf", "png")
+    supports_batch: bool = False  # True when archive_batch shares work across URLs
+    dedupe_inline_assets: bool = False  # True for self-contained HTML with base64 data URIs
 
     def __init__(
         self,
@@ -24,6 +72,11 @@ class BaseArchiver(abc.ABC):
         self.settings = settings
         self.file_storage_providers = file_storage_providers or []
         self.db_storage = db_storage
+        # Set by the server at startup
+        self.artifact_manifest: Optional[ArtifactManifest] = None
+        self.object_index: Optional[StoredObjectRepository] = None
+        # Dictionaries every provider is known to hold
+        self._uploaded_dictionaries: set[int] = set()
 
     def get_output_path(self, item_id: str) -> tuple[Path, Path]:
         """Return (output_dir, output_file_path) for this archiver.
@@ -47,6 +100,11 @@ class BaseArchiver(abc.ABC):
         Checks for both the standard output file and any numbered variants.
         """
         safe_item = sanitize_filename(item_id)
+        manifest = self.artifact_manifest
+        if manifest is not None and manifest.ready:
+            entry = manifest.find_output(safe_item, self.name, self.output_extension)
+            return self.settings.data_dir / entry.path if entry else None
+
         out_dir = self.settings.data_dir / safe_item / self.name
 
         if not out_dir.exists():
@@ -65,6 +123,13 @@ class BaseArchiver(abc.ABC):
 
         return None
 
+    def output_exists(self, path: str | Path) -> bool:
+        """Whether a saved output is on disk, answered from the artifact manifest when available."""
+        manifest = self.artifact_manifest
+        if manifest is not None and manifest.ready and manifest.relative_path(path) is not None:
+            return manifest.contains(path)
+        return Path(path).exists()
+
     def validate_output(
         self,
         path: Path,
@@ -81,11 +146,12 @@ class BaseArchiver(abc.ABC):
         Returns:
             True if output is valid (exit code 0, file exists, size >= min_size)
         """
-        return (
-            exit_code == 0
-            and path.exists()
-            and path.stat().st_size >= min_size
-        )
+        if exit_code != 0:
+            return False
+        try:
+            return path.stat().st_size >= min_size
+        except OSError:
+            return False
 
     def create_result(
         self,
@@ -113,6 +179,203 @@ class BaseArchiver(abc.ABC):
             metadata=metadata,
         )
 
+    def postprocess_output(
+        self,
+        result: ArchiveResult,
+        item_id: str,
+        *,
+        record_manifest: bool = True
+    ) -> ArchiveResult:
+        """Apply optional post-processing to a finished archive.
+
+        With ASSET_DEDUP enabled, large inlined assets in self-contained HTML
+        are moved into the content-addressed asset store. The final output is
+        then measured (``size_bytes``) and recorded in the artifact manifest.
+
+        Args:
+            result: Result returned by ``archive``
+            item_id: Article identifier
+            record_manifest: Record the output in the artifact manifest here;
+                ``finalize_with_storage`` records it after upload instead,
+                reusing the hash taken while encoding
+
+        Returns:
+            The same ArchiveResult, with ``asset_dedup`` metadata when applied
+        """
+        if not (result.success and result.saved_path):
+            return result
+        if self.dedupe_inline_assets:
+            result = self._dedupe_inline_assets(result, item_id)
+        result.size_bytes = get_output_size(Path(result.saved_path).parent)
+        if record_manifest:
+            self._record_manifest(Path(result.saved_path).parent, item_id)
+        return result
+
+    def _record_manifest(self, out_dir: Path, item_id: str, hashes: Optional[dict[str, str]] = None) -> None:
+        """Record an output directory in the artifact manifest, if there is one."""
+        manifest = self.artifact_manifest
+        if manifest is None:
+            return
+        try:
+            manifest.record_dir(out_dir, hashes=hashes)
+        except OSError as e:
+            import logging
+
+            logging.getLogger(__name__).warning(f"Failed to record {item_id}/{self.name} in manifest: {e}")
+
+    def _dedupe_inline_assets(self, result: ArchiveResult, item_id: str) -> ArchiveResult:
+        """Move large inlined assets of a saved HTML file into the asset store."""
+        store = build_asset_store(self.settings)
+        if store is None:
+            return result
+
+        import logging
+
+        logger = logging.getLogger(__name__)
+        try:
+            dedup = store.dedupe_file(Path(result.saved_path))
+        except Exception as e:
+            logger.warning(f"Asset dedup failed for {item_id}/{self.name}: {e}")
+            return result
+
+        if dedup.assets:
+            if result.metadata is None:
+                result.metadata = {}
+            result.metadata['asset_dedup'] = {
+                'assets': dedup.assets,
+                'bytes_saved': dedup.bytes_saved,
+                'new_digests': dedup.new_digests,
+            }
+            logger.info(
+                f"Moved {dedup.assets} inlined assets to the asset store",
+                extra={"item_id": item_id, "archiver": self.name, "bytes_saved": dedup.bytes_saved},
+            )
+        return result
+
+    def upload_assets(self, digests: list[str]) -> int:
+        """Upload asset store blobs to every provider that lacks them.
+
+        Args:
+            digests: SHA-256 digests of blobs to upload
+
+        Returns:
+            Number of blobs uploaded
+        """
+        import logging
+
+        logger = logging.getLogger(__name__)
+        store = build_asset_store(self.settings)
+        if store is None or not digests:
+            return 0
+
+        uploaded = 0
+        for provider in self.file_storage_providers:
+            for digest in digests:
+                remote_path = remote_asset_path(digest)
+                try:
+                    if provider.exists(remote_path):
+                        continue
+                    upload_result = provider.upload_file(
+                        local_path=store.blob_path(digest),
+                        destination_path=remote_path,
+                        compress=False
+                    )
+                    if upload_result.success:
+                        uploaded += 1
+                    else:
+                        logger.warning(f"Asset upload to {provider.provider_name} failed: {upload_result.error}")
+                except Exception as e:
+                    logger.warning(f"Asset upload to {provider.provider_name} failed: {e}")
+        return uploaded
+
+    def upload_dictionary(self, dict_id: int) -> int:
+        """Upload a zstd dictionary to every provider that lacks it.
+
+        Args:
+            dict_id: Dictionary ID referenced by uploaded zstd frames
+
+        Returns:
+            Number of providers the dictionary was uploaded to
+        """
+        import logging
+
+        logger = logging.getLogger(__name__)
+        if dict_id in self._uploaded_dictionaries:
+            return 0
+
+        local_path = get_dictionary_store().path_for(dict_id)
+        remote_path = remote_dictionary_path(dict_id)
+        uploaded = 0
+        complete = True
+        for provider in self.file_storage_providers:
+            try:
+                if provider.exists(remote_path):
+                    continue
+                upload_result = provider.upload_file(
+                    local_path=local_path,
+                    destination_path=remote_path,
+                    compress=False
+                )
+                if upload_result.success:
+                    uploaded += 1
+                else:
+                    complete = False
+                    logger.warning(f"Dictionary upload to {provider.provider_name} failed: {upload_result.error}")
+            except Exception as e:
+                complete = False
+                logger.warning(f"Dictionary upload to {provider.provider_name} failed: {e}")
+        if complete:
+            self._uploaded_dictionaries.add(dict_id)
+        return uploaded
+
+    def upload_derivatives(self, out_dir: Path, names: list[str], item_id: str) -> int:
+        """Upload derivative files (e.g. screenshot thumbnails) next to the main output.
+
+        Derivatives are already-compressed images, so they are stored as is.
+        Every upload runs concurrently on the shared upload pool, bounded by
+        each provider's UPLOAD_TIMEOUTS entry.
+
+        Args:
+            out_dir: Directory holding the derivative files
+            names: File names within ``out_dir``
+            item_id: Article identifier
+
+        Returns:
+            Number of files uploaded
+        """
+        import logging
+
+        logger = logging.getLogger(__name__)
+        executor = get_upload_executor()
+        started = time.monotonic()
+        futures = [
+            (
+                provider,
+                executor.submit(
+                    provider.upload_file,
+                    local_path=out_dir / name,
+                    destination_path=f"archives/{item_id}/{self.name}/{name}",
+                    compress=False
+                ),
+            )
+            for provider in self.file_storage_providers
+            for name in names
+        ]
+        uploaded = 0
+        for provider, future in futures:
+            timeout = self.settings.upload_timeout_for(provider.provider_name)
+            try:
+                upload_result = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+                if upload_result.success:
+                    uploaded += 1
+                else:
+                    logger.warning(f"Derivative upload to {provider.provider_name} failed: {upload_result.error}")
+            except FutureTimeoutError:
+                logger.warning(f"Derivative upload to {provider.provider_name} timed out after {timeout}s")
+            except Exception as e:
+                logger.warning(f"Derivative upload to {provider.provider_name} failed: {e}")
+        return uploaded
+
     def upload_to_all_providers(
         self,
         local_path: Path,
@@ -120,12 +383,28 @@ class BaseArchiver(abc.ABC):
     ) -> list[dict]:
         """Upload file to all configured storage providers.
 
+        The file is hashed in the same read that compresses it: with several
+        providers one pass writes the encoded copy they all upload, and a
+        single provider compresses as it uploads (GCS streams without a temp
+        file). Uploads run concurrently on the shared upload pool; a provider
+        that overruns its timeout (UPLOAD_TIMEOUTS) is reported as failed
+        without holding up the others.
+
+        With UPLOAD_DEDUP, content a provider already holds (same SHA-256 and
+        codec) is not uploaded again: the existing object is reused when it is
+        already at this path, or copied server-side when it is elsewhere. The
+        file is then hashed first, so a hit costs no compression at all.
+
+        Outputs the archiver already compressed (``output.warc.gz``) are
+        stored as is, without a second codec layer or a dedup lookup.
+
         Args:
             local_path: Path to the local file to upload
             item_id: Article identifier
 
         Returns:
-            List of upload results (one per provider)
+            List of upload results (one per provider, in provider order;
+            ``provider_index`` records the position reads are routed by)
         """
         import logging
         from datetime import datetime
@@ -135,46 +414,233 @@ class BaseArchiver(abc.ABC):
         if not self.file_storage_providers or not local_path.exists():
             return []
 
+        # Named after the file actually uploaded (a screenshot may fall back to its PNG)
+        storage_path = f"archives/{item_id}/{self.name}/output{''.join(local_path.suffixes)}"
+        compress = not local_path.name.endswith(COMPRESSED_SUFFIXES)
+        codec = build_codec(self.settings, archiver=self.name) if compress else Codec()
+        stored_path = storage_path + codec.suffix
+        if codec.dictionary_id:
+            # Frames reference the dictionary by ID; keep a copy next to the archives
+            self.upload_dictionary(codec.dictionary_id)
+
+        index = self.object_index if compress else None
+        digest = None
+        # Keyed by position: several providers may share a name (two local roots)
+        reused: dict[int, UploadResult] = {}
+        if index is not None:
+            digest = file_sha256(local_path)
+            for i, provider in enumerate(self.file_storage_providers):
+                reuse = self._reuse_stored_object(index, provider, digest, codec, stored_path)
+                if reuse is not None:
+                    reused[i] = reuse
+        pending = [(i, p) for i, p in enumerate(self.file_storage_providers) if i not in reused]
+
+        encoded = None
+        compress_error = None
+        content_hash = None
+        if not compress:
+            digest = file_sha256(local_path)
+        elif len(pending) > 1:
+            try:
+                encoded = self._encode_output(local_path, codec)
+                digest = encoded.sha256
+            except Exception as e:
+                compress_error = str(e)
+                pending = []
+                logger.error(f"Compressing {local_path} for upload failed: {e}")
+        elif pending and digest is None:
+            # The lone upload streams from the source; hash it on the way through
+            content_hash = hashlib.sha256()
+
+        metrics = get_metrics()
+        executor = get_upload_executor()
+        started = time.monotonic()
+        futures: dict[int, Future] = {}
+        for i, provider in pending:
+            future = executor.submit(
+                provider.upload_file,
+                local_path=local_path,
+                destination_path=storage_path,
+                compress=compress,
+                codec=codec,
+                precompressed=encoded.path if encoded is not None else None,
+                **({'content_hash': content_hash} if content_hash is not None else {})
+            )
+            future.add_done_callback(
+                lambda _f, name=provider.provider_name: metrics.observe(
+                    "storage_upload_seconds", time.monotonic() - started, provider=name
+                )
+            )
+            futures[i] = future
+        if encoded is not None:
+            if futures:
+                # Timed-out uploads keep reading the encoded copy; remove it once all finish
+                _unlink_when_done(list(futures.values()), encoded.path)
+            else:
+                encoded.path.unlink(missing_ok=True)
+
         results = []
-        storage_path = f"archives/{item_id}/{self.name}/output.{self.output_extension}"
+        for i, provider in enumerate(self.file_storage_providers):
+            if compress_error is not None and i not in reused:
+                results.append({
+                    'provider_name': provider.provider_name,
+                    'provider_index': i,
+                    'success': False,
+                    'error': compress_error
+                })
+                continue
 
-        for provider in self.file_storage_providers:
+            timeout = self.settings.upload_timeout_for(provider.provider_name)
             try:
-                upload_result = provider.upload_file(
-                    local_path=local_path,
-                    destination_path=storage_path,
-                    compress=True
-                )
+                upload_result = reused.get(i)
+                if upload_result is None:
+                    upload_result = futures[i].result(
+                        timeout=max(0.0, started + timeout - time.monotonic())
+                    )
+                    if content_hash is not None and upload_result.success:
+                        digest = content_hash.hexdigest()
 
                 if upload_result.success:
                     metadata = {
                         'provider_name': provider.provider_name,
+                        'provider_index': i,
                         'storage_uri': upload_result.uri,
+                        # Exact key, so reads go straight to the stored object
+                        'storage_path': stored_path if upload_result.codec else storage_path,
                         'original_size': upload_result.original_size,
                         'stored_size': upload_result.stored_size,
                         'compression_ratio': upload_result.compression_ratio,
-                        'uploaded_at': datetime.utcnow(),
+                        'codec': upload_result.codec,
+                        'codec_params': codec.describe() if upload_result.codec else None,
+                        'content_sha256': digest,
+                        'deduplicated': i in reused,
+                        'uploaded_at': datetime.utcnow().isoformat(),
                         'success': True
                     }
+                    if index is not None and i not in reused:
+                        self._record_stored_object(index, provider, digest, metadata)
                 else:
                     metadata = {
                         'provider_name': provider.provider_name,
+                        'provider_index': i,
                         'success': False,
                         'error': upload_result.error
                     }
 
                 results.append(metadata)
 
+            except FutureTimeoutError:
+                logger.error(f"Upload to {provider.provider_name} timed out after {timeout}s")
+                metrics.inc("storage_upload_timeouts_total", provider=provider.provider_name)
+                results.append({
+                    'provider_name': provider.provider_name,
+                    'provider_index': i,
+                    'success': False,
+                    'error': f"Upload timed out after {timeout}s"
+                })
             except Exception as e:
                 logger.error(f"Upload to {provider.provider_name} failed: {e}")
                 results.append({
                     'provider_name': provider.provider_name,
+                    'provider_index': i,
                     'success': False,
                     'error': str(e)
                 })
 
         return results
 
+    def _encode_output(self, local_path: Path, codec) -> EncodedFile:
+        """Encode an output into a temp file, taking its size and SHA-256 in the same read."""
+        fd, temp_name = tempfile.mkstemp(prefix=".upload-", suffix=codec.suffix)
+        os.close(fd)
+        try:
+            return encode_file(codec, local_path, Path(temp_name))
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    def _reuse_stored_object(
+        self,
+        index,
+        provider: FileStorageProvider,
+        digest: str,
+        codec,
+        stored_path: str
+    ) -> Optional[UploadResult]:
+        """Stand in for an upload when the provider already holds this content.
+
+        An object already at ``stored_path`` is kept as is; one stored under
+        another path (an identical save of another item) is copied
+        server-side, so every artifact still owns its own object and a later
+        overwrite of the source cannot change it.
+
+        Returns:
+            UploadResult for the reused object, or None to upload normally
+        """
+        import logging
+
+        logger = logging.getLogger(__name__)
+        try:
+            entry = index.find(digest, provider.provider_name, codec.name)
+            if entry is None:
+                return None
+            if entry.storage_path == stored_path:
+                if not provider.exists(stored_path):
+                    index.forget(digest, provider.provider_name, codec.name)
+                    return None
+                mode = "reference"
+                result = UploadResult(
+                    success=True,
+                    uri=entry.storage_uri or "",
+                    original_size=entry.original_size or 0,
+                    stored_size=entry.stored_size or 0
+                )
+            else:
+                result = provider.copy_file(entry.storage_path, stored_path)
+                if not result.success:
+                    logger.info(f"Copy from {entry.storage_path} on {provider.provider_name} failed: {result.error}")
+                    return None
+                mode = "copy"
+                index.record(
+                    digest,
+                    provider.provider_name,
+                    codec.name,
+                    stored_path,
+                    storage_uri=result.uri,
+                    stored_size=result.stored_size,
+                    original_size=result.original_size,
+                )
+        except Exception as e:
+            logger.warning(f"Upload dedup lookup on {provider.provider_name} failed: {e}")
+            return None
+
+        result.codec = codec.name
+        if result.original_size:
+            result.compression_ratio = (1 - result.stored_size / result.original_size) * 100
+        metrics = get_metrics()
+        metrics.inc("storage_upload_dedup_total", provider=provider.provider_name, mode=mode)
+        metrics.inc("storage_upload_dedup_bytes_total", result.stored_size, provider=provider.provider_name)
+        return result
+
+    def _record_stored_object(self, index, provider: FileStorageProvider, digest: str, upload: dict) -> None:
+        """Remember where an uploaded object lives so identical content can reuse it."""
+        if not upload.get('codec'):
+            return
+        try:
+            index.record(
+                digest,
+                provider.provider_name,
+                upload['codec'],
+                upload['storage_path'],
+                storage_uri=upload['storage_uri'],
+                stored_size=upload['stored_size'],
+                original_size=upload['original_size'],
+            )
+        except Exception as e:
+            import logging
+
+            logging.getLogger(__name__).warning(f"Failed to index stored object on {provider.provider_name}: {e}")
+
     def update_database_storage(
         self,
         item_id: str,
@@ -229,10 +695,53 @@ class BaseArchiver(abc.ABC):
         # 1. Run the base archiving logic
         result = self.archive(url=url, item_id=item_id)
 
+        # 2-7. Upload, record and schedule cleanup
+        return self.finalize_with_storage(result, item_id)
+
+    def archive_batch(self, items: list[tuple[str, str]]) -> list[ArchiveResult]:
+        """Archive several ``(url, item_id)`` pairs; results keep the input order.
+
+        The default runs ``archive`` per item. Archivers whose tools can share
+        startup cost across URLs set ``supports_batch`` and override this.
+        """
+        return [self.archive(url=url, item_id=item_id) for url, item_id in items]
+
+    def archive_batch_with_storage(self, items: list[tuple[str, str]]) -> list[ArchiveResult]:
+        """Batch counterpart of ``archive_with_storage``."""
+        results = self.archive_batch(items)
+        return [
+            self.finalize_with_storage(result, item_id)
+            for result, (_, item_id) in zip(results, items)
+        ]
+
+    def finalize_with_storage(self, result: ArchiveResult, item_id: str) -> ArchiveResult:
+        """Upload a finished archive to all providers and record storage state.
+
+        Args:
+            result: Result returned by ``archive``
+            item_id: Article identifier
+
+        Returns:
+            The same ArchiveResult with storage metadata included
+        """
+        # 1b. Optional post-processing (asset dedup) before anything is uploaded
+        result = self.postprocess_output(result, item_id, record_manifest=False)
+        if result.success and result.saved_path and not self.file_storage_providers:
+            self._record_manifest(Path(result.saved_path).parent, item_id)
+
         # 2. Upload to all providers if successful
         if result.success and result.saved_path and self.file_storage_providers:
             local_path = Path(result.saved_path)
             upload_results = self.upload_to_all_providers(local_path, item_id)
+            # The upload pass already hashed the output; the manifest reuses it
+            digest = next((r['content_sha256'] for r in upload_results if r.get('content_sha256')), None)
+            self._record_manifest(local_path.parent, item_id, {local_path.name: digest} if digest else None)
+            dedup = (result.metadata or {}).get('asset_dedup')
+            if dedup:
+                self.upload_assets(dedup['new_digests'])
+            derivatives = (result.metadata or {}).get('derivatives')
+            if derivatives:
+                self.upload_derivatives(local_path.parent, [d['name'] for d in derivatives], item_id)
 
             # 3. Check if ALL uploads succeeded
             all_succeeded = all(r.get('success', False) for r in upload_results)
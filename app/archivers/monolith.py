@@ -6,9 +6,12 @@ from typing import Optional
 import shlex
 
 from .base import BaseArchiver
+from core.asset_proxy import running_asset_proxy
+from core.chromium_readiness import ChromiumPageLoader, ReadinessStats
 from core.chromium_utils import ChromiumArchiverMixin, ChromiumCommandBuilder
 from core.config import AppSettings
 from core.command_runner import CommandRunner
+from core.render_classifier import RenderClassifier
 from models import ArchiveResult
 from core.utils import sanitize_filename
 from storage.file_storage import FileStorageProvider
@@ -19,6 +22,7 @@ logger = logging.getLogger(__name__)
 
 class MonolithArchiver(BaseArchiver, ChromiumArchiverMixin):
     name = "monolith"
+    dedupe_inline_assets = True
 
     def __init__(
         self,
@@ -31,14 +35,22 @@ class MonolithArchiver(BaseArchiver, ChromiumArchiverMixin):
         self.command_runner = command_runner
         self.use_chromium = settings.chromium.enabled
         self.chromium_builder = ChromiumCommandBuilder(settings)
+        self.page_loader = ChromiumPageLoader(settings)
+        # Shared RenderClassifier, injected at startup when ADAPTIVE_RENDER is on
+        self.render_classifier: Optional[RenderClassifier] = None
 
     def archive(self, *, url: str, item_id: str) -> ArchiveResult:
         logger.info(f"Archiving {url}", extra={"item_id": item_id, "archiver": "monolith"})
         out_dir, out_path = self.get_output_path(item_id)
 
+        # Static pages (adaptive rendering) are fed to monolith as fetched
+        static = None
+        if self.render_classifier is not None:
+            static = self.render_classifier.static_page(url)
+        use_chromium = self.use_chromium and static is None
 
         # Setup Chromium if needed
-        if self.use_chromium:
+        if use_chromium:
             self.setup_chromium()
 
         # Parse and safely quote any extra monolith flags from config
@@ -59,7 +71,23 @@ class MonolithArchiver(BaseArchiver, ChromiumArchiverMixin):
         if extra_q:
             mono_cmd += f" {extra_q}"
 
-        if self.use_chromium:
+        # Fetch assets through the shared cache; it re-signs HTTPS, hence -k
+        asset_proxy = running_asset_proxy()
+        if asset_proxy is not None:
+            proxy_env = " ".join(f"{k}={shlex.quote(v)}" for k, v in asset_proxy.proxy_env().items())
+            mono_cmd = f"{proxy_env} {mono_cmd} -k"
+
+        # Prefer network-idle readiness for the DOM dump; the rendered DOM (or the
+        # static page) is fed to monolith on stdin like the piped Chromium CLI output
+        capture = None
+        dom_path = out_dir / ".source-dom.html"
+        if use_chromium:
+            capture = self.capture_with_readiness(url, "dom", incognito=True)
+
+        if static is not None or capture is not None:
+            dom_path.write_text(static.html if static is not None else capture.content, encoding="utf-8")
+            cmd = f"{mono_cmd} - -I -b {url_q} -o {out_q} < {shlex.quote(str(dom_path))}"
+        elif use_chromium:
             # Build Chromium command for DOM dumping
             chromium_args = self.chromium_builder.build_dump_dom_for_monolith(url, incognito=True)
             chromium_cmd = " ".join(shlex.quote(arg) for arg in chromium_args)
@@ -78,12 +106,22 @@ class MonolithArchiver(BaseArchiver, ChromiumArchiverMixin):
             archiver=self.name,
         )
 
+        dom_path.unlink(missing_ok=True)
+
         if result.timed_out:
             self.cleanup_after_timeout()
             return ArchiveResult(success=False, exit_code=result.exit_code, saved_path=None)
 
         # Clean up Chromium singleton locks after archiving (if using Chromium)
-        if self.use_chromium:
+        metadata = None
+        if static is not None:
+            readiness = ReadinessStats(strategy="static", ready=True, elapsed_ms=static.fetch_ms, budget_ms=0)
+            metadata = {"readiness": readiness.as_dict()}
+        elif use_chromium:
             self.cleanup_chromium()
+            readiness = capture.readiness if capture is not None else ReadinessStats.from_virtual_time(
+                self.settings.chromium.virtual_time_budget_ms, result.duration_seconds
+            )
+            metadata = {"readiness": readiness.as_dict()}
 
-        return self.create_result(path=out_path, exit_code=result.exit_code)
+        return self.create_result(path=out_path, exit_code=result.exit_code, metadata=metadata)
@@ -6,6 +6,7 @@ from typing import Optional
 import shlex
 
 from .base import BaseArchiver
+from core.chromium_readiness import ChromiumPageLoader, ReadinessStats
 from core.chromium_utils import ChromiumArchiverMixin, ChromiumCommandBuilder
 from core.config import AppSettings
 from core.command_runner import CommandRunner
@@ -31,6 +32,7 @@ class PDFArchiver(BaseArchiver, ChromiumArchiverMixin):
         super().__init__(settings, file_storage_providers, db_storage)
         self.command_runner = command_runner
         self.chromium_builder = ChromiumCommandBuilder(settings)
+        self.page_loader = ChromiumPageLoader(settings)
 
     def archive(self, *, url: str, item_id: str) -> ArchiveResult:
         out_dir, out_path = self.get_output_path(item_id)
@@ -40,6 +42,17 @@ class PDFArchiver(BaseArchiver, ChromiumArchiverMixin):
         # Setup Chromium (create user data dir and clean locks)
         self.setup_chromium()
 
+        # Prefer network-idle readiness; fall back to the fixed virtual time budget
+        capture = self.capture_with_readiness(url, "pdf")
+        if capture is not None:
+            out_path.write_bytes(capture.content)
+            self.cleanup_chromium()
+            return self.create_result(
+                path=out_path,
+                exit_code=0,
+                metadata={"readiness": capture.readiness.as_dict()},
+            )
+
         # Build Chromium command using builder
         chromium_args = self.chromium_builder.build_pdf_args(url, out_path)
         cmd = " ".join(shlex.quote(arg) for arg in chromium_args)
@@ -59,4 +72,11 @@ class PDFArchiver(BaseArchiver, ChromiumArchiverMixin):
         # Clean up Chromium singleton locks after archiving
         self.cleanup_chromium()
 
-        return self.create_result(path=out_path, exit_code=result.exit_code)
+        readiness = ReadinessStats.from_virtual_time(
+            self.settings.chromium.virtual_time_budget_ms, result.duration_seconds
+        )
+        return self.create_result(
+            path=out_path,
+            exit_code=result.exit_code,
+            metadata={"readiness": readiness.as_dict()},
+        )
@@ -2,13 +2,21 @@ from __future__ import annotations
 
 from datetime import datetime
 import logging
+import os
 from pathlib import Path
+import signal
 from typing import Optional
 import subprocess
+import time
 
 from .base import BaseArchiver
+from .readability_extraction import extract_readability
+from core.chromium_readiness import ChromiumPageLoader, ReadinessStats
 from core.chromium_utils import ChromiumArchiverMixin, ChromiumCommandBuilder
 from core.config import AppSettings
+from core.process_pool import ProcessPoolTimeout, get_process_pool
+from core.process_watchdog import get_process_watchdog
+from core.render_classifier import RenderClassifier
 from core.utils import sanitize_filename
 from models import ArchiveResult
 from storage.file_storage import FileStorageProvider
@@ -31,33 +39,73 @@ class ReadabilityArchiver(BaseArchiver, ChromiumArchiverMixin):
         # command_runner not used by readability; kept for constructor compatibility
         self.command_runner = command_runner
         self.chromium_builder = ChromiumCommandBuilder(settings)
+        self.page_loader = ChromiumPageLoader(settings)
+        # Shared RenderClassifier, injected at startup when ADAPTIVE_RENDER is on
+        self.render_classifier: Optional[RenderClassifier] = None
 
-    def _get_source_html(self, url: str) -> Optional[str]:
-        """Return page HTML either via headless Chromium (--dump-dom) or HTTP GET.
-
-        This avoids any need for a long-lived shell/`ht` session and does not
-        write an intermediate DOM file to disk.
+    def _get_source_html(
+        self,
+        url: str,
+        *,
+        allow_static: bool = True,
+    ) -> tuple[Optional[str], Optional[ReadinessStats]]:
+        """Return page HTML either via headless Chromium or HTTP GET.
+
+        With adaptive rendering enabled, pages classified as static use the
+        raw HTTP response and skip Chromium entirely. Otherwise Chromium is
+        driven through the readiness-aware loader when enabled and falls back
+        to ``--dump-dom`` under the virtual time budget. This avoids any need
+        for a long-lived shell/`ht` session and does not write an intermediate
+        DOM file to disk. The readiness stats are None when the HTML came from
+        the HTTP fallback.
         """
+        if allow_static and self.render_classifier is not None:
+            static = self.render_classifier.static_page(url)
+            if static is not None:
+                return static.html, ReadinessStats(
+                    strategy="static",
+                    ready=True,
+                    elapsed_ms=static.fetch_ms,
+                    budget_ms=0,
+                )
+
         # Try Chromium first if enabled
         try:
-            if getattr(self.settings, "use_chromium", True):
+            if self.settings.chromium.enabled:
                 # Setup Chromium (create user data dir and clean locks)
                 self.setup_chromium()
 
+                capture = self.capture_with_readiness(url, "dom")
+                if capture is not None and capture.content.strip():
+                    self.cleanup_chromium()
+                    return capture.content, capture.readiness
+
                 # Build Chromium command for DOM dumping
                 args = self.chromium_builder.build_dump_dom_args(url)
 
-                proc = subprocess.run(
+                started = time.monotonic()
+                proc = subprocess.Popen(
                     args,
-                    check=False,
-                    capture_output=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
                     text=True,
-                    timeout=120,
+                    start_new_session=True,
                 )
-                if proc.returncode == 0 and proc.stdout.strip():
+                with get_process_watchdog().watch(proc, archiver=self.name):
+                    try:
+                        stdout, _ = proc.communicate(timeout=120)
+                    except subprocess.TimeoutExpired:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                        proc.communicate()
+                        raise
+                if proc.returncode == 0 and stdout.strip():
                     # Clean up after Chromium completes
                     self.cleanup_chromium()
-                    return proc.stdout
+                    readiness = ReadinessStats.from_virtual_time(
+                        self.settings.chromium.virtual_time_budget_ms,
+                        time.monotonic() - started,
+                    )
+                    return stdout, readiness
         except Exception:
             # Fall through to requests
             pass
@@ -75,90 +123,62 @@ class ReadabilityArchiver(BaseArchiver, ChromiumArchiverMixin):
             }
             r = requests.get(url, headers=headers, timeout=30)
             r.raise_for_status()
-            return r.text
+            return r.text, None
         except Exception:
-            return None
+            return None, None
+
+    def _extract(self, html: str, url: str) -> tuple[str, str, dict]:
+        """Run readability over ``html``; returns (title, article_html, metadata).
+
+        Extraction is CPU-bound pure Python, so it runs in the shared process
+        pool when one is configured and in the calling thread otherwise.
+        """
+        pool = get_process_pool()
+        if pool is None:
+            payload = extract_readability(html, url)
+        else:
+            payload = pool.run(
+                extract_readability,
+                html,
+                url,
+                timeout=self.settings.extraction_timeout_seconds,
+            )
+        return payload["title"], payload["article_html"], payload["meta"]
 
     def archive(self, *, url: str, item_id: str) -> ArchiveResult:
         out_dir, out_path = self.get_output_path(item_id)
 
         logger.info(f"Archiving {url}", extra={"item_id": item_id, "archiver": "readability"})
 
-        # Obtain page HTML (Chromium dump preferred; HTTP fallback)
-        html = self._get_source_html(url)
+        # Obtain page HTML (static fetch, Chromium dump, or HTTP fallback)
+        html, readiness = self._get_source_html(url)
         if not html:
             return ArchiveResult(success=False, exit_code=1, saved_path=None)
 
         try:
-            from readability import Document  # type: ignore
+            import readability  # type: ignore  # noqa: F401
         except Exception:
             return ArchiveResult(success=False, exit_code=127, saved_path=None)
 
         try:
-            doc = Document(html)
-            title = doc.short_title() or doc.title() or ""
-            # summary() returns article HTML
-            article_html = doc.summary(html_partial=False)
-
-            # Extract metadata from DOM using lxml
-            meta: dict = {}
-            try:
-                import lxml.html as LH  # provided by readability-lxml dependency
-
-                tree = LH.fromstring(html)
-
-                def mget(names: list[tuple[str, str]]):
-                    for attr, key in names:
-                        val = tree.xpath(f"//meta[@{attr}='{key}']/@content")
-                        if val:
-                            return val[0]
-                    return None
-
-                def lget(rels: list[str]):
-                    for rel in rels:
-                        val = tree.xpath(f"//link[translate(@rel,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='{rel}']/@href")
-                        if val:
-                            return val[0]
-                    return None
-
-                lang = (tree.xpath("string(//html/@lang)") or "").strip().lower() or None
-                byline = mget([( "name", "author"), ("property", "article:author"), ("name", "byl")])
-                site_name = mget([( "property", "og:site_name")])
-                description = mget([("name", "description"), ("property", "og:description")])
-                published = mget([("property", "article:published_time"), ("name", "pubdate"), ("name", "date")])
-                canonical = lget(["canonical"]) or None
-                top_image = mget([("property", "og:image")]) or lget(["image_src"]) or None
-                favicon = lget(["icon"]) or lget(["shortcut icon"]) or None
-                keywords_raw = mget([("name", "keywords")])
-                keywords = [s.strip() for s in keywords_raw.split(",") if s.strip()] if keywords_raw else []
-
-                # Derive text, word counts
-                try:
-                    article_tree = LH.fromstring(article_html)
-                    text = article_tree.text_content().strip()
-                except Exception:
-                    text = ""
-                word_count = len(text.split()) if text else 0
-                reading_time_minutes = round(word_count / 200.0, 2) if word_count else 0.0
-
-                meta = {
-                    "source_url": url,
-                    "title": title,
-                    "byline": byline,
-                    "site_name": site_name,
-                    "description": description,
-                    "published": published,
-                    "language": lang,
-                    "canonical_url": canonical,
-                    "top_image": top_image,
-                    "favicon": favicon,
-                    "keywords": keywords,
-                    "word_count": word_count,
-                    "reading_time_minutes": reading_time_minutes,
-                    "text": text,
-                }
-            except Exception:
-                meta = {"source_url": url, "title": title}
+            title, article_html, meta = self._extract(html, url)
+
+            # A static page that yields almost no article text was misclassified:
+            # remember the domain needs JavaScript and render it properly.
+            if (
+                readiness is not None
+                and readiness.strategy == "static"
+                and self.render_classifier is not None
+                and (meta.get("word_count") or 0) < self.render_classifier.min_words
+            ):
+                self.render_classifier.record_outcome(url, needs_js=True)
+                rendered, rendered_readiness = self._get_source_html(url, allow_static=False)
+                if rendered:
+                    html, readiness = rendered, rendered_readiness
+                    title, article_html, meta = self._extract(html, url)
+
+            if readiness is not None:
+                meta["readiness"] = readiness.as_dict()
 
             # Persist metadata JSON alongside the HTML for inspection/debugging
             try:
@@ -177,6 +197,12 @@ class ReadabilityArchiver(BaseArchiver, ChromiumArchiverMixin):
                 f"<body>{article_html}</body></html>"
             )
             out_path.write_text(page, encoding="utf-8")
+        except ProcessPoolTimeout as exc:
+            logger.warning(
+                f"Readability extraction timed out: {exc}",
+                extra={"item_id": item_id, "archiver": "readability"},
+            )
+            return ArchiveResult(success=False, exit_code=1, saved_path=None)
         except Exception:
             return ArchiveResult(success=False, exit_code=1, saved_path=None)
 
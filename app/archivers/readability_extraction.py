@@ -0,0 +1,173 @@
+"""Readability extraction as a self-contained, picklable task.
+
+``extract_readability`` takes page HTML and returns plain data so it can run
+in a worker process (see ``core.process_pool``) as well as inline. Keep this
+module free of settings, database and archiver imports; spawned workers import
+it on their own.
+
+The page is parsed once. readability works on copies of that tree, metadata
+(meta/link tags and JSON-LD) is collected in a single pass of a precompiled
+XPath, and the article text is read from the tree readability produced rather
+than by re-parsing the article HTML.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from lxml import etree
+
+# One walk over every node the metadata lookups need, in document order
+_METADATA_NODES = etree.XPath(
+    "//meta[@content] | //link[@href] | //script[@type='application/ld+json']"
+)
+
+
+@lru_cache(maxsize=None)
+def _document_class():
+    from readability import Document  # type: ignore
+
+    class TreeDocument(Document):
+        """Document that keeps the final article tree instead of only its HTML."""
+
+        article_tree = None
+
+        def get_clean_html(self):
+            self.article_tree = self.html
+            return super().get_clean_html()
+
+    return TreeDocument
+
+
+class PageMetadata:
+    """Meta/link/JSON-LD lookups collected from one pass over a parsed page."""
+
+    def __init__(self, tree: Any) -> None:
+        self.metas: dict[tuple[str, str], str] = {}
+        self.links: dict[str, str] = {}
+        self.json_ld: list[dict] = []
+        for node in _METADATA_NODES(tree):
+            if node.tag == "meta":
+                content = node.get("content")
+                for attr in ("name", "property"):
+                    key = node.get(attr)
+                    if key is not None:
+                        self.metas.setdefault((attr, key), content)
+            elif node.tag == "link":
+                rel = node.get("rel")
+                if rel is not None:
+                    self.links.setdefault(rel.lower(), node.get("href"))
+            else:
+                self.json_ld.extend(_json_ld_objects(node.text))
+
+    def meta(self, *names: tuple[str, str]) -> Optional[str]:
+        for name in names:
+            value = self.metas.get(name)
+            if value:
+                return value
+        return None
+
+    def link(self, *rels: str) -> Optional[str]:
+        for rel in rels:
+            value = self.links.get(rel)
+            if value:
+                return value
+        return None
+
+    def ld(self, key: str) -> Optional[str]:
+        """First JSON-LD value for ``key``, flattened to a string."""
+        for obj in self.json_ld:
+            value = _ld_string(obj.get(key))
+            if value:
+                return value
+        return None
+
+
+def _json_ld_objects(text: Optional[str]) -> list[dict]:
+    try:
+        data = json.loads(text or "")
+    except ValueError:
+        return []
+    items = data if isinstance(data, list) else [data]
+    objects: list[dict] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        objects.append(item)
+        graph = item.get("@graph")
+        if isinstance(graph, list):
+            objects.extend(obj for obj in graph if isinstance(obj, dict))
+    return objects
+
+
+def _ld_string(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("url")
+    if isinstance(value, str):
+        return value.strip() or None
+    return None
+
+
+def extract_readability(html: str, url: str) -> dict:
+    """Run readability over ``html``.
+
+    Returns ``{"title": str, "article_html": str, "meta": dict}``.
+    """
+    from readability.htmls import build_doc  # type: ignore
+
+    tree, _ = build_doc(html)
+    doc = _document_class()(tree)
+    title = doc.short_title() or doc.title() or ""
+    # summary() returns article HTML
+    article_html = doc.summary(html_partial=False)
+
+    # readability cleans copies, so ``tree`` is still the untouched page
+    try:
+        page = PageMetadata(tree)
+
+        lang = (tree.get("lang") or "").strip().lower() or None
+        byline = page.meta(("name", "author"), ("property", "article:author"), ("name", "byl")) or page.ld("author")
+        site_name = page.meta(("property", "og:site_name"))
+        description = page.meta(("name", "description"), ("property", "og:description"))
+        published = (
+            page.meta(("property", "article:published_time"), ("name", "pubdate"), ("name", "date"))
+            or page.ld("datePublished")
+        )
+        canonical = page.link("canonical")
+        top_image = page.meta(("property", "og:image")) or page.link("image_src") or page.ld("image")
+        favicon = page.link("icon", "shortcut icon")
+        keywords_raw = page.meta(("name", "keywords"))
+        keywords = [s.strip() for s in keywords_raw.split(",") if s.strip()] if keywords_raw else []
+
+        # Derive text, word counts from the article tree readability built
+        try:
+            text = doc.article_tree.text_content().strip() if doc.article_tree is not None else ""
+        except Exception:
+            text = ""
+        word_count = len(text.split()) if text else 0
+        reading_time_minutes = round(word_count / 200.0, 2) if word_count else 0.0
+
+        meta = {
+            "source_url": url,
+            "title": title,
+            "byline": byline,
+            "site_name": site_name,
+            "description": description,
+            "published": published,
+            "language": lang,
+            "canonical_url": canonical,
+            "top_image": top_image,
+            "favicon": favicon,
+            "keywords": keywords,
+            "word_count": word_count,
+            "reading_time_minutes": reading_time_minutes,
+            "text": text,
+        }
+    except Exception:
+        meta = {"source_url": url, "title": title}
+
+    return {"title": title, "article_html": article_html, "meta": meta}
@@ -6,9 +6,13 @@ import shlex
 from typing import Optional
 
 from .base import BaseArchiver
+from .screenshot_derivatives import encode_derivatives
+from core.chromium_readiness import ChromiumPageLoader, ReadinessStats
 from core.chromium_utils import ChromiumArchiverMixin, ChromiumCommandBuilder
 from core.config import AppSettings
 from core.command_runner import CommandRunner
+from core.metrics import get_metrics
+from core.process_pool import get_process_pool
 from core.utils import sanitize_filename
 from models import ArchiveResult
 from storage.file_storage import FileStorageProvider
@@ -31,20 +35,42 @@ class ScreenshotArchiver(BaseArchiver, ChromiumArchiverMixin):
         super().__init__(settings, file_storage_providers, db_storage)
         self.command_runner = command_runner
         self.chromium_builder = ChromiumCommandBuilder(settings)
+        self.page_loader = ChromiumPageLoader(settings)
 
         # Default viewport to attempt near-full-page captures for common pages
         self.viewport_width = 1920
         # Height large enough for many pages; CLI screenshot doesn't truly do full-page
         self.viewport_height = 8000
+        # Without the PNG, the first encoded format is stored as the screenshot
+        if not settings.screenshot_keep_png and settings.screenshot_formats:
+            self.output_extension = settings.screenshot_formats[0]
 
     def archive(self, *, url: str, item_id: str) -> ArchiveResult:
         out_dir, out_path = self.get_output_path(item_id)
+        # Chromium always captures PNG; other formats are encoded from it afterwards
+        out_path = out_path.with_suffix(".png")
 
         logger.info(f"Archiving {url}", extra={"item_id": item_id, "archiver": "screenshot"})
 
         # Setup Chromium (create user data dir and clean locks)
         self.setup_chromium()
 
+        # Prefer network-idle readiness; fall back to the fixed virtual time budget
+        capture = self.capture_with_readiness(
+            url,
+            "screenshot",
+            width=self.viewport_width,
+            height=self.viewport_height,
+        )
+        if capture is not None:
+            out_path.write_bytes(capture.content)
+            self.cleanup_chromium()
+            return self.create_result(
+                path=out_path,
+                exit_code=0,
+                metadata={"readiness": capture.readiness.as_dict()},
+            )
+
         # Build Chromium command using builder
         chromium_args = self.chromium_builder.build_screenshot_args(
             url,
@@ -69,4 +95,78 @@ class ScreenshotArchiver(BaseArchiver, ChromiumArchiverMixin):
         # Clean up Chromium singleton locks after archiving
         self.cleanup_chromium()
 
-        return self.create_result(path=out_path, exit_code=result.exit_code)
+        readiness = ReadinessStats.from_virtual_time(
+            self.settings.chromium.virtual_time_budget_ms, result.duration_seconds
+        )
+        return self.create_result(
+            path=out_path,
+            exit_code=result.exit_code,
+            metadata={"readiness": readiness.as_dict()},
+        )
+
+    def postprocess_output(self, result: ArchiveResult, item_id: str, **kwargs) -> ArchiveResult:
+        if result.success and result.saved_path:
+            result = self._encode_derivatives(result, item_id)
+            if self.output_extension != "png":
+                result = self._replace_png(result, item_id)
+        return super().postprocess_output(result, item_id, **kwargs)
+
+    def _replace_png(self, result: ArchiveResult, item_id: str) -> ArchiveResult:
+        """Make the encoded copy the saved output and delete the PNG (SCREENSHOT_KEEP_PNG=false)."""
+        derivatives = (result.metadata or {}).get("derivatives") or []
+        primary = next(
+            (d for d in derivatives if d["kind"] == "encoded" and d["format"] == self.output_extension),
+            None,
+        )
+        if primary is None:
+            logger.warning(
+                f"No {self.output_extension} encoding of the screenshot; keeping the PNG",
+                extra={"item_id": item_id, "archiver": self.name},
+            )
+            return result
+        png = Path(result.saved_path)
+        result.saved_path = str(png.with_name(primary["name"]))
+        result.metadata["derivatives"] = [d for d in derivatives if d is not primary]
+        png.unlink(missing_ok=True)
+        return result
+
+    def _encode_derivatives(self, result: ArchiveResult, item_id: str) -> ArchiveResult:
+        """Write WebP/AVIF copies and dashboard thumbnails next to the PNG.
+
+        Encoding is CPU-bound, so it runs in the shared process pool when one
+        is configured and in the calling thread otherwise.
+        """
+        formats = self.settings.screenshot_formats
+        sizes = self.settings.screenshot_thumbnail_sizes
+        if not formats and not sizes:
+            return result
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            logger.debug("Pillow not installed; skipping screenshot derivatives")
+            return result
+
+        args = (result.saved_path, formats, self.settings.screenshot_quality, sizes)
+        pool = get_process_pool()
+        try:
+            if pool is None:
+                payload = encode_derivatives(*args)
+            else:
+                payload = pool.run(encode_derivatives, *args, timeout=60.0)
+        except Exception as e:
+            logger.warning(
+                f"Screenshot derivatives failed: {e}",
+                extra={"item_id": item_id, "archiver": self.name},
+            )
+            return result
+
+        metrics = get_metrics()
+        for derivative in payload["derivatives"]:
+            metrics.inc("screenshot_derivatives_total", kind=derivative["kind"], format=derivative["format"])
+            metrics.inc("screenshot_derivative_bytes_total", derivative["bytes"], kind=derivative["kind"])
+        if result.metadata is None:
+            result.metadata = {}
+        result.metadata["derivatives"] = payload["derivatives"]
+        if payload["skipped"]:
+            result.metadata["derivatives_skipped"] = payload["skipped"]
+        return result
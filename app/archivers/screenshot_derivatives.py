@@ -0,0 +1,109 @@
+"""Screenshot derivatives as a self-contained, picklable task.
+
+``encode_derivatives`` re-encodes a captured PNG to WebP/AVIF and renders
+fixed-size thumbnails for the dashboard. It takes and returns plain data so it
+can run in a worker process (see ``core.process_pool``) as well as inline.
+Keep this module free of settings, database and archiver imports; spawned
+workers import it on their own.
+
+Pillow is optional. AVIF needs a Pillow build with libavif (11.3+) or the
+``pillow-avif-plugin`` package; formats the build cannot write are reported
+as skipped rather than failing the capture.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+# Pillow format names and file suffixes for the supported encodings
+_FORMATS = {"webp": ("WEBP", ".webp"), "avif": ("AVIF", ".avif")}
+
+
+def thumbnail_name(width: int, height: int) -> str:
+    """File name of a thumbnail (always WebP, which every dashboard browser decodes)."""
+    return f"thumb-{width}x{height}.webp"
+
+
+def _can_write(fmt: str) -> bool:
+    from PIL import features
+
+    if fmt == "avif" and not features.check("avif"):
+        try:
+            import pillow_avif  # type: ignore  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    return features.check(fmt)
+
+
+def _save(image, path: Path, fmt: str, quality: int) -> None:
+    pil_format = _FORMATS[fmt][0]
+    options: dict[str, Any] = {"quality": quality}
+    if fmt == "webp":
+        options["method"] = 4
+    else:
+        options["speed"] = 6
+    tmp = path.with_name(f".{path.name}.tmp")
+    image.save(tmp, pil_format, **options)
+    tmp.replace(path)
+
+
+def encode_derivatives(
+    src: str,
+    formats: list[str],
+    quality: int,
+    thumbnail_sizes: list[tuple[int, int]],
+) -> dict[str, Any]:
+    """Write encoded copies and thumbnails of ``src`` next to it.
+
+    Args:
+        src: Path of the captured PNG
+        formats: Encodings to produce (``webp``, ``avif``)
+        quality: Encoder quality (0-100)
+        thumbnail_sizes: (width, height) boxes; thumbnails are cropped from the top of the page
+
+    Returns:
+        ``{"derivatives": [{"name", "kind", "format", "width", "height", "bytes"}], "skipped": [format]}``
+    """
+    from PIL import Image, ImageOps
+
+    src_path = Path(src)
+    derivatives: list[dict[str, Any]] = []
+    skipped: list[str] = []
+    writable = []
+    for fmt in formats:
+        if fmt in _FORMATS and _can_write(fmt):
+            writable.append(fmt)
+        else:
+            skipped.append(fmt)
+
+    with Image.open(src_path) as captured:
+        # Screenshots are opaque; dropping alpha shrinks every encoding
+        image = captured.convert("RGB")
+
+    def add(path: Path, kind: str, fmt: str, size: tuple[int, int]) -> None:
+        derivatives.append(
+            {
+                "name": path.name,
+                "kind": kind,
+                "format": fmt,
+                "width": size[0],
+                "height": size[1],
+                "bytes": path.stat().st_size,
+            }
+        )
+
+    for fmt in writable:
+        path = src_path.with_suffix(_FORMATS[fmt][1])
+        _save(image, path, fmt, quality)
+        add(path, "encoded", fmt, image.size)
+
+    if thumbnail_sizes and _can_write("webp"):
+        for width, height in thumbnail_sizes:
+            thumb = ImageOps.fit(image, (width, height), method=Image.Resampling.LANCZOS, centering=(0.5, 0.0))
+            path = src_path.with_name(thumbnail_name(width, height))
+            _save(thumb, path, "webp", quality)
+            add(path, "thumbnail", "webp", thumb.size)
+
+    return {"derivatives": derivatives, "skipped": skipped}
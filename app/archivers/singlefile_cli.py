@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 from pathlib import Path
+import shutil
+import tempfile
 from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
 import shlex
 
 from .base import BaseArchiver
+from core.asset_proxy import running_asset_proxy
 from core.chromium_utils import ChromiumArchiverMixin, ChromiumCommandBuilder
 from core.config import AppSettings
 from core.command_runner import CommandRunner
-from core.utils import sanitize_filename
+from core.singlefile_worker import WORKER_SCRIPT, SingleFileWorkerClient, SingleFileWorkerError
+from core.utils import cleanup_chromium_singleton_locks, sanitize_filename
 from models import ArchiveResult
 from storage.file_storage import FileStorageProvider
 from storage.database_storage import DatabaseStorageProvider
@@ -21,6 +28,8 @@ logger = logging.getLogger(__name__)
 class SingleFileCLIArchiver(BaseArchiver, ChromiumArchiverMixin):
     # Folder name to write under each item_id
     name = "singlefile"
+    supports_batch = True
+    dedupe_inline_assets = True
 
     def __init__(
         self,
@@ -32,18 +41,16 @@ class SingleFileCLIArchiver(BaseArchiver, ChromiumArchiverMixin):
         super().__init__(settings, file_storage_providers, db_storage)
         self.command_runner = command_runner
         self.chromium_builder = ChromiumCommandBuilder(settings)
+        self.worker: Optional[SingleFileWorkerClient] = None
+        if settings.singlefile_worker:
+            self.worker = SingleFileWorkerClient(
+                self._build_worker_command(),
+                max_jobs=settings.singlefile_worker_max_jobs,
+                archiver=self.name,
+            )
 
-    def archive(self, *, url: str, item_id: str) -> ArchiveResult:
-        out_dir, out_path = self.get_output_path(item_id)
-
-        logger.info(f"Archiving {item_id} {url}", extra={"item_id": item_id, "archiver": "singlefile"})
-
-        # Setup Chromium (create user data dir and clean locks)
-        self.setup_chromium()
-
-        # Compose command to run via command runner
-        url_q = shlex.quote(url)
-        out_q = shlex.quote(str(out_path))
+    def _build_cli_tokens(self) -> list[str]:
+        """Return SINGLEFILE_FLAGS plus browser path and --browser-args tokens (unquoted)."""
         user_data_dir = self.settings.chromium.resolved_user_data_dir(self.settings.data_dir)
 
         chromium_bin = getattr(self.settings, "chromium_bin", "")
@@ -102,6 +109,13 @@ class SingleFileCLIArchiver(BaseArchiver, ChromiumArchiverMixin):
             if flag not in browser_args and not any(arg.startswith(flag.split("=")[0]) for arg in browser_args):
                 browser_args.append(flag)
 
+        # Fetch page assets through the shared asset cache when it is running
+        asset_proxy = running_asset_proxy()
+        if asset_proxy is not None:
+            for flag in asset_proxy.chromium_args():
+                if not any(arg.startswith(flag.split("=")[0]) for arg in browser_args):
+                    browser_args.append(flag)
+
         # Update or add --browser-args token
         browser_args_json = json.dumps(browser_args)
         browser_args_token = f"--browser-args={browser_args_json}"
@@ -111,6 +125,78 @@ class SingleFileCLIArchiver(BaseArchiver, ChromiumArchiverMixin):
         else:
             tokens.append(browser_args_token)
 
+        return tokens
+
+    def _worker_user_data_dir(self) -> Path:
+        user_data_dir = self.settings.chromium.resolved_user_data_dir(self.settings.data_dir)
+        return user_data_dir.with_name(f"{user_data_dir.name}-singlefile-worker")
+
+    def _build_worker_command(self) -> list[str]:
+        """Return the resident worker command line.
+
+        The worker's browser stays up between jobs and would hold the shared
+        profile lock, so it gets its own user data dir (seeded from the shared
+        profile on first start to keep login state).
+        """
+        worker_dir = self._worker_user_data_dir()
+        tokens = []
+        for token in self._build_cli_tokens():
+            if token.startswith("--browser-args="):
+                browser_args = [
+                    f"--user-data-dir={worker_dir}" if arg.startswith("--user-data-dir=") else arg
+                    for arg in json.loads(token.split("=", 1)[1])
+                ]
+                token = f"--browser-args={json.dumps(browser_args)}"
+            tokens.append(token)
+        return [self.settings.node_bin, str(WORKER_SCRIPT)] + tokens
+
+    def _prepare_worker_profile(self) -> None:
+        worker_dir = self._worker_user_data_dir()
+        if not worker_dir.exists():
+            shared_dir = self.settings.chromium.resolved_user_data_dir(self.settings.data_dir)
+            if shared_dir.exists():
+                shutil.copytree(
+                    shared_dir,
+                    worker_dir,
+                    ignore=shutil.ignore_patterns("Singleton*"),
+                    ignore_dangling_symlinks=True,
+                )
+            else:
+                worker_dir.mkdir(parents=True, exist_ok=True)
+        cleanup_chromium_singleton_locks(worker_dir)
+
+    def _archive_with_worker(self, url: str, item_id: str, out_path: Path) -> Optional[ArchiveResult]:
+        """Capture through the resident worker; None means fall back to the CLI."""
+        assert self.worker is not None
+        if not self.worker.running:
+            self._prepare_worker_profile()
+        try:
+            self.worker.capture(url, out_path)
+        except SingleFileWorkerError as exc:
+            logger.warning(
+                f"SingleFile worker capture failed, falling back to CLI: {exc}",
+                extra={"item_id": item_id, "archiver": "singlefile"},
+            )
+            return None
+        return self.create_result(path=out_path, exit_code=0)
+
+    def archive(self, *, url: str, item_id: str) -> ArchiveResult:
+        out_dir, out_path = self.get_output_path(item_id)
+
+        logger.info(f"Archiving {item_id} {url}", extra={"item_id": item_id, "archiver": "singlefile"})
+
+        if self.worker is not None:
+            result = self._archive_with_worker(url, item_id, out_path)
+            if result is not None:
+                return result
+
+        # Setup Chromium (create user data dir and clean locks)
+        self.setup_chromium()
+
+        # Compose command to run via command runner
+        url_q = shlex.quote(url)
+        out_q = shlex.quote(str(out_path))
+        tokens = self._build_cli_tokens()
         extra_q = " ".join(shlex.quote(t) for t in tokens) if tokens else ""
 
         sf_cmd = f"{self.settings.singlefile_bin} {url_q} {out_q}"
@@ -126,6 +212,7 @@ class SingleFileCLIArchiver(BaseArchiver, ChromiumArchiverMixin):
         )
 
         if result.timed_out:
+            self.cleanup_after_timeout()
             return ArchiveResult(success=False, exit_code=result.exit_code, saved_path=None)
 
         # Clean up Chromium singleton locks after archiving
@@ -133,3 +220,88 @@ class SingleFileCLIArchiver(BaseArchiver, ChromiumArchiverMixin):
 
         return self.create_result(path=out_path, exit_code=result.exit_code)
 
+    def archive_batch(self, items: list[tuple[str, str]]) -> list[ArchiveResult]:
+        """Archive several URLs with one ``single-file --urls-file`` invocation.
+
+        Node and the browser start once for the whole batch. Outputs are named
+        by the SHA-1 of each page URL and moved to the usual per-item output
+        path; URLs whose output cannot be matched (e.g. after a redirect) are
+        retried individually through ``archive``. With the resident worker
+        enabled there is no startup cost to amortize, so items go through it
+        one by one.
+        """
+        if len(items) <= 1 or self.worker is not None:
+            return super().archive_batch(items)
+
+        logger.info(
+            f"Archiving batch of {len(items)} URLs",
+            extra={"archiver": "singlefile", "item_count": len(items)},
+        )
+
+        # Setup Chromium (create user data dir and clean locks)
+        self.setup_chromium()
+
+        batch_dir = Path(tempfile.mkdtemp(prefix="singlefile-batch-", dir=self.settings.data_dir))
+        try:
+            urls_file = batch_dir / "urls.txt"
+            urls_file.write_text("".join(f"{url}\n" for url, _ in items), encoding="utf-8")
+            output_dir = batch_dir / "out"
+            output_dir.mkdir()
+
+            tokens = [
+                f"--urls-file={urls_file}",
+                f"--output-directory={output_dir}",
+                f"--filename-template={{url-href-digest-sha-1}}.{self.output_extension}",
+                "--filename-conflict-action=overwrite",
+            ] + self._build_cli_tokens()
+            sf_cmd = f"{self.settings.singlefile_bin} " + " ".join(shlex.quote(t) for t in tokens)
+
+            result = self.command_runner.execute(
+                command=sf_cmd,
+                timeout=300.0 + 60.0 * (len(items) - 1),
+                archived_url_id=None,
+                archiver=self.name,
+            )
+            if result.timed_out:
+                self.cleanup_after_timeout()
+            else:
+                self.cleanup_chromium()
+
+            results: list[Optional[ArchiveResult]] = []
+            for url, item_id in items:
+                produced = self._find_batch_output(output_dir, url)
+                if produced is None:
+                    results.append(None)
+                    continue
+                _, out_path = self.get_output_path(item_id)
+                os.replace(produced, out_path)
+                results.append(self.create_result(path=out_path, exit_code=0))
+        finally:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+
+        # Retry unmatched or empty outputs one at a time
+        final: list[ArchiveResult] = []
+        for (url, item_id), batch_result in zip(items, results):
+            if batch_result is not None and batch_result.success:
+                final.append(batch_result)
+                continue
+            logger.info(
+                "Batch output missing, archiving individually",
+                extra={"archiver": "singlefile", "item_id": item_id, "url": url},
+            )
+            final.append(self.archive(url=url, item_id=item_id))
+        return final
+
+    def _find_batch_output(self, output_dir: Path, url: str) -> Optional[Path]:
+        """Locate the batch output for ``url`` by its SHA-1 file name."""
+        candidates = [url]
+        parts = urlsplit(url)
+        if not parts.path:
+            # Browsers report bare origins with a trailing slash
+            candidates.append(urlunsplit(parts._replace(path="/")))
+        for candidate in candidates:
+            digest = hashlib.sha1(candidate.encode("utf-8")).hexdigest()
+            path = output_dir / f"{digest}.{self.output_extension}"
+            if path.exists():
+                return path
+        return None
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import shlex
+from pathlib import Path
+from typing import Optional
+
+from .base import BaseArchiver
+from core.asset_proxy import AssetProxy
+from core.chromium_readiness import ChromiumPageLoader, ReadinessStats
+from core.chromium_utils import ChromiumArchiverMixin, ChromiumCommandBuilder
+from core.config import AppSettings
+from core.command_runner import CommandRunner
+from core.warc import Page, WarcRecorder, WarcWriter, write_wacz
+from models import ArchiveResult
+from storage.file_storage import FileStorageProvider
+from storage.database_storage import DatabaseStorageProvider
+
+logger = logging.getLogger(__name__)
+
+
+class WarcArchiver(BaseArchiver, ChromiumArchiverMixin):
+    """Record every HTTP exchange of a page load as WARC (optionally WACZ).
+
+    Chromium loads the page through a private recording proxy started for the
+    capture, so concurrent captures never share a WARC.
+    """
+
+    name = "warc"
+    output_extension = "wacz"
+
+    def __init__(
+        self,
+        command_runner: CommandRunner,
+        settings: AppSettings,
+        file_storage_providers: Optional[list[FileStorageProvider]] = None,
+        db_storage: Optional[DatabaseStorageProvider] = None
+    ):
+        super().__init__(settings, file_storage_providers, db_storage)
+        self.command_runner = command_runner
+        self.chromium_builder = ChromiumCommandBuilder(settings)
+        self.page_loader = ChromiumPageLoader(settings)
+        self.output_extension = "wacz" if settings.warc_wacz else "warc.gz"
+        self.proxy_key_path = settings.data_dir / "warc-proxy" / "proxy-key.pem"
+
+    def archive(self, *, url: str, item_id: str) -> ArchiveResult:
+        out_dir, out_path = self.get_output_path(item_id)
+        wacz = self.settings.warc_wacz
+        warc_path = out_dir / "data.warc.gz" if wacz else out_path
+        cdxj_path = out_dir / ("index.cdxj" if wacz else "output.cdxj")
+
+        logger.info(f"Archiving {url}", extra={"item_id": item_id, "archiver": "warc"})
+
+        # Setup Chromium (create user data dir and clean locks)
+        self.setup_chromium()
+
+        with WarcWriter(warc_path) as writer:
+            recorder = WarcRecorder(writer)
+            proxy = AssetProxy(None, port=0, key_path=self.proxy_key_path, recorder=recorder)
+            proxy.start()
+            try:
+                exit_code, timed_out, metadata = self._load(url, proxy)
+            finally:
+                proxy.stop()
+                # Responses relayed just before Chromium exited may still be spooling
+                recorder.drain()
+                proxy.upstream.close()
+
+        self.cleanup_chromium()
+
+        if timed_out or not writer.index:
+            logger.warning(
+                f"No WARC capture for {url}",
+                extra={"item_id": item_id, "archiver": "warc", "timed_out": timed_out},
+            )
+            warc_path.unlink(missing_ok=True)
+            return ArchiveResult(success=False, exit_code=exit_code if exit_code else 1, saved_path=None)
+
+        writer.write_cdxj(cdxj_path)
+        if wacz:
+            write_wacz(out_path, warc_path, cdxj_path, [Page(url=url)])
+            warc_path.unlink()
+            cdxj_path.unlink()
+
+        metadata.update({"records": writer.records, "responses": len(writer.index), "format": self.output_extension})
+        return self.create_result(path=out_path, exit_code=exit_code, metadata=metadata)
+
+    def _load(self, url: str, proxy: AssetProxy) -> tuple[Optional[int], bool, dict]:
+        """Load ``url`` through ``proxy``; returns (exit_code, timed_out, metadata)."""
+        # Prefer network-idle readiness; fall back to the fixed virtual time budget
+        capture = self.capture_with_readiness(
+            url,
+            "dom",
+            incognito=True,
+            extra_args=proxy.chromium_args() + ["--proxy-bypass-list=<-loopback>"],
+        )
+        if capture is not None:
+            return 0, False, {"readiness": capture.readiness.as_dict()}
+
+        chromium_args = self.chromium_builder.build_recording_args(url, proxy.chromium_args())
+        cmd = " ".join(shlex.quote(arg) for arg in chromium_args)
+        result = self.command_runner.execute(
+            command=cmd,
+            timeout=60.0,
+            archived_url_id=None,
+            archiver=self.name,
+        )
+        if result.timed_out:
+            self.cleanup_after_timeout()
+            return result.exit_code, True, {}
+
+        readiness = ReadinessStats.from_virtual_time(
+            self.settings.chromium.virtual_time_budget_ms, result.duration_seconds
+        )
+        return result.exit_code, False, {"readiness": readiness.as_dict()}
@@ -0,0 +1,340 @@
+"""Content-addressed on-disk cache for page assets (CSS, JS, fonts, images).
+
+Entries are keyed by URL and remember the response validators (``ETag`` /
+``Last-Modified``), freshness lifetime and the request header values named by
+``Vary`` (a request that differs in them misses); bodies are stored once per SHA-256
+under ``blobs/`` so the same file served from several URLs takes space once.
+The least recently used URLs are evicted when the blobs exceed the size
+budget. ``core.asset_proxy`` serves archivers from this cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping, Optional
+
+from core.metrics import MetricsRegistry, get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Response headers replayed to clients on a cache hit
+_STORED_HEADERS = (
+    "content-type",
+    "cache-control",
+    "expires",
+    "etag",
+    "last-modified",
+    "access-control-allow-origin",
+    "timing-allow-origin",
+    "content-language",
+)
+_MAX_HEURISTIC_LIFETIME = 24 * 3600.0
+_INDEX_FLUSH_EVERY = 50
+
+
+@dataclass
+class CachedAsset:
+    url: str
+    sha256: str
+    size: int
+    headers: list[tuple[str, str]]
+    stored_at: float
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Request header values the response varies on, lowercased names
+    vary: Optional[dict[str, str]] = None
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def matches(self, request_headers: Mapping[str, str]) -> bool:
+        """Whether a request selects this stored variant (RFC 9111 §4.1)."""
+        if not self.vary:
+            return True
+        request = _lower_keys(request_headers)
+        return all(request.get(name, "") == value for name, value in self.vary.items())
+
+
+def _cache_control(headers: Mapping[str, str]) -> dict[str, Optional[str]]:
+    directives: dict[str, Optional[str]] = {}
+    for part in (headers.get("cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _lower_keys(headers: Mapping[str, str]) -> dict[str, str]:
+    return {name.lower(): value for name, value in headers.items()}
+
+
+def _vary_names(headers: Mapping[str, str]) -> list[str]:
+    return [name.strip().lower() for name in (headers.get("vary") or "").split(",") if name.strip()]
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> float:
+    """Seconds a response stays fresh, per RFC 9111 (with the 10% heuristic)."""
+    directives = _cache_control(headers)
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name):
+            try:
+                return max(float(directives[name]), 0.0)
+            except ValueError:
+                return 0.0
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or now
+        return max(expires - date, 0.0)
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        date = _http_date(headers.get("date")) or now
+        return min(max(date - last_modified, 0.0) * 0.1, _MAX_HEURISTIC_LIFETIME)
+    return 0.0
+
+
+def is_cacheable(
+    status: int,
+    headers: Mapping[str, str],
+    request_headers: Optional[Mapping[str, str]] = None,
+) -> bool:
+    """Only shareable, non-document 200 responses are cached.
+
+    Responses to credentialed requests (``Authorization`` or ``Cookie``) are
+    only shared when the origin says so with ``public``, ``s-maxage`` or
+    ``must-revalidate`` (RFC 9111 §3.5).
+    """
+    if status != 200:
+        return False
+    directives = _cache_control(headers)
+    if "no-store" in directives or "private" in directives:
+        return False
+    if "set-cookie" in headers or "*" in _vary_names(headers):
+        return False
+    request = _lower_keys(request_headers or {})
+    if ("authorization" in request or "cookie" in request) and not (
+        {"public", "s-maxage", "must-revalidate"} & directives.keys()
+    ):
+        return False
+    # Documents are always fetched live; only their subresources are shared
+    return "text/html" not in (headers.get("content-type") or "").lower()
+
+
+class AssetCache:
+    """URL index over a content-addressed blob store with LRU size eviction."""
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int,
+        max_object_bytes: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes or max(max_bytes // 20, 1)
+        self.metrics = metrics or get_metrics()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedAsset]" = OrderedDict()
+        self._blobs: dict[str, list[int]] = {}  # sha256 -> [size, refcount]
+        self._total_bytes = 0
+        self._dirty = 0
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str, request_headers: Optional[Mapping[str, str]] = None) -> Optional[CachedAsset]:
+        """Entry stored for ``url``, if its ``Vary`` headers match the request."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or not entry.matches(request_headers or {}):
+                return None
+            self._entries.move_to_end(url)
+            return entry
+
+    def read(self, entry: CachedAsset) -> Optional[bytes]:
+        """Return the cached body, or None (and drop the entry) if the blob is gone."""
+        try:
+            return self._blob_path(entry.sha256).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                if self._entries.get(entry.url) is entry:
+                    self._remove_locked(entry.url)
+            return None
+
+    def put(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        body: bytes,
+        request_headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[CachedAsset]:
+        """Store a cacheable 200 response body; returns None when it is too large.
+
+        ``request_headers`` are the headers the response was fetched with; the
+        ones named by ``Vary`` are kept so other variants miss.
+        """
+        if len(body) > self.max_object_bytes:
+            return None
+        now = time.time()
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+
+        entry = CachedAsset(
+            url=url,
+            sha256=digest,
+            size=len(body),
+            headers=[(name, headers[name]) for name in _STORED_HEADERS if name in headers],
+            stored_at=now,
+            expires_at=now + freshness_lifetime(headers, now),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+        vary = _vary_names(headers)
+        if vary:
+            request = _lower_keys(request_headers or {})
+            entry.vary = {name: request.get(name, "") for name in vary}
+        with self._lock:
+            if url in self._entries:
+                self._remove_locked(url)
+            self._entries[url] = entry
+            blob = self._blobs.setdefault(digest, [len(body), 0])
+            if blob[1] == 0:
+                self._total_bytes += blob[0]
+            blob[1] += 1
+            self._evict_locked()
+            self._touched_locked()
+        return entry
+
+    def refresh(self, url: str, headers: Mapping[str, str]) -> Optional[CachedAsset]:
+        """Extend an entry's freshness after a ``304 Not Modified``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            entry.expires_at = now + freshness_lifetime(headers, now)
+            entry.etag = headers.get("etag") or entry.etag
+            entry.last_modified = headers.get("last-modified") or entry.last_modified
+            self._touched_locked()
+            return entry
+
+    def record(self, result: str, served_bytes: int = 0) -> None:
+        """Count a lookup outcome: hit, revalidated, miss or uncacheable."""
+        self.metrics.inc("asset_cache_requests_total", result=result)
+        if served_bytes:
+            source = "cache" if result in ("hit", "revalidated") else "upstream"
+            self.metrics.inc("asset_cache_served_bytes_total", served_bytes, source=source)
+
+    def flush(self) -> None:
+        with self._lock:
+            payload = json.dumps([asdict(entry) for entry in self._entries.values()])
+            self._dirty = 0
+        index = self.root / "index.json"
+        tmp = None
+        try:
+            # Unique per flush: proxy threads may flush concurrently
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".index-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, index)
+        except OSError as exc:
+            logger.warning(f"Failed to persist asset cache index: {exc}")
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    # ----------------------------------------------------------------- internals
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _remove_locked(self, url: str) -> None:
+        entry = self._entries.pop(url)
+        blob = self._blobs.get(entry.sha256)
+        if blob is None:
+            return
+        blob[1] -= 1
+        if blob[1] <= 0:
+            del self._blobs[entry.sha256]
+            self._total_bytes -= blob[0]
+            self._blob_path(entry.sha256).unlink(missing_ok=True)
+
+    def _evict_locked(self) -> None:
+        evicted = 0
+        while self._total_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove_locked(oldest)
+            evicted += 1
+        if evicted:
+            self.metrics.inc("asset_cache_evictions_total", evicted)
+
+    def _touched_locked(self) -> None:
+        self.metrics.set("asset_cache_bytes", self._total_bytes)
+        self.metrics.set("asset_cache_entries", len(self._entries))
+        self._dirty += 1
+        if self._dirty >= _INDEX_FLUSH_EVERY:
+            # Flush outside the lock on a helper thread to keep requests fast
+            self._dirty = 0
+            threading.Thread(target=self.flush, name="asset-cache-flush", daemon=True).start()
+
+    def _load_index(self) -> None:
+        index = self.root / "index.json"
+        try:
+            raw = json.loads(index.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable asset cache index {index}: {exc}")
+            return
+        for item in raw:
+            try:
+                entry = CachedAsset(**{**item, "headers": [tuple(h) for h in item["headers"]]})
+            except TypeError:
+                continue
+            if not self._blob_path(entry.sha256).exists():
+                continue
+            self._entries[entry.url] = entry
+            blob = self._blobs.setdefault(entry.sha256, [entry.size, 0])
+            if blob[1] == 0:
+                self._total_bytes += blob[0]
+            blob[1] += 1
+        self._evict_locked()
+        self.metrics.set("asset_cache_bytes", self._total_bytes)
+        self.metrics.set("asset_cache_entries", len(self._entries))
@@ -0,0 +1,458 @@
+"""Local caching forward proxy that monolith and SingleFile route through.
+
+Plain HTTP requests are proxied directly. ``CONNECT`` tunnels are terminated
+locally with a certificate minted for the requested host, so HTTPS assets can
+be cached too. Every host certificate shares one persisted key, which lets
+Chromium trust the proxy via ``--ignore-certificate-errors-spki-list``.
+monolith is pointed at the proxy with ``HTTP(S)_PROXY`` and ``-k``.
+
+Only GET subresources go through ``core.asset_cache``; documents and other
+methods are forwarded untouched.
+
+The same proxy doubles as the WARC recorder: given a ``recorder`` (see
+``core.warc.WarcRecorder``) and no cache, every exchange is relayed fresh and
+written to the recorder as it streams.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import hashlib
+import ipaddress
+import logging
+import os
+import re
+import secrets
+import ssl
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.asset_cache import AssetCache, is_cacheable
+
+if TYPE_CHECKING:
+    from core.config import AppSettings
+    from core.warc import WarcRecorder
+
+logger = logging.getLogger(__name__)
+
+_HOP_BY_HOP = frozenset(
+    {
+        "connection",
+        "proxy-connection",
+        "keep-alive",
+        "proxy-authorization",
+        "proxy-authenticate",
+        "te",
+        "trailer",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+# Recomputed by the proxy: bodies are relayed decoded
+_RESPONSE_SKIP = _HOP_BY_HOP | {"content-length", "content-encoding"}
+_REQUEST_SKIP = _HOP_BY_HOP | {"content-length", "accept-encoding", "host", "if-none-match", "if-modified-since"}
+
+
+class AssetProxy:
+    """Threaded HTTP(S) forward proxy backed by an ``AssetCache``.
+
+    With ``cache=None`` nothing is cached; ``key_path`` is then required.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[AssetCache],
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8899,
+        key_path: Optional[Path] = None,
+        upstream: Optional[httpx.Client] = None,
+        timeout: float = 30.0,
+        recorder: Optional[WarcRecorder] = None,
+    ) -> None:
+        if cache is None and key_path is None:
+            raise ValueError("key_path is required when the proxy has no cache")
+        self.cache = cache
+        self.recorder = recorder
+        self.host = host
+        self.port = port
+        self.key_path = key_path or cache.root / "proxy-key.pem"
+        self._key = self._load_or_create_key(self.key_path)
+        self._cert_dir = self.key_path.parent / "certs"
+        self._contexts: dict[str, ssl.SSLContext] = {}
+        self._contexts_lock = threading.Lock()
+        self.upstream = upstream or httpx.Client(
+            follow_redirects=False,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ clients
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def spki_hash(self) -> str:
+        """Base64 SHA-256 of the shared leaf public key (Chromium's SPKI format)."""
+        from cryptography.hazmat.primitives import serialization
+
+        der = self._key.public_key().public_bytes(
+            serialization.Encoding.DER,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        return base64.b64encode(hashlib.sha256(der).digest()).decode("ascii")
+
+    def chromium_args(self) -> list[str]:
+        return [
+            f"--proxy-server={self.url}",
+            f"--ignore-certificate-errors-spki-list={self.spki_hash}",
+        ]
+
+    def proxy_env(self) -> dict[str, str]:
+        return {"HTTP_PROXY": self.url, "HTTPS_PROXY": self.url}
+
+    # ---------------------------------------------------------------- lifecycle
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    def start(self) -> None:
+        if self._server is not None:
+            return
+        server = ThreadingHTTPServer((self.host, self.port), _ProxyHandler)
+        server.daemon_threads = True
+        server.proxy = self  # type: ignore[attr-defined]
+        self.port = server.server_address[1]
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, name="asset-proxy", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"{'Asset cache' if self.cache is not None else 'Recording'} proxy listening on {self.url}",
+            extra={"cache_dir": str(self.cache.root) if self.cache is not None else None},
+        )
+
+    def stop(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.cache is not None:
+            self.cache.flush()
+
+    # --------------------------------------------------------------------- TLS
+
+    @staticmethod
+    def _load_or_create_key(path: Path):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        try:
+            return serialization.load_pem_private_key(path.read_bytes(), password=None)
+        except FileNotFoundError:
+            pass
+        key = ec.generate_private_key(ec.SECP256R1())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+        return key
+
+    def ssl_context(self, hostname: str) -> ssl.SSLContext:
+        """Server-side TLS context presenting a certificate for ``hostname``."""
+        with self._contexts_lock:
+            context = self._contexts.get(hostname)
+            if context is None:
+                cert_path = self._host_cert(hostname)
+                context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                context.load_cert_chain(cert_path, self.key_path)
+                self._contexts[hostname] = context
+            return context
+
+    def _host_cert(self, hostname: str) -> Path:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.x509.oid import NameOID
+
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", hostname)
+        path = self._cert_dir / f"{safe}.pem"
+        if path.exists():
+            return path
+
+        try:
+            san: x509.GeneralName = x509.IPAddress(ipaddress.ip_address(hostname))
+        except ValueError:
+            san = x509.DNSName(hostname)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, hostname[:64])])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(self._key.public_key())
+            .serial_number(int.from_bytes(secrets.token_bytes(16), "big") >> 1)
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=365))
+            .add_extension(x509.SubjectAlternativeName([san]), critical=False)
+            .sign(self._key, hashes.SHA256())
+        )
+        self._cert_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+        os.replace(tmp, path)
+        return path
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "htbase-asset-proxy"
+    _tunnel: Optional[str] = None
+
+    @property
+    def proxy(self) -> AssetProxy:
+        return self.server.proxy  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        logger.debug("asset-proxy: " + format % args)
+
+    # ------------------------------------------------------------------ tunnel
+
+    def do_CONNECT(self) -> None:
+        hostname = self.path.rsplit(":", 1)[0].strip("[]")
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        try:
+            tls = self.proxy.ssl_context(hostname).wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as exc:
+            logger.debug(f"asset-proxy: TLS handshake with client failed for {hostname}: {exc}")
+            self.close_connection = True
+            return
+        # Keep serving requests, now read from inside the tunnel
+        self.connection = tls
+        self.rfile = tls.makefile("rb", self.rbufsize)
+        self.wfile = tls.makefile("wb", 0)
+        self._tunnel = self.path
+        self.close_connection = False
+
+    # ---------------------------------------------------------------- requests
+
+    def do_GET(self) -> None:
+        self._proxy_request()
+
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_GET
+
+    def _target_url(self) -> str:
+        if self._tunnel is None:
+            return self.path
+        host, _, port = self._tunnel.rpartition(":")
+        authority = host if port == "443" else self._tunnel
+        return f"https://{authority}{self.path}"
+
+    def _proxy_request(self) -> None:
+        url = self._target_url()
+        if urlsplit(url).scheme not in ("http", "https"):
+            self.send_error(400, "Absolute URL required")
+            return
+
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = [(k, v) for k, v in self.headers.items() if k.lower() not in _REQUEST_SKIP]
+        # What upstream sees (Accept-Encoding is the proxy's own), for Vary matching
+        forwarded = dict(headers)
+        unconditional = list(headers)
+        cacheable_request = self.proxy.cache is not None and self.command == "GET" and "range" not in self.headers
+
+        if cacheable_request:
+            entry = self.proxy.cache.get(url, forwarded)
+            if entry is not None and entry.is_fresh():
+                data = self.proxy.cache.read(entry)
+                if data is not None:
+                    self.proxy.cache.record("hit", len(data))
+                    self._send_cached(entry.headers, data)
+                    return
+            if entry is not None:
+                if entry.etag:
+                    headers.append(("If-None-Match", entry.etag))
+                if entry.last_modified:
+                    headers.append(("If-Modified-Since", entry.last_modified))
+        else:
+            entry = None
+
+        data = None
+        try:
+            response = self._send_upstream(url, headers, body)
+            if entry is not None and response.status_code == 304:
+                response.close()
+                refreshed = self.proxy.cache.refresh(url, response.headers)
+                data = self.proxy.cache.read(entry) if refreshed is not None else None
+                if data is None:
+                    # The cached body is gone (evicted or unreadable), so the
+                    # 304 cannot be answered from it: fetch the asset again
+                    response = self._send_upstream(url, unconditional, body)
+        except httpx.HTTPError as exc:
+            self.send_error(502, f"Upstream request failed: {exc.__class__.__name__}")
+            return
+
+        if data is not None:
+            self.proxy.cache.record("revalidated", len(data))
+            self._send_cached(entry.headers, data)
+            return
+
+        try:
+            exchange = None
+            if self.proxy.recorder is not None:
+                exchange = self.proxy.recorder.begin(
+                    self.command, url, response.request.headers.multi_items(), body,
+                    response.status_code, response.reason_phrase, response.headers.multi_items(),
+                )
+            try:
+                self._relay(
+                    url,
+                    response,
+                    cache=cacheable_request and is_cacheable(response.status_code, response.headers, forwarded),
+                    request_headers=forwarded,
+                    record=exchange.write if exchange is not None else None,
+                )
+            finally:
+                if exchange is not None:
+                    exchange.finish()
+        finally:
+            response.close()
+
+    def _send_upstream(self, url: str, headers: list[tuple[str, str]], body: Optional[bytes]) -> httpx.Response:
+        request = self.proxy.upstream.build_request(self.command, url, headers=headers, content=body)
+        return self.proxy.upstream.send(request, stream=True)
+
+    def _send_cached(self, headers: list[tuple[str, str]], data: bytes) -> None:
+        self.send_response(200)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Cache", "HIT")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _relay(
+        self,
+        url: str,
+        response: httpx.Response,
+        *,
+        cache: bool,
+        request_headers: Optional[dict[str, str]] = None,
+        record: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        """Relay an upstream response, storing it when cacheable and small enough.
+
+        Only cacheable responses are buffered (up to the cache's object size
+        limit); everything else streams straight through. ``record`` receives
+        every body chunk as it is relayed.
+        """
+        # Chunks as they arrive, so streamed responses are not held back to fill a buffer
+        chunks: Iterator[bytes] = response.iter_bytes() if self.command != "HEAD" else iter(())
+        if record is not None:
+            chunks = _tee(chunks, record)
+        buffered: list[bytes] = []
+        size = 0
+        if cache:
+            complete = True
+            for chunk in chunks:
+                buffered.append(chunk)
+                size += len(chunk)
+                if size > self.proxy.cache.max_object_bytes:
+                    complete = False
+                    break
+            if complete:
+                data = b"".join(buffered)
+                self._send_upstream_headers(response)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+                stored = self.proxy.cache.put(url, response.headers, data, request_headers) is not None
+                self.proxy.cache.record("miss" if stored else "uncacheable", len(data))
+                return
+
+        self._send_upstream_headers(response)
+        if self.command == "HEAD" or response.status_code in (204, 304):
+            # No body to relay
+            if self.command == "HEAD" and "content-length" in response.headers:
+                self.send_header("Content-Length", response.headers["content-length"])
+            elif response.status_code != 204:
+                self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            # Uncacheable or too large to cache: stream with chunked encoding
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in buffered:
+                self._write_chunk(chunk)
+            for chunk in chunks:
+                size += len(chunk)
+                self._write_chunk(chunk)
+            self.wfile.write(b"0\r\n\r\n")
+        if self.proxy.cache is not None:
+            self.proxy.cache.record("uncacheable", size)
+
+    def _send_upstream_headers(self, response: httpx.Response) -> None:
+        self.send_response(response.status_code, response.reason_phrase)
+        for name, value in response.headers.multi_items():
+            if name.lower() not in _RESPONSE_SKIP:
+                self.send_header(name, value)
+        self.send_header("X-Cache", "MISS")
+
+    def _write_chunk(self, chunk: bytes) -> None:
+        if chunk:
+            self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+
+
+def _tee(chunks: Iterator[bytes], sink: Callable[[bytes], None]) -> Iterator[bytes]:
+    for chunk in chunks:
+        sink(chunk)
+        yield chunk
+
+
+@lru_cache
+def get_asset_proxy() -> Optional[AssetProxy]:
+    """Shared proxy, or None when ``ASSET_CACHE`` is off. Started by the server."""
+    from core.config import get_settings
+
+    return build_asset_proxy(get_settings())
+
+
+def build_asset_proxy(settings: AppSettings) -> Optional[AssetProxy]:
+    if not settings.asset_cache:
+        return None
+    cache = AssetCache(
+        settings.resolved_asset_cache_dir,
+        max_bytes=settings.asset_cache_max_mb * 1024 * 1024,
+    )
+    return AssetProxy(cache, port=settings.asset_cache_port)
+
+
+def running_asset_proxy() -> Optional[AssetProxy]:
+    """The shared proxy when it is enabled and serving, for archivers to route through."""
+    proxy = get_asset_proxy()
+    return proxy if proxy is not None and proxy.running else None
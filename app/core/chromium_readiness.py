@@ -0,0 +1,476 @@
+"""Readiness-aware page loading for Chromium captures.
+
+The CLI captures (``--dump-dom``, ``--screenshot``, ``--print-to-pdf``) always
+burn the full ``--virtual-time-budget``. ``ChromiumPageLoader`` instead drives
+headless Chromium over the DevTools protocol (``--remote-debugging-pipe``) and
+captures the page as soon as the network is idle and DOM mutations have
+settled, using the configured budget only as an upper bound.
+"""
+
+from __future__ import annotations
+
+import base64
+import fcntl
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from core.chromium_utils import ChromiumCommandBuilder
+from core.process_watchdog import get_process_watchdog
+
+if TYPE_CHECKING:
+    from core.config import AppSettings
+
+logger = logging.getLogger(__name__)
+
+# Installed before any page script runs; records the time of the latest DOM mutation.
+_MUTATION_TRACKER_JS = """
+(() => {
+  window.__htbaseLastMutation = performance.now();
+  const observer = new MutationObserver(() => {
+    window.__htbaseLastMutation = performance.now();
+  });
+  observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+})();
+"""
+
+_DOM_QUIET_JS = (
+    "(() => { const t = window.__htbaseLastMutation;"
+    " return t === undefined ? null : performance.now() - t; })()"
+)
+
+_OUTER_HTML_JS = "document.documentElement ? document.documentElement.outerHTML : ''"
+
+_COMMAND_TIMEOUT = 30.0
+_POLL_INTERVAL = 0.1
+
+
+class ChromiumReadinessError(RuntimeError):
+    """Raised when a DevTools-driven capture cannot be completed."""
+
+
+@dataclass
+class ReadinessStats:
+    """How long a page took to become ready for capture.
+
+    ``ready`` is False when the budget ran out before the page settled (always
+    the case for the ``virtual_time`` strategy).
+    """
+
+    strategy: str
+    ready: bool
+    elapsed_ms: int
+    budget_ms: int
+    requests: int = 0
+
+    @classmethod
+    def from_virtual_time(cls, budget_ms: int, elapsed_seconds: float) -> "ReadinessStats":
+        """Stats for a CLI capture that ran under ``--virtual-time-budget``."""
+        return cls(
+            strategy="virtual_time",
+            ready=False,
+            elapsed_ms=int(elapsed_seconds * 1000),
+            budget_ms=budget_ms,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class PageCapture:
+    """Captured page content plus the readiness measurements for the load."""
+
+    content: Union[str, bytes]
+    readiness: ReadinessStats
+
+
+class ReadinessTracker:
+    """Track network and DOM activity for a single page load.
+
+    The page is ready once the load event has fired, no more than
+    ``max_inflight`` requests have been outstanding for ``network_idle_ms``,
+    and the DOM has not mutated for ``dom_stable_ms``.
+    """
+
+    def __init__(
+        self,
+        *,
+        network_idle_ms: int,
+        dom_stable_ms: int,
+        max_inflight: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self.network_idle = max(network_idle_ms, 0) / 1000.0
+        self.dom_stable = max(dom_stable_ms, 0) / 1000.0
+        self.max_inflight = max(max_inflight, 0)
+        self.loaded = False
+        self.requests_seen = 0
+        self._inflight: set[str] = set()
+        self._idle_since: Optional[float] = clock()
+        self._last_mutation: Optional[float] = None
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def request_started(self, request_id: str) -> None:
+        # Redirects re-use the request id; count the chain once.
+        if request_id in self._inflight:
+            return
+        self._inflight.add(request_id)
+        self.requests_seen += 1
+        if len(self._inflight) > self.max_inflight:
+            self._idle_since = None
+
+    def request_finished(self, request_id: str) -> None:
+        self._inflight.discard(request_id)
+        if self._idle_since is None and len(self._inflight) <= self.max_inflight:
+            self._idle_since = self._clock()
+
+    def load_fired(self) -> None:
+        self.loaded = True
+
+    def dom_quiet_for(self, quiet_ms: Optional[float]) -> None:
+        """Record a DOM sample: milliseconds since the last observed mutation."""
+        if quiet_ms is None:
+            return
+        self._last_mutation = self._clock() - max(float(quiet_ms), 0.0) / 1000.0
+
+    def is_ready(self) -> bool:
+        if not self.loaded or self._idle_since is None or self._last_mutation is None:
+            return False
+        now = self._clock()
+        return (
+            now - self._idle_since >= self.network_idle
+            and now - self._last_mutation >= self.dom_stable
+        )
+
+
+class DevToolsPipe:
+    """Minimal DevTools protocol client for Chromium's ``--remote-debugging-pipe``.
+
+    Chromium reads NUL-terminated JSON commands from fd 3 and writes responses
+    and events to fd 4. Responses resolve pending ``send`` calls; events are
+    queued on ``events`` for the caller to consume.
+    """
+
+    def __init__(self, args: list[str]) -> None:
+        to_child_r, self._write_fd = os.pipe()
+        self._read_fd, from_child_w = os.pipe()
+
+        def _setup_child() -> None:
+            os.setsid()
+            # Move the pipe ends out of the way before claiming fds 3 and 4.
+            child_in = fcntl.fcntl(to_child_r, fcntl.F_DUPFD, 10)
+            child_out = fcntl.fcntl(from_child_w, fcntl.F_DUPFD, 10)
+            os.dup2(child_in, 3)
+            os.dup2(child_out, 4)
+            os.close(child_in)
+            os.close(child_out)
+
+        try:
+            self.proc = subprocess.Popen(
+                args,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(3, 4),
+                preexec_fn=_setup_child,
+            )
+        except Exception:
+            os.close(self._write_fd)
+            os.close(self._read_fd)
+            raise
+        finally:
+            os.close(to_child_r)
+            os.close(from_child_w)
+
+        self.events: "queue.Queue[dict[str, Any]]" = queue.Queue()
+        self._pending: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._next_id = 0
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="cdp-pipe-reader", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        parts: list[bytes] = []
+        try:
+            while True:
+                chunk = os.read(self._read_fd, 1 << 16)
+                if not chunk:
+                    break
+                while True:
+                    idx = chunk.find(b"\0")
+                    if idx < 0:
+                        parts.append(chunk)
+                        break
+                    parts.append(chunk[:idx])
+                    self._dispatch(b"".join(parts))
+                    parts = []
+                    chunk = chunk[idx + 1:]
+        except OSError:
+            pass
+        finally:
+            self._closed = True
+            with self._lock:
+                pending = list(self._pending.values())
+                self._pending.clear()
+            for future in pending:
+                if not future.done():
+                    future.set_exception(ChromiumReadinessError("Chromium closed the DevTools pipe"))
+
+    def _dispatch(self, raw: bytes) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.debug("Ignoring malformed DevTools message")
+            return
+
+        msg_id = message.get("id")
+        if msg_id is None:
+            self.events.put(message)
+            return
+
+        with self._lock:
+            future = self._pending.pop(msg_id, None)
+        if future is None:
+            return
+        if "error" in message:
+            future.set_exception(ChromiumReadinessError(str(message["error"].get("message", message["error"]))))
+        else:
+            future.set_result(message.get("result") or {})
+
+    def send(
+        self,
+        method: str,
+        params: Optional[dict[str, Any]] = None,
+        *,
+        session_id: Optional[str] = None,
+        timeout: float = _COMMAND_TIMEOUT,
+    ) -> dict[str, Any]:
+        """Send a DevTools command and wait for its result."""
+        if self._closed:
+            raise ChromiumReadinessError("DevTools pipe is closed")
+
+        future: Future = Future()
+        with self._lock:
+            self._next_id += 1
+            msg_id = self._next_id
+            self._pending[msg_id] = future
+
+        payload: dict[str, Any] = {"id": msg_id, "method": method, "params": params or {}}
+        if session_id:
+            payload["sessionId"] = session_id
+        data = json.dumps(payload).encode("utf-8") + b"\0"
+
+        try:
+            with self._write_lock:
+                view = memoryview(data)
+                while view:
+                    written = os.write(self._write_fd, view)
+                    view = view[written:]
+        except OSError as exc:
+            with self._lock:
+                self._pending.pop(msg_id, None)
+            raise ChromiumReadinessError(f"{method} failed: {exc}") from exc
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError as exc:
+            with self._lock:
+                self._pending.pop(msg_id, None)
+            raise ChromiumReadinessError(f"{method} timed out after {timeout}s") from exc
+
+    def close(self) -> None:
+        """Close the browser, killing its process group if it does not exit."""
+        try:
+            if not self._closed:
+                self.send("Browser.close", timeout=5.0)
+        except Exception:
+            pass
+
+        try:
+            self.proc.wait(timeout=5.0)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.proc.wait()
+
+        self._reader.join(timeout=2.0)
+        for fd in (self._write_fd, self._read_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class ChromiumPageLoader:
+    """Load a page in headless Chromium and capture it once it is ready.
+
+    ``kind`` is ``"dom"`` (outer HTML as ``str``), ``"screenshot"`` (PNG bytes)
+    or ``"pdf"`` (PDF bytes). ``on_event`` receives every DevTools event for the
+    page along with the pipe, so callers can issue follow-up commands.
+    """
+
+    def __init__(self, settings: AppSettings):
+        self.settings = settings
+        self.chromium_builder = ChromiumCommandBuilder(settings)
+
+    @property
+    def enabled(self) -> bool:
+        chromium = self.settings.chromium
+        return chromium.enabled and chromium.readiness == "network_idle"
+
+    def capture(
+        self,
+        url: str,
+        kind: str,
+        *,
+        width: int = 1920,
+        height: int = 1080,
+        incognito: bool = False,
+        archiver: Optional[str] = None,
+        on_event: Optional[Callable[[DevToolsPipe, dict[str, Any]], None]] = None,
+        extra_args: Optional[list[str]] = None,
+    ) -> PageCapture:
+        chromium = self.settings.chromium
+        budget_ms = chromium.virtual_time_budget_ms
+        args = self.chromium_builder.build_base_args(incognito=incognito) + list(extra_args or []) + [
+            "--remote-debugging-pipe",
+            f"--window-size={width},{height}",
+            "--hide-scrollbars",
+            "about:blank",
+        ]
+
+        pipe = DevToolsPipe(args)
+        watchdog = get_process_watchdog()
+        pgid = watchdog.track(pipe.proc, archiver=archiver)
+        try:
+            target = pipe.send("Target.createTarget", {"url": "about:blank"})
+            attached = pipe.send(
+                "Target.attachToTarget",
+                {"targetId": target["targetId"], "flatten": True},
+            )
+            session_id = attached["sessionId"]
+
+            pipe.send("Page.enable", session_id=session_id)
+            pipe.send("Network.enable", session_id=session_id)
+            pipe.send(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {"source": _MUTATION_TRACKER_JS},
+                session_id=session_id,
+            )
+            if kind == "screenshot":
+                pipe.send(
+                    "Emulation.setDeviceMetricsOverride",
+                    {"width": width, "height": height, "deviceScaleFactor": 1, "mobile": False},
+                    session_id=session_id,
+                )
+
+            tracker = ReadinessTracker(
+                network_idle_ms=chromium.network_idle_ms,
+                dom_stable_ms=chromium.dom_stable_ms,
+                max_inflight=chromium.network_idle_max_inflight,
+            )
+            started = time.monotonic()
+            navigation = pipe.send("Page.navigate", {"url": url}, session_id=session_id)
+            if navigation.get("errorText"):
+                raise ChromiumReadinessError(f"Navigation failed: {navigation['errorText']}")
+
+            ready = self._wait_until_ready(
+                pipe,
+                session_id,
+                tracker,
+                deadline=started + budget_ms / 1000.0,
+                on_event=on_event,
+            )
+            stats = ReadinessStats(
+                strategy="network_idle",
+                ready=ready,
+                elapsed_ms=int((time.monotonic() - started) * 1000),
+                budget_ms=budget_ms,
+                requests=tracker.requests_seen,
+            )
+            logger.info(
+                f"Page {'ready' if ready else 'hit readiness budget'} after {stats.elapsed_ms}ms",
+                extra={"url": url, "kind": kind, **stats.as_dict()},
+            )
+
+            content = self._capture_content(pipe, session_id, kind)
+            return PageCapture(content=content, readiness=stats)
+        finally:
+            pipe.close()
+            watchdog.untrack(pgid)
+
+    def _wait_until_ready(
+        self,
+        pipe: DevToolsPipe,
+        session_id: str,
+        tracker: ReadinessTracker,
+        *,
+        deadline: float,
+        on_event: Optional[Callable[[DevToolsPipe, dict[str, Any]], None]],
+    ) -> bool:
+        next_probe = 0.0
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                return False
+
+            if now >= next_probe:
+                tracker.dom_quiet_for(self._evaluate(pipe, session_id, _DOM_QUIET_JS))
+                if tracker.is_ready():
+                    return True
+                next_probe = now + _POLL_INTERVAL
+
+            try:
+                event = pipe.events.get(timeout=max(min(_POLL_INTERVAL, deadline - now), 0.0))
+            except queue.Empty:
+                continue
+            if event.get("sessionId") != session_id:
+                continue
+
+            method = event.get("method")
+            params = event.get("params") or {}
+            if method == "Network.requestWillBeSent":
+                tracker.request_started(params.get("requestId", ""))
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                tracker.request_finished(params.get("requestId", ""))
+            elif method == "Page.loadEventFired":
+                tracker.load_fired()
+
+            if on_event is not None:
+                on_event(pipe, event)
+
+    def _evaluate(self, pipe: DevToolsPipe, session_id: str, expression: str) -> Any:
+        result = pipe.send(
+            "Runtime.evaluate",
+            {"expression": expression, "returnByValue": True},
+            session_id=session_id,
+        )
+        return (result.get("result") or {}).get("value")
+
+    def _capture_content(self, pipe: DevToolsPipe, session_id: str, kind: str) -> Union[str, bytes]:
+        if kind == "dom":
+            return self._evaluate(pipe, session_id, _OUTER_HTML_JS) or ""
+        if kind == "screenshot":
+            shot = pipe.send("Page.captureScreenshot", {"format": "png"}, session_id=session_id)
+            return base64.b64decode(shot["data"])
+        if kind == "pdf":
+            pdf = pipe.send("Page.printToPDF", {"displayHeaderFooter": False}, session_id=session_id)
+            return base64.b64decode(pdf["data"])
+        raise ValueError(f"Unknown capture kind: {kind}")
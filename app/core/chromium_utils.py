@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, List, Optional
 
+from core.process_watchdog import get_process_watchdog
 from core.utils import cleanup_chromium_singleton_locks
 
 if TYPE_CHECKING:
+    from core.chromium_readiness import PageCapture
     from core.config import AppSettings
 
+logger = logging.getLogger(__name__)
+
 
 class ChromiumCommandBuilder:
     """Builder for constructing Chromium command arguments."""
@@ -18,6 +23,10 @@ class ChromiumCommandBuilder:
         self.settings = settings
         self.user_data_dir = settings.chromium.resolved_user_data_dir(settings.data_dir)
 
+    def virtual_time_budget_arg(self) -> str:
+        """Return the ``--virtual-time-budget`` flag for the configured budget."""
+        return f"--virtual-time-budget={self.settings.chromium.virtual_time_budget_ms}"
+
     def build_base_args(self, *, incognito: bool = False) -> List[str]:
         """Build common base arguments for all Chromium invocations.
 
@@ -61,7 +70,7 @@ class ChromiumCommandBuilder:
         return self.build_base_args() + [
             "--dump-dom",
             "--run-all-compositor-stages-before-draw",
-            "--virtual-time-budget=9000",
+            self.virtual_time_budget_arg(),
             "--hide-scrollbars",
             url,
         ]
@@ -88,7 +97,7 @@ class ChromiumCommandBuilder:
             f"--screenshot={output_path}",
             f"--window-size={viewport_width},{viewport_height}",
             "--run-all-compositor-stages-before-draw",
-            "--virtual-time-budget=9000",
+            self.virtual_time_budget_arg(),
             "--hide-scrollbars",
             "--remote-debugging-address=0.0.0.0",
             "--remote-debugging-port=9222",
@@ -109,7 +118,27 @@ class ChromiumCommandBuilder:
             f"--print-to-pdf={output_path}",
             "--print-to-pdf-no-header",
             "--run-all-compositor-stages-before-draw",
-            "--virtual-time-budget=9000",
+            self.virtual_time_budget_arg(),
+            url,
+        ]
+
+    def build_recording_args(self, url: str, proxy_args: List[str]) -> List[str]:
+        """Build arguments for loading a page through the WARC recording proxy.
+
+        Args:
+            url: URL to load
+            proxy_args: ``--proxy-server`` / SPKI flags from the recording proxy
+
+        Returns:
+            Complete argument list for a recorded page load
+        """
+        # Incognito keeps Chromium's disk cache from answering requests the proxy must see
+        return self.build_base_args(incognito=True) + proxy_args + [
+            "--proxy-bypass-list=<-loopback>",
+            "--window-size=1920,1080",
+            "--run-all-compositor-stages-before-draw",
+            self.virtual_time_budget_arg(),
+            "--dump-dom",
             url,
         ]
 
@@ -126,7 +155,7 @@ class ChromiumCommandBuilder:
         return self.build_base_args(incognito=incognito) + [
             "--window-size=1920,1080",
             "--run-all-compositor-stages-before-draw",
-            "--virtual-time-budget=9000",
+            self.virtual_time_budget_arg(),
             "--dump-dom",
             url,
         ]
@@ -137,7 +166,7 @@ class ChromiumArchiverMixin:
 
     Classes using this mixin must have:
     - self.settings: AppSettings
-    - self.ht_runner: HTRunner (optional, only needed for cleanup_after_timeout)
+    - self.page_loader: ChromiumPageLoader (optional, only needed for capture_with_readiness)
     """
 
     def setup_chromium(self) -> None:
@@ -150,20 +179,34 @@ class ChromiumArchiverMixin:
         """Clean up Chromium singleton locks after execution."""
         cleanup_chromium_singleton_locks(self.settings.chromium.resolved_user_data_dir(self.settings.data_dir))
 
+    def capture_with_readiness(self, url: str, kind: str, **kwargs) -> Optional[PageCapture]:
+        """Capture ``url`` with the readiness-aware page loader.
+
+        Returns None when the loader is disabled (``CHROMIUM_READINESS=virtual_time``)
+        or the capture fails, in which case callers fall back to the Chromium CLI.
+        Requires self.page_loader to be set.
+        """
+        loader = getattr(self, "page_loader", None)
+        if loader is None or not loader.enabled:
+            return None
+
+        try:
+            return loader.capture(url, kind, archiver=getattr(self, "name", None), **kwargs)
+        except Exception as exc:
+            logger.warning(
+                f"Readiness capture failed, falling back to Chromium CLI: {exc}",
+                extra={"url": url, "kind": kind, "archiver": getattr(self, "name", None)},
+            )
+            return None
+
     def cleanup_after_timeout(self) -> None:
         """Standard timeout cleanup for Chromium archivers.
 
-        Interrupts the running shell and kills any stray Chromium processes.
-        Requires self.ht_runner to be set.
+        The command runner has already killed the job's process group; run an
+        immediate watchdog sweep so zombies and orphaned renderers from the
+        timed-out job are reaped now rather than at the next interval.
         """
-        if not hasattr(self, "ht_runner"):
-            return
-
-        self.ht_runner.interrupt()
-        cleanup_cmd = (
-            "pkill -f 'chromium' >/dev/null 2>&1 || true; "
-            "pkill -f 'chrome' >/dev/null 2>&1 || true; "
-            "echo __CLEANUP__:0"
-        )
-        self.ht_runner.send_input(cleanup_cmd + "\r")
-        self.ht_runner.wait_for_done_marker("__CLEANUP__", timeout=15.0)
+        try:
+            get_process_watchdog().sweep()
+        except Exception as exc:
+            logger.warning(f"Watchdog sweep after timeout failed: {exc}")
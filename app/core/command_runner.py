@@ -15,6 +15,8 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from core.process_watchdog import get_process_watchdog
+
 logger = logging.getLogger(__name__)
 
 
@@ -223,6 +225,11 @@ class CommandRunner:
                     preexec_fn=os.setsid,  # Create new process group
                 )
 
+            # Let the watchdog enforce RSS/wall-clock ceilings on the process group
+            watched_pgid = None
+            if not is_windows:
+                watched_pgid = get_process_watchdog().track(proc, archiver=archiver)
+
             # Read output in real-time
             try:
                 stdout, stderr = proc.communicate(timeout=timeout)
@@ -237,6 +244,9 @@ class CommandRunner:
                     f"Command timed out after {timeout}s (execution_id={execution_id})",
                     extra={"execution_id": execution_id, "command": command, "timeout": timeout}
                 )
+            finally:
+                if watched_pgid is not None:
+                    get_process_watchdog().untrack(watched_pgid)
 
             # Process stdout
             if stdout:
@@ -67,6 +67,68 @@ class ChromiumSettings(BaseModel):
         ),
     )
 
+    readiness: str = Field(
+        default="network_idle",
+        validation_alias=AliasChoices("CHROMIUM_READINESS", "CHROMIUM__READINESS"),
+    )
+    virtual_time_budget_ms: int = Field(
+        default=9000,
+        validation_alias=AliasChoices(
+            "CHROMIUM_VIRTUAL_TIME_BUDGET_MS",
+            "CHROMIUM__VIRTUAL_TIME_BUDGET_MS",
+        ),
+    )
+    network_idle_ms: int = Field(
+        default=500,
+        validation_alias=AliasChoices("CHROMIUM_NETWORK_IDLE_MS", "CHROMIUM__NETWORK_IDLE_MS"),
+    )
+    network_idle_max_inflight: int = Field(
+        default=2,
+        validation_alias=AliasChoices(
+            "CHROMIUM_NETWORK_IDLE_MAX_INFLIGHT",
+            "CHROMIUM__NETWORK_IDLE_MAX_INFLIGHT",
+        ),
+    )
+    dom_stable_ms: int = Field(
+        default=500,
+        validation_alias=AliasChoices("CHROMIUM_DOM_STABLE_MS", "CHROMIUM__DOM_STABLE_MS"),
+    )
+
+    watchdog_enabled: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("CHROMIUM_WATCHDOG_ENABLED", "CHROMIUM__WATCHDOG_ENABLED"),
+    )
+    watchdog_interval_seconds: float = Field(
+        default=10.0,
+        validation_alias=AliasChoices(
+            "CHROMIUM_WATCHDOG_INTERVAL_SECONDS",
+            "CHROMIUM__WATCHDOG_INTERVAL_SECONDS",
+        ),
+    )
+    max_job_seconds: float = Field(
+        default=900.0,
+        validation_alias=AliasChoices("CHROMIUM_MAX_JOB_SECONDS", "CHROMIUM__MAX_JOB_SECONDS"),
+    )
+    max_job_rss_mb: int = Field(
+        default=4096,
+        validation_alias=AliasChoices("CHROMIUM_MAX_JOB_RSS_MB", "CHROMIUM__MAX_JOB_RSS_MB"),
+    )
+    orphan_grace_seconds: float = Field(
+        default=60.0,
+        validation_alias=AliasChoices(
+            "CHROMIUM_ORPHAN_GRACE_SECONDS",
+            "CHROMIUM__ORPHAN_GRACE_SECONDS",
+        ),
+    )
+
+    @field_validator("readiness", mode="before")
+    @classmethod
+    def _normalize_readiness(cls, value: str | None) -> str:
+        strategy = str(value or "").strip().lower().replace("-", "_")
+        if strategy not in {"network_idle", "virtual_time"}:
+            return "network_idle"
+        return strategy
+
     @field_validator("profile_directory", mode="before")
     @classmethod
     def _normalize_profile_directory(cls, value: str | Path | None) -> str:
@@ -280,6 +342,30 @@ class GcsSettings(BaseSettings):
         description="Default retention period for stored files in days"
     )
 
+    upload_chunk_mb: int = Field(
+        default=8,
+        validation_alias=AliasChoices("GCS_UPLOAD_CHUNK_MB", "STORAGE__GCS_UPLOAD_CHUNK_MB"),
+        description="Resumable upload chunk size; bounds memory used by streaming compressed uploads"
+    )
+
+    upload_retry_seconds: float = Field(
+        default=120.0,
+        validation_alias=AliasChoices("GCS_UPLOAD_RETRY_SECONDS", "STORAGE__GCS_UPLOAD_RETRY_SECONDS"),
+        description="How long a failed resumable upload chunk is retried (with backoff) before giving up"
+    )
+
+    composite_threshold_mb: int = Field(
+        default=0,
+        validation_alias=AliasChoices("GCS_COMPOSITE_THRESHOLD_MB", "STORAGE__GCS_COMPOSITE_THRESHOLD_MB"),
+        description="Upload files at least this large as parallel parts composed server-side (0 disables)"
+    )
+
+    composite_parts: int = Field(
+        default=8,
+        validation_alias=AliasChoices("GCS_COMPOSITE_PARTS", "STORAGE__GCS_COMPOSITE_PARTS"),
+        description="Number of parts uploaded concurrently in composite mode (compose accepts up to 32)"
+    )
+
     def is_configured(self) -> bool:
         """Check if GCS is properly configured.
 
@@ -358,6 +444,22 @@ class AppSettings(BaseSettings):
     singlefile_flags: str = Field(
         default="", validation_alias=AliasChoices("SINGLEFILE_FLAGS"),
     )
+    singlefile_batch_size: int = Field(
+        default=8,
+        validation_alias=AliasChoices("SINGLEFILE_BATCH_SIZE"),
+        description="Max URLs archived per single-file invocation (1 disables batching)",
+    )
+    singlefile_worker: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("SINGLEFILE_WORKER"),
+        description="Capture through a resident Node worker with a warm browser instead of one single-file process per URL",
+    )
+    singlefile_worker_max_jobs: int = Field(
+        default=200,
+        validation_alias=AliasChoices("SINGLEFILE_WORKER_MAX_JOBS"),
+        description="Captures served before the SingleFile worker is restarted",
+    )
+    node_bin: str = Field(default="node", validation_alias=AliasChoices("NODE_BIN"))
     ht_listen: str = Field(default="localhost:7681", validation_alias=AliasChoices("HT_LISTEN"))
     start_ht: bool = Field(default=True, validation_alias=AliasChoices("START_HT"))
     ht_log_file: Path = Field(
@@ -369,7 +471,135 @@ class AppSettings(BaseSettings):
         default=True,
         validation_alias=AliasChoices("SKIP_EXISTING_SAVES"),
     )
+    artifact_manifest: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("ARTIFACT_MANIFEST"),
+        description="Answer output-exists checks from an on-disk manifest instead of probing the filesystem",
+    )
+    artifact_manifest_reconcile_seconds: int = Field(
+        default=900,
+        validation_alias=AliasChoices("ARTIFACT_MANIFEST_RECONCILE_SECONDS"),
+        description="Interval of the scandir pass that reconciles the artifact manifest with disk",
+    )
+    conditional_rearchive: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("CONDITIONAL_REARCHIVE"),
+        description="Send a conditional request before re-archiving and reuse artifacts when the page is unchanged",
+    )
     summarization: SummarizationSettings = Field(default_factory=SummarizationSettings)
+    adaptive_render: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("ADAPTIVE_RENDER"),
+        description="Archive pages classified as static from their raw HTML instead of rendering them in Chromium",
+    )
+    adaptive_render_min_words: int = Field(
+        default=150,
+        validation_alias=AliasChoices("ADAPTIVE_RENDER_MIN_WORDS"),
+        description="Pages with fewer visible words than this are treated as needing a JavaScript render",
+    )
+    adaptive_render_domain_ttl_days: float = Field(
+        default=30.0,
+        validation_alias=AliasChoices("ADAPTIVE_RENDER_DOMAIN_TTL_DAYS"),
+        description="Days a learned per-domain render verdict is trusted before the domain is probed again",
+    )
+    cpu_pool_workers: int = Field(
+        default=2,
+        validation_alias=AliasChoices("CPU_POOL_WORKERS"),
+        description="Worker processes for CPU-bound work such as readability extraction (0 runs it in-thread)",
+    )
+    extraction_timeout_seconds: float = Field(
+        default=60.0,
+        validation_alias=AliasChoices("EXTRACTION_TIMEOUT_SECONDS"),
+        description="Per-page timeout for readability extraction in the process pool",
+    )
+    asset_cache: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("ASSET_CACHE"),
+        description="Route monolith and SingleFile through a local caching proxy that shares CSS/JS/font/image downloads",
+    )
+    asset_cache_dir: Optional[Path] = Field(
+        default=None,
+        validation_alias=AliasChoices("ASSET_CACHE_DIR"),
+        description="Asset cache directory (defaults to DATA_DIR/asset-cache)",
+    )
+    asset_cache_max_mb: int = Field(
+        default=2048,
+        validation_alias=AliasChoices("ASSET_CACHE_MAX_MB"),
+        description="Total size budget for cached asset bodies; least recently used entries are evicted",
+    )
+    asset_cache_port: int = Field(
+        default=8899,
+        validation_alias=AliasChoices("ASSET_CACHE_PORT"),
+        description="Loopback port for the asset cache proxy",
+    )
+
+    asset_dedup: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("ASSET_DEDUP"),
+        description="Move large base64 assets out of monolith/SingleFile HTML into a content-addressed store",
+    )
+    asset_dedup_min_bytes: int = Field(
+        default=4096,
+        validation_alias=AliasChoices("ASSET_DEDUP_MIN_BYTES"),
+        description="Decoded size below which inlined assets stay in the HTML",
+    )
+    asset_store_dir: Optional[Path] = Field(
+        default=None,
+        validation_alias=AliasChoices("ASSET_STORE_DIR"),
+        description="Content-addressed asset store directory (defaults to DATA_DIR/asset-store)",
+    )
+
+    warc_archiver: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("WARC_ARCHIVER"),
+        description="Register the warc archiver, which records raw HTTP exchanges through a local proxy",
+    )
+    warc_wacz: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("WARC_WACZ"),
+        description="Package warc captures as WACZ (WARC + CDXJ index + pages) instead of a bare .warc.gz",
+    )
+    screenshot_formats_raw: str = Field(
+        default="webp",
+        validation_alias=AliasChoices("SCREENSHOT_FORMATS"),
+        description="Comma-separated encodings written next to each screenshot PNG (webp, avif); empty disables",
+    )
+    screenshot_quality: int = Field(
+        default=80,
+        validation_alias=AliasChoices("SCREENSHOT_QUALITY"),
+        description="WebP/AVIF quality for screenshot derivatives and thumbnails",
+    )
+    screenshot_thumbnails_raw: str = Field(
+        default="400x300",
+        validation_alias=AliasChoices("SCREENSHOT_THUMBNAILS"),
+        description="Comma-separated WIDTHxHEIGHT thumbnail sizes; the first is shown in the dashboard",
+    )
+    screenshot_keep_png: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("SCREENSHOT_KEEP_PNG"),
+        description="Keep the captured PNG as the screenshot; when false the first SCREENSHOT_FORMATS encoding replaces it",
+    )
+
+    @property
+    def screenshot_formats(self) -> list[str]:
+        return [item.strip().lower() for item in self.screenshot_formats_raw.split(",") if item.strip()]
+
+    @property
+    def screenshot_thumbnail_sizes(self) -> list[tuple[int, int]]:
+        sizes = []
+        for item in self.screenshot_thumbnails_raw.split(","):
+            width, _, height = item.strip().lower().partition("x")
+            if width.isdigit() and height.isdigit():
+                sizes.append((int(width), int(height)))
+        return sizes
+
+    @property
+    def resolved_asset_cache_dir(self) -> Path:
+        return self.asset_cache_dir or (self.data_dir / "asset-cache")
+
+    @property
+    def resolved_asset_store_dir(self) -> Path:
+        return self.asset_store_dir or (self.data_dir / "asset-store")
 
     # Storage integration configuration
     enable_storage_integration: bool = Field(
@@ -422,6 +652,104 @@ class AppSettings(BaseSettings):
         description="Enable automatic cleanup of local files after cloud upload"
     )
 
+    # Upload compression
+    upload_dedup: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("UPLOAD_DEDUP", "STORAGE__UPLOAD_DEDUP"),
+        description="Skip uploading content a provider already holds (SHA-256 index in stored_objects); "
+                    "identical content under another path is copied server-side"
+    )
+    upload_codec: str = Field(
+        default="gzip",
+        validation_alias=AliasChoices("UPLOAD_CODEC", "STORAGE__UPLOAD_CODEC"),
+        description="Compression codec for uploads: 'gzip' or 'zstd' (requires the zstandard package)"
+    )
+    upload_codec_level: Optional[int] = Field(
+        default=None,
+        validation_alias=AliasChoices("UPLOAD_CODEC_LEVEL", "STORAGE__UPLOAD_CODEC_LEVEL"),
+        description="Compression level (defaults: gzip 9, zstd 10)"
+    )
+    zstd_long_distance: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("ZSTD_LONG_DISTANCE", "STORAGE__ZSTD_LONG_DISTANCE"),
+        description="Enable zstd long-distance matching for large, repetitive pages"
+    )
+    zstd_dictionaries: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("ZSTD_DICTIONARIES", "STORAGE__ZSTD_DICTIONARIES"),
+        description="Use the trained per-archiver zstd dictionary when one exists"
+    )
+    zstd_dict_dir: Optional[Path] = Field(
+        default=None,
+        validation_alias=AliasChoices("ZSTD_DICT_DIR", "STORAGE__ZSTD_DICT_DIR"),
+        description="Directory of trained zstd dictionaries (defaults to DATA_DIR/zstd-dicts)"
+    )
+
+    @property
+    def resolved_zstd_dict_dir(self) -> Path:
+        return self.zstd_dict_dir or (self.data_dir / "zstd-dicts")
+
+    upload_workers: int = Field(
+        default=8,
+        validation_alias=AliasChoices("UPLOAD_WORKERS", "STORAGE__UPLOAD_WORKERS"),
+        description="Threads shared by all archivers for concurrent storage provider uploads"
+    )
+    upload_timeout_seconds: float = Field(
+        default=300.0,
+        validation_alias=AliasChoices("UPLOAD_TIMEOUT_SECONDS", "STORAGE__UPLOAD_TIMEOUT_SECONDS"),
+        description="How long an archive waits for each provider's upload before reporting it failed"
+    )
+    upload_timeouts_raw: str = Field(
+        default="",
+        validation_alias=AliasChoices("UPLOAD_TIMEOUTS", "STORAGE__UPLOAD_TIMEOUTS"),
+        description="Per-provider upload timeouts overriding UPLOAD_TIMEOUT_SECONDS, e.g. 'local=30,gcs=600'"
+    )
+
+    def upload_timeout_for(self, provider_name: str) -> float:
+        """Upload timeout in seconds for ``provider_name``."""
+        for item in self.upload_timeouts_raw.split(","):
+            name, _, value = item.partition("=")
+            if name.strip() == provider_name:
+                try:
+                    return float(value)
+                except ValueError:
+                    break
+        return self.upload_timeout_seconds
+
+    # Read-through cache in front of remote storage providers
+    artifact_cache_max_mb: int = Field(
+        default=2048,
+        validation_alias=AliasChoices("ARTIFACT_CACHE_MAX_MB", "STORAGE__ARTIFACT_CACHE_MAX_MB"),
+        description="Disk budget for locally cached copies of remotely stored artifacts (0 disables the cache)"
+    )
+    artifact_cache_max_object_mb: int = Field(
+        default=512,
+        validation_alias=AliasChoices("ARTIFACT_CACHE_MAX_OBJECT_MB", "STORAGE__ARTIFACT_CACHE_MAX_OBJECT_MB"),
+        description="Largest stored object kept in the artifact cache; bigger ones are always read remotely"
+    )
+    artifact_cache_dir: Optional[Path] = Field(
+        default=None,
+        validation_alias=AliasChoices("ARTIFACT_CACHE_DIR", "STORAGE__ARTIFACT_CACHE_DIR"),
+        description="Artifact cache directory (defaults to DATA_DIR/artifact-cache)"
+    )
+
+    @property
+    def resolved_artifact_cache_dir(self) -> Path:
+        return self.artifact_cache_dir or (self.data_dir / "artifact-cache")
+
+    # Redirect artifact downloads to signed provider URLs
+    retrieve_signed_redirects: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("RETRIEVE_SIGNED_REDIRECTS", "STORAGE__RETRIEVE_SIGNED_REDIRECTS"),
+        description="Answer /archive/retrieve with a redirect to a signed URL when the provider supports it "
+                    "and the object can be served as stored (uncompressed, not HTML)"
+    )
+    signed_redirect_minutes: int = Field(
+        default=15,
+        validation_alias=AliasChoices("SIGNED_REDIRECT_MINUTES", "STORAGE__SIGNED_REDIRECT_MINUTES"),
+        description="Lifetime of signed URLs handed out by retrieve redirects"
+    )
+
     # Local backup storage (when using multiple providers)
     local_backup_dir: Optional[Path] = Field(
         default=None,
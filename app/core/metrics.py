@@ -0,0 +1,109 @@
+"""In-process metrics registry exposed at ``/metrics``.
+
+Counters, gauges and summaries are keyed by name plus labels and rendered in
+the Prometheus text exposition format.
+"""
+
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from typing import Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + body + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and count/sum summaries."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._summaries: Dict[str, Dict[LabelKey, list[float]]] = {}
+
+    def inc(self, name: str, amount: float = 1.0, **labels: object) -> None:
+        """Increment counter ``name`` by ``amount``."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels: object) -> None:
+        """Set gauge ``name`` to ``value``."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = float(value)
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        """Record one observation for summary ``name`` (tracked as count and sum)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            count_sum = series.setdefault(key, [0.0, 0.0])
+            count_sum[0] += 1
+            count_sum[1] += value
+
+    def get(self, name: str, **labels: object) -> float:
+        """Return the current value of a counter or gauge (0 if unset)."""
+        key = _label_key(labels)
+        with self._lock:
+            for family in (self._counters, self._gauges):
+                if name in family and key in family[name]:
+                    return family[name][key]
+        return 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        """Return every series as ``name{labels}`` -> value."""
+        out: dict[str, float] = {}
+        with self._lock:
+            for family in (self._counters, self._gauges):
+                for name, series in family.items():
+                    for key, value in series.items():
+                        out[name + _format_labels(key)] = value
+            for name, series in self._summaries.items():
+                for key, (count, total) in series.items():
+                    out[f"{name}_count" + _format_labels(key)] = count
+                    out[f"{name}_sum" + _format_labels(key)] = total
+        return out
+
+    def render_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for kind, family in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(family):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(family[name].items()):
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._summaries):
+                lines.append(f"# TYPE {name} summary")
+                for key, (count, total) in sorted(self._summaries[name].items()):
+                    lines.append(f"{name}_count{_format_labels(key)} {count:g}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    return MetricsRegistry()
@@ -0,0 +1,146 @@
+"""Process pool for CPU-bound work that should not hold the API's GIL.
+
+``ProcessPool`` wraps ``ProcessPoolExecutor`` with the ``spawn`` start method,
+a per-task timeout and recovery: a task that overruns its timeout cannot be
+cancelled once running, so the pool's worker processes are killed and a fresh
+executor is created for the next task. Other tasks lost with those workers did
+nothing wrong, so each is resubmitted once to the fresh executor. Task
+functions must be importable top-level callables with picklable arguments and
+results.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from core.metrics import MetricsRegistry, get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPoolError(RuntimeError):
+    """Raised when a task cannot complete because its worker process died."""
+
+
+class ProcessPoolTimeout(ProcessPoolError):
+    """Raised when a task exceeds its timeout; the pool is recycled."""
+
+
+class ProcessPool:
+    """Run picklable callables in worker processes with per-task timeouts."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        *,
+        name: str = "cpu",
+        max_tasks_per_child: Optional[int] = 100,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.name = name
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.metrics = metrics or get_metrics()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Executors whose workers were killed because a task overran its timeout
+        self._killed: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+    def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run ``fn(*args)`` in a worker process and return its result.
+
+        Exceptions raised by ``fn`` propagate unchanged. Raises
+        ``ProcessPoolTimeout`` when ``timeout`` elapses and
+        ``ProcessPoolError`` when the worker process dies. A task lost because
+        another task's timeout recycled the pool is run once more, with a
+        fresh ``timeout``.
+        """
+        started = time.monotonic()
+        executor, future = self._submit(fn, args)
+        try:
+            try:
+                return future.result(timeout=timeout)
+            except (BrokenProcessPool, CancelledError):
+                if executor not in self._killed:
+                    raise
+                self.metrics.inc("process_pool_resubmits_total", pool=self.name)
+                logger.info(
+                    f"Resubmitting process pool task {getattr(fn, '__name__', fn)} lost to a recycled pool",
+                    extra={"pool": self.name},
+                )
+                executor, future = self._submit(fn, args)
+                return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.metrics.inc("process_pool_timeouts_total", pool=self.name)
+            logger.warning(
+                f"Process pool task {getattr(fn, '__name__', fn)} timed out after {timeout}s; recycling pool",
+                extra={"pool": self.name, "timeout": timeout},
+            )
+            self._discard(executor, kill=True)
+            raise ProcessPoolTimeout(f"Task timed out after {timeout}s") from None
+        except BrokenProcessPool as exc:
+            self._discard(executor)
+            raise ProcessPoolError(f"Worker process died: {exc}") from exc
+        except CancelledError as exc:
+            raise ProcessPoolError("Task was cancelled by a pool recycle") from exc
+        finally:
+            self.metrics.observe("process_pool_task_seconds", time.monotonic() - started, pool=self.name)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn: Callable[..., Any], args: tuple) -> tuple[ProcessPoolExecutor, Future]:
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError):
+            # Another task recycled this executor; retry once on a fresh one
+            self._discard(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(fn, *args)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor, *, kill: bool = False) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        if kill:
+            # Running tasks cannot be cancelled; kill the workers outright.
+            self._killed.add(executor)
+            for proc in list((getattr(executor, "_processes", None) or {}).values()):
+                try:
+                    proc.kill()
+                except Exception:
+                    pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_process_pool() -> Optional[ProcessPool]:
+    """Shared CPU pool, or None when ``CPU_POOL_WORKERS`` is 0 (run inline)."""
+    from core.config import get_settings
+
+    settings = get_settings()
+    if settings.cpu_pool_workers <= 0:
+        return None
+    return ProcessPool(settings.cpu_pool_workers, name="cpu")
@@ -0,0 +1,328 @@
+"""Watchdog for Chromium (and other browser) process groups spawned per job.
+
+Every archiver subprocess runs in its own session, so each job owns exactly one
+process group. The watchdog tracks those groups and periodically:
+
+- kills groups that exceed the wall-clock or RSS ceiling,
+- reaps zombie children that were re-parented to this process (e.g. when the
+  service runs as PID 1 in a container), and
+- kills orphaned Chromium processes left behind by groups that are no longer
+  tracked. Only browsers this service started are touched: descendants of
+  this process, or browsers running on our ``--user-data-dir`` (orphans
+  re-parented to init keep it on their command line).
+
+Kills and reaps are reported through ``core.metrics``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import psutil
+
+from core.metrics import MetricsRegistry, get_metrics
+
+if TYPE_CHECKING:
+    from core.config import ChromiumSettings
+
+logger = logging.getLogger(__name__)
+
+_BROWSER_NAMES = ("chromium", "chrome", "headless_shell")
+
+
+@dataclass
+class TrackedGroup:
+    pgid: int
+    archiver: Optional[str]
+    started: float
+    max_seconds: Optional[float]
+    max_rss_bytes: Optional[int]
+    leader_pids: set[int] = field(default_factory=set)
+
+
+@dataclass
+class SweepStats:
+    killed: int = 0
+    reaped: int = 0
+    orphans_killed: int = 0
+
+
+class ProcessWatchdog:
+    """Enforce per-job wall-clock and RSS ceilings on tracked process groups."""
+
+    def __init__(
+        self,
+        *,
+        max_job_seconds: Optional[float] = 900.0,
+        max_job_rss_mb: Optional[int] = 4096,
+        interval_seconds: float = 10.0,
+        orphan_grace_seconds: float = 60.0,
+        user_data_dir: Optional[Path] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.max_job_seconds = max_job_seconds or None
+        self.max_job_rss_bytes = max_job_rss_mb * 1024 * 1024 if max_job_rss_mb else None
+        self.interval_seconds = max(interval_seconds, 0.1)
+        self.orphan_grace_seconds = orphan_grace_seconds
+        # Also matches per-worker siblings such as ``<dir>-singlefile-worker``
+        self.user_data_dir = str(user_data_dir) if user_data_dir else None
+        self.metrics = metrics or get_metrics()
+        self._groups: dict[int, TrackedGroup] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, chromium: ChromiumSettings, data_dir: Optional[Path] = None) -> "ProcessWatchdog":
+        return cls(
+            max_job_seconds=chromium.max_job_seconds,
+            max_job_rss_mb=chromium.max_job_rss_mb,
+            interval_seconds=chromium.watchdog_interval_seconds,
+            orphan_grace_seconds=chromium.orphan_grace_seconds,
+            user_data_dir=chromium.resolved_user_data_dir(data_dir) if data_dir is not None else chromium.user_data_dir,
+        )
+
+    # ------------------------------------------------------------------ tracking
+
+    def track(
+        self,
+        proc: subprocess.Popen,
+        *,
+        archiver: Optional[str] = None,
+        max_seconds: Optional[float] = None,
+    ) -> int:
+        """Start tracking the process group led by ``proc``; returns the pgid.
+
+        ``max_seconds=0`` disables the wall-clock ceiling for resident
+        processes; the RSS ceiling still applies.
+        """
+        try:
+            pgid = os.getpgid(proc.pid)
+        except ProcessLookupError:
+            pgid = proc.pid
+
+        with self._lock:
+            group = self._groups.get(pgid)
+            if group is None:
+                group = TrackedGroup(
+                    pgid=pgid,
+                    archiver=archiver,
+                    started=time.monotonic(),
+                    max_seconds=self.max_job_seconds if max_seconds is None else (max_seconds or None),
+                    max_rss_bytes=self.max_job_rss_bytes,
+                )
+                self._groups[pgid] = group
+            group.leader_pids.add(proc.pid)
+            self.metrics.set("chromium_watchdog_tracked_groups", len(self._groups))
+        return pgid
+
+    def untrack(self, pgid: int) -> None:
+        with self._lock:
+            self._groups.pop(pgid, None)
+            self.metrics.set("chromium_watchdog_tracked_groups", len(self._groups))
+
+    @contextmanager
+    def watch(
+        self,
+        proc: subprocess.Popen,
+        *,
+        archiver: Optional[str] = None,
+        max_seconds: Optional[float] = None,
+    ) -> Iterator[int]:
+        """Track ``proc``'s process group for the duration of the block."""
+        pgid = self.track(proc, archiver=archiver, max_seconds=max_seconds)
+        try:
+            yield pgid
+        finally:
+            self.untrack(pgid)
+
+    @property
+    def tracked_groups(self) -> list[int]:
+        with self._lock:
+            return list(self._groups)
+
+    # --------------------------------------------------------------- lifecycle
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="process-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sweep()
+            except Exception as exc:
+                logger.error(f"Process watchdog sweep failed: {exc}", exc_info=True)
+
+    # ------------------------------------------------------------------- sweep
+
+    def sweep(self) -> SweepStats:
+        """Enforce ceilings, reap zombies and kill orphans once."""
+        stats = SweepStats()
+        now = time.monotonic()
+        processes = self._snapshot_processes()
+
+        with self._lock:
+            groups = list(self._groups.values())
+
+        for group in groups:
+            reason = self._violation(group, processes, now)
+            if reason is None:
+                continue
+            logger.warning(
+                f"Killing process group {group.pgid} ({reason})",
+                extra={"pgid": group.pgid, "archiver": group.archiver, "reason": reason},
+            )
+            if self._kill_group(group.pgid):
+                stats.killed += 1
+                self.metrics.inc("chromium_watchdog_kills_total", reason=reason, archiver=group.archiver)
+
+        stats.reaped = self._reap_zombies(processes)
+        stats.orphans_killed = self._kill_orphans(processes)
+        return stats
+
+    def _snapshot_processes(self) -> list[psutil.Process]:
+        procs = []
+        for proc in psutil.process_iter(["pid", "ppid", "name", "status", "create_time"]):
+            try:
+                proc.info["pgid"] = os.getpgid(proc.pid)
+            except (ProcessLookupError, PermissionError):
+                continue
+            procs.append(proc)
+        return procs
+
+    def _violation(
+        self,
+        group: TrackedGroup,
+        processes: list[psutil.Process],
+        now: float,
+    ) -> Optional[str]:
+        if group.max_seconds and now - group.started > group.max_seconds:
+            return "wall_clock"
+
+        if group.max_rss_bytes:
+            rss = 0
+            for proc in processes:
+                if proc.info["pgid"] != group.pgid:
+                    continue
+                try:
+                    rss += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            if rss > group.max_rss_bytes:
+                return "rss"
+        return None
+
+    def _kill_group(self, pgid: int) -> bool:
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError as exc:
+            logger.warning(f"Not permitted to kill process group {pgid}: {exc}")
+            return False
+
+    def _reap_zombies(self, processes: list[psutil.Process]) -> int:
+        """Reap zombie children that no ``Popen`` owns.
+
+        Our own ``Popen`` children lead their session (pid == pgid) or share our
+        process group; anything else is a descendant re-parented to us.
+        """
+        own_pid = os.getpid()
+        own_pgid = os.getpgid(own_pid)
+        reaped = 0
+        for proc in processes:
+            info = proc.info
+            if info["ppid"] != own_pid or info["status"] != psutil.STATUS_ZOMBIE:
+                continue
+            if info["pgid"] in (proc.pid, own_pgid):
+                continue
+            try:
+                pid, _ = os.waitpid(proc.pid, os.WNOHANG)
+            except ChildProcessError:
+                continue
+            if pid:
+                reaped += 1
+        if reaped:
+            self.metrics.inc("chromium_watchdog_zombies_reaped_total", reaped)
+            logger.info(f"Reaped {reaped} zombie process(es)")
+        return reaped
+
+    def _kill_orphans(self, processes: list[psutil.Process]) -> int:
+        """Kill browser processes we started whose job group is no longer tracked."""
+        own_pid = os.getpid()
+        own_pgid = os.getpgid(own_pid)
+        tracked = set(self.tracked_groups)
+        cutoff = time.time() - self.orphan_grace_seconds
+        parents = {proc.pid: proc.info["ppid"] for proc in processes}
+        killed = 0
+        for proc in processes:
+            info = proc.info
+            name = (info.get("name") or "").lower()
+            if not any(browser in name for browser in _BROWSER_NAMES):
+                continue
+            if info["status"] == psutil.STATUS_ZOMBIE:
+                continue
+            if info["pgid"] in tracked or info["pgid"] == own_pgid:
+                continue
+            if (info.get("create_time") or 0) > cutoff:
+                continue
+            if not (_descends_from(proc.pid, own_pid, parents) or self._uses_our_profile(proc)):
+                continue
+            try:
+                proc.kill()
+                killed += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if killed:
+            self.metrics.inc("chromium_watchdog_kills_total", killed, reason="orphan")
+            logger.warning(f"Killed {killed} orphaned browser process(es)")
+        return killed
+
+    def _uses_our_profile(self, proc: psutil.Process) -> bool:
+        if not self.user_data_dir:
+            return False
+        try:
+            cmdline = proc.cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return False
+        prefix = f"--user-data-dir={self.user_data_dir}"
+        return any(arg.startswith(prefix) for arg in cmdline)
+
+
+def _descends_from(pid: int, ancestor: int, parents: dict[int, int]) -> bool:
+    seen = set()
+    while pid in parents and pid not in seen:
+        seen.add(pid)
+        pid = parents[pid]
+        if pid == ancestor:
+            return True
+    return False
+
+
+@lru_cache
+def get_process_watchdog() -> ProcessWatchdog:
+    from core.config import get_settings
+
+    settings = get_settings()
+    return ProcessWatchdog.from_settings(settings.chromium, settings.data_dir)
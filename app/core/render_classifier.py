@@ -0,0 +1,284 @@
+"""Decide whether a page needs a JavaScript render before archiving.
+
+Many saved articles are plain server-rendered HTML. For those, the raw HTTP
+response is as good as a Chromium DOM dump and is available in milliseconds.
+``RenderClassifier`` fetches the raw HTML once, applies cheap heuristics (text
+density, ``<noscript>`` hints, empty SPA roots) and remembers per-domain
+outcomes so domains known to need JavaScript skip the probe entirely.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from core.config import AppSettings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+
+_SPA_ROOT_IDS = ("root", "app", "__next", "__nuxt", "___gatsby", "svelte", "main-app")
+_NOSCRIPT_HINT = re.compile(
+    r"(enable|turn on|requires?|need)\s+javascript|javascript\s+(is\s+)?(disabled|required)",
+    re.IGNORECASE,
+)
+_MAX_HTML_BYTES = 5 * 1024 * 1024
+# Heuristic verdicts strong enough to remember for the whole domain. A noscript
+# hint is not: paywalled or teaser pages carry one on otherwise static sites.
+_DOMAIN_WIDE_REASONS = ("empty-spa-root", "spa-framework-marker")
+
+
+@dataclass
+class RenderDecision:
+    """Outcome of classifying a URL.
+
+    ``html`` carries the raw response body when the page can be archived
+    without a JavaScript render.
+    """
+
+    needs_js: bool
+    reason: str
+    html: Optional[str] = None
+    fetch_ms: int = 0
+
+
+def analyze_html(html: str, *, min_words: int = 150) -> tuple[bool, str]:
+    """Return ``(needs_js, reason)`` for a raw HTML document."""
+    import lxml.html as LH
+
+    try:
+        tree = LH.document_fromstring(html)
+    except Exception:
+        return True, "unparseable"
+
+    scripts = tree.xpath("//script")
+    script_bytes = sum(len(s.text or "") for s in scripts)
+
+    noscript_text = " ".join(n.text_content() for n in tree.xpath("//noscript"))
+    for node in tree.xpath("//script|//style|//noscript|//template"):
+        node.drop_tree()
+
+    body = tree.find("body")
+    text = body.text_content() if body is not None else tree.text_content()
+    words = len(text.split())
+
+    if words >= max(min_words * 2, 300):
+        return False, "text-rich"
+
+    for root_id in _SPA_ROOT_IDS:
+        root = tree.get_element_by_id(root_id, None)
+        if root is not None and len(root.text_content().split()) < 10:
+            return True, f"empty-spa-root:{root_id}"
+    if tree.xpath("//*[@ng-app or @data-reactroot or @data-server-rendered='false']"):
+        if words < min_words * 2:
+            return True, "spa-framework-marker"
+
+    if _NOSCRIPT_HINT.search(noscript_text) and words < min_words * 2:
+        return True, "noscript-hint"
+
+    if words < min_words:
+        return True, "thin-content"
+
+    if script_bytes > 4 * len(text):
+        return True, "script-heavy"
+
+    return False, "static"
+
+
+def _domain(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class RenderClassifier:
+    """Classify URLs as static or JS-rendered, caching fetches and domain verdicts.
+
+    Raw HTML is kept in a small TTL cache so every archiver in an ``all`` run
+    shares one fetch. Domain verdicts learned from archiver feedback persist to
+    ``render_domains.json`` in the data dir and expire after
+    ``ADAPTIVE_RENDER_DOMAIN_TTL_DAYS``, so a site that changes stack is
+    probed again.
+    """
+
+    def __init__(
+        self,
+        settings: AppSettings,
+        *,
+        fetch: Optional[Callable[[str], Optional[str]]] = None,
+        page_cache_size: int = 64,
+        page_ttl_seconds: float = 300.0,
+    ) -> None:
+        self.settings = settings
+        self.min_words = settings.adaptive_render_min_words
+        self._fetch = fetch or self._http_fetch
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[str, tuple[float, RenderDecision]]" = OrderedDict()
+        self._page_cache_size = page_cache_size
+        self._page_ttl = page_ttl_seconds
+        self._domain_ttl = settings.adaptive_render_domain_ttl_days * 86400
+        self._domains_path = settings.data_dir / "render_domains.json"
+        self._domains: dict[str, dict] = self._load_domains(self._domains_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.adaptive_render
+
+    def classify(self, url: str) -> RenderDecision:
+        cached = self._cached_decision(url)
+        if cached is not None:
+            return cached
+
+        domain = _domain(url)
+        with self._lock:
+            learned = self._learned(domain)
+        if learned:
+            decision = RenderDecision(needs_js=True, reason="domain-cache")
+            self._remember(url, decision)
+            return decision
+
+        started = time.monotonic()
+        html = self._fetch(url)
+        fetch_ms = int((time.monotonic() - started) * 1000)
+        if not html:
+            decision = RenderDecision(needs_js=True, reason="fetch-failed", fetch_ms=fetch_ms)
+        elif learned is False:
+            decision = RenderDecision(needs_js=False, reason="domain-cache", html=html, fetch_ms=fetch_ms)
+        else:
+            needs_js, reason = analyze_html(html, min_words=self.min_words)
+            decision = RenderDecision(
+                needs_js=needs_js,
+                reason=reason,
+                html=None if needs_js else html,
+                fetch_ms=fetch_ms,
+            )
+
+        logger.info(
+            f"Render classification: {'js' if decision.needs_js else 'static'} ({decision.reason})",
+            extra={"url": url, "domain": domain, "needs_js": decision.needs_js, "fetch_ms": fetch_ms},
+        )
+        self._remember(url, decision)
+        if decision.needs_js and decision.reason.startswith(_DOMAIN_WIDE_REASONS):
+            self.record_outcome(url, needs_js=True)
+        return decision
+
+    def static_page(self, url: str) -> Optional[RenderDecision]:
+        """Return the decision when ``url`` can skip Chromium, otherwise None."""
+        if not self.enabled:
+            return None
+        decision = self.classify(url)
+        return None if decision.needs_js else decision
+
+    def record_outcome(self, url: str, *, needs_js: bool) -> None:
+        """Learn a domain verdict from archiver feedback (e.g. an empty static extract)."""
+        domain = _domain(url)
+        if not domain:
+            return
+        with self._lock:
+            if self._learned(domain) == needs_js:
+                return
+            entry = self._domains.setdefault(domain, {})
+            entry["needs_js"] = needs_js
+            entry["updated_at"] = int(time.time())
+            self._pages.pop(url, None)
+            snapshot = json.dumps(self._domains, sort_keys=True)
+        self._write_domains(snapshot)
+        logger.info(
+            f"Learned render mode for {domain}: {'js' if needs_js else 'static'}",
+            extra={"domain": domain, "needs_js": needs_js},
+        )
+
+    def _learned(self, domain: str) -> Optional[bool]:
+        """Learned verdict for ``domain``, or None when unknown or expired (lock held)."""
+        entry = self._domains.get(domain)
+        if not entry:
+            return None
+        if time.time() - entry.get("updated_at", 0) > self._domain_ttl:
+            return None
+        return entry.get("needs_js")
+
+    def _cached_decision(self, url: str) -> Optional[RenderDecision]:
+        with self._lock:
+            entry = self._pages.get(url)
+            if entry is None:
+                return None
+            stored_at, decision = entry
+            if time.monotonic() - stored_at > self._page_ttl:
+                del self._pages[url]
+                return None
+            self._pages.move_to_end(url)
+            return decision
+
+    def _remember(self, url: str, decision: RenderDecision) -> None:
+        with self._lock:
+            self._pages[url] = (time.monotonic(), decision)
+            self._pages.move_to_end(url)
+            while len(self._pages) > self._page_cache_size:
+                self._pages.popitem(last=False)
+
+    @staticmethod
+    def _load_domains(path: Path) -> dict[str, dict]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable render domain cache {path}: {exc}")
+            return {}
+
+    def _write_domains(self, payload: str) -> None:
+        tmp = None
+        try:
+            self._domains_path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique per write: concurrent writers in one process must not share a temp file
+            fd, tmp = tempfile.mkstemp(dir=self._domains_path.parent, prefix=".render_domains-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self._domains_path)
+        except OSError as exc:
+            logger.warning(f"Failed to persist render domain cache: {exc}")
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    @staticmethod
+    def _http_fetch(url: str) -> Optional[str]:
+        try:
+            import httpx
+
+            with httpx.Client(
+                follow_redirects=True,
+                timeout=15,
+                headers={"User-Agent": USER_AGENT},
+            ) as client, client.stream("GET", url) as response:
+                if response.status_code >= 400:
+                    return None
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type.lower():
+                    return None
+                # Refuse oversized pages up front, and stop reading once past the limit
+                if int(response.headers.get("content-length") or 0) > _MAX_HTML_BYTES:
+                    return None
+                body = bytearray()
+                for chunk in response.iter_bytes():
+                    body += chunk
+                    if len(body) > _MAX_HTML_BYTES:
+                        return None
+                return bytes(body).decode(response.encoding or "utf-8", errors="replace")
+        except Exception:
+            return None
@@ -0,0 +1,200 @@
+"""Client for the resident SingleFile worker (``scripts/singlefile_worker.mjs``).
+
+Each ``single-file`` invocation pays for Node module loading and a browser
+launch before it captures anything. The worker keeps both warm and accepts
+jobs as JSON lines on stdin, answering on stdout. ``SingleFileWorkerClient``
+starts the worker on first use, detects crashes and hung jobs, and starts a
+fresh worker for the next job.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+from core.process_watchdog import get_process_watchdog
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "singlefile_worker.mjs"
+
+_EOF = object()
+
+
+class SingleFileWorkerError(RuntimeError):
+    """Raised when the worker fails to start, crashes, times out or rejects a job."""
+
+
+class SingleFileWorkerClient:
+    """Send capture jobs to one long-lived worker process.
+
+    Jobs are serialized; the worker captures one page at a time. The worker
+    is recycled after ``max_jobs`` captures to bound browser memory growth.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        *,
+        startup_timeout: float = 60.0,
+        job_timeout: float = 300.0,
+        max_jobs: int = 200,
+        archiver: str = "singlefile",
+    ) -> None:
+        self.command = list(command)
+        self.startup_timeout = startup_timeout
+        self.job_timeout = job_timeout
+        self.max_jobs = max_jobs
+        self.archiver = archiver
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._pgid: Optional[int] = None
+        self._messages: "queue.Queue[object]" = queue.Queue()
+        self._next_id = 0
+        self._jobs_served = 0
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def capture(self, url: str, output: Path, *, timeout: Optional[float] = None) -> None:
+        """Capture ``url`` into ``output``; raises ``SingleFileWorkerError`` on failure."""
+        with self._lock:
+            if self._jobs_served >= self.max_jobs:
+                logger.info("Recycling SingleFile worker", extra={"jobs_served": self._jobs_served})
+                self._stop_locked()
+            if not self.running:
+                self._start_locked()
+
+            self._next_id += 1
+            job_id = self._next_id
+            job = {"id": job_id, "url": url, "output": str(output)}
+            try:
+                assert self._proc is not None and self._proc.stdin is not None
+                self._proc.stdin.write(json.dumps(job) + "\n")
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError) as exc:
+                self._crashed_locked("write failed")
+                raise SingleFileWorkerError(f"SingleFile worker unavailable: {exc}") from exc
+
+            self._jobs_served += 1
+            reply = self._wait_for_locked(
+                lambda message: message.get("id") == job_id,
+                timeout or self.job_timeout,
+                what=f"job for {url}",
+            )
+            if not reply.get("ok"):
+                raise SingleFileWorkerError(reply.get("error") or "capture failed")
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_locked()
+
+    # ----------------------------------------------------------------- internals
+
+    def _start_locked(self) -> None:
+        self._messages = queue.Queue()
+        try:
+            proc = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                start_new_session=True,
+            )
+        except OSError as exc:
+            raise SingleFileWorkerError(f"Failed to start SingleFile worker: {exc}") from exc
+
+        self._proc = proc
+        # Resident worker: no wall-clock ceiling, but RSS and orphan checks apply.
+        self._pgid = get_process_watchdog().track(proc, archiver=self.archiver, max_seconds=0)
+        self._jobs_served = 0
+        threading.Thread(
+            target=self._read_stdout, args=(proc, self._messages), name="singlefile-worker-out", daemon=True
+        ).start()
+        threading.Thread(
+            target=self._read_stderr, args=(proc,), name="singlefile-worker-err", daemon=True
+        ).start()
+
+        self._wait_for_locked(lambda message: message.get("ready") is True, self.startup_timeout, what="startup")
+        logger.info("SingleFile worker started", extra={"pid": proc.pid, "restarts": self.restarts})
+
+    def _wait_for_locked(self, match, timeout: float, *, what: str) -> dict:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._crashed_locked(f"{what} timed out")
+                raise SingleFileWorkerError(f"SingleFile worker {what} timed out after {timeout:.0f}s")
+            try:
+                message = self._messages.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if message is _EOF:
+                code = self._proc.wait() if self._proc is not None else None
+                self._crashed_locked(f"exited with {code}")
+                raise SingleFileWorkerError(f"SingleFile worker exited during {what} (exit code {code})")
+            if isinstance(message, dict) and match(message):
+                return message
+
+    def _crashed_locked(self, reason: str) -> None:
+        logger.warning(f"SingleFile worker {reason}; restarting on next job")
+        self.restarts += 1
+        self._stop_locked(graceful=False)
+
+    def _stop_locked(self, *, graceful: bool = True) -> None:
+        proc = self._proc
+        if proc is None:
+            return
+        self._proc = None
+        if graceful and proc.poll() is None:
+            try:
+                # EOF asks the worker to close its browser and exit
+                proc.stdin.close()
+                proc.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        # Take down the worker's browser processes along with it
+        try:
+            os.killpg(self._pgid or proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        if self._pgid is not None:
+            get_process_watchdog().untrack(self._pgid)
+            self._pgid = None
+
+    @staticmethod
+    def _read_stdout(proc: subprocess.Popen, messages: "queue.Queue[object]") -> None:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                messages.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug(f"SingleFile worker: {line}")
+        messages.put(_EOF)
+
+    @staticmethod
+    def _read_stderr(proc: subprocess.Popen) -> None:
+        assert proc.stderr is not None
+        for line in proc.stderr:
+            line = line.rstrip()
+            if line:
+                logger.debug(f"SingleFile worker: {line}")
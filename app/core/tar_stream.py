@@ -0,0 +1,63 @@
+"""Streaming tar.gz writer.
+
+``stream_tar_gz`` yields a gzip-compressed tar archive chunk by chunk while
+reading each member from its own stream, so a bundle of large artifacts is
+sent with constant memory and no temp files. Tar headers carry each member's
+size up front, so members declare it; a stream that turns out shorter or
+longer than declared aborts the archive instead of producing a corrupt one.
+"""
+
+from __future__ import annotations
+
+import tarfile
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterable, Iterator
+
+_CHUNK = 64 * 1024
+
+
+@dataclass
+class TarMember:
+    """A file to add to the archive."""
+
+    name: str
+    size: int
+    open: Callable[[], BinaryIO]
+    mtime: float = 0.0
+
+
+def _member_blocks(member: TarMember) -> Iterator[bytes]:
+    info = tarfile.TarInfo(member.name)
+    info.size = member.size
+    info.mtime = int(member.mtime)
+    info.mode = 0o644
+    yield info.tobuf(format=tarfile.PAX_FORMAT)
+
+    remaining = member.size
+    with member.open() as stream:
+        while remaining > 0:
+            chunk = stream.read(min(_CHUNK, remaining))
+            if not chunk:
+                raise IOError(f"{member.name} ended {remaining} bytes short of its declared size")
+            remaining -= len(chunk)
+            yield chunk
+        if stream.read(1):
+            raise IOError(f"{member.name} is larger than its declared size ({member.size} bytes)")
+
+    padding = -member.size % tarfile.BLOCKSIZE
+    if padding:
+        yield tarfile.NUL * padding
+
+
+def stream_tar_gz(members: Iterable[TarMember], level: int = 6) -> Iterator[bytes]:
+    """Yield a tar.gz archive of ``members`` (consumed lazily, in order)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for member in members:
+        for block in _member_blocks(member):
+            if out := compressor.compress(block):
+                yield out
+    # End-of-archive marker: two zero blocks
+    if out := compressor.compress(tarfile.NUL * (2 * tarfile.BLOCKSIZE)):
+        yield out
+    yield compressor.flush()
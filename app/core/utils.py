@@ -1,4 +1,5 @@
 import glob
+import hashlib
 import re
 from dataclasses import dataclass
 from pathlib import Path
@@ -136,6 +137,11 @@ class URLCheck:
     is_reachable: bool
     status_code: int | None
     should_archive: bool
+    # HTTP validators from the response (set by check_url_freshness)
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None
+    not_modified: bool = False
 
     @property
     def is_not_found(self) -> bool:
@@ -180,27 +186,119 @@ def check_url_archivability(url: str, timeout: int = 10) -> URLCheck:
         )
 
 
-def get_directory_size(path: Path) -> int:
-    """Calculate total size of a directory and all its contents recursively.
+def check_url_freshness(
+    url: str,
+    *,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    content_hash: str | None = None,
+    timeout: int = 10,
+) -> URLCheck:
+    """Check a URL with a conditional GET against previously stored validators.
 
-    Returns size in bytes. Returns 0 if path doesn't exist or on error.
+    The page counts as unchanged on a 304, when the server repeats the stored
+    ETag, or when the SHA-256 of the body matches ``content_hash`` (for servers
+    that send no validators). The returned URLCheck carries the validators to
+    store for the next check.
+
+    Args:
+        url: URL to check
+        etag: ETag from the previous fetch
+        last_modified: Last-Modified from the previous fetch
+        content_hash: SHA-256 hex digest of the previous body
+        timeout: Request timeout in seconds (default: 10)
+
+    Returns:
+        URLCheck with reachability status, validators and ``not_modified``
     """
-    if not path.exists():
-        return 0
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
 
-    total = 0
     try:
-        if path.is_file():
-            return path.stat().st_size
-
-        for item in path.rglob("*"):
-            if item.is_file():
-                try:
-                    total += item.stat().st_size
-                except (OSError, PermissionError):
-                    # Skip files we can't access
-                    pass
-    except (OSError, PermissionError):
-        pass
+        import httpx
+
+        with httpx.Client(follow_redirects=True, timeout=timeout) as client:
+            with client.stream("GET", url, headers=headers) as r:
+                status = int(r.status_code)
+                body_hash = _hash_body(r) if status == 200 else None
+                new_etag = r.headers.get("etag")
+                new_last_modified = r.headers.get("last-modified")
+    except Exception:
+        return URLCheck(url=url, is_reachable=False, status_code=None, should_archive=True)
+
+    if status == 304:
+        return URLCheck(
+            url=url,
+            is_reachable=True,
+            status_code=status,
+            should_archive=True,
+            etag=new_etag or etag,
+            last_modified=new_last_modified or last_modified,
+            content_hash=content_hash,
+            not_modified=True,
+        )
+
+    not_modified = status == 200 and (
+        bool(etag and new_etag == etag)
+        or bool(content_hash and body_hash == content_hash)
+    )
+    return URLCheck(
+        url=url,
+        is_reachable=True,
+        status_code=status,
+        should_archive=status != 404,
+        etag=new_etag,
+        last_modified=new_last_modified,
+        content_hash=body_hash,
+        not_modified=not_modified,
+    )
+
+
+def _hash_body(response: "httpx.Response", max_bytes: int = 16 * 1024 * 1024) -> str | None:
+    """SHA-256 of a streamed response body, or None when it exceeds ``max_bytes``."""
+    digest = hashlib.sha256()
+    total = 0
+    for chunk in response.iter_bytes():
+        total += len(chunk)
+        if total > max_bytes:
+            return None
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
+
+def get_output_size(path: Path) -> int:
+    """Total size of the files in an archiver output directory.
+
+    A single ``os.scandir`` walk that reuses the directory entries' cached
+    stat results. Returns 0 if the directory doesn't exist.
+    """
+    import os
+
+    total = 0
+    pending = [str(path)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
     return total
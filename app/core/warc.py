@@ -0,0 +1,429 @@
+"""WARC capture: streaming record writer, CDXJ index and WACZ packaging.
+
+``WarcWriter`` appends WARC/1.1 records as one gzip member each, so any record
+can be decompressed on its own from its byte offset. Bodies are streamed from
+a file object into the compressor; nothing holds a whole response in memory.
+
+``WarcRecorder`` is the exchange sink the recording proxy (``core.asset_proxy``)
+feeds. Each response body is spooled to a temporary file (in memory up to
+``spool_bytes``) while it is relayed, then written as a ``response`` record
+with its ``request`` record.
+
+``write_wacz`` packages the WARC with its CDXJ index and page list as a WACZ
+1.1.1 file. Entries are stored uncompressed so replay tools can range-read
+records straight out of the zip.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import tempfile
+import threading
+import uuid
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 64 * 1024
+WACZ_VERSION = "1.1.1"
+
+
+def warc_date(when: Optional[datetime] = None) -> str:
+    when = when or datetime.now(timezone.utc)
+    return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def surt(url: str) -> str:
+    """Sort-friendly URI key used by CDXJ (``com,example)/path?query``)."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = ",".join(reversed(host.split(".")))
+    if parts.port and parts.port not in (80, 443):
+        key += f":{parts.port}"
+    path = parts.path or "/"
+    query = "&".join(sorted(parts.query.split("&"))) if parts.query else ""
+    return f"{key}){path.lower()}" + (f"?{query.lower()}" if query else "")
+
+
+@dataclass
+class IndexEntry:
+    """One CDXJ line: where a response record lives in the WARC."""
+    url: str
+    timestamp: str
+    mime: str
+    status: int
+    digest: str
+    offset: int
+    length: int
+    filename: str
+
+    def cdxj(self) -> str:
+        fields = {
+            "url": self.url,
+            "mime": self.mime,
+            "status": str(self.status),
+            "digest": self.digest,
+            "length": str(self.length),
+            "offset": str(self.offset),
+            "filename": self.filename,
+        }
+        return f"{surt(self.url)} {self.timestamp} {json.dumps(fields)}"
+
+
+def _digest(hasher) -> str:
+    return f"sha256:{hasher.hexdigest()}"
+
+
+class WarcWriter:
+    """Append gzip-per-record WARC/1.1 records to a file."""
+
+    def __init__(self, path: Path, *, software: str = "htbase"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._lock = threading.Lock()
+        self.index: list[IndexEntry] = []
+        self.records = 0
+        self.write_record(
+            "warcinfo",
+            io.BytesIO(f"software: {software}\r\nformat: WARC File Format 1.1\r\n".encode()),
+            content_type="application/warc-fields",
+            headers={"WARC-Filename": self.path.name},
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self) -> "WarcWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write_record(
+        self,
+        warc_type: str,
+        block: BinaryIO,
+        *,
+        content_type: str,
+        target_uri: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+        payload_offset: Optional[int] = None,
+    ) -> tuple[str, int, int, Optional[str]]:
+        """Write one record whose block is read from ``block`` (seekable).
+
+        Args:
+            payload_offset: Where the HTTP payload starts inside the block, for
+                ``WARC-Payload-Digest``
+
+        Returns:
+            (record_id, offset, compressed_length, payload_digest)
+        """
+        block_hash = hashlib.sha256()
+        payload_hash = hashlib.sha256() if payload_offset is not None else None
+        block.seek(0)
+        position = 0
+        while chunk := block.read(_CHUNK):
+            block_hash.update(chunk)
+            if payload_hash is not None:
+                if position + len(chunk) > payload_offset:
+                    payload_hash.update(chunk[max(0, payload_offset - position):])
+                position += len(chunk)
+        length = block.tell()
+
+        record_id = f"<urn:uuid:{uuid.uuid4()}>"
+        lines = [
+            "WARC/1.1",
+            f"WARC-Type: {warc_type}",
+            f"WARC-Record-ID: {record_id}",
+            f"WARC-Date: {warc_date()}",
+        ]
+        if target_uri:
+            lines.append(f"WARC-Target-URI: {target_uri}")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        lines.append(f"Content-Type: {content_type}")
+        lines.append(f"WARC-Block-Digest: {_digest(block_hash)}")
+        payload_digest = _digest(payload_hash) if payload_hash is not None else None
+        if payload_digest:
+            lines.append(f"WARC-Payload-Digest: {payload_digest}")
+        lines.append(f"Content-Length: {length}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+        with self._lock:
+            offset = self._file.tell()
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # one gzip member per record
+            self._file.write(compressor.compress(head))
+            block.seek(0)
+            while chunk := block.read(_CHUNK):
+                self._file.write(compressor.compress(chunk))
+            self._file.write(compressor.compress(b"\r\n\r\n"))
+            self._file.write(compressor.flush())
+            self.records += 1
+            return record_id, offset, self._file.tell() - offset, payload_digest
+
+    def write_exchange(
+        self,
+        url: str,
+        request_head: bytes,
+        request_body: Optional[bytes],
+        response_head: bytes,
+        body: BinaryIO,
+        *,
+        status: int,
+        mime: str,
+    ) -> None:
+        """Write a response record and its request record, and index the response."""
+        response = _ConcatReader(response_head, body)
+        record_id, offset, length, payload_digest = self.write_record(
+            "response",
+            response,
+            content_type="application/http;msgtype=response",
+            target_uri=url,
+            payload_offset=len(response_head),
+        )
+        self.write_record(
+            "request",
+            io.BytesIO(request_head + (request_body or b"")),
+            content_type="application/http;msgtype=request",
+            target_uri=url,
+            headers={"WARC-Concurrent-To": record_id},
+        )
+        with self._lock:
+            self.index.append(
+                IndexEntry(
+                    url=url,
+                    timestamp=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+                    mime=mime,
+                    status=status,
+                    digest=payload_digest,
+                    offset=offset,
+                    length=length,
+                    filename=self.path.name,
+                )
+            )
+
+    def write_cdxj(self, path: Path) -> None:
+        """Write the sorted CDXJ index of every response record."""
+        with self._lock:
+            lines = sorted(entry.cdxj() for entry in self.index)
+        Path(path).write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+class _ConcatReader(io.RawIOBase):
+    """Seekable read-only view of ``head`` followed by a seekable ``body``."""
+
+    def __init__(self, head: bytes, body: BinaryIO):
+        self._head = head
+        self._body = body
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("only absolute seeks are supported")
+        self._pos = pos
+        self._body.seek(max(0, pos - len(self._head)))
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        if self._pos < len(self._head):
+            data = self._head[self._pos:self._pos + len(buffer)]
+        else:
+            data = self._body.read(len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+_RECORD_SKIP = frozenset({"content-length", "content-encoding", "transfer-encoding"})
+
+
+class Exchange:
+    """A response being relayed; its body is spooled until ``finish``."""
+
+    def __init__(
+        self,
+        recorder: "WarcRecorder",
+        url: str,
+        request_head: bytes,
+        request_body: Optional[bytes],
+        status: int,
+        reason: str,
+        headers: Iterable[tuple[str, str]],
+    ):
+        self._recorder = recorder
+        self.url = url
+        self.request_head = request_head
+        self.request_body = request_body
+        self.status = status
+        self.reason = reason
+        self.headers = [(k, v) for k, v in headers if k.lower() not in _RECORD_SKIP]
+        self._spool = tempfile.SpooledTemporaryFile(max_size=recorder.spool_bytes)
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._spool.write(chunk)
+        self.size += len(chunk)
+
+    def finish(self) -> None:
+        """Write the exchange; bodies were relayed decoded, so headers are recomputed."""
+        try:
+            lines = [f"HTTP/1.1 {self.status} {self.reason}"]
+            lines += [f"{name}: {value}" for name, value in self.headers]
+            lines.append(f"Content-Length: {self.size}")
+            head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", errors="replace")
+            mime = next((v for k, v in self.headers if k.lower() == "content-type"), "")
+            self._recorder.writer.write_exchange(
+                self.url,
+                self.request_head,
+                self.request_body,
+                head,
+                self._spool,
+                status=self.status,
+                mime=mime.split(";")[0].strip() or "application/octet-stream",
+            )
+        except Exception as exc:
+            logger.warning(f"Failed to record {self.url} to WARC: {exc}")
+        finally:
+            self._spool.close()
+            self._recorder._finished()
+
+
+class WarcRecorder:
+    """Exchange sink for the recording proxy, backed by one ``WarcWriter``."""
+
+    def __init__(self, writer: WarcWriter, *, spool_bytes: int = 1024 * 1024):
+        self.writer = writer
+        self.spool_bytes = spool_bytes
+        self._pending = 0
+        self._idle = threading.Condition()
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait for exchanges still being written; False if some are left."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def _finished(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def begin(
+        self,
+        method: str,
+        url: str,
+        request_headers: Iterable[tuple[str, str]],
+        request_body: Optional[bytes],
+        status: int,
+        reason: str,
+        response_headers: Iterable[tuple[str, str]],
+    ) -> Exchange:
+        target = urlsplit(url)
+        path = target.path or "/"
+        if target.query:
+            path += f"?{target.query}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {target.netloc}"]
+        lines += [f"{name}: {value}" for name, value in request_headers if name.lower() != "host"]
+        request_head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", errors="replace")
+        with self._idle:
+            self._pending += 1
+        return Exchange(self, url, request_head, request_body, status, reason, response_headers)
+
+
+@dataclass
+class Page:
+    url: str
+    ts: str = field(default_factory=warc_date)
+    title: Optional[str] = None
+
+
+def _file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+    return _digest(hasher)
+
+
+def write_wacz(
+    wacz_path: Path,
+    warc_path: Path,
+    cdxj_path: Path,
+    pages: list[Page],
+    *,
+    software: str = "htbase",
+) -> None:
+    """Package a WARC and its CDXJ index as a WACZ file.
+
+    Args:
+        wacz_path: Destination ``.wacz`` file
+        warc_path: gzip-per-record WARC
+        cdxj_path: Sorted CDXJ index for ``warc_path``
+        pages: Pages captured in the WARC (the first is the main page)
+    """
+    pages_jsonl = json.dumps({"format": "json-pages-1.0", "id": "pages", "title": "All Pages"}) + "\n"
+    pages_jsonl += "".join(
+        json.dumps({k: v for k, v in {"url": p.url, "ts": p.ts, "title": p.title}.items() if v}) + "\n"
+        for p in pages
+    )
+    pages_bytes = pages_jsonl.encode("utf-8")
+
+    members = [
+        (f"archive/{warc_path.name}", warc_path),
+        (f"indexes/{cdxj_path.name}", cdxj_path),
+    ]
+    resources = [
+        {"name": Path(arcname).name, "path": arcname, "hash": _file_digest(src), "bytes": src.stat().st_size}
+        for arcname, src in members
+    ]
+    resources.append(
+        {
+            "name": "pages.jsonl",
+            "path": "pages/pages.jsonl",
+            "hash": f"sha256:{hashlib.sha256(pages_bytes).hexdigest()}",
+            "bytes": len(pages_bytes),
+        }
+    )
+    datapackage = {
+        "profile": "data-package",
+        "wacz_version": WACZ_VERSION,
+        "software": software,
+        "created": warc_date(),
+        "resources": resources,
+    }
+    if pages:
+        datapackage["mainPageUrl"] = pages[0].url
+        datapackage["mainPageDate"] = pages[0].ts
+    datapackage_bytes = json.dumps(datapackage, indent=2).encode("utf-8")
+    digest = {"path": "datapackage.json", "hash": f"sha256:{hashlib.sha256(datapackage_bytes).hexdigest()}"}
+
+    tmp = wacz_path.with_name(f".{wacz_path.name}.tmp")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for arcname, src in members:
+            zf.write(src, arcname)  # streamed in chunks by zipfile
+        zf.writestr("pages/pages.jsonl", pages_bytes)
+        zf.writestr("datapackage.json", datapackage_bytes)
+        zf.writestr("datapackage-digest.json", json.dumps(digest))
+    tmp.replace(wacz_path)
@@ -15,6 +15,7 @@ from .repositories import (
     ArticleTagRepository,
     ArticleEntityRepository,
     CommandExecutionRepository,
+    StoredObjectRepository,
 )
 
 # Export schemas
@@ -41,6 +42,7 @@ __all__ = [
     "ArticleTagRepository",
     "ArticleEntityRepository",
     "CommandExecutionRepository",
+    "StoredObjectRepository",
     # Schemas
     "ArtifactSchema",
     "ArtifactStatus",
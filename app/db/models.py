@@ -34,6 +34,11 @@ class ArchivedUrl(Base):
     created_at = Column(DateTime, nullable=False, server_default=sa_text("now()"))
     # Total size of all artifacts for this URL
     total_size_bytes = Column(BigInteger, nullable=True)
+    # HTTP validators from the last archived fetch (conditional re-archive)
+    etag = Column(Text, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    validated_at = Column(DateTime, nullable=True)
 
     # Convenience indices
     __table_args__ = (
@@ -95,12 +100,41 @@ class ArchiveArtifact(Base):
     all_uploads_succeeded = Column(Boolean, nullable=False, server_default=sa_text("false"))
     local_file_deleted = Column(Boolean, nullable=False, server_default=sa_text("false"))
     local_file_deleted_at = Column(DateTime, nullable=True)
+    # SHA-256 of the main output file (identical saves share stored objects)
+    content_sha256 = Column(String(length=64), nullable=True)
+    # Main output as encoded for upload (one shared encoding for all providers)
+    original_size = Column(BigInteger, nullable=True)
+    stored_size = Column(BigInteger, nullable=True)
+    codec = Column(String, nullable=True)
+    # HTML output whose inlined assets were moved to the asset store
+    asset_dedup = Column(Boolean, nullable=False, server_default=sa_text("false"))
 
     __table_args__ = (
         UniqueConstraint("archived_url_id", "archiver", name="uq_artifact_url_archiver"),
         Index("idx_artifact_task_id", "task_id"),
         Index("idx_artifact_archiver", "archiver"),
         Index("idx_artifact_cleanup", "success", "all_uploads_succeeded", "local_file_deleted"),
+        Index("idx_artifact_content_sha256", "content_sha256"),
+    )
+
+
+class StoredObject(Base):
+    """Where a provider already holds given content (upload deduplication)."""
+    __tablename__ = "stored_objects"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_sha256 = Column(String(length=64), nullable=False)  # of the uncompressed file
+    provider = Column(String, nullable=False)
+    codec = Column(String, nullable=False)
+    storage_path = Column(Text, nullable=False)
+    storage_uri = Column(Text, nullable=True)
+    stored_size = Column(BigInteger, nullable=True)
+    original_size = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=sa_text("now()"))
+    last_used_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("content_sha256", "provider", "codec", name="uq_stored_object_content"),
     )
 
 
@@ -8,7 +8,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence, Any
 
-from sqlalchemy import desc, delete, select, update
+from sqlalchemy import desc, delete, func, select, update
 
 from .base_repository import BaseRepository
 from .models import (
@@ -19,11 +19,34 @@ from .models import (
     ArticleTag,
     CommandExecution,
     CommandOutputLine,
+    StoredObject,
     UrlMetadata,
 )
 from .schemas import ArtifactSchema, ArtifactStatus
 
 
+def _adjust_total_size(session, archived_url_id: int, delta: int) -> None:
+    """Add ``delta`` to a URL's total_size_bytes with a single UPDATE."""
+    session.execute(
+        update(ArchivedUrl)
+        .where(ArchivedUrl.id == archived_url_id)
+        .values(total_size_bytes=func.coalesce(ArchivedUrl.total_size_bytes, 0) + delta)
+    )
+
+
+def _set_storage_uploads(art: ArchiveArtifact, uploads: List[Dict[str, Any]]) -> None:
+    """Record per-provider upload results, summary flags, content hash and encoded sizes on an artifact."""
+    art.storage_uploads = json.loads(json.dumps(uploads, default=str))
+    art.uploaded_to_storage = any(u.get("success") for u in uploads)
+    art.all_uploads_succeeded = bool(uploads) and all(u.get("success") for u in uploads)
+    stored = next((u for u in uploads if u.get("success") and u.get("content_sha256")), None)
+    if stored is not None:
+        art.content_sha256 = stored["content_sha256"]
+        art.original_size = stored.get("original_size")
+        art.stored_size = stored.get("stored_size")
+        art.codec = stored.get("codec")
+
+
 class ArchivedUrlRepository(BaseRepository[ArchivedUrl]):
     """Repository for archived URL records."""
 
@@ -105,7 +128,10 @@ class ArchivedUrlRepository(BaseRepository[ArchivedUrl]):
         return row
 
     def update_total_size(self, archived_url_id: int) -> None:
-        """Calculate and update total size from all artifacts.
+        """Recalculate total size from all artifacts.
+
+        Finalization keeps the total current incrementally; this full
+        recount is only needed to repair drift.
 
         Args:
             archived_url_id: ID of archived URL to update
@@ -127,6 +153,33 @@ class ArchivedUrlRepository(BaseRepository[ArchivedUrl]):
             if au:
                 au.total_size_bytes = total if total > 0 else None
 
+    def update_validators(
+        self,
+        archived_url_id: int,
+        *,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_hash: Optional[str],
+        validated_at: datetime,
+    ) -> None:
+        """Store the HTTP validators of the page version that was archived.
+
+        Args:
+            archived_url_id: ID of archived URL to update
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            content_hash: SHA-256 hex digest of the response body
+            validated_at: When the validators were fetched
+        """
+        with self._get_session() as session:
+            au = session.get(ArchivedUrl, archived_url_id)
+            if au is None:
+                return
+            au.etag = etag
+            au.last_modified = last_modified
+            au.content_hash = content_hash
+            au.validated_at = validated_at
+
 
 class ArchiveArtifactRepository(BaseRepository[ArchiveArtifact]):
     """Repository for archive artifact records."""
@@ -246,9 +299,14 @@ class ArchiveArtifactRepository(BaseRepository[ArchiveArtifact]):
         exit_code: Optional[int],
         saved_path: Optional[str],
         size_bytes: Optional[int] = None,
-    ) -> None:
+        storage_uploads: Optional[List[Dict[str, Any]]] = None,
+        asset_dedup: Optional[bool] = None,
+    ) -> Optional[int]:
         """Update artifact with final archiving result.
 
+        When ``size_bytes`` changes, the parent URL's ``total_size_bytes`` is
+        adjusted by the difference in the same transaction.
+
         Args:
             artifact_id: Artifact ID to update.
             rowid: Legacy alias for artifact ID (deprecated).
@@ -256,6 +314,13 @@ class ArchiveArtifactRepository(BaseRepository[ArchiveArtifact]):
             exit_code: Process exit code.
             saved_path: Path to saved file.
             size_bytes: Optional file size in bytes.
+            storage_uploads: Per-provider upload results (provider, stored
+                key, codec, sizes) used to route later reads.
+            asset_dedup: Whether the output references the asset store and
+                must be rehydrated when served.
+
+        Returns:
+            The artifact's archived_url_id, or None if the artifact is missing.
 
         Raises:
             ValueError: If neither artifact_id nor rowid is provided.
@@ -267,13 +332,22 @@ class ArchiveArtifactRepository(BaseRepository[ArchiveArtifact]):
         with self._get_session() as session:
             art = session.get(ArchiveArtifact, resolved_id)
             if art is None:
-                return
+                return None
             art.success = bool(success)
             art.exit_code = exit_code
             art.saved_path = saved_path
             art.status = ArtifactStatus.SUCCESS if success else ArtifactStatus.FAILED
+            art.updated_at = datetime.utcnow()
             if size_bytes is not None:
+                delta = size_bytes - (art.size_bytes or 0)
                 art.size_bytes = size_bytes
+                if delta:
+                    _adjust_total_size(session, art.archived_url_id, delta)
+            if storage_uploads is not None:
+                _set_storage_uploads(art, storage_uploads)
+            if asset_dedup is not None:
+                art.asset_dedup = asset_dedup
+            return art.archived_url_id
 
     def find_successful(
         self, item_id: str, url: str, archiver: str
@@ -328,6 +402,30 @@ class ArchiveArtifactRepository(BaseRepository[ArchiveArtifact]):
             )
             return art
 
+    def delete_many(self, ids: Sequence[int]) -> int:
+        """Delete artifacts by ID and subtract their sizes from the URL totals.
+
+        Args:
+            ids: Sequence of artifact IDs to delete
+
+        Returns:
+            Number of artifacts deleted
+        """
+        if not ids:
+            return 0
+        with self._get_session() as session:
+            count = 0
+            for id in ids:
+                art = session.get(ArchiveArtifact, id)
+                if art is None:
+                    continue
+                if art.size_bytes:
+                    _adjust_total_size(session, art.archived_url_id, -art.size_bytes)
+                session.delete(art)
+                count += 1
+            session.flush()
+            return count
+
     def list_by_item_id(self, item_id: str) -> List[ArchiveArtifact]:
         """Get all artifacts for an item ID.
 
@@ -937,3 +1035,104 @@ class CommandExecutionRepository(BaseRepository[CommandExecution]):
             stmt = stmt.limit(limit)
 
             return list(session.execute(stmt).scalars().all())
+
+
+class StoredObjectRepository(BaseRepository[StoredObject]):
+    """Content-addressed index of objects already held by storage providers."""
+
+    model_class = StoredObject
+
+    def find(self, content_sha256: str, provider: str, codec: str) -> Optional[StoredObject]:
+        """Find where a provider already stores this content with this codec.
+
+        Args:
+            content_sha256: SHA-256 of the uncompressed file
+            provider: Storage provider name
+            codec: Codec name the object was stored with
+
+        Returns:
+            StoredObject or None if the content is not known to be stored
+        """
+        with self._get_session() as session:
+            row = (
+                session.execute(
+                    select(StoredObject).where(
+                        StoredObject.content_sha256 == content_sha256,
+                        StoredObject.provider == provider,
+                        StoredObject.codec == codec,
+                    )
+                )
+                .scalars()
+                .first()
+            )
+            if row is not None:
+                row.last_used_at = datetime.utcnow()
+            return row
+
+    def record(
+        self,
+        content_sha256: str,
+        provider: str,
+        codec: str,
+        storage_path: str,
+        storage_uri: Optional[str] = None,
+        stored_size: Optional[int] = None,
+        original_size: Optional[int] = None,
+    ) -> None:
+        """Record (or move) the stored copy of some content.
+
+        Entries for other content at the same path are dropped, since the
+        object there has been overwritten.
+
+        Args:
+            content_sha256: SHA-256 of the uncompressed file
+            provider: Storage provider name
+            codec: Codec name the object was stored with
+            storage_path: Object key in the provider
+            storage_uri: Full URI reported by the upload
+            stored_size: Stored (encoded) size in bytes
+            original_size: Uncompressed size in bytes
+        """
+        with self._get_session() as session:
+            session.execute(
+                delete(StoredObject).where(
+                    StoredObject.provider == provider,
+                    StoredObject.storage_path == storage_path,
+                    StoredObject.content_sha256 != content_sha256,
+                )
+            )
+            row = (
+                session.execute(
+                    select(StoredObject).where(
+                        StoredObject.content_sha256 == content_sha256,
+                        StoredObject.provider == provider,
+                        StoredObject.codec == codec,
+                    )
+                )
+                .scalars()
+                .first()
+            )
+            if row is None:
+                row = StoredObject(content_sha256=content_sha256, provider=provider, codec=codec)
+                session.add(row)
+            row.storage_path = storage_path
+            row.storage_uri = storage_uri
+            row.stored_size = stored_size
+            row.original_size = original_size
+            row.last_used_at = datetime.utcnow()
+
+    def forget(self, content_sha256: str, provider: str, codec: str) -> int:
+        """Drop an index entry whose object turned out to be gone.
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._get_session() as session:
+            result = session.execute(
+                delete(StoredObject).where(
+                    StoredObject.content_sha256 == content_sha256,
+                    StoredObject.provider == provider,
+                    StoredObject.codec == codec,
+                )
+            )
+            return result.rowcount or 0
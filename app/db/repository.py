@@ -16,11 +16,12 @@ New code should use:
 
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import select
 
 from .models import ArchivedUrl, ArchiveArtifact
+from .repositories import _set_storage_uploads
 from .session import get_session
 
 
@@ -90,6 +91,8 @@ def insert_save_result(
     exit_code: Optional[int],
     saved_path: Optional[str],
     archiver_name: Optional[str] = None,
+    storage_uploads: Optional[List[Dict[str, Any]]] = None,
+    asset_dedup: Optional[bool] = None,
 ) -> int:
     """DEPRECATED: Use ArchiveArtifactRepository instead.
 
@@ -103,6 +106,10 @@ def insert_save_result(
         art.exit_code = exit_code
         art.saved_path = saved_path
         art.status = "success" if success else "failed"
+        if storage_uploads is not None:
+            _set_storage_uploads(art, storage_uploads)
+        if asset_dedup is not None:
+            art.asset_dedup = asset_dedup
         session.flush()
         return int(art.id)
 
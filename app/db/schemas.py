@@ -47,6 +47,10 @@ class ArchivedUrlSchema(BaseModel):
     item_id: Optional[str] = None
     name: Optional[str] = None
     total_size_bytes: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    validated_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -42,6 +42,8 @@ class ArchiveResult(BaseModel):
     exit_code: Optional[int] = None
     saved_path: Optional[str] = None
     metadata: Optional[dict] = None
+    # Bytes on disk for the archiver output directory, measured at finalize
+    size_bytes: Optional[int] = None
 
 
 class SaveResponse(BaseModel):
@@ -0,0 +1,113 @@
+#!/usr/bin/env node
+// Resident SingleFile worker.
+//
+// Loads the single-file-cli API once, keeps its browser warm and serves
+// capture jobs as JSON lines:
+//
+//   stdin:  {"id": 1, "url": "https://example.com/", "output": "/data/x/output.html"}
+//   stdout: {"id": 1, "ok": true}  or  {"id": 1, "ok": false, "error": "..."}
+//
+// A {"ready": true} line is written once the browser is up. Command line
+// arguments use the same --flag=value syntax as the single-file CLI. Set
+// SINGLEFILE_API_MODULE to point at single-file-cli-api.js when the package is
+// not installed in the global npm root.
+
+import { execFileSync } from "node:child_process";
+import { existsSync, statSync } from "node:fs";
+import path from "node:path";
+import { createInterface } from "node:readline";
+import { pathToFileURL } from "node:url";
+
+// Only protocol messages go to stdout; route library logging to stderr.
+const writeMessage = (message) => process.stdout.write(JSON.stringify(message) + "\n");
+console.log = (...args) => console.error(...args);
+console.info = (...args) => console.error(...args);
+
+function camelCase(name) {
+  return name.replace(/-([a-z])/g, (_, letter) => letter.toUpperCase());
+}
+
+function parseValue(value) {
+  if (value === "true") return true;
+  if (value === "false") return false;
+  if (/^-?\d+(\.\d+)?$/.test(value)) return Number(value);
+  return value;
+}
+
+function parseOptions(argv) {
+  const options = {};
+  for (const arg of argv) {
+    if (!arg.startsWith("--")) continue;
+    const eq = arg.indexOf("=");
+    if (eq === -1) {
+      options[camelCase(arg.slice(2))] = true;
+    } else {
+      options[camelCase(arg.slice(2, eq))] = parseValue(arg.slice(eq + 1));
+    }
+  }
+  return options;
+}
+
+function resolveApiModule() {
+  if (process.env.SINGLEFILE_API_MODULE) return process.env.SINGLEFILE_API_MODULE;
+  const root = execFileSync("npm", ["root", "-g"], { encoding: "utf8" }).trim();
+  return path.join(root, "single-file-cli", "single-file-cli-api.js");
+}
+
+async function main() {
+  const options = parseOptions(process.argv.slice(2));
+  const api = await import(pathToFileURL(resolveApiModule()).href);
+  const initialize = api.initialize || (api.default && api.default.initialize);
+  if (typeof initialize !== "function") {
+    throw new Error("single-file-cli API does not export initialize()");
+  }
+  const singlefile = await initialize(options);
+  writeMessage({ ready: true });
+
+  async function handle(line) {
+    let job;
+    try {
+      job = JSON.parse(line);
+    } catch {
+      return;
+    }
+    try {
+      // The API reads options at capture time, so the output is set per job.
+      options.output = job.output;
+      await singlefile.capture([job.url]);
+      if (!existsSync(job.output) || statSync(job.output).size === 0) {
+        throw new Error("no output written");
+      }
+      writeMessage({ id: job.id, ok: true });
+    } catch (error) {
+      writeMessage({ id: job.id, ok: false, error: String((error && error.message) || error) });
+    }
+  }
+
+  // Jobs run one at a time, in arrival order.
+  let pending = Promise.resolve();
+  const lines = createInterface({ input: process.stdin });
+  lines.on("line", (line) => {
+    pending = pending.then(() => handle(line));
+  });
+  lines.on("close", async () => {
+    await pending;
+    try {
+      await singlefile.finish();
+    } finally {
+      process.exit(0);
+    }
+  });
+}
+
+// A broken browser connection surfaces as an unhandled rejection; exit so the
+// client notices and starts a fresh worker.
+process.on("unhandledRejection", (error) => {
+  console.error(error);
+  process.exit(1);
+});
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
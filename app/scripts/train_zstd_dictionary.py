@@ -0,0 +1,62 @@
+"""
+Train a zstd dictionary for one archiver's uploads.
+
+Samples existing outputs under ``DATA_DIR/<item>/<archiver>/output.*``, trains
+a dictionary, stores it in ``ZSTD_DICT_DIR`` and makes it the archiver's
+current dictionary. Uploads made with ``UPLOAD_CODEC=zstd`` pick it up on the
+next archive; earlier uploads keep decoding with the dictionary they were
+written with.
+
+Usage (inside container):
+    python -m scripts.train_zstd_dictionary --archiver monolith
+    python -m scripts.train_zstd_dictionary --archiver readability --samples 500
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Iterator
+
+from core.config import get_settings
+from storage.codecs import DictionaryStore
+
+# Large single samples add little to a dictionary; only their head is used
+_MAX_SAMPLE_BYTES = 256 * 1024
+
+
+def iter_samples(data_dir: Path, archiver: str, limit: int) -> Iterator[bytes]:
+    """Yield up to ``limit`` randomly chosen output files for ``archiver``."""
+    paths = [p for p in data_dir.glob(f"*/{archiver}/output.*") if p.is_file()]
+    random.shuffle(paths)
+    for path in paths[:limit]:
+        with open(path, "rb") as f:
+            yield f.read(_MAX_SAMPLE_BYTES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train a zstd upload dictionary")
+    parser.add_argument("--archiver", required=True, help="Archiver name (e.g. monolith, readability)")
+    parser.add_argument("--samples", type=int, default=1000, help="Maximum number of outputs to sample")
+    parser.add_argument("--dict-size", type=int, default=112640, help="Dictionary size in bytes")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Archive root to sample (defaults to settings.data_dir)",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    data_dir = args.data_dir or settings.data_dir
+    samples = list(iter_samples(data_dir, args.archiver, args.samples))
+    if len(samples) < 8:
+        parser.error(f"found {len(samples)} {args.archiver} outputs in {data_dir}; need at least 8")
+
+    store = DictionaryStore(settings.resolved_zstd_dict_dir)
+    dict_id = store.train(args.archiver, samples, dict_size=args.dict_size)
+    print(f"[zstd] trained dictionary {dict_id} for {args.archiver} from {len(samples)} samples")
+    print(f"[zstd] saved to {store.path_for(dict_id)}")
+
+
+if __name__ == "__main__":
+    main()
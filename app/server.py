@@ -5,21 +5,30 @@ import subprocess
 from typing import Optional
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
 from api import router as api_router
 from api.firebase import router as firebase_router
 from api.sync import router as sync_router
 from web import router as web_router
+from web.static_files import RehydratingStaticFiles
+from archivers.base import get_upload_executor
 from archivers.factory import ArchiverFactory
 from archivers.monolith import MonolithArchiver
 from archivers.singlefile_cli import SingleFileCLIArchiver
 from archivers.screenshot import ScreenshotArchiver
 from archivers.pdf import PDFArchiver
 from archivers.readability import ReadabilityArchiver
+from archivers.warc import WarcArchiver
+from core.asset_proxy import get_asset_proxy
 from core.config import get_settings
 from core.logging import setup_logging
+from core.process_pool import get_process_pool
+from core.process_watchdog import get_process_watchdog
+from core.render_classifier import RenderClassifier
 from core.utils import cleanup_chromium_singleton_locks
+from db import StoredObjectRepository
+from storage.artifact_manifest import get_artifact_manifest
+from storage.codecs import get_dictionary_store
 # init_db is deprecated - engine initialization happens automatically
 from core.command_runner import CommandRunner
 from services.summarizer import SummaryService
@@ -33,7 +42,8 @@ from task_manager import (
 )
 from task_manager.cleanup import CleanupTaskManager
 from storage.local_file_storage import LocalFileStorage
-from storage.gcs_file_storage import GCSFileStorage
+from storage.gcs_file_storage import COMPOSITE_PARTS_PREFIX, GCSFileStorage
+from storage.caching_file_storage import CachingFileStorage
 from storage.postgres_storage import PostgresStorage
 from storage.firestore_storage import FirestoreStorage
 from storage.file_storage import FileStorageProvider
@@ -88,8 +98,30 @@ async def lifespan_context(app: FastAPI):
                 # Initialize GCS storage for production
                 gcs_storage = GCSFileStorage(
                     bucket_name=settings.gcs.bucket,
-                    project_id=settings.gcs.project_id
+                    project_id=settings.gcs.project_id,
+                    chunk_size=settings.gcs.upload_chunk_mb * 1024 * 1024,
+                    retry_seconds=settings.gcs.upload_retry_seconds,
+                    composite_threshold=settings.gcs.composite_threshold_mb * 1024 * 1024,
+                    composite_parts=settings.gcs.composite_parts
                 )
+                if gcs_storage.composite_threshold:
+                    # Parts of composite uploads interrupted by a crash are expired by the bucket
+                    try:
+                        if gcs_storage.ensure_composite_parts_rule():
+                            logger.info(f"Added {COMPOSITE_PARTS_PREFIX} lifecycle rule to {settings.gcs.bucket}")
+                    except Exception as e:
+                        logger.warning(
+                            f"Could not add the {COMPOSITE_PARTS_PREFIX} lifecycle rule to {settings.gcs.bucket}: {e}; "
+                            "parts left by interrupted composite uploads will not expire"
+                        )
+                if settings.artifact_cache_max_mb > 0:
+                    # Serve hot artifacts from local disk instead of GCS
+                    gcs_storage = CachingFileStorage(
+                        gcs_storage,
+                        root_dir=settings.resolved_artifact_cache_dir,
+                        max_bytes=settings.artifact_cache_max_mb * 1024 * 1024,
+                        max_object_bytes=settings.artifact_cache_max_object_mb * 1024 * 1024
+                    )
                 file_storage_providers.append(gcs_storage)
                 logger.info(f"Initialized GCS storage: {settings.gcs.bucket}")
             except Exception as e:
@@ -140,6 +172,14 @@ async def lifespan_context(app: FastAPI):
         db_storage = primary_db
         logger.info("Using PostgreSQL only (dual persistence disabled)")
 
+    # Start the asset cache proxy before archivers build their command lines
+    asset_proxy = get_asset_proxy()
+    if asset_proxy is not None:
+        try:
+            asset_proxy.start()
+        except OSError as e:
+            logger.error(f"Failed to start asset cache proxy: {e}")
+
     # Register archivers using factory with storage providers
     # Registration order matters when using the "all" pipeline
     # Run readability first so its DOM dump can be reused by monolith.
@@ -150,10 +190,27 @@ async def lifespan_context(app: FastAPI):
     # Run Chromium-derived captures last
     factory.register("screenshot", ScreenshotArchiver)
     factory.register("pdf", PDFArchiver)
+    if settings.warc_archiver:
+        factory.register("warc", WarcArchiver)
 
     app.state.archivers = factory.create_all()
     app.state.archiver_factory = factory  # Store factory for potential dynamic registration
 
+    # Share one render classifier so archivers in an "all" run reuse a single fetch
+    if settings.adaptive_render:
+        app.state.render_classifier = RenderClassifier(settings)
+        for archiver in app.state.archivers.values():
+            if hasattr(archiver, "render_classifier"):
+                archiver.render_classifier = app.state.render_classifier
+        logger.info("Adaptive render mode enabled")
+    else:
+        app.state.render_classifier = None
+
+    # Dictionaries missing from ZSTD_DICT_DIR are fetched back from the providers
+    dictionary_store = get_dictionary_store()
+    if dictionary_store is not None:
+        dictionary_store.remotes = file_storage_providers
+
     # Store storage providers on app state for API access
     app.state.file_storage_providers = file_storage_providers
     app.state.db_storage = db_storage
@@ -248,14 +305,33 @@ async def lifespan_context(app: FastAPI):
     except Exception as exc:
         logger.error(f"Failed to resume pending artifacts: {exc}")
 
+    # Artifact manifest: reconciled against disk in the background, then
+    # answers output-exists checks without filesystem probes
+    artifact_manifest = get_artifact_manifest()
+    if artifact_manifest is not None:
+        artifact_manifest.start(settings.artifact_manifest_reconcile_seconds)
+        logger.info(
+            "Artifact manifest started",
+            extra={"entries": len(artifact_manifest), "interval_seconds": settings.artifact_manifest_reconcile_seconds},
+        )
+
     # Initialize and start cleanup task manager
-    app.state.cleanup_manager = CleanupTaskManager(settings)
+    app.state.cleanup_manager = CleanupTaskManager(settings, manifest=artifact_manifest)
     app.state.cleanup_manager.start()
     logger.info("Cleanup task manager started")
 
-    # Inject cleanup manager into all archivers
+    # Content index used to skip re-uploading identical outputs
+    object_index = (
+        StoredObjectRepository(settings.database.resolved_path(settings.data_dir))
+        if settings.upload_dedup
+        else None
+    )
+
+    # Inject cleanup manager, artifact manifest and object index into all archivers
     for archiver in app.state.archivers.values():
         archiver._cleanup_manager = app.state.cleanup_manager
+        archiver.artifact_manifest = artifact_manifest
+        archiver.object_index = object_index
 
     # Schedule periodic failed output cleanup (once per day)
     import threading
@@ -274,10 +350,37 @@ async def lifespan_context(app: FastAPI):
     cleanup_thread = threading.Thread(target=periodic_failed_cleanup, daemon=True)
     cleanup_thread.start()
     logger.info("Started periodic failed output cleanup thread")
+
+    # Start the Chromium process watchdog (ceilings, zombie reaping, orphan kills)
+    process_watchdog = get_process_watchdog()
+    if settings.chromium.watchdog_enabled:
+        process_watchdog.start()
+        logger.info(
+            "Process watchdog started",
+            extra={
+                "interval_seconds": settings.chromium.watchdog_interval_seconds,
+                "max_job_seconds": settings.chromium.max_job_seconds,
+                "max_job_rss_mb": settings.chromium.max_job_rss_mb,
+            },
+        )
     try:
         yield
     finally:
         # Shutdown
+        process_watchdog.stop()
+        if artifact_manifest is not None:
+            artifact_manifest.stop()
+        if asset_proxy is not None:
+            asset_proxy.stop()
+        for archiver in app.state.archivers.values():
+            worker = getattr(archiver, "worker", None)
+            if worker is not None:
+                worker.close()
+        process_pool = get_process_pool()
+        if process_pool is not None:
+            process_pool.shutdown()
+        # Let in-flight provider uploads finish before the process exits
+        get_upload_executor().shutdown(wait=True)
         # Clean up Chromium singleton locks at shutdown to ensure clean state for next startup
         try:
             cleanup_chromium_singleton_locks(user_data_dir)
@@ -299,7 +402,7 @@ app.include_router(web_router)
 if settings.storage_backend == 'local':
     app.mount(
         "/files",
-        StaticFiles(directory=str(settings.data_dir), check_dir=False),
+        RehydratingStaticFiles(directory=str(settings.data_dir), check_dir=False),
         name="files",
     )
 else:
@@ -0,0 +1,394 @@
+"""
+Artifact Manifest
+
+An in-memory index of archiver outputs under ``DATA_DIR`` keyed by
+``(item, archiver)``, so hot paths (skip-existing checks, ``/admin/saves``)
+can answer "is this output on disk?" without touching the filesystem.
+
+The index is persisted as an append-only JSONL journal
+(``DATA_DIR/.artifact-manifest.jsonl``) that is compacted into a snapshot once
+it grows well past the live entry count. Archivers record their output when
+they finalize, cleanup removes entries when it deletes files, and a periodic
+``os.scandir`` reconciliation repairs any drift against the disk.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from core.metrics import MetricsRegistry, get_metrics
+from core.utils import file_sha256
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".artifact-manifest.jsonl"
+_COMPACT_MIN_LINES = 1000
+
+
+@dataclass
+class ManifestEntry:
+    """One output file, with its path relative to ``DATA_DIR``."""
+    path: str
+    size: int
+    mtime: float
+    sha256: Optional[str] = None
+
+
+def _is_output_name(name: str) -> bool:
+    return name.startswith("output") and not name.startswith(".")
+
+
+class ArtifactManifest:
+    """Journal-backed index of ``<item>/<archiver>/output*`` files."""
+
+    def __init__(self, data_dir: Path, metrics: Optional[MetricsRegistry] = None):
+        """
+        Initialize the manifest and replay its journal.
+
+        Args:
+            data_dir: Archive root (``DATA_DIR``)
+            metrics: Metrics registry (defaults to the process-wide one)
+        """
+        self.data_dir = Path(data_dir)
+        self.journal_path = self.data_dir / MANIFEST_NAME
+        self.metrics = metrics or get_metrics()
+        self._lock = threading.RLock()
+        self._entries: dict[tuple[str, str], dict[str, ManifestEntry]] = {}
+        # Keys updated by archivers/cleanup, so a concurrent scan does not undo them
+        self._touched: dict[tuple[str, str], float] = {}
+        self._lines = 0
+        self._ready = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Both spellings of the root, so saved paths map to keys without resolve()
+        self._prefixes = {str(self.data_dir) + os.sep}
+        try:
+            self._prefixes.add(str(self.data_dir.resolve()) + os.sep)
+        except OSError:
+            pass
+        self._load()
+
+    @property
+    def ready(self) -> bool:
+        """True once the index has been reconciled against disk at least once."""
+        return self._ready
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(files) for files in self._entries.values())
+
+    # ------------------------------------------------------------------ lookups
+
+    def find_output(self, item: str, archiver: str, extension: str) -> Optional[ManifestEntry]:
+        """Best non-empty output for ``(item, archiver)``: ``output.ext``, then numbered variants."""
+        with self._lock:
+            files = self._entries.get((item, archiver))
+            if not files:
+                return None
+            standard = files.get(f"output.{extension}")
+            if standard is not None and standard.size > 0:
+                return standard
+            for name in sorted(files):
+                entry = files[name]
+                if name.startswith("output (") and name.endswith(f").{extension}") and entry.size > 0:
+                    return entry
+        return None
+
+    def get(self, path: str | Path) -> Optional[ManifestEntry]:
+        """Entry for an absolute saved path, or None if it is not indexed."""
+        key = self._split(str(path))
+        if key is None:
+            return None
+        item, archiver, name = key
+        with self._lock:
+            return self._entries.get((item, archiver), {}).get(name)
+
+    def contains(self, path: str | Path) -> bool:
+        return self.get(path) is not None
+
+    def relative_path(self, path: str | Path) -> Optional[str]:
+        """Path relative to ``DATA_DIR`` (string-only, no syscalls)."""
+        raw = str(path)
+        for prefix in self._prefixes:
+            if raw.startswith(prefix):
+                return raw[len(prefix):]
+        return None
+
+    # ------------------------------------------------------------------ updates
+
+    def record_dir(
+        self,
+        out_dir: Path,
+        hash_files: bool = True,
+        hashes: Optional[dict[str, str]] = None,
+    ) -> int:
+        """Re-index one ``<item>/<archiver>`` directory after an archiver finalizes.
+
+        Args:
+            out_dir: Archiver output directory
+            hash_files: Hash files whose digest is not already known
+            hashes: Known SHA-256 digests by file name (those files are not read)
+
+        Returns:
+            Number of output files indexed
+        """
+        out_dir = Path(out_dir)
+        item, archiver = out_dir.parent.name, out_dir.name
+        files: dict[str, ManifestEntry] = {}
+        try:
+            with os.scandir(out_dir) as it:
+                for entry in it:
+                    if not _is_output_name(entry.name) or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    sha256 = (hashes or {}).get(entry.name)
+                    if sha256 is None and hash_files:
+                        sha256 = file_sha256(Path(entry.path))
+                    files[entry.name] = ManifestEntry(
+                        path=f"{item}/{archiver}/{entry.name}",
+                        size=st.st_size,
+                        mtime=st.st_mtime,
+                        sha256=sha256,
+                    )
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._touched[(item, archiver)] = time.monotonic()
+            self._replace(item, archiver, files)
+        return len(files)
+
+    def remove_path(self, path: str | Path) -> bool:
+        """Drop the entry for a deleted file; True if it was indexed."""
+        key = self._split(str(path))
+        if key is None:
+            return False
+        item, archiver, name = key
+        with self._lock:
+            files = self._entries.get((item, archiver))
+            if not files or name not in files:
+                return False
+            del files[name]
+            if not files:
+                del self._entries[(item, archiver)]
+            self._touched[(item, archiver)] = time.monotonic()
+            self._append({"op": "del", "item": item, "archiver": archiver, "name": name})
+        return True
+
+    def reconcile(self) -> dict[str, int]:
+        """Walk ``DATA_DIR`` with ``os.scandir`` and repair the index.
+
+        New or changed files are indexed without a hash; vanished files are
+        dropped. Returns counts of added, updated and removed entries.
+        """
+        started = time.monotonic()
+        seen: dict[tuple[str, str], dict[str, ManifestEntry]] = {}
+        try:
+            with os.scandir(self.data_dir) as items:
+                for item_entry in items:
+                    if item_entry.name.startswith(".") or not item_entry.is_dir(follow_symlinks=False):
+                        continue
+                    self._scan_item(item_entry, seen)
+        except FileNotFoundError:
+            pass
+
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            fresh = {key for key, at in self._touched.items() if at >= started}
+            self._touched.clear()
+            for key in fresh:
+                seen.pop(key, None)
+            for key in list(self._entries):
+                if key not in seen and key not in fresh:
+                    counts["removed"] += len(self._entries[key])
+                    self._replace(*key, {})
+            for key, files in seen.items():
+                current = self._entries.get(key, {})
+                merged: dict[str, ManifestEntry] = {}
+                changed = set(current) != set(files)
+                for name, found in files.items():
+                    known = current.get(name)
+                    if known is None:
+                        counts["added"] += 1
+                        merged[name] = found
+                    elif known.size != found.size or known.mtime != found.mtime:
+                        counts["updated"] += 1
+                        changed = True
+                        merged[name] = found
+                    else:
+                        merged[name] = known
+                counts["removed"] += len(set(current) - set(files))
+                if changed:
+                    self._replace(*key, merged)
+            self._ready = True
+
+        for result, count in counts.items():
+            if count:
+                self.metrics.inc("artifact_manifest_reconciled_total", count, result=result)
+        self.metrics.set("artifact_manifest_entries", len(self))
+        return counts
+
+    # --------------------------------------------------------------- lifecycle
+
+    def start(self, interval_seconds: float) -> None:
+        """Reconcile now and then every ``interval_seconds`` on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), name="artifact-manifest", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                counts = self.reconcile()
+                if any(counts.values()):
+                    logger.info("Artifact manifest reconciled", extra=counts)
+            except Exception as exc:
+                logger.warning(f"Artifact manifest reconcile failed: {exc}")
+            if self._stop.wait(interval_seconds):
+                return
+
+    # ---------------------------------------------------------------- internals
+
+    def _scan_item(self, item_entry: os.DirEntry, seen: dict) -> None:
+        with os.scandir(item_entry.path) as archivers:
+            for archiver_entry in archivers:
+                if archiver_entry.name.startswith(".") or not archiver_entry.is_dir(follow_symlinks=False):
+                    continue
+                files: dict[str, ManifestEntry] = {}
+                with os.scandir(archiver_entry.path) as outputs:
+                    for entry in outputs:
+                        if not _is_output_name(entry.name) or not entry.is_file(follow_symlinks=False):
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                        files[entry.name] = ManifestEntry(
+                            path=f"{item_entry.name}/{archiver_entry.name}/{entry.name}",
+                            size=st.st_size,
+                            mtime=st.st_mtime,
+                        )
+                if files:
+                    seen[(item_entry.name, archiver_entry.name)] = files
+
+    def _split(self, path: str) -> Optional[tuple[str, str, str]]:
+        relative = self.relative_path(path)
+        if relative is None:
+            return None
+        parts = relative.split(os.sep)
+        if len(parts) != 3:
+            return None
+        return parts[0], parts[1], parts[2]
+
+    def _replace(self, item: str, archiver: str, files: dict[str, ManifestEntry]) -> None:
+        with self._lock:
+            if files:
+                self._entries[(item, archiver)] = files
+            else:
+                self._entries.pop((item, archiver), None)
+            self._append({
+                "op": "put",
+                "item": item,
+                "archiver": archiver,
+                "files": [asdict(entry) for entry in files.values()],
+            })
+
+    def _append(self, record: dict) -> None:
+        """Append one journal line (a single write, so readers never see half a record)."""
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as exc:
+            logger.warning(f"Failed to append to artifact manifest: {exc}")
+            return
+        self._lines += 1
+        if self._lines > max(_COMPACT_MIN_LINES, 2 * len(self._entries)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the journal as one ``put`` line per key and swap it in atomically."""
+        tmp = self.journal_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        lines = [
+            json.dumps(
+                {
+                    "op": "put",
+                    "item": item,
+                    "archiver": archiver,
+                    "files": [asdict(entry) for entry in files.values()],
+                },
+                separators=(",", ":"),
+            )
+            for (item, archiver), files in self._entries.items()
+        ]
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + ("\n" if lines else ""))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal_path)
+        except OSError as exc:
+            logger.warning(f"Failed to compact artifact manifest: {exc}")
+            return
+        self._lines = len(lines)
+
+    def _load(self) -> None:
+        try:
+            handle = open(self.journal_path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                    key = (record["item"], record["archiver"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn final line after a crash
+                self._lines += 1
+                if record.get("op") == "del":
+                    files = self._entries.get(key)
+                    if files is not None:
+                        files.pop(record.get("name"), None)
+                        if not files:
+                            del self._entries[key]
+                    continue
+                files = {}
+                for raw in record.get("files") or []:
+                    try:
+                        entry = ManifestEntry(**raw)
+                    except TypeError:
+                        continue
+                    files[entry.path.rsplit("/", 1)[-1]] = entry
+                if files:
+                    self._entries[key] = files
+                else:
+                    self._entries.pop(key, None)
+
+
+def build_artifact_manifest(settings) -> Optional[ArtifactManifest]:
+    """Artifact manifest for ``settings``, or None when ``ARTIFACT_MANIFEST`` is off."""
+    if not settings.artifact_manifest:
+        return None
+    return ArtifactManifest(settings.data_dir)
+
+
+@lru_cache
+def get_artifact_manifest() -> Optional[ArtifactManifest]:
+    from core.config import get_settings
+
+    return build_artifact_manifest(get_settings())
@@ -0,0 +1,228 @@
+"""
+Content-Addressed Asset Store
+
+monolith and SingleFile inline every asset as a base64 ``data:`` URI, so the
+same logo or font is stored once per archived page. ``AssetStore`` moves large
+inlined assets into a content-addressed blob store (``<root>/<aa>/<sha256>``)
+and rewrites each URI to a marker that keeps its media type:
+
+    data:font/woff2;base64,d09GMgAB...   ->   data:font/woff2;htbase-cas=<sha256>,
+
+``rehydrate`` reverses the rewrite byte for byte, so the self-contained file
+can be rebuilt whenever it is served or downloaded.
+"""
+
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+from core.metrics import MetricsRegistry, get_metrics
+
+logger = logging.getLogger(__name__)
+
+MARKER = b";htbase-cas="
+
+_DATA_URI = re.compile(
+    rb"data:(?P<head>[\w.+-]+/[\w.+-]+(?:;[\w.+-]+=[^;,\s\"'()<>]*)*);base64,(?P<data>[A-Za-z0-9+/]+={0,2})"
+)
+_CAS_URI = re.compile(
+    rb"data:(?P<head>[\w.+-]+/[\w.+-]+(?:;[\w.+-]+=[^;,\s\"'()<>]*)*);htbase-cas=(?P<digest>[0-9a-f]{64}),"
+)
+
+
+def remote_asset_path(digest: str) -> str:
+    """Storage provider path for an asset blob."""
+    return f"assets/{digest[:2]}/{digest}"
+
+
+@dataclass
+class DedupResult:
+    """Outcome of extracting inlined assets from one document."""
+    assets: int = 0
+    bytes_saved: int = 0
+    new_digests: list[str] = field(default_factory=list)
+
+
+class AssetStore:
+    """Extract and restore large base64 assets in self-contained HTML."""
+
+    def __init__(
+        self,
+        root: Path,
+        min_bytes: int = 4096,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize the asset store.
+
+        Args:
+            root: Directory holding the content-addressed blobs
+            min_bytes: Decoded size below which assets stay inline
+            metrics: Metrics registry (defaults to the process-wide one)
+        """
+        self.root = Path(root)
+        self.min_bytes = min_bytes
+        self.metrics = metrics or get_metrics()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            return self.blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def extract(self, html: bytes) -> tuple[bytes, DedupResult]:
+        """Replace large inlined assets with store references.
+
+        Only URIs whose payload re-encodes to exactly the same base64 text are
+        rewritten, which keeps ``rehydrate`` lossless.
+        """
+        result = DedupResult()
+        min_encoded = (self.min_bytes * 4) // 3
+
+        def replace(match: re.Match) -> bytes:
+            encoded = match.group("data")
+            if len(encoded) < min_encoded:
+                return match.group(0)
+            try:
+                payload = base64.b64decode(encoded, validate=True)
+            except ValueError:
+                return match.group(0)
+            if base64.b64encode(payload) != encoded:
+                return match.group(0)
+
+            digest = hashlib.sha256(payload).hexdigest()
+            if self._write_blob(digest, payload):
+                result.new_digests.append(digest)
+            result.assets += 1
+            reference = b"data:" + match.group("head") + MARKER + digest.encode("ascii") + b","
+            result.bytes_saved += len(match.group(0)) - len(reference)
+            return reference
+
+        rewritten = _DATA_URI.sub(replace, html)
+        if result.assets:
+            self.metrics.inc("asset_store_assets_total", result.assets - len(result.new_digests), result="existing")
+            self.metrics.inc("asset_store_assets_total", len(result.new_digests), result="new")
+            self.metrics.inc("asset_store_bytes_saved_total", result.bytes_saved)
+        return rewritten, result
+
+    def rehydrate(
+        self,
+        html: bytes,
+        fetch: Optional[Callable[[str], Optional[bytes]]] = None
+    ) -> bytes:
+        """Rebuild the self-contained document from store references.
+
+        Args:
+            html: Document produced by ``extract``
+            fetch: Fallback loader for blobs missing locally (e.g. from a provider)
+
+        Raises:
+            FileNotFoundError: If a referenced blob cannot be found
+        """
+        if MARKER not in html:
+            return html
+
+        def restore(match: re.Match) -> bytes:
+            digest = match.group("digest").decode("ascii")
+            payload = self.read_blob(digest)
+            if payload is None and fetch is not None:
+                payload = fetch(digest)
+                if payload is not None:
+                    self._write_blob(digest, payload)
+            if payload is None:
+                raise FileNotFoundError(f"Asset blob missing: {digest}")
+            return b"data:" + match.group("head") + b";base64," + base64.b64encode(payload)
+
+        return _CAS_URI.sub(restore, html)
+
+    def dedupe_file(self, path: Path) -> DedupResult:
+        """Rewrite ``path`` in place with large assets moved into the store."""
+        path = Path(path)
+        rewritten, result = self.extract(path.read_bytes())
+        if result.assets:
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(rewritten)
+            os.replace(tmp, path)
+        return result
+
+    def _write_blob(self, digest: str, payload: bytes) -> bool:
+        """Store a blob unless present; returns True when it was new."""
+        path = self.blob_path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+        return True
+
+
+def has_references(stream: BinaryIO) -> bool:
+    """Whether a stream of HTML holds asset store references (read chunk by chunk)."""
+    overlap = len(MARKER) - 1
+    tail = b""
+    while chunk := stream.read(1024 * 1024):
+        if MARKER in tail + chunk:
+            return True
+        tail = chunk[-overlap:]
+    return False
+
+
+def is_deduplicated(path: Path) -> bool:
+    """Whether an HTML file holds asset store references (streamed scan)."""
+    try:
+        with open(path, "rb") as f:
+            return has_references(f)
+    except OSError:
+        return False
+
+
+def build_asset_store(settings) -> Optional[AssetStore]:
+    """Asset store for ``settings``, or None when ``ASSET_DEDUP`` is off."""
+    if not settings.asset_dedup:
+        return None
+    return AssetStore(settings.resolved_asset_store_dir, min_bytes=settings.asset_dedup_min_bytes)
+
+
+@lru_cache
+def get_asset_store() -> Optional[AssetStore]:
+    from core.config import get_settings
+
+    return build_asset_store(get_settings())
+
+
+def fetch_remote_asset(providers: list, digest: str) -> Optional[bytes]:
+    """Load an asset blob from the first storage provider that has it."""
+    for provider in providers:
+        try:
+            with provider.get_file_stream(remote_asset_path(digest)) as stream:
+                return stream.read()
+        except Exception:
+            continue
+    return None
+
+
+def rehydrate_file(path: Path, settings, providers: Optional[list] = None) -> Optional[bytes]:
+    """Self-contained bytes for a deduplicated HTML file, or None if it has no references.
+
+    Works whether or not ASSET_DEDUP is currently enabled, so files written
+    while it was on keep serving correctly.
+    """
+    path = Path(path)
+    if path.suffix.lower() not in (".html", ".htm") or not is_deduplicated(path):
+        return None
+    store = AssetStore(settings.resolved_asset_store_dir)
+    return store.rehydrate(
+        path.read_bytes(),
+        fetch=lambda digest: fetch_remote_asset(providers or [], digest),
+    )
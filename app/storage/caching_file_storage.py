@@ -0,0 +1,356 @@
+"""
+Read-Through Local Cache for Remote Storage
+
+Wraps a remote FileStorageProvider (GCS) with a size-bounded disk cache of
+stored objects. The first read of an object downloads it once, as stored
+(still compressed), into the cache directory; later reads are served from
+local disk, including ``serve_file`` with ``sendfile`` and pass-through
+``Content-Encoding``. Writes and deletes go to the remote provider and drop
+the cached copy.
+
+Concurrent reads of an uncached object share one download (single flight).
+The least recently used objects are evicted when the cache exceeds its size
+budget; objects over the per-object limit are never cached.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator, Mapping, Optional
+
+from core.metrics import MetricsRegistry, get_metrics
+
+from .codecs import COMPRESSED_SUFFIXES, Codec, decode_file, decoded_size, open_decoded, strip_codec_suffix
+from .file_storage import FileMetadata, FileStorageProvider, UploadResult
+
+logger = logging.getLogger(__name__)
+
+
+class _Fill:
+    """An in-progress download other readers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.path: Optional[Path] = None
+
+
+class CachingFileStorage(FileStorageProvider):
+    """Disk-backed read-through cache in front of another provider."""
+
+    def __init__(
+        self,
+        inner: FileStorageProvider,
+        root_dir: Path,
+        max_bytes: int,
+        max_object_bytes: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            inner: Remote provider to read through to
+            root_dir: Cache directory (objects are kept under their storage paths)
+            max_bytes: Total size budget; least recently used objects are evicted
+            max_object_bytes: Largest object admitted (defaults to a quarter of the budget)
+            metrics: Metrics registry (defaults to the process registry)
+        """
+        self.inner = inner
+        self.root_dir = Path(root_dir).resolve()
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes or max(max_bytes // 4, 1)
+        self.metrics = metrics or get_metrics()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # storage path -> size
+        self._fills: dict[str, _Fill] = {}
+        self._oversized: set[str] = set()
+        self._total_bytes = 0
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def __getattr__(self, name):
+        # Provider-specific attributes (bucket, client, ...) come from the wrapped provider
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def cached_path(self, storage_path: str) -> Optional[Path]:
+        """Local copy of a stored object, fetching it on a miss; None if it cannot be cached."""
+        local = self._local_path(storage_path)
+        if local is None:
+            return None
+
+        with self._lock:
+            if storage_path in self._entries:
+                self._entries.move_to_end(storage_path)
+                if local.exists():
+                    self.metrics.inc("artifact_cache_requests_total", result="hit")
+                    return local
+                self._forget_locked(storage_path)
+            if storage_path in self._oversized:
+                self.metrics.inc("artifact_cache_requests_total", result="bypass")
+                return None
+            fill = self._fills.get(storage_path)
+            leader = fill is None
+            if leader:
+                fill = self._fills[storage_path] = _Fill()
+
+        if not leader:
+            self.metrics.inc("artifact_cache_requests_total", result="wait")
+            fill.done.wait()
+            return fill.path
+
+        try:
+            fill.path = self._fill(storage_path, local)
+        finally:
+            with self._lock:
+                del self._fills[storage_path]
+            fill.done.set()
+        return fill.path
+
+    # ------------------------------------------------------------------ reads
+
+    def exists(self, storage_path: str) -> bool:
+        """Check if file exists (cached objects answer without a remote call)."""
+        with self._lock:
+            if storage_path in self._entries:
+                return True
+        return self.inner.exists(storage_path)
+
+    def get_file_stream(self, storage_path: str) -> BinaryIO:
+        """Get file stream for reading (decoded when stored compressed)."""
+        local = self.cached_path(storage_path)
+        if local is None:
+            return self.inner.get_file_stream(storage_path)
+        return open_decoded(open(local, 'rb'), storage_path)
+
+    def download_file(
+        self,
+        storage_path: str,
+        local_path: Path,
+        decompress: bool = True
+    ) -> bool:
+        """Download file through the cache."""
+        cached = self.cached_path(storage_path)
+        if cached is None:
+            return self.inner.download_file(storage_path, local_path, decompress)
+        try:
+            local_path = Path(local_path)
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            if decompress and storage_path.endswith(COMPRESSED_SUFFIXES):
+                decode_file(cached, local_path, storage_path)
+            else:
+                shutil.copyfile(cached, local_path)
+            return True
+        except Exception:
+            return False
+
+    def download_to_temp(self, storage_path: str) -> Path:
+        """Copy (decoded) to a temporary file the caller owns."""
+        fd, temp_name = tempfile.mkstemp(suffix=Path(strip_codec_suffix(storage_path)).suffix)
+        os.close(fd)
+        if not self.download_file(storage_path, Path(temp_name), decompress=True):
+            Path(temp_name).unlink(missing_ok=True)
+            raise FileNotFoundError(f"File not found: {storage_path}")
+        return Path(temp_name)
+
+    def get_metadata(self, storage_path: str) -> Optional[FileMetadata]:
+        """Get file metadata (from the cached copy when there is one)."""
+        local = self._local_path(storage_path)
+        with self._lock:
+            cached = storage_path in self._entries
+        if not cached or local is None:
+            return self.inner.get_metadata(storage_path)
+        try:
+            stat = local.stat()
+        except FileNotFoundError:
+            return self.inner.get_metadata(storage_path)
+        is_compressed = storage_path.endswith(COMPRESSED_SUFFIXES)
+        original_size = decoded_size(local) if is_compressed else None
+        return FileMetadata(
+            path=storage_path,
+            size=stat.st_size,
+            created_at=datetime.fromtimestamp(stat.st_mtime),
+            content_type=None,
+            compressed=is_compressed,
+            compression_ratio=(1 - stat.st_size / original_size) * 100 if original_size else None,
+            original_size=original_size
+        )
+
+    def serve_file(
+        self,
+        storage_path: str,
+        filename: str,
+        media_type: str = "application/octet-stream",
+        request_headers: Optional[Mapping[str, str]] = None
+    ):
+        """Serve file from the local copy, falling back to the remote provider."""
+        local = self.cached_path(storage_path)
+        if local is None:
+            return self.inner.serve_file(storage_path, filename, media_type, request_headers)
+
+        from .serving import file_response
+
+        return file_response(local, request_headers or {}, media_type, filename)
+
+    # ----------------------------------------------------------------- writes
+
+    def upload_file(
+        self,
+        local_path: Path,
+        destination_path: str,
+        compress: bool = True,
+        storage_class: Optional[str] = None,
+        codec: Optional[Codec] = None,
+        precompressed: Optional[Path] = None,
+        content_hash: Optional["hashlib._Hash"] = None
+    ) -> UploadResult:
+        """Upload to the remote provider (replacing any cached copy)."""
+        result = self.inner.upload_file(
+            local_path, destination_path, compress, storage_class, codec, precompressed, content_hash
+        )
+        for suffix in ("",) + COMPRESSED_SUFFIXES:
+            self.invalidate(destination_path + suffix)
+        return result
+
+    def copy_file(self, source_path: str, destination_path: str) -> UploadResult:
+        """Copy on the remote provider (replacing any cached copy of the destination)."""
+        result = self.inner.copy_file(source_path, destination_path)
+        self.invalidate(destination_path)
+        return result
+
+    def delete_file(self, storage_path: str) -> bool:
+        """Delete from the remote provider and the cache."""
+        self.invalidate(storage_path)
+        return self.inner.delete_file(storage_path)
+
+    def invalidate(self, storage_path: str) -> None:
+        """Drop the cached copy of ``storage_path``, if any."""
+        with self._lock:
+            self._oversized.discard(storage_path)
+            if storage_path in self._entries:
+                self._forget_locked(storage_path)
+                self._update_gauges_locked()
+
+    # ------------------------------------------------------------ delegation
+
+    def generate_access_url(
+        self,
+        storage_path: str,
+        expiration: timedelta = timedelta(days=7)
+    ) -> str:
+        return self.inner.generate_access_url(storage_path, expiration)
+
+    def list_files(
+        self,
+        prefix: str = "",
+        limit: Optional[int] = None
+    ) -> list[FileMetadata]:
+        return self.inner.list_files(prefix, limit)
+
+    def iter_files(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None
+    ) -> Iterator[FileMetadata]:
+        return self.inner.iter_files(prefix, start_after)
+
+    @property
+    def provider_name(self) -> str:
+        """Provider name (of the wrapped provider)."""
+        return self.inner.provider_name
+
+    @property
+    def supports_compression(self) -> bool:
+        return self.inner.supports_compression
+
+    @property
+    def supports_signed_urls(self) -> bool:
+        return self.inner.supports_signed_urls
+
+    # -------------------------------------------------------------- internals
+
+    def _local_path(self, storage_path: str) -> Optional[Path]:
+        parts = PurePosixPath(storage_path).parts
+        if not parts or parts[0] == "/" or ".." in parts:
+            return None
+        return self.root_dir.joinpath(*parts)
+
+    def _fill(self, storage_path: str, local: Path) -> Optional[Path]:
+        started = time.monotonic()
+        local.parent.mkdir(parents=True, exist_ok=True)
+        tmp = local.with_name(f".{local.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if not self.inner.download_file(storage_path, tmp, decompress=False):
+                self.metrics.inc("artifact_cache_requests_total", result="miss")
+                return None
+            size = tmp.stat().st_size
+            if size > self.max_object_bytes:
+                with self._lock:
+                    self._oversized.add(storage_path)
+                self.metrics.inc("artifact_cache_requests_total", result="bypass")
+                return None
+            os.replace(tmp, local)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        self.metrics.inc("artifact_cache_requests_total", result="miss")
+        self.metrics.inc("artifact_cache_fill_bytes_total", size)
+        self.metrics.observe("artifact_cache_fill_seconds", time.monotonic() - started)
+        with self._lock:
+            self._entries[storage_path] = size
+            self._total_bytes += size
+            self._evict_locked(keep=storage_path)
+            self._update_gauges_locked()
+        return local
+
+    def _forget_locked(self, storage_path: str) -> None:
+        size = self._entries.pop(storage_path)
+        self._total_bytes -= size
+        local = self._local_path(storage_path)
+        if local is not None:
+            local.unlink(missing_ok=True)
+
+    def _evict_locked(self, keep: str) -> None:
+        evicted = 0
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._forget_locked(oldest)
+            evicted += 1
+        if evicted:
+            self.metrics.inc("artifact_cache_evictions_total", evicted)
+
+    def _update_gauges_locked(self) -> None:
+        self.metrics.set("artifact_cache_bytes", self._total_bytes)
+        self.metrics.set("artifact_cache_entries", len(self._entries))
+
+    def _load(self) -> None:
+        """Index objects cached by a previous run, oldest first."""
+        found = []
+        for path in self.root_dir.rglob("*"):
+            if path.name.startswith(".") and path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+                continue
+            if path.is_file():
+                stat = path.stat()
+                found.append((stat.st_mtime, path.relative_to(self.root_dir).as_posix(), stat.st_size))
+        with self._lock:
+            for _, storage_path, size in sorted(found):
+                self._entries[storage_path] = size
+                self._total_bytes += size
+            if self._entries:
+                self._evict_locked(keep=next(reversed(self._entries)))
+            self._update_gauges_locked()
@@ -0,0 +1,411 @@
+"""
+Compression Codecs for Uploads
+
+Storage providers compress archives before upload. A codec bundles the
+compressor settings with the file suffix it produces (``.gz`` / ``.zst``) so
+that reads can pick the matching decoder from the storage path alone.
+
+Zstandard is optional (``zstandard`` package). It supports levels,
+long-distance matching for large repetitive pages, and per-archiver
+dictionaries trained over a sample of existing outputs. Each zstd frame
+records its dictionary ID. Dictionaries are kept in ``ZSTD_DICT_DIR`` as
+``<dict_id>.zdict`` and are also uploaded to the providers
+(``dictionaries/zstd/<dict_id>.zdict``) so archives stay decodable: a host
+missing one fetches it back from the providers on first use.
+"""
+
+import gzip
+import hashlib
+import io
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1024 * 1024
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def remote_dictionary_path(dict_id: int) -> str:
+    """Storage provider path for a zstd dictionary."""
+    return f"dictionaries/zstd/{dict_id}.zdict"
+
+
+class Codec:
+    """Streaming compressor for uploads."""
+
+    name: str = "none"
+    suffix: str = ""
+
+    def compress_file(self, src: Path, dst: Path) -> None:
+        with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+            self.compress_stream(f_in, f_out)
+
+    def compress_stream(self, src: BinaryIO, dst: BinaryIO, size: Optional[int] = None) -> None:
+        """Encode ``src`` into the writable ``dst`` chunk by chunk (``dst`` stays open).
+
+        ``size`` is the number of bytes ``src`` will yield, when known; zstd
+        records it as the frame content size.
+        """
+        raise NotImplementedError
+
+    def compress_bytes(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    @property
+    def dictionary_id(self) -> Optional[int]:
+        return None
+
+    def describe(self) -> dict:
+        """Upload metadata describing how the object was encoded."""
+        return {"codec": self.name}
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+    suffix = ".gz"
+
+    def __init__(self, level: int = 9):
+        self.level = level
+
+    def compress_file(self, src: Path, dst: Path) -> None:
+        with open(src, "rb") as f_in, gzip.open(dst, "wb", compresslevel=self.level) as f_out:
+            shutil.copyfileobj(f_in, f_out, _CHUNK)
+
+    def compress_stream(self, src: BinaryIO, dst: BinaryIO, size: Optional[int] = None) -> None:
+        with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=self.level) as f_out:
+            shutil.copyfileobj(src, f_out, _CHUNK)
+
+    def compress_bytes(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level)
+
+    def describe(self) -> dict:
+        return {"codec": self.name, "level": self.level}
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    suffix = ".zst"
+
+    def __init__(
+        self,
+        level: int = 10,
+        long_distance: bool = False,
+        dictionary: Optional["zstandard.ZstdCompressionDict"] = None,
+    ):
+        """
+        Args:
+            level: Compression level (1-22)
+            long_distance: Enable long-distance matching (window log 27)
+            dictionary: Trained dictionary to prime the compressor with
+        """
+        if zstandard is None:
+            raise RuntimeError("zstd codec requires the 'zstandard' package")
+        self.level = level
+        self.long_distance = long_distance
+        self.dictionary = dictionary
+
+    def _compressor(self) -> "zstandard.ZstdCompressor":
+        if self.long_distance:
+            params = zstandard.ZstdCompressionParameters.from_level(
+                self.level, enable_ldm=True, window_log=27, write_checksum=True
+            )
+            return zstandard.ZstdCompressor(compression_params=params, dict_data=self.dictionary)
+        return zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary, write_checksum=True)
+
+    @property
+    def dictionary_id(self) -> Optional[int]:
+        return self.dictionary.dict_id() if self.dictionary is not None else None
+
+    def compress_file(self, src: Path, dst: Path) -> None:
+        size = Path(src).stat().st_size
+        with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+            self._compressor().copy_stream(f_in, f_out, size=size, read_size=_CHUNK, write_size=_CHUNK)
+
+    def compress_stream(self, src: BinaryIO, dst: BinaryIO, size: Optional[int] = None) -> None:
+        self._compressor().copy_stream(
+            src, dst, size=-1 if size is None else size, read_size=_CHUNK, write_size=_CHUNK
+        )
+
+    def compress_bytes(self, data: bytes) -> bytes:
+        return self._compressor().compress(data)
+
+    def describe(self) -> dict:
+        meta = {"codec": self.name, "level": self.level}
+        if self.long_distance:
+            meta["long_distance"] = True
+        if self.dictionary is not None:
+            meta["dict_id"] = self.dictionary_id
+        return meta
+
+
+class HashingReader:
+    """Read-through wrapper that hashes and counts the bytes read from ``raw``."""
+
+    def __init__(self, raw: BinaryIO, digest: Optional["hashlib._Hash"] = None):
+        self.raw = raw
+        self.digest = digest if digest is not None else hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+
+@dataclass
+class EncodedFile:
+    """An output file encoded for upload, with what was learned while reading it."""
+    path: Path  # encoded copy
+    codec: Codec
+    original_size: int
+    stored_size: int
+    sha256: str  # of the original bytes
+
+
+def encode_file(codec: Codec, src: Path, dst: Path) -> EncodedFile:
+    """Compress ``src`` into ``dst``, measuring and hashing it in the same read."""
+    with open(src, "rb") as f_in, open(dst, "wb") as f_out:
+        reader = HashingReader(f_in)
+        codec.compress_stream(reader, f_out, size=os.fstat(f_in.fileno()).st_size)
+        stored_size = f_out.tell()
+    return EncodedFile(
+        path=Path(dst),
+        codec=codec,
+        original_size=reader.size,
+        stored_size=stored_size,
+        sha256=reader.digest.hexdigest(),
+    )
+
+
+class DictionaryStore:
+    """Trained zstd dictionaries on disk, looked up by archiver or dictionary ID.
+
+    ``remotes`` are storage providers holding the uploaded copies; a
+    dictionary missing from ``root`` is fetched from the first that has it.
+    """
+
+    def __init__(self, root: Path, remotes: Optional[list] = None):
+        self.root = Path(root)
+        self.remotes: list = list(remotes or [])
+        self._cache: dict[int, "zstandard.ZstdCompressionDict"] = {}
+
+    def path_for(self, dict_id: int) -> Path:
+        return self.root / f"{dict_id}.zdict"
+
+    def get(self, dict_id: int) -> Optional["zstandard.ZstdCompressionDict"]:
+        if zstandard is None or not dict_id:
+            return None
+        if dict_id not in self._cache:
+            try:
+                data = self.path_for(dict_id).read_bytes()
+            except FileNotFoundError:
+                data = self._fetch(dict_id)
+                if data is None:
+                    return None
+                self.add(dict_id, data)
+            self._cache[dict_id] = zstandard.ZstdCompressionDict(data)
+        return self._cache[dict_id]
+
+    def add(self, dict_id: int, data: bytes) -> None:
+        """Install a dictionary (e.g. fetched back from a storage provider)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(dict_id)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _fetch(self, dict_id: int) -> Optional[bytes]:
+        """Read an uploaded dictionary back from the first provider holding it."""
+        remote_path = remote_dictionary_path(dict_id)
+        for provider in self.remotes:
+            try:
+                with provider.get_file_stream(remote_path) as stream:
+                    data = stream.read()
+                if zstandard.ZstdCompressionDict(data).dict_id() != dict_id:
+                    raise ValueError("dictionary ID does not match")
+            except Exception as e:
+                logger.debug(f"zstd dictionary {dict_id} not available from {provider.provider_name}: {e}")
+                continue
+            logger.info(f"Fetched zstd dictionary {dict_id} from {provider.provider_name}")
+            return data
+        return None
+
+    def current(self, archiver: str) -> Optional["zstandard.ZstdCompressionDict"]:
+        """The active dictionary for an archiver, if one has been trained."""
+        try:
+            dict_id = int((self.root / f"{archiver}.current").read_text().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+        return self.get(dict_id)
+
+    def train(self, archiver: str, samples: Iterable[bytes], dict_size: int = 112640) -> int:
+        """Train a dictionary over sample outputs and make it current for ``archiver``.
+
+        Returns:
+            The new dictionary ID
+        """
+        if zstandard is None:
+            raise RuntimeError("dictionary training requires the 'zstandard' package")
+        dictionary = zstandard.train_dictionary(dict_size, list(samples))
+        dict_id = dictionary.dict_id()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path_for(dict_id).write_bytes(dictionary.as_bytes())
+        (self.root / f"{archiver}.current").write_text(f"{dict_id}\n")
+        self._cache[dict_id] = dictionary
+        return dict_id
+
+
+class _GzipReader(gzip.GzipFile):
+    """GzipFile that also closes the stream it wraps."""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        super().__init__(fileobj=stream, mode="rb")
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._stream.close()
+
+
+def _frame_dict_id(head: bytes) -> int:
+    try:
+        return zstandard.get_frame_parameters(head).dict_id
+    except zstandard.ZstdError:
+        return 0
+
+
+def open_decoded(stream: BinaryIO, storage_path: str, dictionaries: Optional[DictionaryStore] = None) -> BinaryIO:
+    """Wrap a raw stored stream in the decoder matching its suffix.
+
+    Args:
+        stream: Readable binary stream of the stored object
+        storage_path: Object path; its suffix selects the codec
+        dictionaries: Where to find zstd dictionaries (defaults to the configured store)
+
+    Raises:
+        RuntimeError: If the object is zstd-encoded and ``zstandard`` is missing
+        LookupError: If the dictionary the frame was written with is unavailable
+    """
+    if storage_path.endswith(".gz"):
+        return _GzipReader(stream)
+    if not storage_path.endswith(".zst"):
+        return stream
+    if zstandard is None:
+        raise RuntimeError(f"Cannot decode {storage_path}: 'zstandard' is not installed")
+
+    buffered = io.BufferedReader(stream) if not hasattr(stream, "peek") else stream
+    dict_id = _frame_dict_id(buffered.peek(18)[:18])
+    dictionary = None
+    if dict_id:
+        dictionaries = dictionaries or get_dictionary_store()
+        dictionary = dictionaries.get(dict_id) if dictionaries is not None else None
+        if dictionary is None:
+            raise LookupError(f"zstd dictionary {dict_id} needed for {storage_path} is not available")
+    return zstandard.ZstdDecompressor(dict_data=dictionary).stream_reader(buffered, read_size=_CHUNK)
+
+
+def decode_file(src: Path, dst: Path, storage_path: Optional[str] = None) -> None:
+    """Decode a stored file into ``dst`` (plain copy when uncompressed)."""
+    with open(src, "rb") as raw, open_decoded(raw, storage_path or str(src)) as f_in, open(dst, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, _CHUNK)
+
+
+# Largest zstd window HTTP clients must accept for ``Content-Encoding: zstd`` (RFC 9659)
+_HTTP_ZSTD_MAX_WINDOW = 8 * 1024 * 1024
+
+
+def http_content_coding(storage_path: str, head: bytes = b"") -> Optional[str]:
+    """``Content-Encoding`` under which a stored object can be sent to clients as is.
+
+    gzip objects always qualify. zstd frames qualify only without a dictionary
+    and within the window size browsers decode; ``head`` is the start of the
+    object (at least 18 bytes) for reading the frame header.
+
+    Returns:
+        ``gzip`` / ``zstd``, or None when the object is not compressed or has to
+        be decoded server-side
+    """
+    if storage_path.endswith(".gz"):
+        return "gzip"
+    if not storage_path.endswith(".zst") or zstandard is None:
+        return None
+    try:
+        params = zstandard.get_frame_parameters(head[:18])
+    except zstandard.ZstdError:
+        return None
+    if params.dict_id or params.window_size > _HTTP_ZSTD_MAX_WINDOW:
+        return None
+    return "zstd"
+
+
+def decoded_size(path: Path) -> Optional[int]:
+    """Decoded size recorded in a compressed file, when the format carries it.
+
+    Reads the gzip ISIZE trailer (exact below 4 GiB) or the zstd frame content
+    size (written when the input size is known up front); None if unknown.
+    """
+    path = Path(path)
+    try:
+        with open(path, "rb") as f:
+            if path.name.endswith(".gz"):
+                if f.seek(0, io.SEEK_END) < 18:
+                    return None
+                f.seek(-4, io.SEEK_END)
+                return int.from_bytes(f.read(4), "little")
+            if not path.name.endswith(".zst") or zstandard is None:
+                return None
+            head = f.read(18)
+    except OSError:
+        return None
+    try:
+        size = zstandard.frame_content_size(head)
+    except zstandard.ZstdError:
+        return None
+    return size if size >= 0 else None
+
+
+def strip_codec_suffix(path: str) -> str:
+    """Storage path without its compression suffix."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def build_codec(settings, archiver: Optional[str] = None) -> Codec:
+    """Upload codec for ``settings`` (zstd falls back to gzip without ``zstandard``)."""
+    if settings.upload_codec == "zstd":
+        if zstandard is None:
+            logger.warning("UPLOAD_CODEC=zstd but 'zstandard' is not installed; using gzip")
+        else:
+            dictionary = None
+            if archiver and settings.zstd_dictionaries:
+                store = get_dictionary_store()
+                dictionary = store.current(archiver) if store is not None else None
+            return ZstdCodec(
+                level=settings.upload_codec_level or 10,
+                long_distance=settings.zstd_long_distance,
+                dictionary=dictionary,
+            )
+    return GzipCodec(level=settings.upload_codec_level or 9)
+
+
+@lru_cache
+def get_dictionary_store() -> Optional[DictionaryStore]:
+    from core.config import get_settings
+
+    return DictionaryStore(get_settings().resolved_zstd_dict_dir)
@@ -6,10 +6,17 @@ Implementations: LocalFileStorage, GCSFileStorage, S3FileStorage, etc.
 """
 
 from abc import ABC, abstractmethod
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Tuple, BinaryIO
+from typing import Iterator, Mapping, Optional, Tuple, BinaryIO
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import hashlib
+
+    from .codecs import Codec
 
 
 @dataclass
@@ -22,6 +29,7 @@ class FileMetadata:
     content_type: Optional[str] = None
     compressed: bool = False
     compression_ratio: Optional[float] = None
+    original_size: Optional[int] = None  # Decoded size of a compressed file, when known
 
 
 @dataclass
@@ -33,6 +41,7 @@ class UploadResult:
     stored_size: int
     compression_ratio: Optional[float] = None
     error: Optional[str] = None
+    codec: Optional[str] = None  # Compression codec name (gzip, zstd) when compressed
 
 
 class FileStorageProvider(ABC):
@@ -52,7 +61,10 @@ class FileStorageProvider(ABC):
         local_path: Path,
         destination_path: str,
         compress: bool = True,
-        storage_class: Optional[str] = None
+        storage_class: Optional[str] = None,
+        codec: Optional["Codec"] = None,
+        precompressed: Optional[Path] = None,
+        content_hash: Optional["hashlib._Hash"] = None
     ) -> UploadResult:
         """
         Upload a file to storage.
@@ -62,6 +74,13 @@ class FileStorageProvider(ABC):
             destination_path: Destination path (relative to storage root)
             compress: Whether to compress before upload
             storage_class: Storage tier (STANDARD, NEARLINE, COLDLINE, etc.)
+            codec: Compression codec (defaults to gzip level 9); its suffix
+                is appended to destination_path
+            precompressed: ``local_path`` already encoded with ``codec``;
+                uploaded as is so several providers share one compression
+            content_hash: Hash object updated with the bytes of
+                ``local_path`` as they are compressed, so a single upload
+                can hash the file in the same read
 
         Returns:
             UploadResult with details about the upload
@@ -93,6 +112,8 @@ class FileStorageProvider(ABC):
         """
         Get a file stream for reading.
 
+        Compressed objects (``.gz``, ``.zst``) are decoded transparently.
+
         Args:
             storage_path: Path in storage
 
@@ -114,6 +135,28 @@ class FileStorageProvider(ABC):
         """
         pass
 
+    def copy_file(self, source_path: str, destination_path: str) -> UploadResult:
+        """
+        Copy a stored object to another path without re-uploading it.
+
+        Providers that can copy server-side override this; the default
+        reports failure so callers fall back to a regular upload.
+
+        Args:
+            source_path: Existing path in storage
+            destination_path: Path to copy to (stored as is)
+
+        Returns:
+            UploadResult for the new object
+        """
+        return UploadResult(
+            success=False,
+            uri="",
+            original_size=0,
+            stored_size=0,
+            error=f"{self.provider_name} does not support server-side copies"
+        )
+
     @abstractmethod
     def exists(self, storage_path: str) -> bool:
         """
@@ -167,18 +210,24 @@ class FileStorageProvider(ABC):
         self,
         storage_path: str,
         filename: str,
-        media_type: str = "application/octet-stream"
+        media_type: str = "application/octet-stream",
+        request_headers: Optional[Mapping[str, str]] = None
     ):
         """
         Serve a file for download by streaming from storage.
 
         Used to proxy file downloads through the app instead of direct access.
-        Returns a FastAPI response object that streams the file.
+        Returns a FastAPI response object that streams the file. Compressed
+        objects are sent as stored (``Content-Encoding``) to clients that
+        accept the coding; ``Range`` and ``If-None-Match`` are honoured
+        (see ``storage.serving``).
 
         Args:
             storage_path: Path in storage to the file
             filename: Filename to use in Content-Disposition header
             media_type: MIME type for the response
+            request_headers: Incoming request headers (Accept-Encoding,
+                Range, If-None-Match)
 
         Returns:
             FastAPI StreamingResponse or FileResponse for file download
@@ -222,6 +271,50 @@ class FileStorageProvider(ABC):
         """
         pass
 
+    def iter_files(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None
+    ) -> Iterator[FileMetadata]:
+        """
+        Iterate files under ``prefix`` in path order.
+
+        Providers that can list lazily override this; the default filters
+        ``list_files``.
+
+        Args:
+            prefix: Path prefix to filter by
+            start_after: Resume after this path (one returned earlier)
+
+        Yields:
+            FileMetadata
+        """
+        for metadata in sorted(self.list_files(prefix), key=lambda m: m.path):
+            if start_after is None or metadata.path > start_after:
+                yield metadata
+
+    def list_files_page(
+        self,
+        prefix: str = "",
+        limit: int = 1000,
+        cursor: Optional[str] = None
+    ) -> Tuple[list[FileMetadata], Optional[str]]:
+        """
+        One page of ``iter_files``.
+
+        Args:
+            prefix: Path prefix to filter by
+            limit: Page size
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple of (files, cursor for the next page or None after the last)
+        """
+        files = list(islice(self.iter_files(prefix, start_after=cursor), limit + 1))
+        if len(files) > limit:
+            return files[:limit], files[limit - 1].path
+        return files, None
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
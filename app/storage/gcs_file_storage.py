@@ -5,20 +5,72 @@ Stores files in Google Cloud Storage with compression,
 lifecycle policies, and signed URL support.
 """
 
-import gzip
-import shutil
+import hashlib
+import io
+import math
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, BinaryIO
+from typing import Callable, Mapping, Optional, BinaryIO
 from datetime import datetime, timedelta
 
 from google.cloud import storage
+from google.cloud.storage.fileio import BlobWriter
+from google.cloud.storage.retry import DEFAULT_RETRY
 
+from .codecs import COMPRESSED_SUFFIXES, Codec, GzipCodec, HashingReader, decode_file, open_decoded, strip_codec_suffix
 from .file_storage import (
     FileStorageProvider,
     FileMetadata,
     UploadResult
 )
 
+# Resumable upload chunks must be a multiple of 256 KiB
+_CHUNK_ALIGN = 256 * 1024
+# A single compose request accepts at most 32 source objects
+_MAX_COMPOSE_SOURCES = 32
+# Parts of composite uploads live under this prefix until composed
+COMPOSITE_PARTS_PREFIX = "_composite/"
+_COPY_CHUNK = 1024 * 1024
+# Bytes fetched per ranged GET when relaying an object to a client
+_SERVE_CHUNK = 1024 * 1024
+
+
+class _CountingWriter(io.RawIOBase):
+    """Pass-through writer that counts bytes written."""
+
+    def __init__(self, inner: BinaryIO):
+        self._inner = inner
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        written = self._inner.write(data)
+        self.bytes_written += len(data)
+        return written if written is not None else len(data)
+
+
+class _AbortableBlobWriter(BlobWriter):
+    """``BlobWriter`` that can be abandoned without finalizing its upload.
+
+    ``close()`` (also run when the writer is garbage collected) sends what is
+    buffered as the final chunk, committing a truncated object. After
+    ``abort()`` it does nothing, and the unfinished session simply expires.
+    """
+
+    _aborted = False
+
+    def abort(self) -> None:
+        self._aborted = True
+
+    def close(self) -> None:
+        if not self._aborted:
+            super().close()
+
 
 class GCSFileStorage(FileStorageProvider):
     """
@@ -29,12 +81,18 @@ class GCSFileStorage(FileStorageProvider):
     - Lifecycle policies (tiering, deletion)
     - Signed URLs for secure access
     - Multiple storage classes
+    - Chunked resumable uploads, each chunk retried on transient errors
+    - Optional parallel composite uploads for large files
     """
 
     def __init__(
         self,
         bucket_name: str,
-        project_id: Optional[str] = None
+        project_id: Optional[str] = None,
+        chunk_size: int = 8 * 1024 * 1024,
+        retry_seconds: float = 120.0,
+        composite_threshold: int = 0,
+        composite_parts: int = 8
     ):
         """
         Initialize GCS storage.
@@ -42,19 +100,45 @@ class GCSFileStorage(FileStorageProvider):
         Args:
             bucket_name: GCS bucket name
             project_id: Optional GCP project ID
+            chunk_size: Resumable upload chunk size in bytes (rounded down to
+                a multiple of 256 KiB, as the API requires)
+            retry_seconds: Deadline for retrying a failed chunk (or compose)
+                with exponential backoff
+            composite_threshold: Files of at least this many bytes are uploaded
+                as parallel parts composed server-side (0 disables)
+            composite_parts: Number of parts in composite mode (2-32)
         """
         self.client = storage.Client(project=project_id)
         self.bucket = self.client.bucket(bucket_name)
         self.bucket_name = bucket_name
+        self.chunk_size = max(_CHUNK_ALIGN, chunk_size // _CHUNK_ALIGN * _CHUNK_ALIGN)
+        self.retry = DEFAULT_RETRY.with_timeout(retry_seconds)
+        self.composite_threshold = composite_threshold
+        self.composite_parts = min(max(composite_parts, 2), _MAX_COMPOSE_SOURCES)
 
     def upload_file(
         self,
         local_path: Path,
         destination_path: str,
         compress: bool = True,
-        storage_class: Optional[str] = None
+        storage_class: Optional[str] = None,
+        codec: Optional[Codec] = None,
+        precompressed: Optional[Path] = None,
+        content_hash: Optional["hashlib._Hash"] = None
     ) -> UploadResult:
-        """Upload file to GCS."""
+        """Upload file to GCS.
+
+        Every upload goes through a resumable session in ``chunk_size``
+        chunks; a chunk that fails with a transient error is resent on its
+        own instead of restarting the upload. Each session validates a
+        CRC32C computed over the bytes sent.
+
+        Without ``precompressed``, compressed uploads stream: the file is
+        encoded chunk by chunk straight into the session, so nothing is
+        staged on local disk and memory stays at one chunk. Files already
+        on disk (raw or ``precompressed``) of at least ``composite_threshold``
+        bytes are sent as parallel parts and composed into the object.
+        """
         try:
             local_path = Path(local_path)
             if not local_path.exists():
@@ -69,24 +153,10 @@ class GCSFileStorage(FileStorageProvider):
             original_size = local_path.stat().st_size
 
             if compress:
-                # Compress to temp file
-                compressed_path = local_path.with_suffix(local_path.suffix + '.gz')
-                with open(local_path, 'rb') as f_in:
-                    with gzip.open(compressed_path, 'wb', compresslevel=9) as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-
-                stored_size = compressed_path.stat().st_size
-                compression_ratio = (1 - stored_size / original_size) * 100 if original_size > 0 else 0
-
-                # Add .gz to destination if not present
-                if not destination_path.endswith('.gz'):
-                    destination_path = destination_path + '.gz'
-
-                upload_path = compressed_path
-            else:
-                upload_path = local_path
-                stored_size = original_size
-                compression_ratio = None
+                codec = codec or GzipCodec()
+                # Add the codec extension (.gz, .zst) to destination if not present
+                if not destination_path.endswith(codec.suffix):
+                    destination_path = destination_path + codec.suffix
 
             # Upload to GCS
             blob = self.bucket.blob(destination_path)
@@ -94,18 +164,25 @@ class GCSFileStorage(FileStorageProvider):
             # Set metadata
             blob.content_type = self._guess_content_type(Path(destination_path))
             if compress:
-                blob.metadata = {'compressed': 'true', 'original_size': str(original_size)}
+                blob.metadata = {
+                    'compressed': 'true',
+                    'original_size': str(original_size),
+                    **{key: str(value) for key, value in codec.describe().items()},
+                }
+
+            if compress and precompressed is None:
+                stored_size = self._stream_compressed(blob, local_path, codec, content_hash)
+            else:
+                stored_size = self._upload_path(blob, Path(precompressed) if compress else local_path)
 
-            blob.upload_from_filename(str(upload_path))
+            compression_ratio = None
+            if compress:
+                compression_ratio = (1 - stored_size / original_size) * 100 if original_size > 0 else 0
 
             # Set storage class if specified
             if storage_class:
                 blob.update_storage_class(storage_class)
 
-            # Clean up temp compressed file
-            if compress and compressed_path.exists():
-                compressed_path.unlink()
-
             uri = f"gs://{self.bucket_name}/{destination_path}"
 
             return UploadResult(
@@ -113,7 +190,8 @@ class GCSFileStorage(FileStorageProvider):
                 uri=uri,
                 original_size=original_size,
                 stored_size=stored_size,
-                compression_ratio=compression_ratio
+                compression_ratio=compression_ratio,
+                codec=codec.name if compress else None
             )
 
         except Exception as e:
@@ -125,6 +203,86 @@ class GCSFileStorage(FileStorageProvider):
                 error=str(e)
             )
 
+    def _resumable_upload(self, blob: storage.Blob, fill: Callable[[BinaryIO], None]) -> int:
+        """Upload whatever ``fill(writer)`` writes as ``blob``; returns bytes sent."""
+        writer = _AbortableBlobWriter(
+            blob,
+            chunk_size=self.chunk_size,
+            ignore_flush=True,
+            checksum="crc32c",
+            retry=self.retry
+        )
+        counter = _CountingWriter(writer)
+        try:
+            fill(counter)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+        return counter.bytes_written
+
+    def _stream_compressed(
+        self,
+        blob: storage.Blob,
+        local_path: Path,
+        codec: Codec,
+        content_hash: Optional["hashlib._Hash"] = None
+    ) -> int:
+        """Compress ``local_path`` into a resumable upload of ``blob``; returns stored bytes."""
+        with open(local_path, 'rb') as f_in:
+            size = os.fstat(f_in.fileno()).st_size
+            src = HashingReader(f_in, content_hash) if content_hash is not None else f_in
+            return self._resumable_upload(blob, lambda out: codec.compress_stream(src, out, size=size))
+
+    def _upload_path(self, blob: storage.Blob, path: Path) -> int:
+        """Upload a file as is; returns stored bytes."""
+        size = path.stat().st_size
+        if self.composite_threshold and size >= self.composite_threshold:
+            self._upload_composite(blob, path, size)
+            return size
+        return self._upload_range(blob, path, 0, size)
+
+    def _upload_range(self, blob: storage.Blob, path: Path, offset: int, length: int) -> int:
+        """Upload ``length`` bytes of ``path`` starting at ``offset`` as ``blob``."""
+        def fill(out: BinaryIO) -> None:
+            with open(path, 'rb') as f_in:
+                f_in.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    data = f_in.read(min(_COPY_CHUNK, remaining))
+                    if not data:
+                        raise IOError(f"{path} shrank during upload")
+                    out.write(data)
+                    remaining -= len(data)
+
+        return self._resumable_upload(blob, fill)
+
+    def _upload_composite(self, blob: storage.Blob, path: Path, size: int) -> None:
+        """Upload ``path`` as parallel part objects and compose them into ``blob``.
+
+        Parts go under ``COMPOSITE_PARTS_PREFIX`` and are deleted once
+        composed (or on failure); the rule added by
+        ``ensure_composite_parts_rule`` expires any left behind by a crash.
+        """
+        part_size = math.ceil(size / self.composite_parts)
+        upload_id = uuid.uuid4().hex
+        parts = [
+            (self.bucket.blob(f"{COMPOSITE_PARTS_PREFIX}{upload_id}/{index:02d}"), offset, min(part_size, size - offset))
+            for index, offset in enumerate(range(0, size, part_size))
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=len(parts), thread_name_prefix="gcs-part") as pool:
+                futures = [pool.submit(self._upload_range, part, path, offset, length) for part, offset, length in parts]
+                for future in futures:
+                    future.result()
+            # Destination properties (content type, metadata) are set on ``blob``
+            blob.compose([part for part, _, _ in parts], retry=self.retry)
+        finally:
+            try:
+                self.bucket.delete_blobs([part for part, _, _ in parts], on_error=lambda part: None)
+            except Exception:
+                pass  # Expired by the lifecycle rule instead
+
     def download_file(
         self,
         storage_path: str,
@@ -140,18 +298,16 @@ class GCSFileStorage(FileStorageProvider):
             local_path = Path(local_path)
             local_path.parent.mkdir(parents=True, exist_ok=True)
 
-            is_compressed = storage_path.endswith('.gz')
+            is_compressed = storage_path.endswith(COMPRESSED_SUFFIXES)
 
             if is_compressed and decompress:
                 # Download and decompress
-                temp_path = local_path.with_suffix(local_path.suffix + '.gz')
+                temp_path = local_path.with_name(local_path.name + Path(storage_path).suffix)
                 blob.download_to_filename(str(temp_path))
-
-                with gzip.open(temp_path, 'rb') as f_in:
-                    with open(local_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-
-                temp_path.unlink()
+                try:
+                    decode_file(temp_path, local_path, storage_path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
             else:
                 # Direct download
                 blob.download_to_filename(str(local_path))
@@ -162,9 +318,9 @@ class GCSFileStorage(FileStorageProvider):
             return False
 
     def get_file_stream(self, storage_path: str) -> BinaryIO:
-        """Get file stream for reading."""
+        """Get file stream for reading (decoded when stored compressed)."""
         blob = self.bucket.blob(storage_path)
-        return blob.open('rb')
+        return open_decoded(blob.open('rb'), storage_path)
 
     def delete_file(self, storage_path: str) -> bool:
         """Delete file from GCS."""
@@ -176,6 +332,28 @@ class GCSFileStorage(FileStorageProvider):
         except Exception:
             return False
 
+    def copy_file(self, source_path: str, destination_path: str) -> UploadResult:
+        """Copy an object within the bucket server-side (no bytes pass through here)."""
+        try:
+            blob = self.bucket.copy_blob(
+                self.bucket.blob(source_path), self.bucket, destination_path, retry=self.retry
+            )
+            original_size = (blob.metadata or {}).get('original_size')
+            return UploadResult(
+                success=True,
+                uri=f"gs://{self.bucket_name}/{destination_path}",
+                original_size=int(original_size) if original_size else blob.size,
+                stored_size=blob.size
+            )
+        except Exception as e:
+            return UploadResult(
+                success=False,
+                uri="",
+                original_size=0,
+                stored_size=0,
+                error=str(e)
+            )
+
     def exists(self, storage_path: str) -> bool:
         """Check if file exists."""
         blob = self.bucket.blob(storage_path)
@@ -189,7 +367,7 @@ class GCSFileStorage(FileStorageProvider):
 
         blob.reload()
 
-        is_compressed = storage_path.endswith('.gz')
+        is_compressed = storage_path.endswith(COMPRESSED_SUFFIXES)
         original_size = None
         if is_compressed and blob.metadata:
             original_size = blob.metadata.get('original_size')
@@ -206,7 +384,8 @@ class GCSFileStorage(FileStorageProvider):
             storage_class=blob.storage_class,
             content_type=blob.content_type,
             compressed=is_compressed,
-            compression_ratio=compression_ratio
+            compression_ratio=compression_ratio,
+            original_size=original_size
         )
 
     def generate_access_url(
@@ -243,6 +422,26 @@ class GCSFileStorage(FileStorageProvider):
 
         return files
 
+    def ensure_composite_parts_rule(self) -> bool:
+        """Make the bucket expire composite upload parts that a crash left behind.
+
+        Adds a one-day delete rule on ``COMPOSITE_PARTS_PREFIX`` unless the
+        bucket already has one; other lifecycle rules are left as they are.
+        Needs ``storage.buckets.update`` on the bucket.
+
+        Returns:
+            True if the rule was added, False if it was already in place
+        """
+        bucket = self.client.get_bucket(self.bucket_name)
+        for rule in bucket.lifecycle_rules:
+            if rule.get("action", {}).get("type") != "Delete":
+                continue
+            if COMPOSITE_PARTS_PREFIX in rule.get("condition", {}).get("matchesPrefix", []):
+                return False
+        bucket.add_lifecycle_delete_rule(age=1, matches_prefix=[COMPOSITE_PARTS_PREFIX])
+        bucket.patch()
+        return True
+
     def set_lifecycle_policy(self):
         """Set lifecycle policy for automatic tiering and deletion."""
         bucket = self.client.get_bucket(self.bucket_name)
@@ -250,6 +449,9 @@ class GCSFileStorage(FileStorageProvider):
         # Delete files after 3 years
         bucket.add_lifecycle_delete_rule(age=365 * 3)
 
+        # Delete parts of composite uploads that were never composed
+        bucket.add_lifecycle_delete_rule(age=1, matches_prefix=[COMPOSITE_PARTS_PREFIX])
+
         # Transition to Nearline after 30 days
         bucket.add_lifecycle_set_storage_class_rule(
             storage_class='NEARLINE',
@@ -283,54 +485,55 @@ class GCSFileStorage(FileStorageProvider):
         self,
         storage_path: str,
         filename: str,
-        media_type: str = "application/octet-stream"
+        media_type: str = "application/octet-stream",
+        request_headers: Optional[Mapping[str, str]] = None
     ):
-        """Serve file from GCS by streaming."""
-        from fastapi.responses import StreamingResponse
+        """Serve file from GCS by streaming.
+
+        Compressed objects are relayed as stored to clients accepting their
+        encoding, so nothing is inflated here; ranged requests fetch only the
+        requested bytes from GCS.
+        """
         from fastapi import HTTPException
+        from .serving import stream_response
 
-        blob = self.bucket.blob(storage_path)
-        if not blob.exists():
+        blob = self.bucket.get_blob(storage_path)
+        if blob is None:
             raise HTTPException(status_code=404, detail="File not found in GCS")
 
-        # Stream file from GCS
-        def iterfile():
-            with blob.open('rb') as f:
-                while chunk := f.read(8192):  # 8KB chunks
-                    yield chunk
-
-        headers = {
-            'Content-Disposition': f'attachment; filename="{filename}"'
-        }
-
-        return StreamingResponse(
-            iterfile(),
+        return stream_response(
+            open_raw=lambda: blob.open('rb', chunk_size=_SERVE_CHUNK, raw_download=True),
+            storage_path=storage_path,
+            size=blob.size,
+            etag=f'"{blob.generation}"',
+            request_headers=request_headers or {},
             media_type=media_type,
-            headers=headers
+            filename=filename,
+            read_head=lambda: blob.download_as_bytes(start=0, end=17, raw_download=True),
+            last_modified=blob.updated.timestamp() if blob.updated else None,
         )
 
     def download_to_temp(self, storage_path: str) -> Path:
         """Download from GCS to temporary file."""
-        import tempfile
-
         blob = self.bucket.blob(storage_path)
         if not blob.exists():
             raise FileNotFoundError(f"File not found in GCS: {storage_path}")
 
-        # Create temp file with proper extension
-        suffix = Path(storage_path).suffix
-        temp_file = Path(tempfile.mktemp(suffix=suffix))
+        # Create temp file with the decoded file's extension
+        suffix = Path(strip_codec_suffix(storage_path)).suffix
+        fd, temp_name = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        temp_file = Path(temp_name)
 
-        # Download (handles decompression if .gz)
-        is_compressed = storage_path.endswith('.gz')
-        self.download_file(storage_path, temp_file, decompress=is_compressed)
+        # Download (handles decompression of .gz / .zst)
+        self.download_file(storage_path, temp_file, decompress=True)
 
         return temp_file
 
     def _guess_content_type(self, file_path: Path) -> str:
         """Guess content type from file extension."""
         suffix = file_path.suffix.lower()
-        if suffix == '.gz':
+        if suffix in COMPRESSED_SUFFIXES:
             # Get inner suffix
             suffix = file_path.stem.split('.')[-1] if '.' in file_path.stem else ''
 
@@ -5,12 +5,26 @@ Stores files on the local filesystem.
 Useful for development, testing, and self-hosted deployments.
 """
 
-import gzip
+import hashlib
+import os
 import shutil
+import tempfile
+import zlib
+from itertools import islice
 from pathlib import Path
-from typing import Optional, BinaryIO
+from typing import Iterator, Mapping, Optional, BinaryIO, Tuple
 from datetime import datetime, timedelta
 
+from .codecs import (
+    COMPRESSED_SUFFIXES,
+    Codec,
+    GzipCodec,
+    HashingReader,
+    decode_file,
+    decoded_size,
+    open_decoded,
+    strip_codec_suffix,
+)
 from .file_storage import (
     FileStorageProvider,
     FileMetadata,
@@ -43,7 +57,10 @@ class LocalFileStorage(FileStorageProvider):
         local_path: Path,
         destination_path: str,
         compress: bool = True,
-        storage_class: Optional[str] = None
+        storage_class: Optional[str] = None,
+        codec: Optional[Codec] = None,
+        precompressed: Optional[Path] = None,
+        content_hash: Optional["hashlib._Hash"] = None
     ) -> UploadResult:
         """Upload file to local storage."""
         try:
@@ -64,14 +81,19 @@ class LocalFileStorage(FileStorageProvider):
             original_size = local_path.stat().st_size
 
             if compress:
-                # Add .gz extension if not present
-                if not dest_path.suffix == '.gz':
-                    dest_path = dest_path.with_suffix(dest_path.suffix + '.gz')
-
-                # Compress and upload
-                with open(local_path, 'rb') as f_in:
-                    with gzip.open(dest_path, 'wb', compresslevel=9) as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                codec = codec or GzipCodec()
+                # Add the codec extension (.gz, .zst) if not present
+                if not dest_path.name.endswith(codec.suffix):
+                    dest_path = dest_path.with_name(dest_path.name + codec.suffix)
+
+                # Compress and upload (or reuse the caller's encoded copy)
+                if precompressed is not None:
+                    shutil.copyfile(precompressed, dest_path)
+                elif content_hash is not None:
+                    with open(local_path, "rb") as f_in, open(dest_path, "wb") as f_out:
+                        codec.compress_stream(HashingReader(f_in, content_hash), f_out, size=original_size)
+                else:
+                    codec.compress_file(local_path, dest_path)
 
                 stored_size = dest_path.stat().st_size
                 compression_ratio = (1 - stored_size / original_size) * 100 if original_size > 0 else 0
@@ -90,7 +112,8 @@ class LocalFileStorage(FileStorageProvider):
                 uri=uri,
                 original_size=original_size,
                 stored_size=stored_size,
-                compression_ratio=compression_ratio
+                compression_ratio=compression_ratio,
+                codec=codec.name if compress else None
             )
 
         except Exception as e:
@@ -118,13 +141,11 @@ class LocalFileStorage(FileStorageProvider):
             local_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Check if file is compressed
-            is_compressed = source_path.suffix == '.gz'
+            is_compressed = source_path.suffix in COMPRESSED_SUFFIXES
 
             if is_compressed and decompress:
                 # Decompress
-                with gzip.open(source_path, 'rb') as f_in:
-                    with open(local_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                decode_file(source_path, local_path, storage_path)
             else:
                 # Direct copy
                 shutil.copy2(source_path, local_path)
@@ -137,11 +158,7 @@ class LocalFileStorage(FileStorageProvider):
     def get_file_stream(self, storage_path: str) -> BinaryIO:
         """Get file stream for reading."""
         file_path = self.root_dir / storage_path
-
-        if file_path.suffix == '.gz':
-            return gzip.open(file_path, 'rb')
-        else:
-            return open(file_path, 'rb')
+        return open_decoded(open(file_path, 'rb'), storage_path)
 
     def delete_file(self, storage_path: str) -> bool:
         """Delete file from local storage."""
@@ -153,6 +170,31 @@ class LocalFileStorage(FileStorageProvider):
         except Exception:
             return False
 
+    def copy_file(self, source_path: str, destination_path: str) -> UploadResult:
+        """Copy a stored file within the storage root."""
+        try:
+            source = self.root_dir / source_path
+            dest_path = self.root_dir / destination_path
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, dest_path)
+            stored_size = dest_path.stat().st_size
+            relative_path = dest_path.relative_to(self.root_dir)
+            is_compressed = dest_path.suffix in COMPRESSED_SUFFIXES
+            return UploadResult(
+                success=True,
+                uri=f"file:///{dest_path}" if not self.base_url else f"{self.base_url}/{relative_path}",
+                original_size=(decoded_size(dest_path) if is_compressed else None) or stored_size,
+                stored_size=stored_size
+            )
+        except Exception as e:
+            return UploadResult(
+                success=False,
+                uri="",
+                original_size=0,
+                stored_size=0,
+                error=str(e)
+            )
+
     def exists(self, storage_path: str) -> bool:
         """Check if file exists."""
         file_path = self.root_dir / storage_path
@@ -165,7 +207,12 @@ class LocalFileStorage(FileStorageProvider):
             return None
 
         stat = file_path.stat()
-        is_compressed = file_path.suffix == '.gz'
+        is_compressed = file_path.suffix in COMPRESSED_SUFFIXES
+        original_size = decoded_size(file_path) if is_compressed else None
+
+        compression_ratio = None
+        if original_size:
+            compression_ratio = (1 - stat.st_size / original_size) * 100
 
         return FileMetadata(
             path=storage_path,
@@ -174,7 +221,8 @@ class LocalFileStorage(FileStorageProvider):
             storage_class="LOCAL",
             content_type=self._guess_content_type(file_path),
             compressed=is_compressed,
-            compression_ratio=None  # Would need original size to calculate
+            compression_ratio=compression_ratio,
+            original_size=original_size
         )
 
     def generate_access_url(
@@ -199,20 +247,71 @@ class LocalFileStorage(FileStorageProvider):
         limit: Optional[int] = None
     ) -> list[FileMetadata]:
         """List files with optional prefix filter."""
-        search_path = self.root_dir / prefix if prefix else self.root_dir
-
-        files = []
-        for file_path in search_path.rglob('*'):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(self.root_dir)
-                metadata = self.get_metadata(str(relative_path))
-                if metadata:
-                    files.append(metadata)
+        return list(islice(self.iter_files(prefix), limit))
 
-                if limit and len(files) >= limit:
-                    break
+    def iter_files(
+        self,
+        prefix: str = "",
+        start_after: Optional[str] = None,
+        *,
+        shard: Optional[Tuple[int, int]] = None
+    ) -> Iterator[FileMetadata]:
+        """Iterate files under ``prefix`` lazily, in path order.
+
+        Walks one directory at a time with ``os.scandir`` and builds metadata
+        from each entry's own stat, so nothing is materialised beyond the
+        directory being read. Codec headers are not read, so listings leave
+        ``original_size`` unset (``get_metadata`` fills it in).
+
+        ``start_after`` resumes after a path returned earlier, skipping every
+        subtree that sorts before it without reading it. ``shard=(index,
+        count)`` keeps only the entries directly below the prefix whose name
+        hashes to ``index``, so ``count`` workers can split one listing.
+        """
+        directory, _, name_prefix = prefix.rpartition("/")
+        parts = tuple(part for part in directory.split("/") if part)
+        after = tuple(start_after.split("/")) if start_after else None
+        yield from self._scan(self.root_dir.joinpath(*parts), parts, name_prefix, after, shard)
 
-        return files
+    def _scan(
+        self,
+        directory: Path,
+        parts: Tuple[str, ...],
+        name_prefix: str,
+        after: Optional[Tuple[str, ...]],
+        shard: Optional[Tuple[int, int]]
+    ) -> Iterator[FileMetadata]:
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+
+        for entry in entries:
+            if name_prefix and not entry.name.startswith(name_prefix):
+                continue
+            if shard is not None and zlib.crc32(entry.name.encode()) % shard[1] != shard[0]:
+                continue
+            entry_parts = parts + (entry.name,)
+            if entry.is_dir(follow_symlinks=False):
+                if after is None or entry_parts > after[:len(entry_parts)]:
+                    yield from self._scan(Path(entry.path), entry_parts, "", None, None)
+                elif entry_parts == after[:len(entry_parts)]:
+                    # The cursor lies inside this directory
+                    yield from self._scan(Path(entry.path), entry_parts, "", after, None)
+            elif entry.is_file() and (after is None or entry_parts > after):
+                yield self._entry_metadata(entry, "/".join(entry_parts))
+
+    def _entry_metadata(self, entry: os.DirEntry, storage_path: str) -> FileMetadata:
+        stat = entry.stat()
+        return FileMetadata(
+            path=storage_path,
+            size=stat.st_size,
+            created_at=datetime.fromtimestamp(stat.st_ctime),
+            storage_class="LOCAL",
+            content_type=self._guess_content_type(Path(entry.name)),
+            compressed=entry.name.endswith(COMPRESSED_SUFFIXES)
+        )
 
     @property
     def provider_name(self) -> str:
@@ -233,33 +332,41 @@ class LocalFileStorage(FileStorageProvider):
         self,
         storage_path: str,
         filename: str,
-        media_type: str = "application/octet-stream"
+        media_type: str = "application/octet-stream",
+        request_headers: Optional[Mapping[str, str]] = None
     ):
-        """Serve file from local storage."""
-        from fastapi.responses import FileResponse
+        """Serve file from local storage.
+
+        Compressed files go out as stored (``FileResponse``, so zero-copy
+        where the server supports it) to clients accepting their encoding,
+        and are decoded on the fly for the rest.
+        """
         from fastapi import HTTPException
+        from .serving import file_response
 
         file_path = self.root_dir / storage_path
-        if not file_path.exists():
+        if not file_path.is_file():
             raise HTTPException(status_code=404, detail="File not found in storage")
 
-        return FileResponse(
-            path=str(file_path),
-            media_type=media_type,
-            filename=filename
-        )
+        return file_response(file_path, request_headers or {}, media_type, filename)
 
     def download_to_temp(self, storage_path: str) -> Path:
-        """For local storage, just return the path directly since it's already local."""
+        """Return the path directly for plain files; decode compressed ones to a temp file."""
         file_path = self.root_dir / storage_path
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {storage_path}")
-        return file_path
+        if file_path.suffix not in COMPRESSED_SUFFIXES:
+            return file_path
+
+        fd, temp_name = tempfile.mkstemp(suffix=Path(strip_codec_suffix(storage_path)).suffix)
+        os.close(fd)
+        decode_file(file_path, Path(temp_name), storage_path)
+        return Path(temp_name)
 
     def _guess_content_type(self, file_path: Path) -> str:
         """Guess content type from file extension."""
         suffix = file_path.suffix.lower()
-        if suffix == '.gz':
+        if suffix in COMPRESSED_SUFFIXES:
             # Get inner suffix
             suffix = file_path.stem.split('.')[-1] if '.' in file_path.stem else ''
 
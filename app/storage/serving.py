@@ -0,0 +1,238 @@
+"""
+HTTP Serving of Stored Files
+
+Compressed objects (``.gz``, and ``.zst`` frames browsers can decode) are sent
+as stored, under the matching ``Content-Encoding``, to clients that accept
+that coding: no inflation on the server, and local files go out through
+``FileResponse`` (``sendfile``/pathsend where the server supports it). Other
+clients get a decoded stream.
+
+Responses carry an ``ETag`` and answer ``If-None-Match`` with 304. Single
+``Range`` requests are honoured over the bytes as sent, which for encoded
+responses are the stored bytes, as HTTP specifies.
+"""
+
+import hashlib
+import os
+from email.utils import formatdate
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Mapping, Optional
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from .codecs import COMPRESSED_SUFFIXES, http_content_coding, open_decoded
+
+_CHUNK = 64 * 1024
+
+
+def accepts_coding(accept_encoding: Optional[str], coding: str) -> bool:
+    """Whether an ``Accept-Encoding`` header admits ``coding`` (q-values honoured)."""
+    if not accept_encoding:
+        return False
+    wildcard = False
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == coding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return wildcard
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Parse a single-range ``Range`` header into (start, end exclusive).
+
+    Returns None when there is no usable range (absent, malformed or
+    multi-range requests are answered with the full body).
+
+    Raises:
+        ValueError: If the range cannot be satisfied for ``size`` bytes
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, _, last = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+        else:
+            start, end = max(size - int(last), 0), size
+    except ValueError:
+        return None
+    if start >= size or start >= end:
+        raise ValueError(f"bytes */{size}")
+    return start, end
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Entity tag of a local file, as ``FileResponse``/``StaticFiles`` compute it."""
+    base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    return f'"{hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def variant_etag(etag: str, variant: str) -> str:
+    """Entity tag for another representation (decoded, rebuilt) of the same file."""
+    return f'{etag[:-1]}-{variant}"' if etag.endswith('"') else f"{etag}-{variant}"
+
+
+def _base_headers(etag: str, filename: Optional[str], compressed: bool) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if compressed:
+        headers["Vary"] = "Accept-Encoding"
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return headers
+
+
+def _not_modified(request_headers: Mapping[str, str], etag: str, compressed: bool) -> Optional[Response]:
+    if etag_matches(request_headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_base_headers(etag, None, compressed))
+    return None
+
+
+def _decoded_response(
+    open_raw: Callable[[], BinaryIO],
+    storage_path: str,
+    etag: str,
+    media_type: str,
+    filename: Optional[str],
+    request_headers: Mapping[str, str],
+) -> Response:
+    """Stream the decoded object (no ranges: its decoded length is unknown up front)."""
+    etag = variant_etag(etag, "identity")
+    not_modified = _not_modified(request_headers, etag, True)
+    if not_modified is not None:
+        return not_modified
+
+    def iterfile() -> Iterator[bytes]:
+        with open_decoded(open_raw(), storage_path) as f:
+            while chunk := f.read(_CHUNK):
+                yield chunk
+
+    headers = _base_headers(etag, filename, True)
+    headers["Accept-Ranges"] = "none"
+    return StreamingResponse(iterfile(), media_type=media_type, headers=headers)
+
+
+def file_response(
+    file_path: Path,
+    request_headers: Mapping[str, str],
+    media_type: str,
+    filename: Optional[str] = None,
+) -> Response:
+    """Serve a local stored file, passing its stored encoding through when accepted."""
+    file_path = Path(file_path)
+    stat_result = file_path.stat()
+    compressed = file_path.name.endswith(COMPRESSED_SUFFIXES)
+    coding = None
+    if compressed:
+        with open(file_path, "rb") as f:
+            coding = http_content_coding(file_path.name, f.read(18))
+        if coding is None or not accepts_coding(request_headers.get("accept-encoding"), coding):
+            return _decoded_response(
+                lambda: open(file_path, "rb"), file_path.name, file_etag(stat_result),
+                media_type, filename, request_headers,
+            )
+
+    headers = {"Vary": "Accept-Encoding", "Content-Encoding": coding} if coding else None
+    # FileResponse adds the ETag and Last-Modified and answers Range requests itself
+    response = FileResponse(
+        file_path,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+    )
+    not_modified = _not_modified(request_headers, response.headers["etag"], compressed)
+    return not_modified if not_modified is not None else response
+
+
+def stream_response(
+    open_raw: Callable[[], BinaryIO],
+    storage_path: str,
+    size: int,
+    etag: str,
+    request_headers: Mapping[str, str],
+    media_type: str,
+    filename: Optional[str] = None,
+    read_head: Optional[Callable[[], bytes]] = None,
+    last_modified: Optional[float] = None,
+) -> Response:
+    """Serve a remote stored object, passing its stored encoding through when accepted.
+
+    Args:
+        open_raw: Opens a seekable stream over the stored bytes
+        storage_path: Object path; its suffix names the stored encoding
+        size: Stored size in bytes
+        etag: Quoted entity tag of the stored object
+        request_headers: Incoming request headers
+        media_type: MIME type of the decoded content
+        filename: Attachment filename (inline when omitted)
+        read_head: Returns the first bytes of the object (zstd frame header check)
+        last_modified: Modification time (epoch seconds) for ``Last-Modified``
+    """
+    compressed = storage_path.endswith(COMPRESSED_SUFFIXES)
+    coding = None
+    if compressed:
+        head = read_head() if read_head is not None and storage_path.endswith(".zst") else b""
+        coding = http_content_coding(storage_path, head)
+        if coding is None or not accepts_coding(request_headers.get("accept-encoding"), coding):
+            return _decoded_response(open_raw, storage_path, etag, media_type, filename, request_headers)
+
+    not_modified = _not_modified(request_headers, etag, compressed)
+    if not_modified is not None:
+        return not_modified
+
+    headers = _base_headers(etag, filename, compressed)
+    headers["Accept-Ranges"] = "bytes"
+    if coding:
+        headers["Content-Encoding"] = coding
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if_range = request_headers.get("if-range")
+    try:
+        byte_range = parse_byte_range(request_headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}", "ETag": etag})
+    if byte_range is not None and if_range is not None and if_range.strip() != etag:
+        byte_range = None
+    start, end = byte_range or (0, size)
+
+    def iterfile() -> Iterator[bytes]:
+        with open_raw() as f:
+            if start:
+                f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers["Content-Length"] = str(end - start)
+    status_code = 200
+    if byte_range is not None:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return StreamingResponse(iterfile(), status_code=status_code, media_type=media_type, headers=headers)
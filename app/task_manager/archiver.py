@@ -3,11 +3,13 @@ from __future__ import annotations
 import logging
 import uuid
 from dataclasses import dataclass
+from datetime import datetime
 from threading import Event
 from typing import Any, Dict, List, Optional, Sequence
 
 from core.config import AppSettings
-from core.utils import check_url_archivability, rewrite_paywalled_url, sanitize_filename, get_directory_size, extract_original_url
+from core.metrics import get_metrics
+from core.utils import URLCheck, check_url_archivability, check_url_freshness, rewrite_paywalled_url, sanitize_filename, get_output_size, extract_original_url
 from db import (
     ArchiveArtifactRepository,
     ArchivedUrlRepository,
@@ -32,6 +34,8 @@ class BatchItem:
     rowid: int
     archiver_name: str
     rewritten_url: str | None = None  # Freedium URL (used for archiving)
+    url_check: URLCheck | None = None  # Conditional check result (CONDITIONAL_REARCHIVE)
+    checked_at: datetime | None = None
 
 
 @dataclass
@@ -70,6 +74,8 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
             str(name).strip() for name in resolved_priorities if str(name).strip()
         ]
         self.requeue_chunk_size = max(int(requeue_chunk_size), 1)
+        # Per-task cache of conditional checks: fetch_url -> (check, checked_at, validated_at)
+        self._url_checks: Dict[str, tuple[URLCheck, datetime, Optional[datetime]]] = {}
 
     def _insert_pending_artifact(
         self, item_id: str, url: str, task_id: str, archiver_name: str, name: Optional[str] = None
@@ -413,13 +419,64 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
         return task_ids
 
     def process(self, task: BatchTask) -> None:  # type: ignore[override]
+        # Items for batch-capable archivers (singlefile-cli) are pre-checked one
+        # by one, then archived together so tool startup is paid once per batch.
+        self._url_checks = {}
+        pending: Dict[str, List[BatchItem]] = {}
         for item in task.items:
-            self._process_item(task_id=task.task_id, item=item)
+            archiver = self.archivers.get(item.archiver_name)
+            if not self._batches(archiver):
+                self._process_item(task_id=task.task_id, item=item)
+                continue
+
+            if not self._prepare_item(task_id=task.task_id, item=item, archiver=archiver):
+                continue
+            group = pending.setdefault(item.archiver_name, [])
+            group.append(item)
+            if len(group) >= self.settings.singlefile_batch_size:
+                self._process_batch(task_id=task.task_id, items=pending.pop(item.archiver_name))
+
+        for items in pending.values():
+            self._process_batch(task_id=task.task_id, items=items)
 
         if task.completion_event is not None:
             task.completion_event.set()
 
-    def _process_item(self, *, task_id: str, item: BatchItem) -> None:
+    def _batches(self, archiver: Any) -> bool:
+        return (
+            archiver is not None
+            and getattr(archiver, "supports_batch", False)
+            and self.settings.singlefile_batch_size > 1
+        )
+
+    def _process_batch(self, *, task_id: str, items: List[BatchItem]) -> None:
+        archiver = self.archivers[items[0].archiver_name]
+        entries = [(item.rewritten_url or item.url, item.item_id) for item in items]
+        logger.info(
+            "Invoking archiver for batch",
+            extra={"task_id": task_id, "archiver": items[0].archiver_name, "item_count": len(items)},
+        )
+        try:
+            if self.settings.enable_storage_integration:
+                results = archiver.archive_batch_with_storage(entries)
+            else:
+                results = [
+                    archiver.postprocess_output(result, item_id)
+                    for result, (_, item_id) in zip(archiver.archive_batch(entries), entries)
+                ]
+        except Exception as exc:
+            for item in items:
+                self._handle_archiver_exception(item=item, error=exc)
+            return
+
+        for item, result in zip(items, results):
+            try:
+                self._record_result(item=item, result=result)
+            except Exception as exc:
+                self._handle_archiver_exception(item=item, error=exc)
+
+    def _prepare_item(self, *, task_id: str, item: BatchItem, archiver: Any) -> bool:
+        """Run the per-item pre-checks; True when the archiver should be invoked."""
         fetch_url = item.rewritten_url or item.url
         logger.info(
             "Processing artifact",
@@ -432,18 +489,31 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
             },
         )
 
-        archiver = self.archivers.get(item.archiver_name)
         if archiver is None:
             self._finalize_missing_archiver(item)
-            return
+            return False
 
         try:
             if not self._should_archive(fetch_url=fetch_url, item=item):
-                return
+                return False
+
+            if self._reuse_unchanged_save(item=item):
+                return False
 
             if self.settings.skip_existing_saves and self._reuse_existing_save(item=item, archiver=archiver):
-                return
+                return False
+        except Exception as exc:
+            self._handle_archiver_exception(item=item, error=exc)
+            return False
+        return True
+
+    def _process_item(self, *, task_id: str, item: BatchItem) -> None:
+        fetch_url = item.rewritten_url or item.url
+        archiver = self.archivers.get(item.archiver_name)
+        if not self._prepare_item(task_id=task_id, item=item, archiver=archiver):
+            return
 
+        try:
             logger.info(
                 "Invoking archiver",
                 extra={"archiver": item.archiver_name, "rowid": item.rowid, "url": fetch_url},
@@ -459,6 +529,7 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
                     url=fetch_url,
                     item_id=item.item_id,
                 )
+                result = archiver.postprocess_output(result, item.item_id)
             self._record_result(item=item, result=result)
         except Exception as exc:
             self._handle_archiver_exception(item=item, error=exc)
@@ -474,7 +545,7 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
         )
 
     def _should_archive(self, *, fetch_url: str, item: BatchItem) -> bool:
-        url_check = check_url_archivability(fetch_url)
+        url_check = self._check_url(fetch_url=fetch_url, item=item)
         logger.debug(
             "URL status check",
             extra={
@@ -504,9 +575,104 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
             )
         return False
 
-    def _reuse_existing_save(self, *, item: BatchItem, archiver: Any) -> bool:
-        from pathlib import Path
+    def _check_url(self, *, fetch_url: str, item: BatchItem) -> URLCheck:
+        """Reachability check; a conditional GET when CONDITIONAL_REARCHIVE is on."""
+        if not self.settings.conditional_rearchive:
+            return check_url_archivability(fetch_url)
+
+        cached = self._url_checks.get(fetch_url)
+        if cached is None:
+            archived_url = self.url_repo.get_by_url(item.url)
+            checked_at = datetime.utcnow()
+            url_check = check_url_freshness(
+                fetch_url,
+                etag=getattr(archived_url, "etag", None),
+                last_modified=getattr(archived_url, "last_modified", None),
+                content_hash=getattr(archived_url, "content_hash", None),
+            )
+            cached = (url_check, checked_at, getattr(archived_url, "validated_at", None))
+            self._url_checks[fetch_url] = cached
+            if cached[2] is not None:
+                get_metrics().inc(
+                    "conditional_rearchive_total",
+                    result="unchanged" if url_check.not_modified else "changed",
+                )
+
+        item.url_check, item.checked_at, _ = cached
+        return item.url_check
+
+    def _reuse_unchanged_save(self, *, item: BatchItem) -> bool:
+        """Finalize from the previous artifact when the page has not changed.
+
+        Only artifacts written after the stored validators were fetched are
+        reused, so an archiver that failed on the current page version is
+        not satisfied by an older capture.
+        """
+        url_check = item.url_check
+        if url_check is None or not url_check.not_modified:
+            return False
+        validated_at = self._url_checks[url_check.url][2]
+        if validated_at is None:
+            return False
+
+        existing = self.artifact_repo.find_successful(
+            item_id=item.item_id,
+            url=item.url,
+            archiver=item.archiver_name,
+        )
+        saved_path: Optional[str] = getattr(existing, "saved_path", None) if existing else None
+        updated_at: Optional[datetime] = getattr(existing, "updated_at", None) if existing else None
+        if not saved_path or updated_at is None or updated_at < validated_at:
+            return False
+        if not self.archivers[item.archiver_name].output_exists(saved_path):
+            return False
 
+        logger.info(
+            "Page unchanged since last archive - reusing save",
+            extra={
+                "rowid": item.rowid,
+                "archiver": item.archiver_name,
+                "status": url_check.status_code,
+                "saved_path": saved_path,
+            },
+        )
+        self.artifact_repo.finalize_result(
+            rowid=item.rowid,
+            success=True,
+            exit_code=0,
+            saved_path=saved_path,
+        )
+        get_metrics().inc("conditional_rearchive_reused_total", archiver=item.archiver_name)
+        self._schedule_summary(
+            archived_url_id=existing.archived_url_id,
+            rowid=item.rowid,
+            source=item.archiver_name,
+            reason=f"task-unchanged-{item.archiver_name}",
+        )
+        return True
+
+    def _store_validators(self, *, item: BatchItem, archived_url_id: int) -> None:
+        """Remember the validators of the page version that was just archived."""
+        url_check = item.url_check
+        if url_check is None or item.checked_at is None or url_check.not_modified:
+            return
+        if url_check.status_code != 200:
+            return
+        try:
+            self.url_repo.update_validators(
+                archived_url_id,
+                etag=url_check.etag,
+                last_modified=url_check.last_modified,
+                content_hash=url_check.content_hash,
+                validated_at=item.checked_at,
+            )
+        except Exception as exc:
+            logger.warning(
+                "Failed to store validators",
+                extra={"archived_url_id": archived_url_id, "error": str(exc)},
+            )
+
+    def _reuse_existing_save(self, *, item: BatchItem, archiver: Any) -> bool:
         existing = self.artifact_repo.find_successful(
             
             item_id=item.item_id,
@@ -543,8 +709,7 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
         if not saved_path:
             return False
 
-        saved_path_obj = Path(saved_path)
-        if saved_path_obj.exists():
+        if archiver.output_exists(saved_path):
             logger.info(
                 "Reusing existing save",
                 extra={
@@ -580,56 +745,26 @@ class ArchiverTaskManager(BackgroundTaskManager[BatchTask]):
         return False
 
     def _record_result(self, *, item: BatchItem, result: ArchiveResult) -> None:
-        size_bytes: Optional[int] = None
-        archived_url_id: Optional[int] = None
-
-        if result.success and result.saved_path:
+        # Measured once by the archiver at finalize; the URL total is adjusted
+        # by the delta inside finalize_result
+        size_bytes: Optional[int] = result.size_bytes if result.success else None
+        if size_bytes is None and result.success and result.saved_path:
             from pathlib import Path
 
-            try:
-                saved_path = Path(result.saved_path)
-                if saved_path.exists():
-                    archiver_dir = saved_path.parent
-                    size_bytes = get_directory_size(archiver_dir)
-                    logger.debug(
-                        "Calculated artifact size",
-                        extra={
-                            "rowid": item.rowid,
-                            "archiver": item.archiver_name,
-                            "size_bytes": size_bytes,
-                            "path": str(archiver_dir),
-                        },
-                    )
-
-                artifact = self.artifact_repo.get_by_id(item.rowid)
-                if artifact:
-                    archived_url_id = artifact.archived_url_id
-            except Exception as exc:
-                logger.warning(
-                    "Failed to calculate size",
-                    extra={"rowid": item.rowid, "error": str(exc)},
-                )
+            size_bytes = get_output_size(Path(result.saved_path).parent)
 
-        self.artifact_repo.finalize_result(
-            
+        archived_url_id = self.artifact_repo.finalize_result(
             rowid=item.rowid,
             success=result.success,
             exit_code=result.exit_code,
             saved_path=result.saved_path,
             size_bytes=size_bytes,
+            storage_uploads=(result.metadata or {}).get("storage_uploads"),
+            asset_dedup=bool((result.metadata or {}).get("asset_dedup")),
         )
 
-        if archived_url_id is not None:
-            try:
-                self.url_repo.update_total_size(
-                    
-                    archived_url_id=archived_url_id,
-                )
-            except Exception as exc:
-                logger.warning(
-                    "Failed to update total size",
-                    extra={"archived_url_id": archived_url_id, "error": str(exc)},
-                )
+        if archived_url_id is not None and result.success:
+            self._store_validators(item=item, archived_url_id=archived_url_id)
 
         logger.info(
             f"Finalized save ({'success' if result.success else 'failure'})",
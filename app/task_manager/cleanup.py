@@ -7,10 +7,11 @@ import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from core.config import AppSettings
+    from storage.artifact_manifest import ArtifactManifest
 
 from db.models import ArchiveArtifact
 from db.session import get_session
@@ -31,9 +32,10 @@ class CleanupTask:
 class CleanupTaskManager(BackgroundTaskManager[CleanupTask]):
     """Manages cleanup of local workspace files after retention period."""
 
-    def __init__(self, settings: "AppSettings"):
+    def __init__(self, settings: "AppSettings", manifest: Optional["ArtifactManifest"] = None):
         super().__init__()
         self.settings = settings
+        self.manifest = manifest
 
     def schedule_cleanup(
         self,
@@ -81,6 +83,8 @@ class CleanupTaskManager(BackgroundTaskManager[CleanupTask]):
             if task.local_path.exists():
                 task.local_path.unlink()
                 logger.info(f"Deleted local file: {task.local_path}")
+                if self.manifest is not None:
+                    self.manifest.remove_path(task.local_path)
 
                 # Clean up empty parent directories
                 parent = task.local_path.parent
@@ -138,6 +142,8 @@ class CleanupTaskManager(BackgroundTaskManager[CleanupTask]):
                         if file_path.exists():
                             file_path.unlink()
                             cleaned_count += 1
+                            if self.manifest is not None:
+                                self.manifest.remove_path(file_path)
                             logger.info(f"Cleaned up failed output: {file_path}")
 
                         artifact.local_file_deleted = True
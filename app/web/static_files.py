@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import stat
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Optional
+
+from anyio import to_thread
+from fastapi.responses import FileResponse, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.types import Scope
+
+from core.config import get_settings
+from storage.asset_store import rehydrate_file
+from storage.codecs import COMPRESSED_SUFFIXES
+from storage.serving import etag_matches, file_response, variant_etag
+
+
+class RehydratingStaticFiles(StaticFiles):
+    """StaticFiles that rebuilds self-contained HTML from the asset store.
+
+    A path without a file of its own is served from its compressed sibling
+    (``<path>.gz`` / ``<path>.zst``), sent as stored to clients that accept
+    the encoding.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            response = await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404:
+                raise
+            encoded = await to_thread.run_sync(self._lookup_encoded, path)
+            if encoded is None:
+                raise
+            media_type = guess_type(path)[0] or "application/octet-stream"
+            return await to_thread.run_sync(file_response, encoded, Headers(scope=scope), media_type)
+
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+        # The rebuilt page is its own representation; skip rebuilding it for a cached copy
+        etag = variant_etag(response.headers["etag"], "rehydrated")
+        if etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        content = await to_thread.run_sync(rehydrate_file, response.path, get_settings())
+        if content is None:
+            return response
+        return Response(content, media_type=response.media_type, headers={"ETag": etag})
+
+    def _lookup_encoded(self, path: str) -> Optional[Path]:
+        for suffix in COMPRESSED_SUFFIXES:
+            full_path, stat_result = self.lookup_path(path + suffix)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                return Path(full_path)
+        return None
@@ -0,0 +1,75 @@
+"""Benchmark: paginated scandir listing vs the old rglob + get_metadata walk.
+
+Builds a synthetic tree shaped like DATA_DIR (``archives/<item>/<archiver>/
+output.*``) with ``HTBASE_BENCH_LISTING_FILES`` files (default 10,000; a
+million takes a few minutes to build), then times the first page, a page deep
+into the listing (resumed from a cursor) and a full walk, against the old
+implementation reaching the same deep page. Named ``bench_*`` so a plain
+``pytest tests`` run does not collect it::
+
+    HTBASE_BENCH_LISTING_FILES=1000000 pytest tests/benchmarks/bench_local_listing.py -q
+"""
+
+import os
+
+import pytest
+
+from storage.local_file_storage import LocalFileStorage
+
+pytest.importorskip("pytest_benchmark")
+
+FILES = int(os.environ.get("HTBASE_BENCH_LISTING_FILES", "10000"))
+ARCHIVERS = ("monolith", "singlefile", "readability", "pdf", "screenshot")
+PAGE = 1000
+
+
+@pytest.fixture(scope="module")
+def storage(tmp_path_factory):
+    root = tmp_path_factory.mktemp("listing")
+    for n in range(FILES // len(ARCHIVERS)):
+        item = root / "archives" / f"item-{n:07d}"
+        for archiver in ARCHIVERS:
+            directory = item / archiver
+            directory.mkdir(parents=True)
+            with open(directory / "output.html.gz", "wb") as f:
+                f.write(b"\x1f\x8b")
+    return LocalFileStorage(root)
+
+
+def _legacy_list(storage, prefix="", limit=None):
+    # The previous list_files: rglob, then a full get_metadata per file
+    files = []
+    for file_path in (storage.root_dir / prefix).rglob("*"):
+        if file_path.is_file():
+            files.append(storage.get_metadata(str(file_path.relative_to(storage.root_dir))))
+            if limit and len(files) >= limit:
+                break
+    return files
+
+
+@pytest.mark.benchmark(group="local-listing")
+def test_benchmark_first_page(benchmark, storage):
+    page, cursor = benchmark(storage.list_files_page, "archives/", PAGE)
+    assert len(page) == PAGE and cursor
+
+
+@pytest.mark.benchmark(group="local-listing")
+def test_benchmark_deep_page(benchmark, storage):
+    # Resume at the middle of the tree: earlier subtrees are skipped unread
+    cursor = f"archives/item-{FILES // len(ARCHIVERS) // 2:07d}/monolith/output.html.gz"
+    page, _ = benchmark(storage.list_files_page, "archives/", PAGE, cursor)
+    assert page[0].path > cursor
+
+
+@pytest.mark.benchmark(group="local-listing")
+def test_benchmark_full_walk(benchmark, storage):
+    count = benchmark.pedantic(lambda: sum(1 for _ in storage.iter_files("archives/")), rounds=1)
+    assert count == FILES // len(ARCHIVERS) * len(ARCHIVERS)
+
+
+@pytest.mark.benchmark(group="local-listing")
+def test_benchmark_legacy_deep_page(benchmark, storage):
+    # Without a cursor the only way to reach the middle is to list up to it
+    offset = FILES // 2
+    files = benchmark.pedantic(lambda: _legacy_list(storage, "archives", offset + PAGE)[offset:], rounds=1)
+    assert len(files) == PAGE
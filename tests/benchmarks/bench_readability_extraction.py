@@ -0,0 +1,78 @@
+"""Micro-benchmark: single-parse readability extraction vs the legacy engine.
+
+Runs over saved pages matched by ``HTBASE_BENCH_CORPUS`` (a glob such as
+``/data/*/monolith/output.html``) or a synthetic corpus when unset. Named
+``bench_*`` so a plain ``pytest tests`` run does not collect it::
+
+    HTBASE_BENCH_CORPUS='/data/*/monolith/output.html' pytest tests/benchmarks/bench_readability_extraction.py -q
+"""
+
+import glob
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from archivers.readability_extraction import extract_readability
+from legacy_readability import legacy_extract_readability
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _synthetic_page(i: int) -> str:
+    paragraphs = "".join(
+        f"<p>Paragraph {p} of story {i}. " + "Readable article text with several words. " * 12 + "</p>"
+        for p in range(30)
+    )
+    nav = "".join(f"<li><a href='/section/{n}'>Section {n}</a></li>" for n in range(80))
+    ld = json.dumps({"@type": "NewsArticle", "headline": f"Story {i}", "datePublished": "2024-01-01"})
+    return (
+        f"<html lang='en'><head><title>Story {i} | Example News</title>"
+        "<meta name='description' content='A synthetic story'>"
+        "<meta property='og:site_name' content='Example News'>"
+        "<meta property='og:image' content='https://example.com/i.png'>"
+        "<meta name='author' content='A. Writer'><meta name='keywords' content='a, b, c'>"
+        "<link rel='canonical' href='https://example.com/story'><link rel='icon' href='/favicon.ico'>"
+        f"<script type='application/ld+json'>{ld}</script>"
+        "<script>" + "var x = 1;" * 500 + "</script></head>"
+        f"<body><nav><ul>{nav}</ul></nav><article><h1>Story {i}</h1>{paragraphs}</article>"
+        "<footer>Copyright Example News</footer></body></html>"
+    )
+
+
+def _corpus() -> list[str]:
+    pattern = os.environ.get("HTBASE_BENCH_CORPUS")
+    if pattern:
+        pages = [Path(p).read_text(encoding="utf-8", errors="replace") for p in sorted(glob.glob(pattern))[:50]]
+        if pages:
+            return pages
+    return [_synthetic_page(i) for i in range(10)]
+
+
+CORPUS = _corpus()
+URL = "https://example.com/story"
+
+
+def _run(extract):
+    return [extract(html, URL) for html in CORPUS]
+
+
+def test_single_parse_matches_legacy_output():
+    for html in CORPUS:
+        new = extract_readability(html, URL)
+        old = legacy_extract_readability(html, URL)
+        assert new["title"] == old["title"]
+        assert new["article_html"] == old["article_html"]
+        for key in ("site_name", "description", "canonical_url", "favicon", "keywords", "language", "word_count"):
+            assert new["meta"].get(key) == old["meta"].get(key), key
+
+
+@pytest.mark.benchmark(group="readability-extraction")
+def test_benchmark_single_parse(benchmark):
+    benchmark(_run, extract_readability)
+
+
+@pytest.mark.benchmark(group="readability-extraction")
+def test_benchmark_legacy(benchmark):
+    benchmark(_run, legacy_extract_readability)
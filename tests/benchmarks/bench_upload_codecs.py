@@ -0,0 +1,87 @@
+"""Micro-benchmark: gzip -9 vs zstd (levels, long-distance matching, dictionary).
+
+Runs over saved pages matched by ``HTBASE_BENCH_CORPUS`` (a glob such as
+``/data/*/monolith/output.html``) or a synthetic corpus when unset. The stored
+size ratio of each codec is attached to the benchmark's ``extra_info``. Named
+``bench_*`` so a plain ``pytest tests`` run does not collect it::
+
+    HTBASE_BENCH_CORPUS='/data/*/monolith/output.html' pytest tests/benchmarks/bench_upload_codecs.py -q
+"""
+
+import glob
+import os
+from pathlib import Path
+
+import pytest
+
+from storage.codecs import DictionaryStore, GzipCodec, ZstdCodec
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("zstandard")
+
+
+def _synthetic_page(i: int) -> bytes:
+    nav = "".join(f"<li><a href='/section/{n}'>Section {n}</a></li>" for n in range(80))
+    paragraphs = "".join(
+        f"<p>Paragraph {p} of story {i}. " + "Readable article text with several words. " * 12 + "</p>"
+        for p in range(30)
+    )
+    return (
+        f"<html lang='en'><head><title>Story {i} | Example News</title>"
+        "<style>" + ".c{margin:0;padding:0}" * 400 + "</style></head>"
+        f"<body><nav><ul>{nav}</ul></nav><article><h1>Story {i}</h1>{paragraphs}</article>"
+        "<footer>Copyright Example News</footer></body></html>"
+    ).encode()
+
+
+def _corpus() -> list[bytes]:
+    pattern = os.environ.get("HTBASE_BENCH_CORPUS")
+    if pattern:
+        pages = [Path(p).read_bytes() for p in sorted(glob.glob(pattern))[:50]]
+        if pages:
+            return pages
+    return [_synthetic_page(i) for i in range(40)]
+
+
+CORPUS = _corpus()
+# Train on the first half, measure on the rest
+TRAIN, SAMPLE = CORPUS[: len(CORPUS) // 2], CORPUS[len(CORPUS) // 2:]
+
+
+@pytest.fixture(scope="module")
+def dictionary(tmp_path_factory):
+    store = DictionaryStore(tmp_path_factory.mktemp("dicts"))
+    store.train("bench", TRAIN, dict_size=32 * 1024)
+    return store.current("bench")
+
+
+def _run(codec):
+    return sum(len(codec.compress_bytes(page)) for page in SAMPLE)
+
+
+def _bench(benchmark, codec):
+    stored = benchmark(_run, codec)
+    original = sum(len(page) for page in SAMPLE)
+    benchmark.extra_info["ratio"] = round(original / stored, 2)
+    benchmark.extra_info["mb"] = round(original / 1e6, 2)
+
+
+@pytest.mark.benchmark(group="upload-codecs")
+def test_benchmark_gzip_9(benchmark):
+    _bench(benchmark, GzipCodec(level=9))
+
+
+@pytest.mark.benchmark(group="upload-codecs")
+@pytest.mark.parametrize("level", [3, 10, 19])
+def test_benchmark_zstd(benchmark, level):
+    _bench(benchmark, ZstdCodec(level=level))
+
+
+@pytest.mark.benchmark(group="upload-codecs")
+def test_benchmark_zstd_long_distance(benchmark):
+    _bench(benchmark, ZstdCodec(level=19, long_distance=True))
+
+
+@pytest.mark.benchmark(group="upload-codecs")
+def test_benchmark_zstd_dictionary(benchmark, dictionary):
+    _bench(benchmark, ZstdCodec(level=10, dictionary=dictionary))
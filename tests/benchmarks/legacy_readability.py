@@ -0,0 +1,75 @@
+"""Reference copy of the pre-single-parse readability extraction, for benchmarks."""
+
+from __future__ import annotations
+
+
+def legacy_extract_readability(html: str, url: str) -> dict:
+    """Multi-parse extraction the single-parse engine replaced."""
+    from readability import Document  # type: ignore
+
+    doc = Document(html)
+    title = doc.short_title() or doc.title() or ""
+    # summary() returns article HTML
+    article_html = doc.summary(html_partial=False)
+
+    # Extract metadata from DOM using lxml
+    meta: dict = {}
+    try:
+        import lxml.html as LH  # provided by readability-lxml dependency
+
+        tree = LH.fromstring(html)
+
+        def mget(names: list[tuple[str, str]]):
+            for attr, key in names:
+                val = tree.xpath(f"//meta[@{attr}='{key}']/@content")
+                if val:
+                    return val[0]
+            return None
+
+        def lget(rels: list[str]):
+            for rel in rels:
+                val = tree.xpath(f"//link[translate(@rel,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz')='{rel}']/@href")
+                if val:
+                    return val[0]
+            return None
+
+        lang = (tree.xpath("string(//html/@lang)") or "").strip().lower() or None
+        byline = mget([( "name", "author"), ("property", "article:author"), ("name", "byl")])
+        site_name = mget([( "property", "og:site_name")])
+        description = mget([("name", "description"), ("property", "og:description")])
+        published = mget([("property", "article:published_time"), ("name", "pubdate"), ("name", "date")])
+        canonical = lget(["canonical"]) or None
+        top_image = mget([("property", "og:image")]) or lget(["image_src"]) or None
+        favicon = lget(["icon"]) or lget(["shortcut icon"]) or None
+        keywords_raw = mget([("name", "keywords")])
+        keywords = [s.strip() for s in keywords_raw.split(",") if s.strip()] if keywords_raw else []
+
+        # Derive text, word counts
+        try:
+            article_tree = LH.fromstring(article_html)
+            text = article_tree.text_content().strip()
+        except Exception:
+            text = ""
+        word_count = len(text.split()) if text else 0
+        reading_time_minutes = round(word_count / 200.0, 2) if word_count else 0.0
+
+        meta = {
+            "source_url": url,
+            "title": title,
+            "byline": byline,
+            "site_name": site_name,
+            "description": description,
+            "published": published,
+            "language": lang,
+            "canonical_url": canonical,
+            "top_image": top_image,
+            "favicon": favicon,
+            "keywords": keywords,
+            "word_count": word_count,
+            "reading_time_minutes": reading_time_minutes,
+            "text": text,
+        }
+    except Exception:
+        meta = {"source_url": url, "title": title}
+
+    return {"title": title, "article_html": article_html, "meta": meta}
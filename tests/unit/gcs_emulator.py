@@ -0,0 +1,221 @@
+"""Minimal in-process GCS JSON API emulator for storage tests.
+
+Implements the subset ``google-cloud-storage`` uses here: multipart and
+resumable uploads, compose, copies, object metadata, ranged media downloads,
+deletes and bucket metadata (get/patch, for lifecycle rules). Point a client at
+it with ``STORAGE_EMULATOR_HOST``.
+
+``fail_chunks`` injects transient errors: each entry is the byte offset of
+a resumable chunk PUT that should be answered with a 503 once.
+"""
+
+import base64
+import email.parser
+import email.policy
+import hashlib
+import itertools
+import json
+import re
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import google_crc32c
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode()
+
+
+class GcsEmulator:
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+        self.sessions: dict[str, dict] = {}
+        self.chunk_puts: list[tuple[str, int, int]] = []  # (object name, start, length)
+        self.fail_chunks: set[int] = set()
+        self.composed: list[list[str]] = []  # source names of each compose request
+        self.copied: list[tuple[str, str]] = []  # (source, destination) of each server-side copy
+        self.buckets: dict[str, dict] = {}  # bucket resources, created on first access
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "GcsEmulator":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def bucket(self, name: str) -> dict:
+        with self.lock:
+            return self.buckets.setdefault(name, {"kind": "storage#bucket", "name": name, "metageneration": "1"})
+
+    def data(self, name: str) -> bytes:
+        return self.objects[name]["data"]
+
+    def store(self, bucket: str, name: str, data: bytes, resource: dict) -> dict:
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        generation = str(next(self._ids))
+        obj = {
+            "kind": "storage#object",
+            "id": f"{bucket}/{name}/{generation}",
+            "bucket": bucket,
+            "name": name,
+            "generation": generation,
+            "metageneration": "1",
+            "contentType": resource.get("contentType") or "application/octet-stream",
+            "metadata": resource.get("metadata") or {},
+            "size": str(len(data)),
+            "crc32c": _b64(google_crc32c.value(data).to_bytes(4, "big")),
+            "md5Hash": _b64(hashlib.md5(data).digest()),
+            "storageClass": resource.get("storageClass") or "STANDARD",
+            "timeCreated": now,
+            "updated": now,
+        }
+        with self.lock:
+            self.objects[name] = {"data": data, "resource": obj}
+        return obj
+
+    def _handler(self):
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _send(self, status, payload=None, headers=None, raw=None):
+                body = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else b"")
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                match = re.match(r"^(?:/upload|/download)?/storage/v1/b/([^/]+)/o(?:/(.+))?$", parsed.path)
+                if not match:
+                    return None, None, None, query
+                name = unquote(match.group(2)) if match.group(2) else None
+                return parsed.path, match.group(1), name, query
+
+            def _bucket_route(self):
+                match = re.match(r"^/storage/v1/b/([^/]+)$", urlparse(self.path).path)
+                return match.group(1) if match else None
+
+            def do_GET(self):
+                bucket_name = self._bucket_route()
+                if bucket_name:
+                    return self._send(200, emulator.bucket(bucket_name))
+                path, bucket, name, query = self._route()
+                obj = emulator.objects.get(name) if name else None
+                if obj is None:
+                    return self._send(404, {"error": {"code": 404, "message": "Not Found"}})
+                if query.get("alt") != "media":
+                    return self._send(200, obj["resource"])
+                data = obj["data"]
+                range_header = self.headers.get("Range")
+                if not range_header:
+                    return self._send(200, raw=data)
+                start, _, end = range_header.split("=", 1)[1].partition("-")
+                start = int(start)
+                end = min(int(end) if end else len(data) - 1, len(data) - 1)
+                if start >= len(data):
+                    return self._send(416, {"error": {"code": 416, "message": "Range Not Satisfiable"}})
+                return self._send(
+                    206,
+                    raw=data[start:end + 1],
+                    headers={"Content-Range": f"bytes {start}-{end}/{len(data)}"},
+                )
+
+            def do_DELETE(self):
+                _, _, name, _ = self._route()
+                with emulator.lock:
+                    found = emulator.objects.pop(name, None)
+                self._send(204 if found else 404)
+
+            def do_POST(self):
+                path, bucket, name, query = self._route()
+                body = self._body()
+                if path is None:
+                    return self._send(404, {"error": {"code": 404, "message": "Not Found"}})
+                if name and name.endswith("/compose"):
+                    request = json.loads(body)
+                    data = b"".join(emulator.data(source["name"]) for source in request["sourceObjects"])
+                    emulator.composed.append([source["name"] for source in request["sourceObjects"]])
+                    return self._send(200, emulator.store(bucket, name[: -len("/compose")], data, request["destination"]))
+                copy = re.match(r"^(.+?)/copyTo/b/([^/]+)/o/(.+)$", name or "")
+                if copy:
+                    source = emulator.objects.get(copy.group(1))
+                    if source is None:
+                        return self._send(404, {"error": {"code": 404, "message": "Not Found"}})
+                    emulator.copied.append((copy.group(1), copy.group(3)))
+                    return self._send(200, emulator.store(copy.group(2), copy.group(3), source["data"], source["resource"]))
+                if query.get("uploadType") == "multipart":
+                    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                        b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+                    )
+                    meta_part, data_part = list(message.iter_parts())
+                    resource = json.loads(meta_part.get_payload(decode=True))
+                    data = data_part.get_payload(decode=True)
+                    return self._send(200, emulator.store(bucket, resource["name"], data, resource))
+                if query.get("uploadType") == "resumable":
+                    resource = json.loads(body or b"{}")
+                    resource.setdefault("name", query.get("name"))
+                    session = str(next(emulator._ids))
+                    emulator.sessions[session] = {"bucket": bucket, "resource": resource, "data": bytearray()}
+                    location = f"{emulator.url}{path}?uploadType=resumable&upload_id={session}"
+                    return self._send(200, {}, headers={"Location": location})
+                return self._send(400, {"error": {"code": 400, "message": "Unsupported request"}})
+
+            def do_PATCH(self):
+                bucket_name = self._bucket_route()
+                if not bucket_name:
+                    return self._send(400, {"error": {"code": 400, "message": "Unsupported request"}})
+                resource = emulator.bucket(bucket_name)
+                with emulator.lock:
+                    resource.update(json.loads(self._body() or b"{}"))
+                return self._send(200, resource)
+
+            def do_PUT(self):
+                _, _, _, query = self._route()
+                session = emulator.sessions.get(query.get("upload_id", ""))
+                body = self._body()
+                if session is None:
+                    return self._send(404, {"error": {"code": 404, "message": "No such upload"}})
+                data = session["data"]
+                match = re.match(r"bytes (\*|(\d+)-(\d+))/(\*|\d+)", self.headers.get("Content-Range", ""))
+                if match and match.group(2) is not None:
+                    start = int(match.group(2))
+                    if start in emulator.fail_chunks:
+                        emulator.fail_chunks.discard(start)
+                        return self._send(503, {"error": {"code": 503, "message": "Backend Error"}})
+                    if start != len(data):
+                        return self._send(400, {"error": {"code": 400, "message": "Out of order chunk"}})
+                    data.extend(body)
+                    emulator.chunk_puts.append((session["resource"]["name"], start, len(body)))
+                total = match.group(4) if match else "*"
+                if total != "*" and int(total) == len(data):
+                    resource = session["resource"]
+                    return self._send(200, emulator.store(session["bucket"], resource["name"], bytes(data), resource))
+                headers = {"Range": f"bytes=0-{len(data) - 1}"} if data else {}
+                return self._send(308, headers=headers)
+
+        return Handler
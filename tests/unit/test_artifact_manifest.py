@@ -0,0 +1,85 @@
+import hashlib
+
+from archivers.pdf import PDFArchiver
+from core.config import AppSettings
+from core.metrics import MetricsRegistry
+from models import ArchiveResult
+from storage.artifact_manifest import ArtifactManifest
+
+
+def _write(root, rel, content=b"data"):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def _manifest(root):
+    return ArtifactManifest(root, metrics=MetricsRegistry())
+
+
+def test_reconcile_indexes_outputs_and_drops_vanished(tmp_path):
+    kept = _write(tmp_path, "item-a/monolith/output.html")
+    gone = _write(tmp_path, "item-b/pdf/output.pdf")
+    _write(tmp_path, "item-a/monolith/.source-dom.html")
+    _write(tmp_path, "asset-store/ab/abcdef")
+    manifest = _manifest(tmp_path)
+
+    assert manifest.reconcile() == {"added": 2, "updated": 0, "removed": 0}
+    assert manifest.ready and manifest.contains(kept) and len(manifest) == 2
+
+    gone.unlink()
+    assert manifest.reconcile()["removed"] == 1
+    assert not manifest.contains(gone)
+
+
+def test_find_output_prefers_standard_then_numbered(tmp_path):
+    _write(tmp_path, "item/monolith/output (2).html")
+    _write(tmp_path, "item/monolith/output.html", b"")
+    manifest = _manifest(tmp_path)
+    manifest.reconcile()
+
+    entry = manifest.find_output("item", "monolith", "html")
+    assert entry is not None and entry.path == "item/monolith/output (2).html"
+    assert manifest.find_output("item", "pdf", "pdf") is None
+
+
+def test_journal_replays_records_and_deletes(tmp_path):
+    output = _write(tmp_path, "item/readability/output.html", b"<html/>")
+    _write(tmp_path, "item/readability/output.json")
+    manifest = _manifest(tmp_path)
+    manifest.record_dir(output.parent)
+    manifest.remove_path(output.parent / "output.json")
+
+    reloaded = _manifest(tmp_path)
+    entry = reloaded.get(output)
+
+    assert entry is not None and entry.sha256 == hashlib.sha256(b"<html/>").hexdigest()
+    assert not reloaded.contains(output.parent / "output.json")
+
+
+def test_compaction_keeps_the_live_set(tmp_path, monkeypatch):
+    monkeypatch.setattr("storage.artifact_manifest._COMPACT_MIN_LINES", 5)
+    output = _write(tmp_path, "item/pdf/output.pdf")
+    manifest = _manifest(tmp_path)
+    for _ in range(20):
+        manifest.record_dir(output.parent, hash_files=False)
+
+    assert len(manifest.journal_path.read_text().splitlines()) <= 6
+    assert _manifest(tmp_path).contains(output)
+
+
+def test_archiver_uses_manifest_once_ready(tmp_path):
+    archiver = PDFArchiver(None, AppSettings(DATA_DIR=tmp_path))
+    archiver.artifact_manifest = manifest = _manifest(tmp_path)
+    manifest.reconcile()
+    output = _write(tmp_path, "item/pdf/output.pdf")
+
+    # Not recorded yet: the manifest answers, so no disk probe finds it
+    assert archiver.has_existing_output("item") is None
+    assert not archiver.output_exists(output)
+
+    result = archiver.postprocess_output(ArchiveResult(success=True, exit_code=0, saved_path=str(output)), "item")
+    assert result.size_bytes == len(b"data")
+    assert archiver.has_existing_output("item") == output
+    assert archiver.output_exists(output)
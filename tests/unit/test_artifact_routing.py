@@ -0,0 +1,175 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import saves
+from core.config import AppSettings, get_settings
+from db.models import ArchiveArtifact
+from db.repositories import _set_storage_uploads
+from storage.asset_store import AssetStore
+from storage.codecs import GzipCodec
+from storage.local_file_storage import LocalFileStorage
+
+PAGE = b"<html><body>" + b"<p>stored page</p>" * 500 + b"</body></html>"
+
+
+class CountingStorage(LocalFileStorage):
+    """Local storage that records every ``exists`` lookup."""
+
+    def __init__(self, root_dir, name="local", signed=False):
+        super().__init__(root_dir)
+        self.name = name
+        self.signed = signed
+        self.lookups = []
+
+    def exists(self, storage_path):
+        self.lookups.append(storage_path)
+        return super().exists(storage_path)
+
+    def generate_access_url(self, storage_path, expiration=None):
+        return f"https://signed.example/{storage_path}?ttl={int(expiration.total_seconds())}"
+
+    @property
+    def provider_name(self):
+        return self.name
+
+    @property
+    def supports_signed_urls(self):
+        return self.signed
+
+
+def _artifact(settings, archiver, filename, uploads=None, asset_dedup=False):
+    saved_path = settings.data_dir / "item-1" / archiver / filename
+    return SimpleNamespace(
+        id=1,
+        archiver=archiver,
+        success=True,
+        saved_path=str(saved_path),
+        storage_uploads=uploads,
+        asset_dedup=asset_dedup,
+    )
+
+
+def _upload(provider, storage_path, codec="gzip", index=0):
+    return {
+        "provider_name": provider,
+        "provider_index": index,
+        "storage_path": storage_path,
+        "codec": codec,
+        "success": True,
+    }
+
+
+def _client(monkeypatch, settings, providers, artifacts):
+    app = FastAPI()
+    app.include_router(saves.router)
+    app.state.file_storage_providers = providers
+    app.dependency_overrides[get_settings] = lambda: settings
+    monkeypatch.setattr(saves, "_collect_existing_artifacts", lambda **_: artifacts)
+    return TestClient(app)
+
+
+def test_recorded_upload_is_read_without_lookups(tmp_path, monkeypatch):
+    settings = AppSettings(DATA_DIR=tmp_path / "data")
+    storage = CountingStorage(tmp_path / "bucket")
+    source = tmp_path / "output.html"
+    source.write_bytes(PAGE)
+    storage.upload_file(source, "archives/item-1/monolith/output.html", codec=GzipCodec())
+    other = CountingStorage(tmp_path / "other", name="gcs")
+    artifact = _artifact(settings, "monolith", "output.html", [
+        {"provider_name": "gcs", "provider_index": 0, "success": False, "error": "timed out"},
+        _upload("local", "archives/item-1/monolith/output.html.gz", index=1),
+    ])
+    client = _client(monkeypatch, settings, [other, storage], [artifact])
+
+    response = client.post(
+        "/archive/retrieve",
+        json={"id": "item-1", "archiver": "monolith"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == PAGE
+    assert storage.lookups == [] and other.lookups == []
+
+
+def test_only_recorded_dedup_outputs_are_rehydrated(tmp_path, monkeypatch):
+    settings = AppSettings(DATA_DIR=tmp_path / "data")
+    font = b"\x00font" * 2000
+    original = b"<html><style>@font-face{src:url(data:font/woff2;base64," + base64.b64encode(font) + b")}</style></html>"
+    source = tmp_path / "output.html"
+    source.write_bytes(original)
+    AssetStore(settings.resolved_asset_store_dir).dedupe_file(source)
+    storage = CountingStorage(tmp_path / "bucket")
+    storage.upload_file(source, "archives/item-1/monolith/output.html", codec=GzipCodec())
+    uploads = [_upload("local", "archives/item-1/monolith/output.html.gz")]
+    opened = []
+    get_file_stream = storage.get_file_stream
+    monkeypatch.setattr(storage, "get_file_stream", lambda path: opened.append(path) or get_file_stream(path))
+
+    plain = _client(monkeypatch, settings, [storage], [_artifact(settings, "monolith", "output.html", uploads)])
+    response = plain.post("/archive/retrieve", json={"id": "item-1", "archiver": "monolith"})
+    assert response.content == source.read_bytes() and opened == []
+
+    deduped = _artifact(settings, "monolith", "output.html", uploads, asset_dedup=True)
+    client = _client(monkeypatch, settings, [storage], [deduped])
+    response = client.post("/archive/retrieve", json={"id": "item-1", "archiver": "monolith"})
+    assert response.content == original
+
+
+def test_recorded_uploads_route_by_provider_position(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path / "data")
+    first, second = CountingStorage(tmp_path / "a"), CountingStorage(tmp_path / "b")
+    artifact = _artifact(settings, "pdf", "output.pdf", [
+        _upload("local", "archives/item-1/pdf/output.pdf.gz", index=1),
+        _upload("gcs", "archives/item-1/pdf/output.pdf.gz", index=0),  # provider reconfigured since
+    ])
+
+    locations = list(saves._artifact_locations(artifact, [first, second], settings))
+
+    assert [provider for provider, _, _ in locations] == [second]
+
+
+def test_legacy_rows_find_the_compressed_key(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path / "data")
+    storage = CountingStorage(tmp_path / "bucket")
+    source = tmp_path / "output.html"
+    source.write_bytes(PAGE)
+    storage.upload_file(source, "archives/item-1/monolith/output.html", codec=GzipCodec())
+
+    locations = list(saves._artifact_locations(_artifact(settings, "monolith", "output.html"), [storage], settings))
+
+    assert [(p, key) for p, key, _ in locations] == [(storage, "archives/item-1/monolith/output.html.gz")]
+
+
+def test_signed_redirect_only_for_objects_served_as_stored(tmp_path, monkeypatch):
+    settings = AppSettings(DATA_DIR=tmp_path / "data", RETRIEVE_SIGNED_REDIRECTS=True)
+    storage = CountingStorage(tmp_path / "bucket", name="gcs", signed=True)
+    pdf = _artifact(settings, "pdf", "output.pdf", [_upload("gcs", "archives/item-1/pdf/output.pdf", codec=None)])
+    client = _client(monkeypatch, settings, [storage], [pdf])
+
+    response = client.post(
+        "/archive/retrieve", json={"id": "item-1", "archiver": "pdf"}, follow_redirects=False
+    )
+    assert response.status_code == 307
+    assert response.headers["location"] == "https://signed.example/archives/item-1/pdf/output.pdf?ttl=900"
+
+    # Compressed objects still stream through the API (a signed URL cannot add Content-Encoding)
+    assert not saves._can_redirect(
+        storage, _upload("gcs", "archives/item-1/pdf/output.pdf.gz"), "application/pdf", settings
+    )
+
+
+def test_upload_results_are_stored_as_json():
+    art = ArchiveArtifact()
+    _set_storage_uploads(art, [
+        {**_upload("gcs", "a.html.gz"), "uploaded_at": datetime(2024, 1, 2)},
+        {"provider_name": "local", "success": False},
+    ])
+
+    assert art.storage_uploads[0]["uploaded_at"] == "2024-01-02 00:00:00"
+    assert art.uploaded_to_storage and not art.all_uploads_succeeded
@@ -0,0 +1,238 @@
+import base64
+import hashlib
+import socket
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from core.asset_cache import AssetCache, freshness_lifetime, is_cacheable
+from core.asset_proxy import AssetProxy
+from core.metrics import MetricsRegistry
+
+CSS_HEADERS = {"content-type": "text/css", "cache-control": "max-age=600", "etag": '"v1"'}
+
+
+def _cache(tmp_path, **kwargs):
+    kwargs.setdefault("max_bytes", 1024 * 1024)
+    return AssetCache(tmp_path / "cache", metrics=MetricsRegistry(), **kwargs)
+
+
+def test_identical_bodies_share_one_blob(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("https://a.example/logo.png", {"content-type": "image/png"}, b"same-bytes")
+    cache.put("https://b.example/logo.png", {"content-type": "image/png"}, b"same-bytes")
+
+    assert len(cache) == 2
+    assert cache.total_bytes == len(b"same-bytes")
+    assert len(list((tmp_path / "cache" / "blobs").rglob("*"))) == 2  # one shard dir + one blob
+
+
+def test_lru_eviction_by_total_size(tmp_path):
+    cache = _cache(tmp_path, max_bytes=250, max_object_bytes=100)
+    cache.put("https://x/1.js", {}, b"1" * 100)
+    cache.put("https://x/2.js", {}, b"2" * 100)
+    cache.get("https://x/1.js")  # 1 is now more recently used than 2
+    cache.put("https://x/3.js", {}, b"3" * 100)
+
+    assert cache.get("https://x/2.js") is None
+    assert cache.get("https://x/1.js") is not None
+    assert cache.total_bytes == 200
+    assert cache.metrics.get("asset_cache_evictions_total") == 1
+
+
+def test_index_survives_restart(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("https://x/app.css", CSS_HEADERS, b"body{}")
+    cache.flush()
+
+    reloaded = _cache(tmp_path)
+    entry = reloaded.get("https://x/app.css")
+
+    assert entry is not None and entry.etag == '"v1"'
+    assert reloaded.read(entry) == b"body{}"
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+
+def test_freshness_and_cacheability_rules():
+    assert freshness_lifetime({"cache-control": "public, max-age=60"}, 0) == 60
+    assert freshness_lifetime({"cache-control": "no-cache, max-age=60"}, 0) == 0
+    assert is_cacheable(200, {"content-type": "font/woff2"})
+    assert not is_cacheable(200, {"content-type": "text/html; charset=utf-8"})
+    assert not is_cacheable(200, {"content-type": "text/css", "cache-control": "no-store"})
+    assert not is_cacheable(206, {"content-type": "image/png"})
+
+
+def test_credentialed_requests_are_not_shared_by_default():
+    css = {"content-type": "text/css", "cache-control": "max-age=600"}
+
+    assert not is_cacheable(200, css, {"Cookie": "session=1"})
+    assert not is_cacheable(200, css, {"Authorization": "Bearer t"})
+    assert is_cacheable(200, {**css, "cache-control": "public, max-age=600"}, {"Cookie": "session=1"})
+    assert is_cacheable(200, {**css, "cache-control": "s-maxage=600"}, {"Authorization": "Bearer t"})
+
+
+def test_entries_only_match_their_vary_headers(tmp_path):
+    cache = _cache(tmp_path)
+    headers = {"content-type": "image/webp", "vary": "Accept"}
+    cache.put("https://x/logo", headers, b"webp", {"Accept": "image/webp"})
+
+    assert cache.get("https://x/logo", {"accept": "image/webp"}) is not None
+    assert cache.get("https://x/logo", {"Accept": "image/png"}) is None
+    assert cache.get("https://x/logo") is None
+
+    cache.flush()
+    assert _cache(tmp_path).get("https://x/logo", {"Accept": "image/webp"}).vary == {"accept": "image/webp"}
+
+
+class _Origin(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list = []
+    release = threading.Event()
+
+    def do_GET(self):
+        _Origin.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/slow.html":
+            # Half the page now, the rest once the test has seen the first half
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "2000")
+            self.end_headers()
+            self.wfile.write(b"a" * 1000)
+            self.wfile.flush()
+            _Origin.release.wait(5)
+            self.wfile.write(b"b" * 1000)
+            return
+        if self.path == "/stale.css" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"body{color:red}"
+        if self.path == "/vary.css":
+            body = f"/* {self.headers.get('Accept')} */".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/css")
+        if self.path == "/vary.css":
+            self.send_header("Vary", "Accept")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Cache-Control", "max-age=0" if self.path == "/stale.css" else "max-age=600")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    _Origin.requests = []
+    _Origin.release = threading.Event()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Origin)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    proxy = AssetProxy(_cache(tmp_path), port=0)
+    proxy.start()
+    yield proxy
+    proxy.stop()
+
+
+def test_proxy_serves_repeat_requests_from_cache(origin, proxy):
+    with httpx.Client(proxy=proxy.url) as client:
+        first = client.get(f"{origin}/app.css")
+        second = client.get(f"{origin}/app.css")
+
+    assert first.content == second.content == b"body{color:red}"
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert len(_Origin.requests) == 1
+    metrics = proxy.cache.metrics
+    assert metrics.get("asset_cache_requests_total", result="miss") == 1
+    assert metrics.get("asset_cache_requests_total", result="hit") == 1
+
+
+def test_proxy_keeps_variants_and_credentialed_responses_apart(origin, proxy):
+    with httpx.Client(proxy=proxy.url) as client:
+        css = client.get(f"{origin}/vary.css", headers={"Accept": "text/css"})
+        other = client.get(f"{origin}/vary.css", headers={"Accept": "*/*"})
+        again = client.get(f"{origin}/vary.css", headers={"Accept": "*/*"})
+        client.get(f"{origin}/app.css", headers={"Cookie": "session=1"})
+        client.get(f"{origin}/app.css", headers={"Cookie": "session=2"})
+
+    assert css.content == b"/* text/css */"
+    assert other.content == again.content == b"/* */* */"
+    assert (other.headers["x-cache"], again.headers["x-cache"]) == ("MISS", "HIT")
+    assert [path for path, _ in _Origin.requests].count("/app.css") == 2
+
+
+def test_proxy_streams_uncacheable_responses_without_buffering(origin, proxy):
+    with httpx.Client(proxy=proxy.url) as client:
+        started = time.monotonic()
+        with client.stream("GET", f"{origin}/slow.html") as response:
+            body = response.iter_raw()
+            first = next(body)
+            waited = time.monotonic() - started
+            _Origin.release.set()
+            rest = b"".join(body)
+
+    assert waited < 2  # relayed before the origin finished the body
+    assert first + rest == b"a" * 1000 + b"b" * 1000
+    # Counted once the relay finishes, just after the client has the last chunk
+    deadline = time.monotonic() + 2
+    while not proxy.cache.metrics.get("asset_cache_requests_total", result="uncacheable") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert proxy.cache.metrics.get("asset_cache_requests_total", result="uncacheable") == 1
+
+
+def test_proxy_revalidates_stale_entries_with_validators(origin, proxy):
+    with httpx.Client(proxy=proxy.url) as client:
+        client.get(f"{origin}/stale.css")
+        again = client.get(f"{origin}/stale.css")
+
+    assert again.content == b"body{color:red}"
+    assert _Origin.requests[-1] == ("/stale.css", '"v1"')
+    assert proxy.cache.metrics.get("asset_cache_requests_total", result="revalidated") == 1
+
+
+def test_proxy_refetches_when_a_revalidated_body_is_gone(origin, proxy):
+    with httpx.Client(proxy=proxy.url) as client:
+        client.get(f"{origin}/stale.css")
+        for blob in (proxy.cache.root / "blobs").rglob("*"):
+            if blob.is_file():
+                blob.unlink()
+        again = client.get(f"{origin}/stale.css")
+
+    assert again.status_code == 200 and again.content == b"body{color:red}"
+    assert _Origin.requests[-2:] == [("/stale.css", '"v1"'), ("/stale.css", None)]
+
+
+def test_connect_tunnel_presents_cert_with_pinned_spki(proxy):
+    with socket.create_connection((proxy.host, proxy.port), timeout=5) as sock:
+        sock.sendall(b"CONNECT example.com:443 HTTP/1.1\r\nHost: example.com:443\r\n\r\n")
+        assert sock.recv(1024).startswith(b"HTTP/1.1 200")
+
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        with context.wrap_socket(sock, server_hostname="example.com") as tls:
+            der = tls.getpeercert(binary_form=True)
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import serialization
+
+    spki = x509.load_der_x509_certificate(der).public_key().public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    assert base64.b64encode(hashlib.sha256(spki).digest()).decode() == proxy.spki_hash
+    assert f"--ignore-certificate-errors-spki-list={proxy.spki_hash}" in proxy.chromium_args()
@@ -0,0 +1,104 @@
+import base64
+import io
+import os
+
+import pytest
+
+from archivers.monolith import MonolithArchiver
+from core.config import AppSettings
+from core.metrics import MetricsRegistry
+from models import ArchiveResult
+from storage.asset_store import AssetStore, is_deduplicated, rehydrate_file
+
+FONT = os.urandom(8192)
+LOGO = os.urandom(6000)
+
+
+def _page(*assets: tuple[str, bytes]) -> bytes:
+    parts = [b"<html><head><style>"]
+    for mime, payload in assets:
+        parts.append(b"@font-face{src:url(data:" + mime.encode() + b";base64," + base64.b64encode(payload) + b")}")
+    parts.append(b"</style></head><body><img src=\"data:image/gif;base64,R0lGODlhAQABAAAAACw=\"></body></html>")
+    return b"".join(parts)
+
+
+def _store(tmp_path, **kwargs):
+    return AssetStore(tmp_path / "store", metrics=MetricsRegistry(), **kwargs)
+
+
+def test_extract_and_rehydrate_round_trip_exactly(tmp_path):
+    store = _store(tmp_path)
+    original = _page(("font/woff2", FONT), ("image/png;charset=binary", LOGO))
+
+    rewritten, result = store.extract(original)
+
+    assert result.assets == 2
+    assert len(rewritten) < len(original) - len(FONT)
+    assert b"data:font/woff2;htbase-cas=" in rewritten
+    assert b"R0lGODlhAQABAAAAACw=" in rewritten  # below the threshold, left inline
+    assert store.rehydrate(rewritten) == original
+
+
+def test_repeated_assets_share_one_blob(tmp_path):
+    store = _store(tmp_path)
+    _, first = store.extract(_page(("font/woff2", FONT)))
+    _, second = store.extract(_page(("font/woff2", FONT)))
+
+    assert len(first.new_digests) == 1 and second.new_digests == []
+    assert len([p for p in (tmp_path / "store").rglob("*") if p.is_file()]) == 1
+    assert store.metrics.get("asset_store_assets_total", result="existing") == 1
+
+
+def test_missing_blobs_use_fetch_fallback(tmp_path):
+    store = _store(tmp_path)
+    original = _page(("font/woff2", FONT))
+    rewritten, result = store.extract(original)
+    digest = result.new_digests[0]
+    store.blob_path(digest).unlink()
+
+    with pytest.raises(FileNotFoundError):
+        store.rehydrate(rewritten)
+    assert store.rehydrate(rewritten, fetch=lambda d: FONT if d == digest else None) == original
+    assert store.read_blob(digest) == FONT
+
+
+def test_postprocess_output_dedupes_saved_file(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path, ASSET_DEDUP=True)
+    archiver = MonolithArchiver(None, settings)
+    output = tmp_path / "item" / "monolith" / "output.html"
+    output.parent.mkdir(parents=True)
+    original = _page(("font/woff2", FONT))
+    output.write_bytes(original)
+
+    result = archiver.postprocess_output(
+        ArchiveResult(success=True, exit_code=0, saved_path=str(output)), "item"
+    )
+
+    assert result.metadata["asset_dedup"]["assets"] == 1
+    assert is_deduplicated(output)
+    assert rehydrate_file(output, settings) == original
+
+
+class _Provider:
+    provider_name = "fake"
+
+    def __init__(self, files):
+        self.files = files
+
+    def get_file_stream(self, path):
+        return io.BytesIO(self.files[path])
+
+
+def test_rehydrate_file_fetches_from_providers(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path)
+    store = AssetStore(settings.resolved_asset_store_dir, metrics=MetricsRegistry())
+    original = _page(("font/woff2", FONT))
+    output = tmp_path / "output.html"
+    output.write_bytes(original)
+    digest = store.dedupe_file(output).new_digests[0]
+    store.blob_path(digest).unlink()
+
+    provider = _Provider({f"assets/{digest[:2]}/{digest}": FONT})
+
+    assert rehydrate_file(output, settings, [provider]) == original
+    assert rehydrate_file(tmp_path / "missing.pdf", settings) is None
@@ -0,0 +1,127 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from core.metrics import MetricsRegistry
+from storage.caching_file_storage import CachingFileStorage
+from storage.codecs import GzipCodec
+from storage.local_file_storage import LocalFileStorage
+
+
+class SlowRemote(LocalFileStorage):
+    """Local storage standing in for GCS, counting (slow) downloads."""
+
+    def __init__(self, root_dir, delay=0.0):
+        super().__init__(root_dir)
+        self.delay = delay
+        self.downloads = []
+        self._count_lock = threading.Lock()
+
+    def download_file(self, storage_path, local_path, decompress=True):
+        with self._count_lock:
+            self.downloads.append(storage_path)
+        time.sleep(self.delay)
+        return super().download_file(storage_path, local_path, decompress)
+
+    @property
+    def provider_name(self):
+        return "gcs"
+
+
+def _remote(tmp_path, delay=0.0, objects=("a",), size=1000):
+    remote = SlowRemote(tmp_path / "remote", delay)
+    for name in objects:
+        path = tmp_path / f"{name}.html"
+        path.write_bytes(name.encode() * size)
+        remote.upload_file(path, f"archives/{name}/monolith/output.html", compress=False)
+    return remote
+
+
+def test_reads_are_served_from_local_copy_after_first_fetch(tmp_path):
+    remote = _remote(tmp_path)
+    metrics = MetricsRegistry()
+    cache = CachingFileStorage(remote, tmp_path / "cache", max_bytes=10_000, metrics=metrics)
+    path = "archives/a/monolith/output.html"
+
+    for _ in range(3):
+        with cache.get_file_stream(path) as stream:
+            assert stream.read() == b"a" * 1000
+
+    assert remote.downloads == [path]
+    assert metrics.get("artifact_cache_requests_total", result="miss") == 1
+    assert metrics.get("artifact_cache_requests_total", result="hit") == 2
+    assert cache.exists(path) and cache.provider_name == "gcs"
+    assert (tmp_path / "cache" / path).read_bytes() == b"a" * 1000
+
+
+def test_concurrent_misses_share_one_download(tmp_path):
+    remote = _remote(tmp_path, delay=0.3)
+    metrics = MetricsRegistry()
+    cache = CachingFileStorage(remote, tmp_path / "cache", max_bytes=10_000, metrics=metrics)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        paths = list(pool.map(lambda _: cache.cached_path("archives/a/monolith/output.html"), range(6)))
+
+    assert len(remote.downloads) == 1
+    assert len(set(paths)) == 1 and paths[0].exists()
+    assert metrics.get("artifact_cache_requests_total", result="wait") == 5
+
+
+def test_least_recently_used_objects_are_evicted(tmp_path):
+    remote = _remote(tmp_path, objects=("a", "b", "c"))
+    metrics = MetricsRegistry()
+    cache = CachingFileStorage(remote, tmp_path / "cache", max_bytes=2500, max_object_bytes=1000, metrics=metrics)
+    path = "archives/{}/monolith/output.html".format
+
+    cache.cached_path(path("a"))
+    cache.cached_path(path("b"))
+    cache.cached_path(path("a"))  # a is now the most recently used
+    cache.cached_path(path("c"))
+
+    assert cache.total_bytes == 2000
+    assert not (tmp_path / "cache" / path("b")).exists()
+    assert (tmp_path / "cache" / path("a")).exists()
+    assert metrics.get("artifact_cache_evictions_total") == 1
+
+    # A restart picks the cached copies back up
+    reloaded = CachingFileStorage(remote, tmp_path / "cache", max_bytes=2500, max_object_bytes=1000)
+    assert reloaded.total_bytes == 2000
+
+
+def test_oversized_objects_bypass_the_cache(tmp_path):
+    remote = _remote(tmp_path, size=5000)
+    cache = CachingFileStorage(remote, tmp_path / "cache", max_bytes=10_000, max_object_bytes=4000)
+    path = "archives/a/monolith/output.html"
+
+    assert cache.cached_path(path) is None
+    with cache.get_file_stream(path) as stream:
+        assert stream.read() == b"a" * 5000
+    assert remote.downloads == [path]  # tried once, then read straight through
+
+
+def test_upload_replaces_cached_copy_and_serve_uses_it(tmp_path):
+    remote = _remote(tmp_path)
+    cache = CachingFileStorage(remote, tmp_path / "cache", max_bytes=10_000)
+    source = tmp_path / "page.html"
+    source.write_bytes(b"<html>v1</html>" * 100)
+    cache.upload_file(source, "archives/x/monolith/output.html", codec=GzipCodec())
+    stored = "archives/x/monolith/output.html.gz"
+    assert cache.cached_path(stored) is not None
+
+    source.write_bytes(b"<html>v2</html>" * 100)
+    cache.upload_file(source, "archives/x/monolith/output.html", codec=GzipCodec())
+    assert not (tmp_path / "cache" / stored).exists()
+
+    app = FastAPI()
+
+    @app.get("/f")
+    def serve(request: Request):
+        return cache.serve_file(stored, "x.html", "text/html", request_headers=request.headers)
+
+    response = TestClient(app).get("/f", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"<html>v2</html>" * 100
+    assert remote.downloads.count(stored) == 2
@@ -0,0 +1,146 @@
+import stat
+import sys
+import textwrap
+
+from core.chromium_readiness import ChromiumPageLoader, ReadinessTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _tracker(clock, **overrides):
+    params = dict(network_idle_ms=500, dom_stable_ms=300, max_inflight=0, clock=clock)
+    params.update(overrides)
+    return ReadinessTracker(**params)
+
+
+def test_tracker_requires_load_event_and_dom_sample():
+    clock = FakeClock()
+    tracker = _tracker(clock)
+    clock.advance(1.0)
+    assert not tracker.is_ready()
+
+    tracker.load_fired()
+    assert not tracker.is_ready()  # no DOM sample yet
+
+    tracker.dom_quiet_for(1000)
+    assert tracker.is_ready()
+
+
+def test_tracker_waits_for_network_idle_window():
+    clock = FakeClock()
+    tracker = _tracker(clock)
+    tracker.load_fired()
+    tracker.request_started("a")
+    clock.advance(2.0)
+    tracker.dom_quiet_for(2000)
+    assert not tracker.is_ready()
+
+    tracker.request_finished("a")
+    clock.advance(0.4)
+    assert not tracker.is_ready()
+    clock.advance(0.2)
+    assert tracker.is_ready()
+
+
+def test_tracker_tolerates_long_lived_requests_up_to_max_inflight():
+    clock = FakeClock()
+    tracker = _tracker(clock, max_inflight=1)
+    tracker.load_fired()
+    tracker.request_started("analytics-beacon")
+    clock.advance(1.0)
+    tracker.dom_quiet_for(1000)
+    assert tracker.is_ready()
+    assert tracker.inflight == 1
+
+
+def test_tracker_resets_on_dom_mutation():
+    clock = FakeClock()
+    tracker = _tracker(clock)
+    tracker.load_fired()
+    clock.advance(1.0)
+    tracker.dom_quiet_for(50)
+    assert not tracker.is_ready()
+    clock.advance(0.3)
+    assert tracker.is_ready()
+
+
+def test_tracker_counts_redirect_chain_once():
+    tracker = _tracker(FakeClock())
+    tracker.request_started("r1")
+    tracker.request_started("r1")
+    assert tracker.requests_seen == 1
+
+
+FAKE_BROWSER = textwrap.dedent(
+    """
+    import json, os
+
+    def send(msg):
+        os.write(4, json.dumps(msg).encode() + b"\\0")
+
+    buf = b""
+    while True:
+        chunk = os.read(3, 65536)
+        if not chunk:
+            break
+        buf += chunk
+        while b"\\0" in buf:
+            raw, buf = buf.split(b"\\0", 1)
+            msg = json.loads(raw)
+            method, sid = msg["method"], msg.get("sessionId")
+            result = {}
+            if method == "Target.createTarget":
+                result = {"targetId": "T1"}
+            elif method == "Target.attachToTarget":
+                result = {"sessionId": "S1"}
+            elif method == "Page.navigate":
+                result = {"frameId": "F1"}
+                for event, params in (
+                    ("Network.requestWillBeSent", {"requestId": "1"}),
+                    ("Network.loadingFinished", {"requestId": "1"}),
+                    ("Page.loadEventFired", {}),
+                ):
+                    send({"method": event, "params": params, "sessionId": sid})
+            elif method == "Runtime.evaluate":
+                if "outerHTML" in msg["params"]["expression"]:
+                    result = {"result": {"value": "<html><body>ready</body></html>"}}
+                else:
+                    result = {"result": {"value": 5000}}
+            send({"id": msg["id"], "result": result})
+            if method == "Browser.close":
+                raise SystemExit(0)
+    """
+)
+
+
+def test_page_loader_returns_once_page_is_ready(tmp_path, monkeypatch):
+    """Loader speaks the DevTools pipe protocol and stops well before the budget."""
+    browser = tmp_path / "fake-chromium"
+    browser.write_text(f"#!{sys.executable}\n{FAKE_BROWSER}")
+    browser.chmod(browser.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path / "data"))
+    from core.config import AppSettings, ChromiumSettings
+
+    chromium = ChromiumSettings(
+        CHROMIUM_BIN=str(browser),
+        CHROMIUM_VIRTUAL_TIME_BUDGET_MS=20000,
+        CHROMIUM_NETWORK_IDLE_MS=50,
+    )
+    loader = ChromiumPageLoader(AppSettings(chromium=chromium))
+    capture = loader.capture("https://example.com", "dom")
+
+    assert capture.content == "<html><body>ready</body></html>"
+    assert capture.readiness.strategy == "network_idle"
+    assert capture.readiness.ready is True
+    assert capture.readiness.requests == 1
+    assert capture.readiness.elapsed_ms < 20000
@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+from core.config import AppSettings
+from storage.codecs import DictionaryStore, GzipCodec, ZstdCodec, build_codec, open_decoded, remote_dictionary_path
+from storage.local_file_storage import LocalFileStorage
+
+zstandard = pytest.importorskip("zstandard")
+
+PAGE = b"<html><head><title>Story</title></head><body>" + b"<p>Repeated article text.</p>" * 2000 + b"</body></html>"
+
+
+def _pages(n: int) -> list[bytes]:
+    return [
+        b"<html><head><meta charset='utf-8'><link rel='stylesheet' href='/site.css'></head><body>"
+        b"<nav><a href='/'>Home</a><a href='/news'>News</a><a href='/about'>About</a></nav>"
+        + f"<article><h1>Story {i}</h1><p>Body of story number {i * 7919}.</p></article>".encode()
+        + b"<footer>Copyright Example News. All rights reserved.</footer></body></html>"
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("codec", [GzipCodec(), ZstdCodec(level=3), ZstdCodec(level=19, long_distance=True)])
+def test_local_storage_round_trips_each_codec(tmp_path, codec):
+    source = tmp_path / "output.html"
+    source.write_bytes(PAGE)
+    storage = LocalFileStorage(tmp_path / "bucket")
+
+    result = storage.upload_file(source, "archives/a/monolith/output.html", codec=codec)
+
+    stored_path = f"archives/a/monolith/output.html{codec.suffix}"
+    assert result.success and result.codec == codec.name
+    assert result.stored_size < result.original_size
+    with storage.get_file_stream(stored_path) as stream:
+        assert stream.read() == PAGE
+    assert storage.download_file(stored_path, tmp_path / "copy.html")
+    assert (tmp_path / "copy.html").read_bytes() == PAGE
+    temp = storage.download_to_temp(stored_path)
+    assert temp.suffix == ".html" and temp.read_bytes() == PAGE
+
+
+def test_dictionary_frames_need_their_dictionary(tmp_path):
+    store = DictionaryStore(tmp_path / "dicts")
+    dict_id = store.train("monolith", _pages(200), dict_size=4096)
+    codec = ZstdCodec(level=10, dictionary=store.current("monolith"))
+    sample = _pages(201)[-1]
+
+    encoded = codec.compress_bytes(sample)
+
+    assert codec.dictionary_id == dict_id and codec.describe()["dict_id"] == dict_id
+    assert len(encoded) < len(ZstdCodec(level=10).compress_bytes(sample))
+    with open_decoded(io.BytesIO(encoded), "output.html.zst", dictionaries=store) as stream:
+        assert stream.read() == sample
+    with pytest.raises(LookupError):
+        open_decoded(io.BytesIO(encoded), "output.html.zst", dictionaries=DictionaryStore(tmp_path / "empty"))
+
+
+def test_missing_dictionary_is_fetched_back_from_providers(tmp_path):
+    store = DictionaryStore(tmp_path / "dicts")
+    dict_id = store.train("monolith", _pages(200), dict_size=4096)
+    storage = LocalFileStorage(tmp_path / "bucket")
+    storage.upload_file(store.path_for(dict_id), remote_dictionary_path(dict_id), compress=False)
+    sample = _pages(201)[-1]
+    encoded = ZstdCodec(level=10, dictionary=store.current("monolith")).compress_bytes(sample)
+
+    fresh = DictionaryStore(tmp_path / "fresh", remotes=[LocalFileStorage(tmp_path / "other"), storage])
+    with open_decoded(io.BytesIO(encoded), "output.html.zst", dictionaries=fresh) as stream:
+        assert stream.read() == sample
+    assert fresh.path_for(dict_id).read_bytes() == store.path_for(dict_id).read_bytes()
+
+
+def test_build_codec_defaults_to_gzip(tmp_path):
+    assert isinstance(build_codec(AppSettings(DATA_DIR=tmp_path)), GzipCodec)
+
+    codec = build_codec(
+        AppSettings(DATA_DIR=tmp_path, UPLOAD_CODEC="zstd", UPLOAD_CODEC_LEVEL=6, ZSTD_LONG_DISTANCE=True)
+    )
+    assert isinstance(codec, ZstdCodec)
+    assert codec.describe() == {"codec": "zstd", "level": 6, "long_distance": True}
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from core.config import AppSettings
+from core.utils import check_url_freshness
+from models import ArchiveResult
+from task_manager.archiver import ArchiverTaskManager, BatchItem, BatchTask
+
+BODY = b"<html><body>article</body></html>"
+
+
+class _Origin(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+            self.send_header("Last-Modified", "Mon, 05 Oct 2026 10:00:00 GMT")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Origin)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_first_fetch_returns_validators(origin):
+    check = check_url_freshness(f"{origin}/etag")
+
+    assert check.status_code == 200 and not check.not_modified
+    assert check.etag == '"v1"'
+    assert check.last_modified == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert check.content_hash == hashlib.sha256(BODY).hexdigest()
+
+
+def test_conditional_request_detects_304(origin):
+    check = check_url_freshness(f"{origin}/etag", etag='"v1"')
+
+    assert check.status_code == 304 and check.not_modified
+    assert check.should_archive and check.etag == '"v1"'
+
+
+def test_content_hash_used_without_validators(origin):
+    same = check_url_freshness(f"{origin}/plain", content_hash=hashlib.sha256(BODY).hexdigest())
+    changed = check_url_freshness(f"{origin}/plain", content_hash="0" * 64)
+
+    assert same.not_modified and same.etag is None
+    assert not changed.not_modified
+
+
+class _Archiver:
+    name = "monolith"
+
+    def __init__(self, out):
+        self.out = out
+        self.calls = 0
+
+    def archive(self, *, url, item_id):
+        self.calls += 1
+        self.out.write_text("<html></html>")
+        return ArchiveResult(success=True, exit_code=0, saved_path=str(self.out))
+
+    def postprocess_output(self, result, item_id):
+        return result
+
+    def output_exists(self, path):
+        return Path(path).exists()
+
+
+class _Repos:
+    """In-memory stand-in for the URL and artifact repositories."""
+
+    def __init__(self):
+        self.url = SimpleNamespace(id=1, etag=None, last_modified=None, content_hash=None, validated_at=None)
+        self.artifact = None
+
+    def get_by_url(self, url):
+        return self.url
+
+    def update_validators(self, archived_url_id, **fields):
+        for name, value in fields.items():
+            setattr(self.url, name, value)
+
+    def find_successful(self, item_id, url, archiver):
+        return self.artifact if self.artifact and self.artifact.success else None
+
+    def get_by_id(self, rowid):
+        return SimpleNamespace(archived_url_id=1)
+
+    def finalize_result(
+        self, *, rowid, success, exit_code, saved_path=None, size_bytes=None, storage_uploads=None, asset_dedup=None
+    ):
+        self.artifact = SimpleNamespace(
+            success=success, saved_path=saved_path, archived_url_id=1, updated_at=datetime.utcnow()
+        )
+        return 1
+
+
+def _manager(tmp_path, archiver):
+    settings = AppSettings(DATA_DIR=tmp_path, CONDITIONAL_REARCHIVE=True, SKIP_EXISTING_SAVES=False)
+    manager = ArchiverTaskManager(settings, {"monolith": archiver})
+    repos = _Repos()
+    manager.url_repo = manager.artifact_repo = repos
+    return manager, repos
+
+
+def _run(manager, url):
+    item = BatchItem(item_id="item", url=url, rowid=1, archiver_name="monolith")
+    manager.process(BatchTask(task_id="t", archiver_name="monolith", items=[item]))
+
+
+def test_unchanged_page_reuses_previous_artifact(tmp_path, origin):
+    archiver = _Archiver(tmp_path / "output.html")
+    manager, repos = _manager(tmp_path, archiver)
+
+    _run(manager, f"{origin}/etag")
+    assert archiver.calls == 1
+    assert repos.url.etag == '"v1"' and repos.url.validated_at is not None
+
+    _run(manager, f"{origin}/etag")
+    assert archiver.calls == 1
+    assert repos.artifact.success and repos.artifact.saved_path == str(tmp_path / "output.html")
+
+
+def test_artifact_older_than_validators_is_rearchived(tmp_path, origin):
+    archiver = _Archiver(tmp_path / "output.html")
+    manager, repos = _manager(tmp_path, archiver)
+    _run(manager, f"{origin}/etag")
+
+    # Another archiver stored these validators after this capture was taken
+    repos.artifact.updated_at = repos.url.validated_at - timedelta(seconds=1)
+    _run(manager, f"{origin}/etag")
+
+    assert archiver.calls == 2
@@ -0,0 +1,106 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from gcs_emulator import GcsEmulator
+from storage.gcs_file_storage import GCSFileStorage
+from storage.local_file_storage import LocalFileStorage
+from storage.serving import accepts_coding, parse_byte_range
+from web.static_files import RehydratingStaticFiles
+
+PAGE = b"<html><body>" + b"<p>archived paragraph</p>" * 2000 + b"</body></html>"
+STORED = gzip.compress(PAGE)
+
+
+def _client(provider) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/saves/{path:path}")
+    def serve(path: str, request: Request):
+        return provider.serve_file(path, "item-1.html", "text/html", request_headers=request.headers)
+
+    return TestClient(app)
+
+
+def _raw(client, path, **headers):
+    with client.stream("GET", path, headers=headers) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.fixture
+def local(tmp_path):
+    path = tmp_path / "archives" / "item-1" / "monolith" / "output.html.gz"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(STORED)
+    return _client(LocalFileStorage(tmp_path))
+
+
+@pytest.fixture
+def gcs(monkeypatch):
+    emulator = GcsEmulator().start()
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", emulator.url)
+    emulator.store("archives", "archives/item-1/monolith/output.html.gz", STORED, {"contentType": "text/html"})
+    yield _client(GCSFileStorage("archives"))
+    emulator.stop()
+
+
+@pytest.mark.parametrize("client", ["local", "gcs"])
+def test_compressed_object_is_sent_as_stored(client, request):
+    client = request.getfixturevalue(client)
+    path = "/saves/archives/item-1/monolith/output.html.gz"
+
+    response, body = _raw(client, path, **{"Accept-Encoding": "br, gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert body == STORED
+
+    etag = response.headers["etag"]
+    assert client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+
+    response, body = _raw(client, path, **{"Accept-Encoding": "gzip", "Range": "bytes=10-99"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-99/{len(STORED)}"
+    assert body == STORED[10:100]
+
+
+@pytest.mark.parametrize("client", ["local", "gcs"])
+def test_clients_without_gzip_get_decoded_content(client, request):
+    client = request.getfixturevalue(client)
+    path = "/saves/archives/item-1/monolith/output.html.gz"
+
+    response, body = _raw(client, path, **{"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert body == PAGE
+    assert response.headers["etag"].endswith('-identity"')
+
+
+def test_static_mount_serves_compressed_sibling(tmp_path):
+    (tmp_path / "item-1").mkdir()
+    (tmp_path / "item-1" / "output.html.gz").write_bytes(STORED)
+    app = FastAPI()
+    app.mount("/files", RehydratingStaticFiles(directory=str(tmp_path)), name="files")
+    client = TestClient(app)
+
+    response, body = _raw(client, "/files/item-1/output.html", **{"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.headers["content-encoding"] == "gzip" and body == STORED
+    assert client.get("/files/item-1/missing.html").status_code == 404
+
+
+def test_header_parsing():
+    assert accepts_coding("gzip;q=0.5, br", "gzip")
+    assert not accepts_coding("gzip;q=0, *", "gzip")
+    assert accepts_coding("*", "zstd")
+    assert not accepts_coding(None, "gzip")
+    assert parse_byte_range("bytes=-10", 100) == (90, 100)
+    assert parse_byte_range("bytes=95-200", 100) == (95, 100)
+    assert parse_byte_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_byte_range("bytes=100-", 100)
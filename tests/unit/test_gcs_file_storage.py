@@ -0,0 +1,128 @@
+import gc
+import gzip
+import os
+import tempfile
+
+import pytest
+
+from gcs_emulator import GcsEmulator
+from storage.codecs import GzipCodec, ZstdCodec, zstandard
+from storage.gcs_file_storage import GCSFileStorage
+
+CHUNK = 256 * 1024
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    server = GcsEmulator().start()
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", server.url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    # Random lines compress, but not below a few chunks
+    path = tmp_path / "output.html"
+    path.write_bytes(b"".join(os.urandom(48).hex().encode() + b"\n" for _ in range(40000)))
+    return path
+
+
+def test_streamed_gzip_upload_spans_resumable_chunks(emulator, artifact, monkeypatch):
+    storage = GCSFileStorage("archives", chunk_size=CHUNK + 1000)
+    monkeypatch.setattr(tempfile, "mkstemp", lambda *a, **kw: pytest.fail("upload staged a temp file"))
+
+    result = storage.upload_file(artifact, "item-1/output.html", codec=GzipCodec(level=6))
+
+    assert result.success, result.error
+    assert result.uri == "gs://archives/item-1/output.html.gz"
+    stored = emulator.data("item-1/output.html.gz")
+    assert result.stored_size == len(stored)
+    assert gzip.decompress(stored) == artifact.read_bytes()
+    # chunk_size rounds down to the 256 KiB grid, and every chunk but the last is full
+    lengths = [length for _, _, length in emulator.chunk_puts]
+    assert len(lengths) > 2 and set(lengths[:-1]) == {CHUNK}
+    assert emulator.objects["item-1/output.html.gz"]["resource"]["metadata"]["codec"] == "gzip"
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_streamed_zstd_upload_reads_back_decoded(emulator, artifact):
+    storage = GCSFileStorage("archives", chunk_size=CHUNK)
+
+    result = storage.upload_file(artifact, "item-1/output.html", codec=ZstdCodec(level=3))
+
+    assert result.success, result.error
+    with storage.get_file_stream("item-1/output.html.zst") as stream:
+        assert stream.read() == artifact.read_bytes()
+
+
+def test_failed_stream_does_not_finalize_a_truncated_object(emulator, artifact):
+    class BrokenCodec(GzipCodec):
+        def compress_stream(self, src, dst, size=None):
+            dst.write(os.urandom(3 * CHUNK))
+            raise OSError("disk read failed")
+
+    storage = GCSFileStorage("archives", chunk_size=CHUNK)
+
+    result = storage.upload_file(artifact, "item-1/output.html", codec=BrokenCodec())
+
+    assert not result.success and "disk read failed" in result.error
+    gc.collect()  # a collected writer must not finalize the upload either
+    assert emulator.chunk_puts  # full chunks were already sent ...
+    assert "item-1/output.html.gz" not in emulator.objects  # ... but the session never completed
+
+
+def test_failed_chunk_is_retried_without_restarting_the_upload(emulator, artifact):
+    storage = GCSFileStorage("archives", chunk_size=CHUNK)
+    storage.retry = storage.retry.with_delay(initial=0.01, maximum=0.05)
+    emulator.fail_chunks = {CHUNK, 3 * CHUNK}
+
+    result = storage.upload_file(artifact, "item-1/output.html", compress=False)
+
+    assert result.success, result.error
+    assert emulator.data("item-1/output.html") == artifact.read_bytes()
+    assert not emulator.fail_chunks
+    offsets = [start for _, start, _ in emulator.chunk_puts]
+    assert offsets == sorted(set(offsets))  # each chunk landed once, in order
+
+
+def test_large_file_uploads_as_composed_parts(emulator, artifact):
+    storage = GCSFileStorage("archives", chunk_size=CHUNK, composite_threshold=CHUNK, composite_parts=4)
+    precompressed = artifact.with_name("output.html.gz")
+    precompressed.write_bytes(gzip.compress(artifact.read_bytes(), 1))
+
+    result = storage.upload_file(artifact, "item-1/output.html", codec=GzipCodec(), precompressed=precompressed)
+
+    assert result.success, result.error
+    assert result.stored_size == precompressed.stat().st_size
+    assert list(emulator.objects) == ["item-1/output.html.gz"]  # parts were cleaned up
+    obj = emulator.objects["item-1/output.html.gz"]
+    assert obj["data"] == precompressed.read_bytes()
+    assert obj["resource"]["contentType"] == "text/html"
+    assert obj["resource"]["metadata"]["original_size"] == str(artifact.stat().st_size)
+    assert len(emulator.composed) == 1 and len(emulator.composed[0]) == 4
+    assert len({name for name, _, _ in emulator.chunk_puts}) == 4
+
+
+def test_small_files_skip_composite_mode(emulator, tmp_path):
+    storage = GCSFileStorage("archives", chunk_size=CHUNK, composite_threshold=CHUNK)
+    small = tmp_path / "output.pdf"
+    small.write_bytes(b"%PDF-1.4 small")
+
+    result = storage.upload_file(small, "item-1/output.pdf", compress=False)
+
+    assert result.success, result.error
+    assert emulator.data("item-1/output.pdf") == b"%PDF-1.4 small"
+    assert not emulator.composed
+
+
+def test_composite_parts_rule_is_added_once(emulator):
+    storage = GCSFileStorage("archives", composite_threshold=CHUNK)
+    emulator.bucket("archives")["lifecycle"] = {"rule": [{"action": {"type": "Delete"}, "condition": {"age": 1095}}]}
+
+    assert storage.ensure_composite_parts_rule()
+    assert not storage.ensure_composite_parts_rule()
+
+    rules = emulator.bucket("archives")["lifecycle"]["rule"]
+    assert rules[0]["condition"] == {"age": 1095}  # existing rules are kept
+    assert rules[1:] == [{"action": {"type": "Delete"}, "condition": {"age": 1, "matchesPrefix": ["_composite/"]}}]
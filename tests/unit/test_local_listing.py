@@ -0,0 +1,69 @@
+import gzip
+
+from storage.local_file_storage import LocalFileStorage
+
+
+def _tree(root):
+    paths = [
+        "archives/a/monolith/output.html.gz",
+        "archives/a/pdf/output.pdf",
+        "archives/a.txt",
+        "archives/b/monolith/output.html",
+        "archives/b10/screenshot/output.png",
+        "assets/ab/abcdef.css",
+        "top.json",
+    ]
+    for path in paths:
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(gzip.compress(b"x" * 100) if path.endswith(".gz") else b"x" * 10)
+    (root / "archives" / "empty").mkdir()
+    return paths
+
+
+def test_pages_resume_from_cursor(tmp_path):
+    storage = LocalFileStorage(tmp_path)
+    expected = _tree(tmp_path)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = storage.list_files_page(limit=2, cursor=cursor)
+        seen.extend(m.path for m in page)
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert [m.path for m in storage.iter_files(start_after="archives/a/pdf/output.pdf")] == expected[2:]
+    assert storage.list_files(limit=3) == list(storage.iter_files())[:3]
+
+
+def test_metadata_comes_from_the_directory_entry(tmp_path):
+    storage = LocalFileStorage(tmp_path)
+    _tree(tmp_path)
+
+    listed = next(storage.iter_files("archives/a/monolith/"))
+
+    assert listed.path == "archives/a/monolith/output.html.gz"
+    assert listed.compressed and listed.content_type == "text/html"
+    assert listed.size == (tmp_path / listed.path).stat().st_size
+    assert listed.original_size is None  # codec headers are left to get_metadata
+
+
+def test_prefix_and_shards(tmp_path):
+    storage = LocalFileStorage(tmp_path)
+    _tree(tmp_path)
+
+    assert [m.path for m in storage.iter_files("archives/b")] == [
+        "archives/b/monolith/output.html",
+        "archives/b10/screenshot/output.png",
+    ]
+    assert list(storage.iter_files("missing/")) == []
+
+    everything = [m.path for m in storage.iter_files("archives/")]
+    shards = [[m.path for m in storage.iter_files("archives/", shard=(i, 3))] for i in range(3)]
+    assert sorted(sum(shards, [])) == sorted(everything)
+    assert all(
+        {path.split("/")[1] for path in shard}.isdisjoint(path.split("/")[1] for path in other)
+        for i, shard in enumerate(shards)
+        for other in shards[i + 1:]
+    )
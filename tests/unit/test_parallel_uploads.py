@@ -0,0 +1,83 @@
+import threading
+import time
+from pathlib import Path
+
+from archivers.pdf import PDFArchiver
+from core.config import AppSettings
+from storage.codecs import GzipCodec
+from storage.file_storage import UploadResult
+from storage.local_file_storage import LocalFileStorage
+
+
+class CountingCodec(GzipCodec):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def compress_stream(self, src, dst, size=None):
+        self.calls += 1
+        super().compress_stream(src, dst, size)
+
+
+class SlowProvider:
+    def __init__(self, name, delay):
+        self.provider_name = name
+        self.delay = delay
+        self.precompressed = []
+        self.finished = threading.Event()
+
+    def upload_file(self, local_path, destination_path, compress=True, storage_class=None, codec=None, precompressed=None):
+        self.precompressed.append(Path(precompressed))
+        assert Path(precompressed).exists()
+        time.sleep(self.delay)
+        self.finished.set()
+        return UploadResult(success=True, uri=f"{self.provider_name}://{destination_path}", original_size=1, stored_size=1, codec=codec.name)
+
+
+def _removed(path, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return not path.exists()
+
+
+def _archiver(tmp_path, providers, monkeypatch, **settings):
+    codec = CountingCodec()
+    monkeypatch.setattr("archivers.base.build_codec", lambda *args, **kwargs: codec)
+    archiver = PDFArchiver(None, AppSettings(DATA_DIR=tmp_path / "data", **settings), file_storage_providers=providers)
+    _, out_path = archiver.get_output_path("item-1")
+    out_path.write_bytes(b"%PDF-1.4 " + b"0" * 10000)
+    return archiver, out_path, codec
+
+
+def test_uploads_run_concurrently_from_one_compressed_copy(tmp_path, monkeypatch):
+    providers = [SlowProvider("a", 0.5), SlowProvider("b", 0.5), LocalFileStorage(tmp_path / "bucket")]
+    archiver, out_path, codec = _archiver(tmp_path, providers, monkeypatch)
+
+    started = time.monotonic()
+    results = archiver.upload_to_all_providers(out_path, "item-1")
+    elapsed = time.monotonic() - started
+
+    assert [r["success"] for r in results] == [True, True, True]
+    assert elapsed < 0.9  # sequential uploads would take over 1s
+    assert codec.calls == 1
+    assert providers[0].precompressed == providers[1].precompressed
+    assert (tmp_path / "bucket" / "archives" / "item-1" / "pdf" / "output.pdf.gz").exists()
+    assert _removed(providers[0].precompressed[0])
+
+
+def test_slow_provider_times_out_without_blocking_others(tmp_path, monkeypatch):
+    slow = SlowProvider("slow", 1.0)
+    providers = [slow, LocalFileStorage(tmp_path / "bucket")]
+    archiver, out_path, _ = _archiver(tmp_path, providers, monkeypatch, UPLOAD_TIMEOUTS="slow=0.2")
+
+    started = time.monotonic()
+    results = archiver.upload_to_all_providers(out_path, "item-1")
+
+    assert time.monotonic() - started < 0.8
+    assert results[0]["success"] is False and "timed out" in results[0]["error"]
+    assert results[1]["success"] is True
+    # The encoded copy outlives the timed-out upload that is still reading it
+    assert slow.precompressed[0].exists()
+    assert slow.finished.wait(2)
+    assert _removed(slow.precompressed[0])
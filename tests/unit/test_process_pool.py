@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from archivers.readability_extraction import extract_readability
+from core.metrics import MetricsRegistry
+from core.process_pool import ProcessPool, ProcessPoolTimeout
+
+
+@pytest.fixture
+def pool():
+    pool = ProcessPool(1, name="test", metrics=MetricsRegistry())
+    yield pool
+    pool.shutdown()
+
+
+def test_runs_task_in_worker_process(pool):
+    assert pool.run(pow, 2, 10, timeout=30) == 1024
+
+
+def test_task_exceptions_propagate(pool):
+    with pytest.raises(ValueError):
+        pool.run(int, "not a number", timeout=30)
+
+
+def test_timeout_recycles_pool(pool):
+    with pytest.raises(ProcessPoolTimeout):
+        pool.run(time.sleep, 30, timeout=0.5)
+    assert pool.metrics.get("process_pool_timeouts_total", pool="test") == 1
+
+    # The next task gets a fresh executor instead of queueing behind the hung one
+    started = time.monotonic()
+    assert pool.run(pow, 3, 2, timeout=30) == 9
+    assert time.monotonic() - started < 25
+
+
+def test_tasks_lost_to_another_timeout_are_resubmitted_once():
+    pool = ProcessPool(2, name="test", metrics=MetricsRegistry())
+    outcome = {}
+
+    def innocent():
+        try:
+            outcome["result"] = pool.run(time.sleep, 1.5, timeout=30)
+        except Exception as exc:
+            outcome["error"] = exc
+
+    try:
+        pool.run(pow, 2, 2, timeout=30)  # both workers up before the race starts
+        thread = threading.Thread(target=innocent)
+        thread.start()
+        with pytest.raises(ProcessPoolTimeout):
+            pool.run(time.sleep, 30, timeout=0.5)
+        thread.join(timeout=30)
+    finally:
+        pool.shutdown()
+
+    assert outcome == {"result": None}
+    assert pool.metrics.get("process_pool_resubmits_total", pool="test") == 1
+
+
+def test_readability_extraction_payload_round_trips(pool):
+    html = (
+        "<html lang='en'><head><title>Example story</title>"
+        "<meta property='og:site_name' content='Example'></head>"
+        "<body><article><p>" + "Words in the article body. " * 40 + "</p></article></body></html>"
+    )
+
+    payload = pool.run(extract_readability, html, "https://example.com/story", timeout=60)
+
+    assert payload["title"] == "Example story"
+    assert "Words in the article body." in payload["article_html"]
+    assert payload["meta"]["site_name"] == "Example"
+    assert payload["meta"]["language"] == "en"
+    assert payload["meta"]["word_count"] == 200
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+from core.metrics import MetricsRegistry
+from core.process_watchdog import ProcessWatchdog
+
+
+def _spawn_sleeper():
+    return subprocess.Popen(["sleep", "30"], start_new_session=True)
+
+
+def test_watchdog_kills_group_over_wall_clock_ceiling():
+    metrics = MetricsRegistry()
+    watchdog = ProcessWatchdog(max_job_seconds=0.05, max_job_rss_mb=None, metrics=metrics)
+    proc = _spawn_sleeper()
+    try:
+        with watchdog.watch(proc, archiver="pdf"):
+            time.sleep(0.1)
+            stats = watchdog.sweep()
+        assert stats.killed == 1
+        assert proc.wait(timeout=5) == -9
+        assert metrics.get("chromium_watchdog_kills_total", reason="wall_clock", archiver="pdf") == 1
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_watchdog_kills_group_over_rss_ceiling():
+    metrics = MetricsRegistry()
+    watchdog = ProcessWatchdog(max_job_seconds=None, max_job_rss_mb=1, metrics=metrics)
+    watchdog.max_job_rss_bytes = 1  # any real process exceeds one byte
+    proc = _spawn_sleeper()
+    try:
+        with watchdog.watch(proc, archiver="screenshot"):
+            stats = watchdog.sweep()
+        assert stats.killed == 1
+        assert proc.wait(timeout=5) == -9
+        assert metrics.get("chromium_watchdog_kills_total", reason="rss", archiver="screenshot") == 1
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_watchdog_leaves_healthy_groups_alone():
+    watchdog = ProcessWatchdog(max_job_seconds=60, max_job_rss_mb=4096, metrics=MetricsRegistry())
+    proc = _spawn_sleeper()
+    try:
+        with watchdog.watch(proc) as pgid:
+            assert watchdog.tracked_groups == [pgid]
+            assert watchdog.sweep().killed == 0
+            assert proc.poll() is None
+        assert watchdog.tracked_groups == []
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def _spawn_stray_browser(tmp_path, profile):
+    chrome = tmp_path / "chrome"
+    if not chrome.exists():
+        chrome.symlink_to(sys.executable)
+    # Started through a shell that exits at once, like a browser left behind by a crashed job
+    shell = subprocess.run(
+        ["sh", "-c", f'"{chrome}" -c "import time; time.sleep(30)" --user-data-dir={profile} >/dev/null 2>&1 & echo $!'],
+        capture_output=True,
+        text=True,
+        start_new_session=True,
+    )
+    proc = psutil.Process(int(shell.stdout))
+    deadline = time.monotonic() + 5
+    while proc.name() != "chrome" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return proc
+
+
+def test_orphan_sweep_only_kills_browsers_on_our_profile(tmp_path):
+    ours = _spawn_stray_browser(tmp_path, tmp_path / "chromium-user-data-singlefile-worker")
+    foreign = _spawn_stray_browser(tmp_path, "/home/someone/.config/chromium")
+    watchdog = ProcessWatchdog(
+        orphan_grace_seconds=0, user_data_dir=tmp_path / "chromium-user-data", metrics=MetricsRegistry()
+    )
+    try:
+        assert ours.ppid() != os.getpid() and foreign.ppid() != os.getpid()
+        assert watchdog.sweep().orphans_killed == 1
+        assert foreign.is_running() and foreign.status() != psutil.STATUS_ZOMBIE
+    finally:
+        for proc in (ours, foreign):
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
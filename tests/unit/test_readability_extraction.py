@@ -0,0 +1,67 @@
+import json
+
+from archivers.readability_extraction import PageMetadata, extract_readability
+
+BODY = "<article><p>" + "Words in the article body. " * 40 + "</p></article>"
+
+
+def _page(head: str) -> str:
+    return f"<html lang='EN'><head><title>Story</title>{head}</head><body>{BODY}</body></html>"
+
+
+def test_metadata_from_meta_and_link_tags():
+    html = _page(
+        "<meta name='author' content='A. Writer'>"
+        "<meta property='og:image' content='https://example.com/og.png'>"
+        "<meta name='keywords' content='one, two,,three'>"
+        "<link rel='Shortcut Icon' href='/favicon.ico'>"
+        "<link rel='canonical' href='https://example.com/story'>"
+    )
+
+    meta = extract_readability(html, "https://example.com/story?ref=x")["meta"]
+
+    assert meta["byline"] == "A. Writer"
+    assert meta["top_image"] == "https://example.com/og.png"
+    assert meta["keywords"] == ["one", "two", "three"]
+    assert meta["favicon"] == "/favicon.ico"
+    assert meta["canonical_url"] == "https://example.com/story"
+    assert meta["language"] == "en"
+    assert meta["word_count"] == 200
+    assert meta["text"].startswith("Words in the article body.")
+
+
+def test_json_ld_fills_missing_metadata():
+    ld = {
+        "@graph": [
+            {"@type": "WebSite", "name": "Example"},
+            {
+                "@type": "NewsArticle",
+                "author": [{"@type": "Person", "name": "B. Reporter"}],
+                "datePublished": "2024-05-01T10:00:00Z",
+                "image": {"url": "https://example.com/ld.png"},
+            },
+        ]
+    }
+    html = _page(f"<script type='application/ld+json'>{json.dumps(ld)}</script>")
+
+    meta = extract_readability(html, "https://example.com/story")["meta"]
+
+    assert meta["byline"] == "B. Reporter"
+    assert meta["published"] == "2024-05-01T10:00:00Z"
+    assert meta["top_image"] == "https://example.com/ld.png"
+
+
+def test_first_matching_tag_wins_and_bad_json_ld_is_ignored():
+    import lxml.html as LH
+
+    tree = LH.document_fromstring(
+        _page(
+            "<meta name='description' content='first'><meta name='description' content='second'>"
+            "<script type='application/ld+json'>{not json</script>"
+        )
+    )
+
+    page = PageMetadata(tree)
+
+    assert page.meta(("name", "description")) == "first"
+    assert page.json_ld == []
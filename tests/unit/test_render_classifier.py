@@ -0,0 +1,151 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.config import AppSettings
+from core.render_classifier import RenderClassifier, analyze_html
+
+
+ARTICLE = "<html><body><article>{}</article></body></html>".format(
+    "<p>" + " ".join(["word"] * 400) + "</p>"
+)
+SPA_SHELL = (
+    "<html><head><script src='/bundle.js'></script></head>"
+    "<body><div id='root'></div>"
+    "<noscript>You need to enable JavaScript to run this app.</noscript></body></html>"
+)
+
+
+def _settings(tmp_path, **extra):
+    return AppSettings(DATA_DIR=tmp_path, ADAPTIVE_RENDER=True, **extra)
+
+
+def test_analyze_html_static_article():
+    assert analyze_html(ARTICLE) == (False, "text-rich")
+
+
+def test_analyze_html_detects_empty_spa_root():
+    needs_js, reason = analyze_html(SPA_SHELL)
+    assert needs_js
+    assert reason == "empty-spa-root:root"
+
+
+def test_analyze_html_detects_noscript_hint():
+    html = (
+        "<html><body><p>" + " ".join(["teaser"] * 160) + "</p>"
+        "<noscript>Please enable JavaScript to continue.</noscript></body></html>"
+    )
+    assert analyze_html(html) == (True, "noscript-hint")
+
+
+def test_analyze_html_thin_content_needs_js():
+    assert analyze_html("<html><body><p>Loading...</p></body></html>") == (True, "thin-content")
+
+
+def test_classifier_reuses_one_fetch_per_url(tmp_path):
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return ARTICLE
+
+    classifier = RenderClassifier(_settings(tmp_path), fetch=fetch)
+    first = classifier.static_page("https://blog.example.com/a")
+    second = classifier.static_page("https://blog.example.com/a")
+    assert first is not None and first.html == ARTICLE
+    assert second is first
+    assert calls == ["https://blog.example.com/a"]
+
+
+def test_classifier_learns_js_domains_and_persists(tmp_path):
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return SPA_SHELL
+
+    settings = _settings(tmp_path)
+    classifier = RenderClassifier(settings, fetch=fetch)
+    assert classifier.static_page("https://www.app.example.com/one") is None
+
+    # A fresh classifier loads the learned verdict and skips the probe fetch
+    reloaded = RenderClassifier(settings, fetch=fetch)
+    decision = reloaded.classify("https://app.example.com/two")
+    assert decision.needs_js and decision.reason == "domain-cache"
+    assert calls == ["https://www.app.example.com/one"]
+
+
+def test_noscript_hints_are_not_learned_for_the_domain(tmp_path):
+    teaser = (
+        "<html><body><p>" + " ".join(["teaser"] * 160) + "</p>"
+        "<noscript>Please enable JavaScript to continue.</noscript></body></html>"
+    )
+    pages = {"https://news.example.com/paywalled": teaser, "https://news.example.com/open": ARTICLE}
+    classifier = RenderClassifier(_settings(tmp_path), fetch=pages.get)
+
+    assert classifier.static_page("https://news.example.com/paywalled") is None
+    assert classifier.static_page("https://news.example.com/open") is not None
+
+
+def test_learned_domain_verdicts_expire(tmp_path):
+    settings = _settings(tmp_path, ADAPTIVE_RENDER_DOMAIN_TTL_DAYS=1)
+    classifier = RenderClassifier(settings, fetch=lambda url: ARTICLE)
+    classifier.record_outcome("https://app.example.com/one", needs_js=True)
+    assert classifier.classify("https://app.example.com/two").reason == "domain-cache"
+
+    classifier._domains["app.example.com"]["updated_at"] -= 2 * 86400
+    assert classifier.static_page("https://app.example.com/three") is not None
+    assert [p.name for p in tmp_path.iterdir()] == ["render_domains.json"]  # no temp files left
+
+
+def test_classifier_feedback_overrides_static_verdict(tmp_path):
+    classifier = RenderClassifier(_settings(tmp_path), fetch=lambda url: ARTICLE)
+    assert classifier.static_page("https://news.example.com/x") is not None
+    classifier.record_outcome("https://news.example.com/x", needs_js=True)
+    assert classifier.static_page("https://news.example.com/y") is None
+
+
+def test_classifier_disabled_returns_none(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path)
+    classifier = RenderClassifier(settings, fetch=lambda url: ARTICLE)
+    assert classifier.static_page("https://blog.example.com/a") is None
+
+
+class _Pages(BaseHTTPRequestHandler):
+    release = threading.Event()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path == "/declared":
+            self.send_header("Content-Length", str(10 * 1024 * 1024))
+        self.end_headers()
+        if self.path == "/article":
+            self.wfile.write(ARTICLE.encode())
+            return
+        # An endless page: the fetch must give up without waiting for the rest
+        self.wfile.write(b"<p>" + b"x" * 8192)
+        self.wfile.flush()
+        _Pages.release.wait(5)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_fetch_stops_reading_past_the_size_limit(monkeypatch):
+    monkeypatch.setattr("core.render_classifier._MAX_HTML_BYTES", 4096)
+    _Pages.release = threading.Event()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Pages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        started = time.monotonic()
+        assert RenderClassifier._http_fetch(f"{base}/declared") is None
+        assert RenderClassifier._http_fetch(f"{base}/endless") is None
+        assert time.monotonic() - started < 2
+        monkeypatch.setattr("core.render_classifier._MAX_HTML_BYTES", 1024 * 1024)
+        assert RenderClassifier._http_fetch(f"{base}/article") == ARTICLE
+    finally:
+        _Pages.release.set()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,90 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from archivers.screenshot import ScreenshotArchiver
+from archivers.screenshot_derivatives import encode_derivatives, thumbnail_name
+from core.config import AppSettings
+from models import ArchiveResult
+from storage.local_file_storage import LocalFileStorage
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _screenshot(path: Path, width: int = 1920, height: int = 4000) -> Path:
+    image = Image.new("RGBA", (width, height), "white")
+    for y in range(0, height, 40):
+        image.paste((30, 60, 200, 255), (100, y, width - 100, y + 12))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path, "PNG")
+    return path
+
+
+def test_encode_derivatives_writes_webp_and_top_cropped_thumbnails(tmp_path):
+    src = _screenshot(tmp_path / "output.png")
+
+    payload = encode_derivatives(str(src), ["webp", "avif"], 80, [(400, 300), (160, 120)])
+
+    by_name = {d["name"]: d for d in payload["derivatives"]}
+    webp = by_name["output.webp"]
+    assert webp["kind"] == "encoded" and (webp["width"], webp["height"]) == (1920, 4000)
+    assert webp["bytes"] < src.stat().st_size
+    assert ("output.avif" in by_name) != ("avif" in payload["skipped"])
+    with Image.open(tmp_path / thumbnail_name(400, 300)) as thumb:
+        assert thumb.size == (400, 300) and thumb.format == "WEBP"
+    assert by_name[thumbnail_name(160, 120)]["kind"] == "thumbnail"
+
+
+def test_screenshot_postprocess_records_and_uploads_derivatives(tmp_path, monkeypatch):
+    monkeypatch.setattr("archivers.screenshot.get_process_pool", lambda: None)
+    storage = LocalFileStorage(tmp_path / "bucket")
+    settings = AppSettings(DATA_DIR=tmp_path / "data", SCREENSHOT_FORMATS="webp", SCREENSHOT_THUMBNAILS="400x300")
+    archiver = ScreenshotArchiver(None, settings, file_storage_providers=[storage])
+    _, out_path = archiver.get_output_path("item-1")
+    _screenshot(out_path)
+
+    result = archiver.postprocess_output(ArchiveResult(success=True, exit_code=0, saved_path=str(out_path)), "item-1")
+
+    names = [d["name"] for d in result.metadata["derivatives"]]
+    assert names == ["output.webp", "thumb-400x300.webp"]
+    assert result.size_bytes == sum(p.stat().st_size for p in out_path.parent.iterdir())
+
+    threads = []
+    upload_file = storage.upload_file
+    monkeypatch.setattr(
+        storage, "upload_file", lambda *a, **kw: threads.append(threading.current_thread().name) or upload_file(*a, **kw)
+    )
+    assert archiver.upload_derivatives(out_path.parent, names, "item-1") == 2
+    assert (tmp_path / "bucket" / "archives" / "item-1" / "screenshot" / "thumb-400x300.webp").exists()
+    assert all(name.startswith("upload") for name in threads)  # on the shared upload pool
+
+
+def test_screenshot_derivatives_disabled(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path, SCREENSHOT_FORMATS="", SCREENSHOT_THUMBNAILS="")
+    archiver = ScreenshotArchiver(None, settings)
+    _, out_path = archiver.get_output_path("item-1")
+    _screenshot(out_path, 200, 200)
+
+    result = archiver.postprocess_output(ArchiveResult(success=True, exit_code=0, saved_path=str(out_path)), "item-1")
+
+    assert result.metadata is None
+    assert [p.name for p in out_path.parent.iterdir()] == ["output.png"]
+
+
+def test_encoded_screenshot_replaces_the_png_when_not_kept(tmp_path):
+    storage = LocalFileStorage(tmp_path / "bucket")
+    settings = AppSettings(
+        DATA_DIR=tmp_path / "data", SCREENSHOT_FORMATS="webp", SCREENSHOT_THUMBNAILS="400x300", SCREENSHOT_KEEP_PNG=False
+    )
+    archiver = ScreenshotArchiver(None, settings, file_storage_providers=[storage])
+    out_dir, out_path = archiver.get_output_path("item-1")
+    png = _screenshot(out_path.with_suffix(".png"))
+
+    result = archiver.postprocess_output(ArchiveResult(success=True, exit_code=0, saved_path=str(png)), "item-1")
+
+    assert result.saved_path == str(out_path) == str(out_dir / "output.webp")
+    assert [d["name"] for d in result.metadata["derivatives"]] == ["thumb-400x300.webp"]
+    assert sorted(p.name for p in out_dir.iterdir()) == ["output.webp", "thumb-400x300.webp"]
+    [upload] = archiver.upload_to_all_providers(out_path, "item-1")
+    assert upload["storage_path"].startswith("archives/item-1/screenshot/output.webp")
@@ -0,0 +1,144 @@
+import builtins
+import gzip
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+from archivers.pdf import PDFArchiver
+from core.config import AppSettings
+from core.metrics import MetricsRegistry
+from db.models import ArchiveArtifact
+from db.repositories import _set_storage_uploads
+from models import ArchiveResult
+from storage.artifact_manifest import ArtifactManifest
+from storage.codecs import GzipCodec, ZstdCodec, decoded_size, encode_file
+from storage.local_file_storage import LocalFileStorage
+
+PDF = b"%PDF-1.4 " + b"page " * 5000
+
+
+def test_encode_file_measures_and_hashes_in_one_read(tmp_path):
+    src = tmp_path / "output.pdf"
+    src.write_bytes(PDF)
+
+    encoded = encode_file(GzipCodec(), src, tmp_path / "output.pdf.gz")
+
+    assert encoded.original_size == len(PDF)
+    assert encoded.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert encoded.stored_size == encoded.path.stat().st_size
+    assert gzip.decompress(encoded.path.read_bytes()) == PDF
+
+
+def test_encoded_zstd_frames_record_their_content_size(tmp_path):
+    pytest.importorskip("zstandard")
+    src = tmp_path / "output.pdf"
+    src.write_bytes(PDF)
+
+    encoded = encode_file(ZstdCodec(level=3), src, tmp_path / "output.pdf.zst")
+
+    assert decoded_size(encoded.path) == len(PDF)
+
+
+def test_finalize_reads_the_output_once(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    archiver = PDFArchiver(
+        None,
+        AppSettings(DATA_DIR=data_dir, ENABLE_LOCAL_CLEANUP=False),
+        file_storage_providers=[LocalFileStorage(tmp_path / "a"), LocalFileStorage(tmp_path / "b")],
+    )
+    archiver.artifact_manifest = manifest = ArtifactManifest(data_dir, metrics=MetricsRegistry())
+    manifest.reconcile()
+    _, out_path = archiver.get_output_path("item-1")
+    out_path.write_bytes(PDF)
+
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, mode="r", *args, **kwargs):
+        if str(file) == str(out_path) and "r" in mode:
+            opened.append(mode)
+        return real_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    result = archiver.finalize_with_storage(
+        ArchiveResult(success=True, exit_code=0, saved_path=str(out_path)), "item-1"
+    )
+    monkeypatch.setattr(builtins, "open", real_open)
+
+    digest = hashlib.sha256(PDF).hexdigest()
+    uploads = result.metadata["storage_uploads"]
+    assert opened == ["rb"]
+    assert [u["success"] for u in uploads] == [True, True]
+    assert {u["content_sha256"] for u in uploads} == {digest}
+    assert manifest.get(out_path).sha256 == digest
+    for root, upload in zip(("a", "b"), uploads):
+        stored = tmp_path / root / upload["storage_path"]
+        assert stored.exists()
+        assert gzip.decompress(stored.read_bytes()) == PDF
+
+    artifact = ArchiveArtifact()
+    _set_storage_uploads(artifact, uploads)
+    assert artifact.content_sha256 == digest
+    assert artifact.original_size == len(PDF)
+    assert artifact.stored_size == uploads[0]["stored_size"] < len(PDF)
+    assert artifact.codec == "gzip"
+
+
+class RecordingStorage(LocalFileStorage):
+    def __init__(self, root_dir):
+        super().__init__(root_dir)
+        self.calls = []
+
+    def upload_file(self, local_path, destination_path, *args, **kwargs):
+        self.calls.append(kwargs)
+        return super().upload_file(local_path, destination_path, *args, **kwargs)
+
+
+def test_single_provider_streams_and_hashes_while_uploading(tmp_path, monkeypatch):
+    storage = RecordingStorage(tmp_path / "bucket")
+    archiver = PDFArchiver(None, AppSettings(DATA_DIR=tmp_path / "data"), file_storage_providers=[storage])
+    monkeypatch.setattr(archiver, "_encode_output", lambda *args: pytest.fail("staged an encoded copy"))
+    _, out_path = archiver.get_output_path("item-1")
+    out_path.write_bytes(PDF)
+
+    [upload] = archiver.upload_to_all_providers(out_path, "item-1")
+
+    assert storage.calls[0]["precompressed"] is None
+    assert upload["content_sha256"] == hashlib.sha256(PDF).hexdigest()
+    assert gzip.decompress((tmp_path / "bucket" / upload["storage_path"]).read_bytes()) == PDF
+
+
+def test_dedup_hit_skips_compression(tmp_path, monkeypatch):
+    class Index:
+        def __init__(self):
+            self.rows = {}
+
+        def find(self, content_sha256, provider, codec):
+            return self.rows.get((content_sha256, provider, codec))
+
+        def record(self, content_sha256, provider, codec, storage_path, **fields):
+            self.rows[(content_sha256, provider, codec)] = SimpleNamespace(storage_path=storage_path, **fields)
+
+        def forget(self, content_sha256, provider, codec):
+            self.rows.pop((content_sha256, provider, codec), None)
+
+    compressed = []
+    compress_stream = GzipCodec.compress_stream
+
+    def counting_compress(self, src, dst, size=None):
+        compressed.append(size)
+        compress_stream(self, src, dst, size)
+
+    monkeypatch.setattr(GzipCodec, "compress_stream", counting_compress)
+    providers = [LocalFileStorage(tmp_path / "a"), LocalFileStorage(tmp_path / "b")]
+    archiver = PDFArchiver(None, AppSettings(DATA_DIR=tmp_path / "data"), file_storage_providers=providers)
+    archiver.object_index = Index()
+    _, out_path = archiver.get_output_path("item-1")
+    out_path.write_bytes(PDF)
+
+    archiver.upload_to_all_providers(out_path, "item-1")
+    results = archiver.upload_to_all_providers(out_path, "item-1")
+
+    assert [r["deduplicated"] for r in results] == [True, True]
+    assert compressed == [len(PDF)]  # only the first save was encoded
@@ -0,0 +1,64 @@
+import hashlib
+import shlex
+from pathlib import Path
+from types import SimpleNamespace
+
+from archivers.singlefile_cli import SingleFileCLIArchiver
+from core.config import AppSettings
+
+
+class FakeRunner:
+    """Pretends to be single-file; skips URLs listed in ``unmatched``."""
+
+    def __init__(self, unmatched=()):
+        self.commands = []
+        self.unmatched = set(unmatched)
+
+    def execute(self, command, timeout, archived_url_id=None, archiver=None):
+        self.commands.append(command)
+        args = shlex.split(command)
+        options = dict(arg.split("=", 1) for arg in args if arg.startswith("--") and "=" in arg)
+        if "--urls-file" in options:
+            out_dir = Path(options["--output-directory"])
+            for url in Path(options["--urls-file"]).read_text().split():
+                if url in self.unmatched:
+                    continue
+                digest = hashlib.sha1(url.encode()).hexdigest()
+                (out_dir / f"{digest}.html").write_text(f"<html>{url}</html>")
+        else:
+            Path(args[2]).write_text(f"<html>{args[1]}</html>")
+        return SimpleNamespace(timed_out=False, exit_code=0)
+
+
+def test_archive_batch_maps_outputs_back_to_items(tmp_path):
+    runner = FakeRunner(unmatched={"https://example.com/redirects"})
+    archiver = SingleFileCLIArchiver(runner, AppSettings(DATA_DIR=tmp_path))
+    items = [
+        ("https://example.com/a", "item-a"),
+        ("https://example.com/redirects", "item-b"),
+        ("https://example.com/c", "item-c"),
+    ]
+
+    results = archiver.archive_batch(items)
+
+    assert [r.success for r in results] == [True, True, True]
+    for (url, item_id), result in zip(items, results):
+        saved = Path(result.saved_path)
+        assert saved == tmp_path / item_id / "singlefile" / "output.html"
+        assert saved.read_text() == f"<html>{url}</html>"
+
+    # One batch invocation plus one individual retry for the unmatched URL
+    assert len(runner.commands) == 2
+    assert "--urls-file=" in runner.commands[0]
+    assert "https://example.com/redirects" in runner.commands[1]
+    assert not list(tmp_path.glob("singlefile-batch-*"))
+
+
+def test_archive_batch_single_item_uses_regular_path(tmp_path):
+    runner = FakeRunner()
+    archiver = SingleFileCLIArchiver(runner, AppSettings(DATA_DIR=tmp_path))
+
+    results = archiver.archive_batch([("https://example.com/", "only")])
+
+    assert results[0].success
+    assert "--urls-file" not in runner.commands[0]
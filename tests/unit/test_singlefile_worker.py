@@ -0,0 +1,76 @@
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from core.singlefile_worker import SingleFileWorkerClient, SingleFileWorkerError
+
+# Speaks the worker protocol; "crash" URLs exit the process, "hang" URLs never answer.
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json, os, sys, time
+    print(json.dumps({"ready": True, "pid": os.getpid()}), flush=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        if "crash" in job["url"]:
+            sys.exit(3)
+        if "hang" in job["url"]:
+            time.sleep(60)
+        with open(job["output"], "w") as fh:
+            fh.write(f"{os.getpid()} {job['url']}")
+        print("log noise from the library", flush=True)
+        print(json.dumps({"id": job["id"], "ok": True}), flush=True)
+    """
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    script = tmp_path / "worker.py"
+    script.write_text(FAKE_WORKER)
+    client = SingleFileWorkerClient([sys.executable, str(script)], startup_timeout=10, job_timeout=10)
+    yield client
+    client.close()
+
+
+def _pid(path: Path) -> str:
+    return path.read_text().split()[0]
+
+
+def test_worker_is_reused_across_jobs(client, tmp_path):
+    client.capture("https://example.com/a", tmp_path / "a.html")
+    client.capture("https://example.com/b", tmp_path / "b.html")
+
+    assert (tmp_path / "b.html").read_text().endswith("https://example.com/b")
+    assert _pid(tmp_path / "a.html") == _pid(tmp_path / "b.html")
+    assert client.restarts == 0
+
+
+def test_worker_restarts_after_crash(client, tmp_path):
+    client.capture("https://example.com/a", tmp_path / "a.html")
+    with pytest.raises(SingleFileWorkerError, match="exited"):
+        client.capture("https://example.com/crash", tmp_path / "crash.html")
+    assert not client.running
+
+    client.capture("https://example.com/b", tmp_path / "b.html")
+    assert client.restarts == 1
+    assert _pid(tmp_path / "a.html") != _pid(tmp_path / "b.html")
+
+
+def test_hung_job_times_out_and_worker_restarts(client, tmp_path):
+    with pytest.raises(SingleFileWorkerError, match="timed out"):
+        client.capture("https://example.com/hang", tmp_path / "hang.html", timeout=0.5)
+    assert not client.running
+
+    client.capture("https://example.com/b", tmp_path / "b.html")
+    assert (tmp_path / "b.html").exists()
+
+
+def test_worker_recycles_after_max_jobs(client, tmp_path):
+    client.max_jobs = 1
+    client.capture("https://example.com/a", tmp_path / "a.html")
+    client.capture("https://example.com/b", tmp_path / "b.html")
+
+    assert _pid(tmp_path / "a.html") != _pid(tmp_path / "b.html")
+    assert client.restarts == 0
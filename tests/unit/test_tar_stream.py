@@ -0,0 +1,91 @@
+import base64
+import gzip
+import io
+import tarfile
+
+import pytest
+
+from api.saves import _bundle_members
+from core.config import AppSettings
+from core.tar_stream import TarMember, stream_tar_gz
+from storage.asset_store import AssetStore
+from storage.codecs import GzipCodec, ZstdCodec, zstandard
+from storage.local_file_storage import LocalFileStorage
+
+
+def _members(archive: bytes) -> dict[str, bytes]:
+    with tarfile.open(fileobj=io.BytesIO(archive), mode="r:gz") as tar:
+        return {info.name: tar.extractfile(info).read() for info in tar.getmembers()}
+
+
+def test_stream_tar_gz_reads_members_lazily():
+    opened = []
+
+    def member(name, data):
+        return TarMember(name, len(data), lambda: opened.append(name) or io.BytesIO(data))
+
+    chunks = stream_tar_gz(iter([member("a/one.txt", b"1" * 700), member("b/two.bin", b"")]))
+    first = next(chunks)
+
+    assert first and "b/two.bin" not in opened
+    assert _members(first + b"".join(chunks)) == {"a/one.txt": b"1" * 700, "b/two.bin": b""}
+
+
+def test_stream_tar_gz_rejects_size_mismatch():
+    short = TarMember("short.txt", 10, lambda: io.BytesIO(b"abc"))
+    with pytest.raises(IOError, match="short"):
+        b"".join(stream_tar_gz([short]))
+
+
+def test_bundle_streams_decoded_provider_objects(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path / "data")
+    storage = LocalFileStorage(tmp_path / "bucket")
+    page = b"<html>" + b"page " * 50000 + b"</html>"
+    source = tmp_path / "output.html"
+    source.write_bytes(page)
+    storage.upload_file(source, "archives/item-1/monolith/output.html", codec=GzipCodec())
+    pdf = tmp_path / "data" / "item-1" / "pdf" / "output.pdf"
+    pdf.parent.mkdir(parents=True)
+    pdf.write_bytes(b"%PDF-1.4 local only")
+    sources = [
+        ("monolith", storage, "archives/item-1/monolith/output.html.gz", False),
+        ("pdf", None, str(pdf), False),
+    ]
+    if zstandard is not None:
+        storage.upload_file(source, "archives/item-1/singlefile/output.html", codec=ZstdCodec(level=3))
+        sources.append(("singlefile", storage, "archives/item-1/singlefile/output.html.zst", False))
+
+    members = list(_bundle_members(sources, settings, [storage]))
+    archive = _members(b"".join(stream_tar_gz(members)))
+
+    assert members[0].size == len(page)  # from the gzip trailer, without decoding
+    assert archive["monolith/output.html"] == page
+    assert archive["pdf/output.pdf"] == b"%PDF-1.4 local only"
+    if zstandard is not None:
+        assert archive["singlefile/output.html"] == page
+    assert gzip.decompress((tmp_path / "bucket" / sources[0][2]).read_bytes()) == page
+
+
+def test_bundle_rehydrates_only_flagged_html(tmp_path):
+    settings = AppSettings(DATA_DIR=tmp_path / "data")
+    font = b"\x00font" * 2000
+    original = b"<html><style>@font-face{src:url(data:font/woff2;base64," + base64.b64encode(font) + b")}</style></html>"
+    page = tmp_path / "output.html"
+    page.write_bytes(original)
+    AssetStore(settings.resolved_asset_store_dir).dedupe_file(page)
+    opened = []
+
+    class Storage(LocalFileStorage):
+        def get_file_stream(self, path):
+            opened.append(path)
+            return super().get_file_stream(path)
+
+    storage = Storage(tmp_path / "bucket")
+    storage.upload_file(page, "archives/item-1/monolith/output.html", codec=GzipCodec())
+    key = "archives/item-1/monolith/output.html.gz"
+
+    [plain] = _bundle_members([("monolith", storage, key, False)], settings, [storage])
+    assert opened == []  # described without reading the page
+    [flagged] = _bundle_members([("monolith", storage, key, True)], settings, [storage])
+    assert _members(b"".join(stream_tar_gz([plain])))["monolith/output.html"] == page.read_bytes()
+    assert _members(b"".join(stream_tar_gz([flagged])))["monolith/output.html"] == original
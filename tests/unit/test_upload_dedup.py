@@ -0,0 +1,139 @@
+import gzip
+from types import SimpleNamespace
+
+import pytest
+
+from archivers.pdf import PDFArchiver
+from core.config import AppSettings
+from core.metrics import get_metrics
+from gcs_emulator import GcsEmulator
+from storage.gcs_file_storage import GCSFileStorage
+from storage.local_file_storage import LocalFileStorage
+
+PDF = b"%PDF-1.4 " + b"same bytes " * 2000
+
+
+class MemoryIndex:
+    """In-memory stand-in for StoredObjectRepository."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def find(self, content_sha256, provider, codec):
+        return self.rows.get((content_sha256, provider, codec))
+
+    def record(self, content_sha256, provider, codec, storage_path, storage_uri=None, stored_size=None, original_size=None):
+        for key, row in list(self.rows.items()):
+            if key[1] == provider and row.storage_path == storage_path and key[0] != content_sha256:
+                del self.rows[key]
+        self.rows[(content_sha256, provider, codec)] = SimpleNamespace(
+            storage_path=storage_path, storage_uri=storage_uri, stored_size=stored_size, original_size=original_size
+        )
+
+    def forget(self, content_sha256, provider, codec):
+        return int(self.rows.pop((content_sha256, provider, codec), None) is not None)
+
+
+class CountingStorage(LocalFileStorage):
+    def __init__(self, root_dir):
+        super().__init__(root_dir)
+        self.uploads = []
+
+    def upload_file(self, local_path, destination_path, *args, **kwargs):
+        self.uploads.append(destination_path)
+        return super().upload_file(local_path, destination_path, *args, **kwargs)
+
+
+def _archiver(tmp_path, providers, index):
+    archiver = PDFArchiver(None, AppSettings(DATA_DIR=tmp_path / "data"), file_storage_providers=providers)
+    archiver.object_index = index
+    return archiver
+
+
+def _save(archiver, item_id, data=PDF):
+    _, out_path = archiver.get_output_path(item_id)
+    out_path.write_bytes(data)
+    return archiver.upload_to_all_providers(out_path, item_id)
+
+
+def test_identical_content_is_not_uploaded_again(tmp_path):
+    storage = CountingStorage(tmp_path / "bucket")
+    archiver = _archiver(tmp_path, [storage], MemoryIndex())
+    metrics = get_metrics()
+    saved_before = metrics.get("storage_upload_dedup_bytes_total", provider="local")
+
+    first = _save(archiver, "item-1")
+    requeued = _save(archiver, "item-1")
+    other_item = _save(archiver, "item-2")
+    changed = _save(archiver, "item-1", PDF + b"edit")
+
+    assert storage.uploads == ["archives/item-1/pdf/output.pdf", "archives/item-1/pdf/output.pdf"]
+    assert not first[0]["deduplicated"] and not changed[0]["deduplicated"]
+    assert requeued[0]["deduplicated"] and requeued[0]["storage_path"] == first[0]["storage_path"]
+    assert requeued[0]["content_sha256"] == first[0]["content_sha256"]
+
+    # Another item gets its own copy, made without an upload, that later
+    # changes to item-1 leave alone
+    assert other_item[0]["storage_path"] == "archives/item-2/pdf/output.pdf.gz"
+    assert gzip.decompress((tmp_path / "bucket" / other_item[0]["storage_path"]).read_bytes()) == PDF
+    assert other_item[0]["original_size"] == len(PDF)
+    assert metrics.get("storage_upload_dedup_bytes_total", provider="local") - saved_before == 2 * first[0]["stored_size"]
+
+
+def test_missing_or_overwritten_objects_are_not_reused(tmp_path):
+    storage = CountingStorage(tmp_path / "bucket")
+    index = MemoryIndex()
+    archiver = _archiver(tmp_path, [storage], index)
+
+    first = _save(archiver, "item-1")
+    (tmp_path / "bucket" / first[0]["storage_path"]).unlink()
+    again = _save(archiver, "item-1")
+
+    assert not again[0]["deduplicated"]
+    assert storage.uploads == ["archives/item-1/pdf/output.pdf"] * 2
+    assert (tmp_path / "bucket" / again[0]["storage_path"]).exists()
+    assert len(index.rows) == 1
+
+    # Overwriting the object with new content retires its old index entry
+    _save(archiver, "item-1", PDF + b"edit")
+    copied = _save(archiver, "item-2")
+    assert not copied[0]["deduplicated"]
+    assert gzip.decompress((tmp_path / "bucket" / copied[0]["storage_path"]).read_bytes()) == PDF
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    emulator = GcsEmulator().start()
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", emulator.url)
+    yield emulator
+    emulator.stop()
+
+
+def test_gcs_copies_server_side(tmp_path, emulator):
+    gcs = GCSFileStorage("archives")
+    local = CountingStorage(tmp_path / "bucket")
+    archiver = _archiver(tmp_path, [gcs, local], MemoryIndex())
+
+    _save(archiver, "item-1")
+    puts = len(emulator.chunk_puts)
+    results = _save(archiver, "item-2")
+
+    assert [r["deduplicated"] for r in results] == [True, True]
+    assert len(emulator.chunk_puts) == puts  # nothing sent to GCS
+    assert emulator.copied == [("archives/item-1/pdf/output.pdf.gz", "archives/item-2/pdf/output.pdf.gz")]
+    assert results[0]["storage_uri"] == "gs://archives/archives/item-2/pdf/output.pdf.gz"
+    assert emulator.data("archives/item-2/pdf/output.pdf.gz") == emulator.data("archives/item-1/pdf/output.pdf.gz")
+
+
+def test_providers_sharing_a_name_each_get_their_object(tmp_path):
+    first, second = CountingStorage(tmp_path / "a"), CountingStorage(tmp_path / "b")
+    archiver = _archiver(tmp_path, [first, second], MemoryIndex())
+
+    results = _save(archiver, "item-1")
+
+    assert [r["provider_name"] for r in results] == ["local", "local"]
+    assert [r["provider_index"] for r in results] == [0, 1]
+    assert first.uploads == second.uploads == ["archives/item-1/pdf/output.pdf"]
+    assert results[0]["storage_uri"] != results[1]["storage_uri"]
+    for root, result in zip(("a", "b"), results):
+        assert gzip.decompress((tmp_path / root / result["storage_path"]).read_bytes()) == PDF
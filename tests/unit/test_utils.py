@@ -29,3 +29,14 @@ def test_sanitize_filename_preserves_leading_underscores_and_dashes():
     # But still strip leading dots (hidden files)
     assert sanitize_filename(".hidden") == "hidden"
     assert sanitize_filename("._file") == "_file"
+
+
+def test_get_output_size_sums_nested_files(tmp_path):
+    from core.utils import get_output_size
+
+    (tmp_path / "output.html").write_bytes(b"x" * 10)
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "a.css").write_bytes(b"y" * 5)
+
+    assert get_output_size(tmp_path) == 15
+    assert get_output_size(tmp_path / "missing") == 0
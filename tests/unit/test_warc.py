@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import io
+import json
+import shlex
+import threading
+import zipfile
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from archivers.warc import WarcArchiver
+from core.asset_proxy import AssetProxy
+from core.config import AppSettings, ChromiumSettings
+from core.warc import Page, WarcRecorder, WarcWriter, surt, write_wacz
+from storage.local_file_storage import LocalFileStorage
+
+BIG = b"x" * (300 * 1024)
+
+
+class _Origin(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = BIG if self.path == "/big.js" else b"<html><script src='/big.js'></script></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/javascript" if self.path == "/big.js" else "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Origin)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _record_at(warc: bytes, offset: int, length: int) -> bytes:
+    """Decompress a single gzip member, as a replay tool would from the CDXJ."""
+    return zlib.decompress(warc[offset:offset + length], 31)
+
+
+def test_surt_keys():
+    assert surt("https://www.Example.com/A/b?z=1&a=2") == "com,example)/a/b?a=2&z=1"
+    assert surt("http://127.0.0.1:8080/") == "1,0,0,127:8080)/"
+
+
+def test_recording_proxy_writes_indexed_gzip_per_record_warc(tmp_path, origin):
+    warc_path = tmp_path / "data.warc.gz"
+    with WarcWriter(warc_path) as writer:
+        recorder = WarcRecorder(writer, spool_bytes=1024)
+        proxy = AssetProxy(None, port=0, key_path=tmp_path / "key.pem", recorder=recorder)
+        proxy.start()
+        try:
+            with httpx.Client(proxy=proxy.url) as client:
+                assert client.get(f"{origin}/").status_code == 200
+                assert client.get(f"{origin}/big.js").content == BIG
+        finally:
+            proxy.stop()
+            assert recorder.drain()
+            proxy.upstream.close()
+
+    data = warc_path.read_bytes()
+    assert gzip.decompress(data).count(b"WARC/1.1\r\n") == 5  # warcinfo + 2 x (response, request)
+
+    by_url = {entry.url: entry for entry in writer.index}
+    big = by_url[f"{origin}/big.js"]
+    record = _record_at(data, big.offset, big.length)
+    assert record.startswith(b"WARC/1.1\r\nWARC-Type: response\r\n")
+    assert record.endswith(b"\r\n\r\n" + BIG + b"\r\n\r\n")
+    assert big.mime == "application/javascript" and big.status == 200
+    assert big.digest == "sha256:" + hashlib.sha256(BIG).hexdigest()
+
+
+def test_wacz_package_lists_resources_with_hashes(tmp_path):
+    warc_path = tmp_path / "data.warc.gz"
+    with WarcWriter(warc_path) as writer:
+        writer.write_exchange(
+            "https://example.com/",
+            b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n",
+            None,
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 5\r\n\r\n",
+            io.BytesIO(b"hello"),
+            status=200,
+            mime="text/html",
+        )
+    writer.write_cdxj(tmp_path / "index.cdxj")
+    write_wacz(tmp_path / "out.wacz", warc_path, tmp_path / "index.cdxj", [Page(url="https://example.com/")])
+
+    with zipfile.ZipFile(tmp_path / "out.wacz") as zf:
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+        package = json.loads(zf.read("datapackage.json"))
+        for resource in package["resources"]:
+            assert resource["hash"] == "sha256:" + hashlib.sha256(zf.read(resource["path"])).hexdigest()
+        digest = json.loads(zf.read("datapackage-digest.json"))
+        assert digest["hash"] == "sha256:" + hashlib.sha256(zf.read("datapackage.json")).hexdigest()
+        assert zf.read("indexes/index.cdxj").startswith(b"com,example)/ ")
+    assert package["mainPageUrl"] == "https://example.com/"
+
+
+class FakeChromium:
+    """Loads the page and its script through the ``--proxy-server`` it is given."""
+
+    def execute(self, command, timeout, archived_url_id=None, archiver=None):
+        args = shlex.split(command)
+        proxy = next(a.split("=", 1)[1] for a in args if a.startswith("--proxy-server="))
+        with httpx.Client(proxy=proxy) as client:
+            client.get(args[-1])
+            client.get(args[-1].rstrip("/") + "/big.js")
+        return SimpleNamespace(timed_out=False, exit_code=0, duration_seconds=0.1)
+
+
+def test_warc_archiver_packages_wacz(tmp_path, origin):
+    settings = AppSettings(DATA_DIR=tmp_path, chromium=ChromiumSettings(CHROMIUM_READINESS="virtual_time"))
+    archiver = WarcArchiver(FakeChromium(), settings)
+
+    result = archiver.archive(url=f"{origin}/", item_id="item-1")
+
+    assert result.success
+    saved = Path(result.saved_path)
+    assert saved == tmp_path / "item-1" / "warc" / "output.wacz"
+    assert sorted(p.name for p in saved.parent.iterdir()) == ["output.wacz"]
+    assert result.metadata["responses"] == 2
+    with zipfile.ZipFile(saved) as zf:
+        assert len(zf.read("indexes/index.cdxj").splitlines()) == 2
+
+
+def test_gzipped_warc_is_uploaded_without_recompressing(tmp_path):
+    providers = [LocalFileStorage(tmp_path / "a"), LocalFileStorage(tmp_path / "b")]
+    archiver = WarcArchiver(
+        None, AppSettings(DATA_DIR=tmp_path / "data", WARC_WACZ=False), file_storage_providers=providers
+    )
+    _, out_path = archiver.get_output_path("item-1")
+    out_path.write_bytes(gzip.compress(b"WARC/1.1\r\n\r\n"))
+
+    uploads = archiver.upload_to_all_providers(out_path, "item-1")
+
+    assert out_path.name == "output.warc.gz"
+    for root, upload in zip(("a", "b"), uploads):
+        assert upload["storage_path"] == "archives/item-1/warc/output.warc.gz"
+        assert upload["codec"] is None
+        assert upload["content_sha256"] == hashlib.sha256(out_path.read_bytes()).hexdigest()
+        assert (tmp_path / root / upload["storage_path"]).read_bytes() == out_path.read_bytes()